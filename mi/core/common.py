@@ -116,20 +116,59 @@ class BaseEnum(object):
     re-used more easily outside of a capability container as needed.
     """
     
+    @classmethod
+    def _members(cls):
+        """Compute the enum members of this class once and cache them.
+
+        The cache is stored in the class's own __dict__ so subclasses (and
+        multiply inherited enums) build their own member set the first time
+        they are used.  The cache name starts with '__' so it is never
+        mistaken for an enum value.
+        @retval tuple of (names, values, dict, hashable value set, unhashable
+        values)
+        """
+        members = cls.__dict__.get('__enum_members__')
+        if members is None:
+            names = []
+            values = []
+            for attr in dir(cls):
+                if attr.startswith('__'):
+                    continue
+                value = getattr(cls, attr)
+                if callable(value):
+                    continue
+                names.append(attr)
+                values.append(value)
+
+            hashable = set()
+            unhashable = []
+            for value in values:
+                try:
+                    hashable.add(value)
+                except TypeError:
+                    unhashable.append(value)
+
+            members = (tuple(names), tuple(values), dict(zip(names, values)),
+                       frozenset(hashable), tuple(unhashable))
+            setattr(cls, '__enum_members__', members)
+
+        return members
+
     @classmethod
     def list(cls):
-        """List the values of this enum."""
-        return [getattr(cls,attr) for attr in dir(cls) if\
-                not callable(getattr(cls,attr)) and not attr.startswith('__')]
+        """List the values of this enum.  A new list is returned on each
+        call so callers may modify it freely."""
+        return list(cls._members()[1])
+
+    @classmethod
+    def tuple(cls):
+        """Return the values of this enum as an immutable, cached tuple."""
+        return cls._members()[1]
 
     @classmethod
     def dict(cls):
         """Return a dict representation of this enum."""
-        result = {}
-        for attr in dir(cls):
-            if not callable(getattr(cls,attr)) and not attr.startswith('__'):
-                result[attr] = getattr(cls,attr)
-        return result
+        return dict(cls._members()[2])
 
     @classmethod
     def has(cls, item):
@@ -144,7 +183,15 @@ class BaseEnum(object):
         @retval True if one of the class attributes has value item, false
         otherwise.
         """
-        return item in cls.list()
+        members = cls._members()
+        try:
+            if item in members[3]:
+                return True
+        except TypeError:
+            # unhashable item, e.g. an InstErrorCode list
+            return item in members[1]
+
+        return item in members[4]
 
 class EventKey(BaseEnum):
     """Keys to the event dictionary fields as used by the InstrumentProtocol
@@ -13,6 +13,8 @@ __license__ = 'Apache 2.0'
 
 import time
 import copy
+import struct
+import binascii
 import ntplib
 import base64
 import logging
@@ -319,6 +321,172 @@ class DataParticle(object):
         """
         return self._encoding_errors
 
+class HexField(object):
+    """
+    A fixed width hex field of a record, published as an integer, or as a
+    list of integers when the field is an array of width hex digit values.
+    """
+    # struct format codes of the array widths that are whole bytes
+    STRUCT_CODES = {2: 'B', 4: 'H', 8: 'I'}
+
+    def __init__(self, key, group, width=None):
+        """
+        @param key The value id of the field in the particle
+        @param group The regex group holding the field, starting at 1
+        @param width Hex digits per value for array fields, None for a
+           single value
+        """
+        self.key = key
+        self.group = group
+        self.width = width
+
+    def expression(self, namespace, group_value):
+        """
+        Python expression for the particle value, used by ParticleSchema
+        @param namespace Names available to the expression, constants used
+           by the expression are added to it
+        @param group_value Function(group) returning the name holding the
+           integer value of a regex group
+        @retval list of (key, expression) tuples
+        """
+        if self.width is None:
+            return [(self.key, group_value(self.group))]
+        if self.width in self.STRUCT_CODES:
+            # whole bytes, unpack the binary values in one call
+            namespace['unhexlify'] = binascii.unhexlify
+            namespace['unpack'] = struct.unpack
+            return [(self.key, "list(unpack('>%%d%s' %% (len(g%d) // %d), unhexlify(g%d)))" %
+                     (self.STRUCT_CODES[self.width], self.group, self.width, self.group))]
+        return [(self.key, '[int(g%d[i:i + %d], 16) for i in xrange(0, len(g%d), %d)]' %
+                 (self.group, self.width, self.group, self.width))]
+
+class ScaledField(HexField):
+    """
+    A hex field published as value * scale + offset.
+    """
+    def __init__(self, key, group, scale, offset=0):
+        """
+        @param key The value id of the field in the particle
+        @param group The regex group holding the field, starting at 1
+        @param scale Multiplier applied to the integer value
+        @param offset Added to the scaled value
+        """
+        HexField.__init__(self, key, group)
+        self.scale = scale
+        self.offset = offset
+
+    def expression(self, namespace, group_value):
+        scale = 'scale_%d' % len(namespace)
+        namespace[scale] = self.scale
+        if not self.offset:
+            return [(self.key, '%s * %s' % (group_value(self.group), scale))]
+        offset = 'offset_%d' % len(namespace)
+        namespace[offset] = self.offset
+        return [(self.key, '%s * %s + %s' % (group_value(self.group), scale, offset))]
+
+class BitFlags(object):
+    """
+    A hex bit field expanded to one boolean particle value per flag.
+    """
+    def __init__(self, group, keys):
+        """
+        @param group The regex group holding the bit field, starting at 1
+        @param keys Value ids of the flags, starting at bit 0. None skips
+           a bit that is not published.
+        """
+        self.group = group
+        self.keys = keys
+
+    def expression(self, namespace, group_value):
+        return [(key, 'bool(%s & %d)' % (group_value(self.group), 1 << bit))
+                for bit, key in enumerate(self.keys) if key is not None]
+
+class ParticleSchema(object):
+    """
+    Declarative layout of a regex matched record. The fields are compiled
+    once, when the schema is created, into a single extractor function that
+    converts each regex group at most once and builds the particle values
+    in field order.
+    """
+    def __init__(self, matcher, fields):
+        """
+        @param matcher Compiled regex matching the whole record
+        @param fields HexField, ScaledField and BitFlags in particle
+           value order
+        """
+        self.matcher = matcher
+        self.fields = fields
+        self.keys = []
+        self._extract = self._compile()
+
+    def _compile(self):
+        namespace = {'VALUE_ID': DataParticleKey.VALUE_ID,
+                     'VALUE': DataParticleKey.VALUE}
+        converted = []
+
+        def group_value(group):
+            if group not in converted:
+                converted.append(group)
+            return 'v%d' % group
+
+        values = []
+        for field in self.fields:
+            for key, expression in field.expression(namespace, group_value):
+                name = 'key_%d' % len(self.keys)
+                namespace[name] = key
+                self.keys.append(key)
+                values.append('{VALUE_ID: %s, VALUE: %s}' % (name, expression))
+
+        lines = ['def extract(match):',
+                 '    groups = match.groups()']
+        lines += ['    g%d = groups[%d]' % (group, group - 1)
+                  for group in sorted(set(field.group for field in self.fields))]
+        lines += ['    v%d = int(g%d, 16)' % (group, group) for group in converted]
+        lines.append('    return [%s]' % ',\n            '.join(values))
+        self.source = '\n'.join(lines)
+
+        exec(compile(self.source, '<particle schema>', 'exec'), namespace)
+        return namespace['extract']
+
+    def extract(self, raw_data, match=None):
+        """
+        @param raw_data The record to parse
+        @param match A match of the schema regex on the record when the
+           caller already has one, None to match raw_data here
+        @retval The particle values list
+        @throws SampleException if the record does not match the schema regex
+        """
+        if match is None:
+            match = self.matcher.match(raw_data)
+        if not match:
+            raise SampleException("No regex match of parsed sample data: [%s]" % raw_data)
+        return self._extract(match)
+
+class SchemaDataParticle(DataParticle):
+    """
+    A data particle whose values are described by a ParticleSchema class
+    attribute rather than a hand written _build_parsed_values.
+    """
+    _schema = None
+
+    def __init__(self, raw_data, *args, **kwargs):
+        """
+        Takes the DataParticle arguments and an optional match keyword
+        argument, a match of the schema regex on raw_data that saves
+        matching the record again.
+        """
+        self._match = kwargs.pop('match', None)
+        DataParticle.__init__(self, raw_data, *args, **kwargs)
+
+    def _build_parsed_values(self):
+        """
+        @return the values tag for this data structure ready to JSONify
+        @raises SampleException when the raw data does not match the schema
+        """
+        if self._schema is None:
+            raise NotImplementedException("_schema not defined for %s" % self.__class__.__name__)
+        return self._schema.extract(self.raw_data, self._match)
+
 class RawDataParticleKey(BaseEnum):
     PAYLOAD = "raw"
     LENGTH = "length"
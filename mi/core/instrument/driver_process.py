@@ -11,7 +11,9 @@ __author__ = 'Edward Hunter'
 __license__ = 'Apache 2.0'
 
 import logging
+from collections import deque
 from threading import Thread
+from threading import Condition
 from subprocess import Popen
 from subprocess import PIPE
 import signal
@@ -19,11 +21,290 @@ import os
 import sys
 import time
 import traceback
+import __builtin__
+from mi.core.common import BaseEnum
 from mi.core.exceptions import InstrumentException, InstrumentCommandException
+from mi.core.exceptions import InstrumentParameterException
 from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.instrument.instrument_dict import InstrumentDict
 
 from ooi.logging import log
 
+# Set this environment variable to a non-empty value to time the driver
+# module import and report a per-module breakdown when the driver is
+# constructed.
+PROFILE_IMPORT_ENVIRONMENT_VARIABLE = 'MI_PROFILE_DRIVER_IMPORT'
+
+# Size and overflow policy of the driver event queue, see DriverEventQueue.
+EVENT_QUEUE_SIZE_ENVIRONMENT_VARIABLE = 'MI_DRIVER_EVENT_QUEUE_SIZE'
+EVENT_QUEUE_POLICY_ENVIRONMENT_VARIABLE = 'MI_DRIVER_EVENT_QUEUE_POLICY'
+DEFAULT_EVENT_QUEUE_SIZE = 100000
+
+
+class EventQueuePolicy(BaseEnum):
+    """
+    What DriverEventQueue.put does when the queue is full.
+    BLOCK - wait for the event thread to make room.
+    DROP_OLDEST - discard the oldest queued SAMPLE event.  Other events are
+    never discarded, the queue grows past its size for them when it holds
+    no samples.
+    COALESCE - as DROP_OLDEST, and a queued STATE_CHANGE or CONFIG_CHANGE
+    event is always replaced by a newer event of the same type, even when
+    the queue is not full.  The values of a replaced CONFIG_CHANGE event are
+    merged into a newer incremental one.
+    """
+    BLOCK = 'BLOCK'
+    DROP_OLDEST = 'DROP_OLDEST'
+    COALESCE = 'COALESCE'
+
+
+class DriverEventQueue(object):
+    """
+    Bounded FIFO of driver events between the driver, which puts events
+    from its own threads, and the messaging event thread, which gets them.
+    Keeps counters so the queue can be sized in production.
+
+    Samples and other events are queued apart, with a sequence number to
+    hand them out in order, so the oldest sample can be dropped without a
+    scan.  The queued event of each coalesced type is kept in _latest; a
+    coalesced event is marked removed and skipped when it reaches the head
+    of the queue.
+    """
+    COALESCED_EVENTS = (DriverAsyncEvent.STATE_CHANGE, DriverAsyncEvent.CONFIG_CHANGE)
+    # marks a queued event replaced by a newer one
+    _REMOVED = object()
+
+    def __init__(self, maxlen=DEFAULT_EVENT_QUEUE_SIZE, policy=EventQueuePolicy.DROP_OLDEST):
+        # queued [sequence number, event] entries
+        self._samples = deque()
+        self._events = deque()
+        self._latest = {}
+        self._sequence = 0
+        self._depth = 0
+        self._removed = 0
+        self._condition = Condition()
+        self.closed = False
+        self.received = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.configure(maxlen, policy)
+
+    def configure(self, maxlen=None, policy=None):
+        """
+        Change the queue size and/or overflow policy.
+        @raise InstrumentParameterException for a bad size or policy
+        """
+        if maxlen is not None:
+            if not isinstance(maxlen, (int, long)) or maxlen < 1:
+                raise InstrumentParameterException('Invalid event queue size: %r' % maxlen)
+            self.maxlen = maxlen
+        if policy is not None:
+            if not EventQueuePolicy.has(policy):
+                raise InstrumentParameterException('Invalid event queue policy: %r' % policy)
+            self.policy = policy
+
+    @staticmethod
+    def _event_type(evt):
+        if isinstance(evt, dict):
+            return evt.get('type')
+        return None
+
+    @staticmethod
+    def _merge_config_change(queued, evt):
+        """
+        @param queued A queued CONFIG_CHANGE event being replaced
+        @param evt The newer CONFIG_CHANGE event
+        @retval evt if it carries the full configuration, otherwise an event
+        with the queued values updated by the values of evt, full if the
+        queued event was.  Events without a 'full' flag are full.
+        """
+        if evt.get('full', True) or not isinstance(queued.get('value'), dict):
+            return evt
+        value = dict(queued['value'])
+        value.update(evt.get('value') or {})
+        return dict(evt, value=value, full=queued.get('full', True))
+
+    def _coalesce(self, evt_type, evt):
+        """
+        Remove the queued event of the type of evt, if any.
+        @retval evt, merged with the removed event for CONFIG_CHANGE
+        """
+        entry = self._latest.pop(evt_type, None)
+        if entry is None:
+            return evt
+
+        if evt_type == DriverAsyncEvent.CONFIG_CHANGE:
+            evt = self._merge_config_change(entry[1], evt)
+        entry[1] = self._REMOVED
+        self._depth -= 1
+        self._removed += 1
+        self.coalesced += 1
+
+        # drop the removed entries once they outnumber the queued ones
+        if self._removed * 2 > len(self._events):
+            self._events = deque(entry for entry in self._events if entry[1] is not self._REMOVED)
+            self._removed = 0
+        return evt
+
+    def _head(self, queue):
+        """
+        @retval the first queued entry of queue, None if it is empty.
+        """
+        while queue and queue[0][1] is self._REMOVED:
+            queue.popleft()
+            self._removed -= 1
+        if queue:
+            return queue[0]
+        return None
+
+    def put(self, evt):
+        """
+        Queue an event, applying the overflow policy.
+        """
+        with self._condition:
+            self.received += 1
+            evt_type = self._event_type(evt)
+
+            if self.policy == EventQueuePolicy.COALESCE and evt_type in self.COALESCED_EVENTS:
+                evt = self._coalesce(evt_type, evt)
+
+            if self.policy == EventQueuePolicy.BLOCK:
+                while self._depth >= self.maxlen and not self.closed:
+                    self._condition.wait(.1)
+
+            while self._depth >= self.maxlen and self._samples:
+                self._samples.popleft()
+                self._depth -= 1
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    log.warning('Driver event queue full (%d), %d samples dropped',
+                                self.maxlen, self.dropped)
+
+            entry = [self._sequence, evt]
+            self._sequence += 1
+            if evt_type == DriverAsyncEvent.SAMPLE:
+                self._samples.append(entry)
+            else:
+                self._events.append(entry)
+                if evt_type in self.COALESCED_EVENTS:
+                    self._latest[evt_type] = entry
+            self._depth += 1
+            self.max_depth = max(self.max_depth, self._depth)
+            self._condition.notify_all()
+
+    def extend(self, events):
+        for evt in events:
+            self.put(evt)
+
+    def get(self, timeout=None):
+        """
+        Remove and return the oldest event.
+        @param timeout seconds to wait for an event, None to wait forever.
+        @retval the event, or None if the timeout expired
+        """
+        with self._condition:
+            if not self._depth:
+                self._condition.wait(timeout)
+            if not self._depth:
+                return None
+
+            sample = self._head(self._samples)
+            event = self._head(self._events)
+            if event is None or (sample is not None and sample[0] < event[0]):
+                entry = self._samples.popleft()
+            else:
+                entry = self._events.popleft()
+                evt_type = self._event_type(entry[1])
+                if self._latest.get(evt_type) is entry:
+                    del self._latest[evt_type]
+            self._depth -= 1
+            self.sent += 1
+            self._condition.notify_all()
+            return entry[1]
+
+    def close(self):
+        """
+        Release any producer blocked on a full queue.
+        """
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def stats(self):
+        """
+        @retval dict of the queue configuration and counters.
+        """
+        with self._condition:
+            return {
+                'size': self.maxlen,
+                'policy': self.policy,
+                'depth': self._depth,
+                'max_depth': self.max_depth,
+                'received': self.received,
+                'sent': self.sent,
+                'dropped': self.dropped,
+                'coalesced': self.coalesced
+            }
+
+    def __len__(self):
+        return self._depth
+
+
+class ImportProfiler(object):
+    """
+    Times every module loaded while active by wrapping __import__. Each
+    newly loaded module is recorded with its inclusive time and its
+    exclusive time (less the time spent loading modules it imported).
+    Modules already in sys.modules are passed straight through.
+    """
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self._original_import = None
+        self._metadata_mark = 0
+
+    def start(self):
+        self._original_import = __builtin__.__import__
+        self._metadata_mark = InstrumentDict.load_count
+        __builtin__.__import__ = self._import
+
+    def stop(self):
+        if self._original_import:
+            __builtin__.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, *args, **kwargs):
+        if name in sys.modules:
+            return self._original_import(name, *args, **kwargs)
+
+        self._stack.append(0.0)
+        start = time.time()
+        try:
+            return self._original_import(name, *args, **kwargs)
+        finally:
+            elapsed = time.time() - start
+            child_time = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.records.append((name, elapsed, elapsed - child_time))
+
+    def report(self):
+        """
+        @retval dict with the import records sorted by exclusive time,
+        the metadata loads made since start and the total import time.
+        """
+        imports = sorted(self.records, key=lambda record: record[2], reverse=True)
+        loads = list(InstrumentDict.load_times)
+        new_loads = InstrumentDict.load_count - self._metadata_mark
+        return {
+            'imports': imports,
+            'metadata': loads[max(len(loads) - new_loads, 0):],
+            'total': sum([record[2] for record in self.records])
+        }
+
+
 class DriverProcess(object):
     """
     Base class for messaging enabled OS-level driver processes. Provides
@@ -56,8 +337,12 @@ class DriverProcess(object):
         self.driver_class = driver_class
         self.ppid = ppid
         self.driver = None
-        self.events = []
+        self.events = DriverEventQueue(
+            int(os.environ.get(EVENT_QUEUE_SIZE_ENVIRONMENT_VARIABLE, DEFAULT_EVENT_QUEUE_SIZE)),
+            os.environ.get(EVENT_QUEUE_POLICY_ENVIRONMENT_VARIABLE, EventQueuePolicy.DROP_OLDEST))
         self.messaging_started = False
+        self.profile_import = bool(os.environ.get(PROFILE_IMPORT_ENVIRONMENT_VARIABLE))
+        self.import_profile = None
         
     def construct_driver(self):
         """
@@ -67,9 +352,15 @@ class DriverProcess(object):
         """
         import_str = 'import %s as dvr_mod' % self.driver_module
         ctor_str = 'driver = dvr_mod.%s(self.send_event)' % self.driver_class
+        profiler = None
+        if self.profile_import:
+            profiler = ImportProfiler()
+            profiler.start()
+
         try:
             exec import_str
             log.info('Imported driver module %s' % self.driver_module)
+            ctor_start = time.time()
             exec ctor_str
             log.info('Constructed driver %s' % self.driver_class)
             
@@ -81,7 +372,33 @@ class DriverProcess(object):
 
         else:
             self.driver = driver
+            if profiler:
+                profiler.stop()
+                self.import_profile = profiler.report()
+                self.import_profile['construct'] = time.time() - ctor_start
+                self.log_import_profile()
             return True
+
+        finally:
+            if profiler:
+                profiler.stop()
+
+    def log_import_profile(self, count=25):
+        """
+        Log the import profile gathered by construct_driver.
+        @param count the number of slowest modules to report
+        """
+        profile = self.import_profile
+        if not profile:
+            return
+
+        lines = ['Driver import profile for %s: %.3fs importing, %.3fs constructing' %
+                 (self.driver_module, profile['total'], profile['construct'])]
+        for (name, inclusive, exclusive) in profile['imports'][:count]:
+            lines.append('  %8.4fs %8.4fs  %s' % (exclusive, inclusive, name))
+        for (source, elapsed) in profile['metadata']:
+            lines.append('  %8.4fs metadata  %s' % (elapsed, source))
+        log.info('\n'.join(lines))
             
     def start_messaging(self):
         """
@@ -103,6 +420,7 @@ class DriverProcess(object):
         Shutdown function prior to process exit.
         """
         log.info('Driver process shutting down.')
+        self.events.close()
         self.driver_module = None
         self.driver_class = None
         self.driver = None
@@ -129,6 +447,9 @@ class DriverProcess(object):
         not forwarded to the driver are:
         'stop_driver_process' - signal to close messaging and terminate.
         'test_events' - populate event queue with test data.
+        'driver_import_profile' - the startup profile, see construct_driver.
+        'driver_event_queue_stats' - event queue size, policy and counters.
+        'configure_event_queue' - set the event queue size and/or policy.
         'process_echo' - echos the message back.
         If the command is not found in the driver, an echo message is
         replied to the client.
@@ -145,8 +466,20 @@ class DriverProcess(object):
             return'stop_driver_process'
         elif cmd == 'test_events':
             events = kwargs['events']
-            self.events += events
+            self.events.extend(events)
             reply = 'test_events'
+        elif cmd == 'driver_event_queue_stats':
+            reply = self.events.stats()
+        elif cmd == 'configure_event_queue':
+            try:
+                self.events.configure(kwargs.get('size'), kwargs.get('policy'))
+                reply = self.events.stats()
+            except InstrumentException as e:
+                reply = e
+        elif cmd == 'driver_import_profile':
+            # metadata is loaded lazily so report every load still recorded
+            reply = dict(self.import_profile or {})
+            reply['metadata'] = list(InstrumentDict.load_times)
         elif cmd == 'process_echo':
             reply = 'ping from resource ppid:%s, resource:%s' % (str(self.ppid), str(self.driver))
             #try:
@@ -187,9 +520,9 @@ class DriverProcess(object):
             
     def send_event(self, evt):
         """
-        Append an event to the list to be sent by the event threaed.
+        Queue an event to be sent by the event thread.
         """
-        self.events.append(evt)
+        self.events.put(evt)
             
     def run(self):
         """
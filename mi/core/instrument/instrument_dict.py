@@ -14,7 +14,13 @@ __license__ = 'Apache 2.0'
 
 import yaml
 import sys
+import os
+import time
+import hashlib
+import tempfile
+import cPickle as pickle
 import pkg_resources
+from collections import deque
 from mi.core.common import BaseEnum
 from mi.core.exceptions import InstrumentParameterException
 
@@ -24,19 +30,113 @@ MODULE = "res"
 EGG_PATH = "config"
 DEFAULT_FILENAME = "strings.yml"
 
+# Parsed YAML metadata is cached on disk as a pickle, keyed by the source
+# file's path, mtime and size.  Set this environment variable to relocate the
+# cache directory, or to an empty string to disable the cache.  Loading a
+# pickle can run code, so the cache is per user and only used when the
+# directory belongs to the user and no one else can write to it.
+METADATA_CACHE_ENVIRONMENT_VARIABLE = "MI_METADATA_CACHE_DIR"
+DEFAULT_METADATA_CACHE_DIR = os.path.join(tempfile.gettempdir(), "mi_metadata_cache_%d" % os.getuid())
+
+
+def _metadata_cache_dir():
+    """
+    @retval the metadata cache directory, created if needed, or None if
+    the cache is disabled or the directory is not private to this user
+    """
+    cache_dir = os.environ.get(METADATA_CACHE_ENVIRONMENT_VARIABLE, DEFAULT_METADATA_CACHE_DIR)
+    if not cache_dir:
+        return None
+
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0700)
+        stat = os.stat(cache_dir)
+    except OSError as e:
+        log.debug("Metadata cache directory %s not available: %s", cache_dir, e)
+        return None
+
+    if stat.st_uid != os.getuid() or stat.st_mode & 077:
+        log.warn("Not using metadata cache directory %s, it must be owned by uid %d "
+                 "and not accessible by others", cache_dir, os.getuid())
+        return None
+    return cache_dir
+
+
+def load_cached_yaml(filename, loader=yaml.safe_load):
+    """
+    Load a YAML file, using a binary on-disk cache of the parsed result when
+    the file has not changed since it was cached.
+    @param filename path to the YAML file
+    @param loader function used to parse the YAML text on a cache miss
+    @retval the parsed YAML structure
+    @throw IOError if the file cannot be read
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError as e:
+        raise IOError(e.errno, e.strerror, filename)
+    path = os.path.abspath(filename)
+    cache_dir = _metadata_cache_dir()
+    cache_file = None
+
+    if cache_dir:
+        key = hashlib.sha1("%s:%s:%s" % (path, stat.st_mtime, stat.st_size)).hexdigest()
+        cache_file = os.path.join(cache_dir, "%s.pkl" % key)
+        try:
+            with open(cache_file, "rb") as infile:
+                result = pickle.load(infile)
+            log.trace("Loaded cached metadata for %s from %s", path, cache_file)
+            return result
+        except (IOError, EOFError, pickle.UnpicklingError):
+            pass
+        except Exception as e:
+            log.debug("Ignoring unreadable metadata cache %s: %s", cache_file, e)
+
+    with open(path, "r") as infile:
+        result = loader(infile)
+
+    if cache_file:
+        try:
+            # write then rename so concurrent driver processes never see a
+            # partial cache file
+            tmp_file = "%s.%d.tmp" % (cache_file, os.getpid())
+            with open(tmp_file, "wb") as outfile:
+                pickle.dump(result, outfile, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp_file, cache_file)
+        except (IOError, OSError, pickle.PicklingError) as e:
+            log.debug("Could not write metadata cache %s: %s", cache_file, e)
+
+    return result
+
+
 class InstrumentDict(object):
     """
     A package for classes that provides some base behavior for manages
     metadata and content for parameters, commands and drivers for the driver or
     protocol classes. 
     """
-    
+
+    # (source, seconds) for the last MAX_LOAD_TIMES metadata loads in this
+    # process, and the count of all loads, used by the driver process
+    # startup profiler.
+    MAX_LOAD_TIMES = 1000
+    load_times = deque(maxlen=MAX_LOAD_TIMES)
+    load_count = 0
+
+    @staticmethod
+    def _record_load_time(source, start_time):
+        InstrumentDict.load_times.append((source, time.time() - start_time))
+        InstrumentDict.load_count += 1
+
     @staticmethod
     def load_metadata_from_file(filename):
         log.debug("Attempting to load instrument dictionary metadata from file %s",
                       filename)
-        file = open("%s" % filename, "r")
-        return yaml.safe_load(file)
+        start_time = time.time()
+        result = load_cached_yaml("%s" % filename, yaml.safe_load)
+        InstrumentDict._record_load_time(filename, start_time)
+        return result
         
     @staticmethod
     def load_metadata_from_egg():
@@ -50,10 +150,13 @@ class InstrumentDict(object):
         log.debug("Attempting to load instrument dictionary metadata from egg with path %s, base %s",
                   resource_name, resource_base)
         if pkg_resources.resource_exists(resource_base, resource_name):
-            yml = pkg_resources.resource_string(resource_base, resource_name)
             log.debug("Found resource in the %s, %s base",
                       resource_base, resource_name)
-            return yaml.load(yml)
+            start_time = time.time()
+            filename = pkg_resources.resource_filename(resource_base, resource_name)
+            result = load_cached_yaml(filename, yaml.load)
+            InstrumentDict._record_load_time(filename, start_time)
+            return result
         else:
             return False
     
@@ -88,4 +191,9 @@ class InstrumentDict(object):
         log.debug("No external instrument dictionary metadata found, using hard coded values.")
         return None
 
-        
\ No newline at end of file
+    def load_strings(self, devel_path=None, filename=None):
+        """
+        Load metadata strings into the dictionary. Implemented by subclasses.
+        @retval True if something could be loaded, False otherwise
+        """
+        return False
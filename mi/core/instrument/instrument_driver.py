@@ -11,10 +11,11 @@ with individual instruments in the system.
 __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
+import os
 import time
 import json
 
-from threading import Thread
+from threading import Thread, Lock, local
 
 from mi.core.common import BaseEnum
 from mi.core.exceptions import TestModeException
@@ -179,6 +180,17 @@ class DriverAsyncEvent(BaseEnum):
     DIRECT_ACCESS = 'DRIVER_ASYNC_EVENT_DIRECT_ACCESS'
     AGENT_EVENT = 'DRIVER_ASYNC_EVENT_AGENT_EVENT'
 
+# A CONFIG_CHANGE event has a 'value', the parameter configuration, and a
+# 'full' flag.  By default every event carries the full configuration.  With
+# this environment variable set the events are incremental: the value holds
+# only the parameters changed since the previous event and 'full' is False.
+# The full configuration is still sent first after connecting, when
+# parameters go away, on publish_config_snapshot and on the first event at
+# least CONFIG_SNAPSHOT_INTERVAL seconds after the last full one.  Only set it
+# for consumers merging incremental values into the configuration they hold.
+INCREMENTAL_CONFIG_CHANGE_ENVIRONMENT_VARIABLE = 'MI_INCREMENTAL_CONFIG_CHANGE'
+CONFIG_SNAPSHOT_INTERVAL = 600
+
 class DriverParameter(BaseEnum):
     """
     Base driver parameters. Subclassed by specific drivers with device
@@ -201,6 +213,18 @@ class InstrumentDriver(object):
         self._send_event = event_callback
         self._test_mode = False
 
+        # The configuration published in the last CONFIG_CHANGE event and
+        # when it was last published in full.
+        self._incremental_config_change = \
+            bool(os.environ.get(INCREMENTAL_CONFIG_CHANGE_ENVIRONMENT_VARIABLE))
+        self._published_config = None
+        self._config_snapshot_time = 0
+        self._config_lock = Lock()
+
+        # Per thread depth of held CONFIG_CHANGE events and whether one is
+        # pending, see _hold_config_changes.
+        self._config_change_hold = local()
+
 
     #############################################################
     # Device connection interface.
@@ -363,9 +387,10 @@ class InstrumentDriver(object):
             self._send_event(event)
             
         elif type == DriverAsyncEvent.CONFIG_CHANGE:
-            config = self.get_resource(DriverParameter.ALL)
-            event['value'] = config
-            self._send_event(event)
+            if getattr(self._config_change_hold, 'depth', 0):
+                self._config_change_hold.pending = True
+            else:
+                self._publish_config_change()
         
         elif type == DriverAsyncEvent.SAMPLE:
             event['value'] = val
@@ -388,6 +413,81 @@ class InstrumentDriver(object):
             self._send_event(event)
 
 
+    def _publish_config_change(self, full=False):
+        """
+        Send a CONFIG_CHANGE event with the configuration, or with the
+        parameters changed since the last one when the events are
+        incremental, see INCREMENTAL_CONFIG_CHANGE_ENVIRONMENT_VARIABLE.
+        The event has a 'full' flag, set when it carries the complete
+        configuration.
+        @param full True to send the complete configuration, even unchanged.
+        @retval the event sent, None if no parameter changed.
+        """
+        config = self.get_resource(DriverParameter.ALL)
+        now = time.time()
+
+        with self._config_lock:
+            published = self._published_config
+            if full or published is None or not self._incremental_config_change \
+                    or not set(published).issubset(config) \
+                    or now - self._config_snapshot_time > CONFIG_SNAPSHOT_INTERVAL:
+                if full or config != published:
+                    full = True
+                    value = config
+                    self._config_snapshot_time = now
+                else:
+                    value = None
+            else:
+                value = dict((key, val) for (key, val) in config.iteritems()
+                             if key not in published or published[key] != val)
+            self._published_config = dict(config)
+
+        if not value:
+            log.debug("No parameter changed, CONFIG_CHANGE not sent")
+            return None
+
+        event = {
+            'type' : DriverAsyncEvent.CONFIG_CHANGE,
+            'value' : value,
+            'time' : now,
+            'full' : full
+        }
+        self._send_event(event)
+        return event
+
+    def publish_config_snapshot(self, *args, **kwargs):
+        """
+        Send a CONFIG_CHANGE event with the complete configuration, e.g. for
+        a consumer that lost track of the incremental events.
+        """
+        self._publish_config_change(full=True)
+
+    def _hold_config_changes(self):
+        """
+        Hold the CONFIG_CHANGE events of this thread until the matching
+        _release_config_changes, so a command handler updating many
+        parameters sends at most one.
+        """
+        hold = self._config_change_hold
+        hold.depth = getattr(hold, 'depth', 0) + 1
+
+    def _release_config_changes(self):
+        """
+        Release a _hold_config_changes, sending the CONFIG_CHANGE event held
+        since the outermost hold.  A failure to send it is logged, the
+        command handler has already completed.
+        """
+        hold = self._config_change_hold
+        hold.depth -= 1
+        if hold.depth or not getattr(hold, 'pending', False):
+            return
+
+        hold.pending = False
+        try:
+            self._publish_config_change()
+        except InstrumentException as e:
+            log.error("Failed to publish held CONFIG_CHANGE event: %s", e)
+
     ########################################################################
     # Test interface.
     ########################################################################
@@ -948,6 +1048,7 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
         log.info("_handler_connected_disconnect: invoking stop_comms().")
         self._connection.stop_comms()
         self._protocol = None
+        self._published_config = None
         next_state = DriverConnectionState.DISCONNECTED
         
         return (next_state, result)
@@ -965,6 +1066,7 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
         log.info("_handler_connected_connection_lost: invoking stop_comms().")
         self._connection.stop_comms()
         self._protocol = None
+        self._published_config = None
         
         # Send async agent state change event.
         log.info("_handler_connected_connection_lost: sending LOST_CONNECTION " \
@@ -984,7 +1086,11 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
         @retval (next_state, result) tuple, (None, protocol result).
         """
         next_state = None
-        result = self._protocol._protocol_fsm.on_event(event, *args, **kwargs)
+        self._hold_config_changes()
+        try:
+            result = self._protocol._protocol_fsm.on_event(event, *args, **kwargs)
+        finally:
+            self._release_config_changes()
         return (next_state, result)
 
     def _handler_connected_start_direct_event(self, event, *args, **kwargs):
@@ -1003,7 +1109,11 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
         self._protocol.enable_da_initialization()
         log.debug("starting DA.  Storing DA parameters for restore: %s", self._pre_da_config)
 
-        result = self._protocol._protocol_fsm.on_event(event, *args, **kwargs)
+        self._hold_config_changes()
+        try:
+            result = self._protocol._protocol_fsm.on_event(event, *args, **kwargs)
+        finally:
+            self._release_config_changes()
         return (next_state, result)
     
     def _handler_connected_stop_direct_event(self, event, *args, **kwargs):
@@ -1015,7 +1125,11 @@ class SingleConnectionInstrumentDriver(InstrumentDriver):
         @retval (next_state, result) tuple, (None, protocol result).
         """
         next_state = None
-        result = self._protocol._protocol_fsm.on_event(event, *args, **kwargs)
+        self._hold_config_changes()
+        try:
+            result = self._protocol._protocol_fsm.on_event(event, *args, **kwargs)
+        finally:
+            self._release_config_changes()
 
         # Moving the responsibility for applying DA parameters to the
         # protocol.
@@ -17,6 +17,7 @@ import re
 import time
 import json
 from functools import partial
+from types import FunctionType, MethodType
 
 from mi.core.log import get_logger ; log = get_logger()
 
@@ -49,6 +50,50 @@ DEFAULT_CMD_TIMEOUT=20
 DEFAULT_WRITE_DELAY=0
 RE_PATTERN = type(re.compile(""))
 
+
+def _make_cell(value):
+    """
+    @return a closure cell holding value
+    """
+    return (lambda: value).func_closure[0]
+
+
+def _rebind_function(func, old, new):
+    """
+    Bind a function built by one protocol to another one.
+    @param func A bound method or a function
+    @param old The protocol the function was built by
+    @param new The protocol to bind it to
+    @return A method bound to new if func is bound to old, a function with
+    new in the closure if func closes over old, otherwise func
+    """
+    if old is new:
+        return func
+
+    if isinstance(func, MethodType):
+        if func.im_self is old:
+            return MethodType(func.im_func, new, func.im_class)
+        return func
+
+    if isinstance(func, FunctionType) and func.func_closure:
+        rebound = False
+        closure = []
+        for cell in func.func_closure:
+            try:
+                if cell.cell_contents is old:
+                    cell = _make_cell(new)
+                    rebound = True
+            except ValueError:
+                # empty cell, the variable is not assigned yet
+                pass
+            closure.append(cell)
+
+        if rebound:
+            return FunctionType(func.func_code, func.func_globals, func.func_name,
+                                func.func_defaults, tuple(closure))
+
+    return func
+
 class InterfaceType(BaseEnum):
     """The methods of connecting to a device"""
     ETHERNET = 'ethernet'
@@ -64,6 +109,11 @@ class InstrumentProtocol(object):
         
     Base instrument protocol class.
     """    
+    # (protocol class, dictionary attribute): (bare instance of the class the
+    # dictionary functions are bound to, dictionary) for
+    # _build_dict_from_prototype
+    _dict_prototypes = {}
+
     def __init__(self, driver_event):
         """
         Base constructor.
@@ -100,6 +150,40 @@ class InstrumentProtocol(object):
         # are applied at the first opertunity.
         self._init_type = InitializationType.STARTUP
 
+    def _build_dict_from_prototype(self, name, build):
+        """
+        Build a parameter or command dictionary once per protocol class and
+        give each instance a copy, e.g.
+            self._build_dict_from_prototype('_param_dict', self._build_param_dict)
+
+        The first instance of a class calls build to fill an empty dictionary,
+        which is kept as the prototype.  Every instance gets prototype.copy():
+        parameter values are per instance, descriptions, compiled regexes and
+        commands are shared until an instance changes them.  Formatting and
+        value functions bound to or closing over the building protocol are
+        rebound to the instance.  The prototype itself keeps them bound to an
+        uninitialised instance of the class, so the building protocol, its
+        driver callback and its connection are not kept alive by it.
+
+        Only for build methods which depend on nothing but the class, driver
+        configuration must be applied to the copy after this call.
+        @param name The dictionary attribute, '_param_dict' or '_cmd_dict'
+        @param build Method filling the empty dictionary in that attribute
+        """
+        key = (self.__class__, name)
+        entry = InstrumentProtocol._dict_prototypes.get(key)
+        if entry is None:
+            setattr(self, name, getattr(self, name).__class__())
+            build()
+            holder = self.__class__.__new__(self.__class__)
+            prototype = getattr(self, name).copy(lambda func: _rebind_function(func, self, holder))
+            entry = (holder, prototype)
+            InstrumentProtocol._dict_prototypes[key] = entry
+            log.debug("built %s prototype for %s", name, self.__class__.__name__)
+
+        (holder, prototype) = entry
+        setattr(self, name, prototype.copy(lambda func: _rebind_function(func, holder, self)))
+
     ########################################################################
     # Common handlers
     ########################################################################
@@ -11,6 +11,8 @@ by the driver
 __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
+import copy
+
 from mi.core.common import BaseEnum
 from mi.core.exceptions import InstrumentParameterException
 from mi.core.instrument.instrument_dict import InstrumentDict
@@ -198,6 +200,36 @@ class ProtocolCommandDict(InstrumentDict):
         Constructor.        
         """
         self._cmd_dict = {}
+
+        # names of the commands shared with the dictionary this one was
+        # copied from
+        self._shared_commands = set()
+
+    def copy(self, rebind=None):
+        """
+        Copy the dictionary, e.g. from the prototype of a protocol class.
+        The commands are shared until they are changed through this
+        dictionary.
+        @param rebind Not used, commands have no functions to rebind.  Taken
+        for symmetry with ProtocolParameterDict.copy
+        @retval The new ProtocolCommandDict
+        """
+        result = copy.copy(self)
+        result._cmd_dict = self._cmd_dict.copy()
+        result._shared_commands = set(result._cmd_dict)
+        return result
+
+    def _get_own_command(self, name):
+        """
+        Get a command to change, copying it and its arguments first if it is
+        shared with another dictionary.
+        @param name The name of the command
+        @raises KeyError if the name is invalid.
+        """
+        if name in self._shared_commands:
+            self._shared_commands.discard(name)
+            self._cmd_dict[name] = copy.deepcopy(self._cmd_dict[name])
+        return self._cmd_dict[name]
         
     def add(self,
             name,
@@ -233,6 +265,7 @@ class ProtocolCommandDict(InstrumentDict):
                       arguments=arguments)
 
         self._cmd_dict[name] = val
+        self._shared_commands.discard(name)
 
     def add_command(self, command):
         """
@@ -246,6 +279,7 @@ class ProtocolCommandDict(InstrumentDict):
             raise InstrumentParameterException("Invalid command structure!")
 
         self._cmd_dict[command.name] = command
+        self._shared_commands.discard(command.name)
         
     def get_command(self, name):
         """
@@ -307,6 +341,7 @@ class ProtocolCommandDict(InstrumentDict):
                     continue
                 if cmd_name not in self._cmd_dict:
                     continue
+                self._get_own_command(cmd_name)
                 
                 if CommandDictKey.DESCRIPTION in cmd_value:
                     self._cmd_dict[cmd_name].description = \
@@ -12,6 +12,7 @@ __author__ = 'Edward Hunter'
 __license__ = 'Apache 2.0'
 
 import re
+import copy
 import ntplib
 import time
 import yaml
@@ -27,6 +28,15 @@ from mi.core.log import get_logger ; log = get_logger()
 EGG_PATH = "resource"
 DEFAULT_FILENAME = "strings.yml"
 
+def _shallow_copy(obj):
+    """
+    Shallow copy of an object with a __dict__, without the copy module
+    protocol overhead, for copying a parameter dictionary per protocol.
+    """
+    result = obj.__class__.__new__(obj.__class__)
+    result.__dict__.update(obj.__dict__)
+    return result
+
 class ParameterDictType(BaseEnum):
     BOOL = "bool"
     INT = "int"
@@ -218,6 +228,23 @@ class Parameter(object):
         @raises InstrumentParameterExpirationException If the value has expired
         """
         return self.value.get_value(timestamp)
+
+    def copy(self, rebind=None):
+        """
+        Copy the parameter with its own value.  The description, the compiled
+        regex and the functions are shared with this parameter.
+        @param rebind Function applied to f_format and f_getval of the copy,
+        returning the function to use instead
+        @retval The new Parameter object
+        """
+        result = _shallow_copy(self)
+        result.value = _shallow_copy(self.value)
+        result.value.timestamp = ntplib.system_to_ntp_time(time.time())
+        if rebind:
+            result.value.f_format = rebind(self.value.f_format)
+            if getattr(self, 'f_getval', None):
+                result.f_getval = rebind(self.f_getval)
+        return result
     
 class RegexParameter(Parameter):
     def __init__(self, name, pattern, f_getval, f_format, value=None,
@@ -394,7 +421,41 @@ class ProtocolParameterDict(InstrumentDict):
         Constructor.        
         """
         self._param_dict = {}
-        
+
+        # names of the parameters whose description is shared with the
+        # dictionary this one was copied from
+        self._shared_descriptions = set()
+
+    def copy(self, rebind=None):
+        """
+        Copy the dictionary, e.g. from the prototype of a protocol class.
+        Every parameter gets its own value, the descriptions are shared until
+        they are changed through this dictionary.
+        @param rebind Function applied to the parameter functions, see
+        Parameter.copy
+        @retval The new ProtocolParameterDict
+        """
+        result = copy.copy(self)
+        result._param_dict = self._param_dict.copy()
+        for (name, param) in result._param_dict.iteritems():
+            result._param_dict[name] = param.copy(rebind)
+        result._shared_descriptions = set(result._param_dict)
+        return result
+
+    def _get_own_description(self, name):
+        """
+        Get a parameter description to change, copying it first if it is
+        shared with another dictionary.
+        @param name The parameter name.
+        @raises KeyError if the name is invalid.
+        """
+        param = self._param_dict[name]
+        if name in self._shared_descriptions:
+            self._shared_descriptions.discard(name)
+            if param.description:
+                param.description = copy.copy(param.description)
+        return param.description
+
     def add(self,
             name,
             pattern,
@@ -480,6 +541,7 @@ class ProtocolParameterDict(InstrumentDict):
                              value_description=value_description)
 
         self._param_dict[name] = val
+        self._shared_descriptions.discard(name)
 
     def add_parameter(self, parameter):
         """
@@ -494,6 +556,7 @@ class ProtocolParameterDict(InstrumentDict):
             raise InstrumentParameterException(
                 "Invalid Parameter added! Attempting to add: %s" % parameter)
         self._param_dict[parameter.name] = parameter
+        self._shared_descriptions.discard(parameter.name)
         
     def get(self, name, timestamp=None):
         """
@@ -613,7 +676,7 @@ class ProtocolParameterDict(InstrumentDict):
         if not self._param_dict[name].description:
             raise InstrumentParameterException("No description present!")
 
-        self._param_dict[name].description.init_value = value
+        self._get_own_description(name).init_value = value
         
     def get_menu_path_read(self, name):
         """
@@ -930,15 +993,15 @@ class ProtocolParameterDict(InstrumentDict):
                     if param_name not in self._param_dict:
                         continue
                     if (name == ParameterDictKey.DESCRIPTION):
-                        self._param_dict[param_name].description.description = value
+                        self._get_own_description(param_name).description = value
                     if name == ParameterDictKey.DISPLAY_NAME:
-                        self._param_dict[param_name].description.display_name = value
+                        self._get_own_description(param_name).display_name = value
                     if name == ParameterDictKey.UNITS:
-                        self._param_dict[param_name].description.units = value
+                        self._get_own_description(param_name).units = value
                     if name == ParameterDictKey.TYPE:
-                        self._param_dict[param_name].description.type = value
+                        self._get_own_description(param_name).type = value
                     if name == ParameterDictKey.VALUE_DESCRIPTION:
-                        self._param_dict[param_name].description.value_description = value
+                        self._get_own_description(param_name).value_description = value
             return True
     
         return False # no metadata!
@@ -11,6 +11,7 @@ __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
 
+import re
 import json
 import base64
 import time
@@ -23,6 +24,8 @@ from mi.core.log import get_logger ; log = get_logger()
 from mi.core.exceptions import SampleException, ReadOnlyException, NotImplementedException, InstrumentParameterException
 from mi.core.instrument.data_particle import DataParticle, DataParticleKey, DataParticleValue
 from mi.core.instrument.data_particle import RawDataParticle, CommonDataParticleType
+from mi.core.instrument.data_particle import SchemaDataParticle, ParticleSchema
+from mi.core.instrument.data_particle import HexField, ScaledField, BitFlags
 from mi.core.instrument.port_agent_client import PortAgentPacket
 
 TEST_PARTICLE_VERSION = 1
@@ -283,3 +286,34 @@ class TestUnitDataParticle(MiUnitTestCase):
 
         with self.assertRaises(NotImplementedException):
             particle.data_particle_type()
+
+    def test_schema_particle(self):
+        """
+        Test hex, array, bit flag and scaled fields of a particle schema
+        """
+        class SchemaParticle(SchemaDataParticle):
+            _data_particle_type = TEST_PARTICLE_TYPE
+            _schema = ParticleSchema(re.compile(r':([0-9A-F]{4})([0-9A-F]{2})([0-9A-F]{8})([0-9A-F]{4})'), [
+                HexField('id', 1),
+                BitFlags(2, ['bit0', None, 'bit2']),
+                HexField('count', 2),
+                HexField('array', 3, width=2),
+                ScaledField('volts', 4, 0.5, offset=-1)])
+
+        values = SchemaParticle(':00FF0501FF10120400').generate_dict()[DataParticleKey.VALUES]
+        self.assertEqual(values, [{DataParticleKey.VALUE_ID: 'id', DataParticleKey.VALUE: 0xFF},
+                                  {DataParticleKey.VALUE_ID: 'bit0', DataParticleKey.VALUE: True},
+                                  {DataParticleKey.VALUE_ID: 'bit2', DataParticleKey.VALUE: True},
+                                  {DataParticleKey.VALUE_ID: 'count', DataParticleKey.VALUE: 5},
+                                  {DataParticleKey.VALUE_ID: 'array', DataParticleKey.VALUE: [1, 255, 16, 18]},
+                                  {DataParticleKey.VALUE_ID: 'volts', DataParticleKey.VALUE: 511.0}])
+        self.assertEqual(SchemaParticle._schema.keys, ['id', 'bit0', 'bit2', 'count', 'array', 'volts'])
+
+        with self.assertRaises(SampleException):
+            SchemaParticle(':00FF').generate_dict()
+
+        class NoSchemaParticle(SchemaDataParticle):
+            _data_particle_type = TEST_PARTICLE_TYPE
+
+        with self.assertRaises(NotImplementedException):
+            NoSchemaParticle(':00FF').generate_dict()
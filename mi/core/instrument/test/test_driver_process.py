@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.instrument.test.test_driver_process
+@file mi/core/instrument/test/test_driver_process.py
+@author agent
+@brief Test cases for the driver process event queue.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import time
+from threading import Thread
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+from mi.core.exceptions import InstrumentParameterException
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.instrument.driver_process import DriverProcess
+from mi.core.instrument.driver_process import DriverEventQueue
+from mi.core.instrument.driver_process import EventQueuePolicy
+from mi.core.instrument.driver_process import ImportProfiler
+from mi.core.instrument.instrument_dict import InstrumentDict
+
+
+def sample(n):
+    return {'type': DriverAsyncEvent.SAMPLE, 'value': n}
+
+
+def state(value):
+    return {'type': DriverAsyncEvent.STATE_CHANGE, 'value': value}
+
+
+def config(value, full):
+    return {'type': DriverAsyncEvent.CONFIG_CHANGE, 'value': value, 'full': full}
+
+
+@attr('UNIT', group='mi')
+class TestDriverEventQueue(MiUnitTest):
+    """
+    Unit tests for DriverEventQueue.
+    """
+    def test_fifo(self):
+        queue = DriverEventQueue(10)
+        for i in range(5):
+            queue.put(sample(i))
+        self.assertEqual(len(queue), 5)
+        self.assertEqual([queue.get(0)['value'] for i in range(5)], range(5))
+        self.assertIsNone(queue.get(0))
+
+        stats = queue.stats()
+        self.assertEqual(stats['received'], 5)
+        self.assertEqual(stats['sent'], 5)
+        self.assertEqual(stats['max_depth'], 5)
+        self.assertEqual(stats['depth'], 0)
+
+    def test_drop_oldest(self):
+        queue = DriverEventQueue(3, EventQueuePolicy.DROP_OLDEST)
+        for i in range(5):
+            queue.put(sample(i))
+        self.assertEqual([queue.get(0)['value'] for i in range(3)], [2, 3, 4])
+        self.assertEqual(queue.stats()['dropped'], 2)
+
+    def test_drop_oldest_keeps_events(self):
+        queue = DriverEventQueue(3, EventQueuePolicy.DROP_OLDEST)
+        queue.put(state('A'))
+        queue.put(sample(1))
+        queue.put(state('B'))
+        queue.put(sample(2))
+        queue.put(state('C'))
+        queue.put(state('D'))
+
+        self.assertEqual(len(queue), 4)
+        self.assertEqual([queue.get(0) for i in range(4)],
+                         [state('A'), state('B'), state('C'), state('D')])
+        self.assertEqual(queue.stats()['dropped'], 2)
+
+    def test_coalesce(self):
+        queue = DriverEventQueue(10, EventQueuePolicy.COALESCE)
+        queue.put(state('A'))
+        queue.put(sample(1))
+        queue.put(state('B'))
+        queue.put(sample(2))
+        queue.put(state('C'))
+
+        events = [queue.get(0) for i in range(3)]
+        self.assertEqual(events, [sample(1), sample(2), state('C')])
+        self.assertEqual(queue.stats()['coalesced'], 2)
+
+    def test_coalesce_config_change(self):
+        queue = DriverEventQueue(10, EventQueuePolicy.COALESCE)
+        queue.put(config({'foo': 1, 'bar': 2}, True))
+        queue.put(config({'foo': 3}, False))
+        queue.put(config({'baz': 4}, False))
+        self.assertEqual(queue.get(0), config({'foo': 3, 'bar': 2, 'baz': 4}, True))
+
+        queue.put(config({'foo': 5}, False))
+        queue.put(config({'bar': 6}, False))
+        self.assertEqual(queue.get(0), config({'foo': 5, 'bar': 6}, False))
+
+        # a full configuration replaces the queued one
+        queue.put(config({'foo': 7}, False))
+        queue.put(config({'bar': 8}, True))
+        self.assertEqual(queue.get(0), config({'bar': 8}, True))
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(queue.stats()['coalesced'], 4)
+
+    def test_coalesce_backed_up(self):
+        queue = DriverEventQueue(100000, EventQueuePolicy.COALESCE)
+        for i in range(50000):
+            queue.put(sample(i))
+            queue.put(state(i))
+        self.assertEqual(len(queue), 50001)
+        self.assertEqual(queue.stats()['coalesced'], 49999)
+        # the replaced events do not pile up
+        self.assertLess(len(queue._events), 3)
+
+        self.assertEqual([queue.get(0) for i in range(50000)], [sample(i) for i in range(50000)])
+        self.assertEqual(queue.get(0), state(49999))
+        self.assertIsNone(queue.get(0))
+
+    def test_block(self):
+        queue = DriverEventQueue(2, EventQueuePolicy.BLOCK)
+        queue.put(sample(1))
+        queue.put(sample(2))
+
+        producer = Thread(target=queue.put, args=(sample(3),))
+        producer.start()
+        time.sleep(.3)
+        self.assertTrue(producer.is_alive())
+        self.assertEqual(len(queue), 2)
+
+        self.assertEqual(queue.get(0), sample(1))
+        producer.join(5)
+        self.assertFalse(producer.is_alive())
+        self.assertEqual([queue.get(0), queue.get(0)], [sample(2), sample(3)])
+        self.assertEqual(queue.stats()['dropped'], 0)
+
+    def test_get_waits(self):
+        queue = DriverEventQueue(2)
+        Thread(target=lambda: (time.sleep(.1), queue.put(sample(1)))).start()
+        self.assertEqual(queue.get(5), sample(1))
+
+    def test_configure(self):
+        queue = DriverEventQueue(2)
+        with self.assertRaises(InstrumentParameterException):
+            queue.configure(maxlen=0)
+        with self.assertRaises(InstrumentParameterException):
+            queue.configure(policy='BOGUS')
+
+        queue.configure(maxlen=5, policy=EventQueuePolicy.BLOCK)
+        self.assertEqual(queue.stats()['size'], 5)
+        self.assertEqual(queue.stats()['policy'], EventQueuePolicy.BLOCK)
+
+    def test_driver_commands(self):
+        process = DriverProcess('module', 'class', None)
+        self.assertEqual(process.cmd_driver({'cmd': 'test_events', 'args': (),
+                                             'kwargs': {'events': ['a', 'b']}}), 'test_events')
+
+        stats = process.cmd_driver({'cmd': 'driver_event_queue_stats', 'args': (), 'kwargs': {}})
+        self.assertEqual(stats['depth'], 2)
+
+        stats = process.cmd_driver({'cmd': 'configure_event_queue', 'args': (),
+                                    'kwargs': {'size': 10, 'policy': EventQueuePolicy.COALESCE}})
+        self.assertEqual(stats['size'], 10)
+        self.assertEqual(stats['policy'], EventQueuePolicy.COALESCE)
+
+        reply = process.cmd_driver({'cmd': 'configure_event_queue', 'args': (),
+                                    'kwargs': {'size': -1}})
+        self.assertIsInstance(reply, InstrumentParameterException)
+
+
+@attr('UNIT', group='mi')
+class TestImportProfiler(MiUnitTest):
+    """
+    Unit tests for ImportProfiler.
+    """
+    def test_metadata_loads(self):
+        profiler = ImportProfiler()
+        for i in range(InstrumentDict.MAX_LOAD_TIMES):
+            InstrumentDict._record_load_time('before', time.time())
+        profiler.start()
+        profiler.stop()
+        for i in range(3):
+            InstrumentDict._record_load_time('after%d' % i, time.time())
+
+        self.assertEqual(len(InstrumentDict.load_times), InstrumentDict.MAX_LOAD_TIMES)
+        self.assertEqual([source for source, seconds in profiler.report()['metadata']],
+                         ['after0', 'after1', 'after2'])
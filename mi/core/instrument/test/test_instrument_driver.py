@@ -25,6 +25,7 @@ from mi.core.exceptions import TestModeException
 from mi.core.exceptions import InstrumentParameterException
 from mi.core.exceptions import NotImplementedException
 from mi.core.instrument.instrument_driver import DriverEvent
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
 from mi.core.instrument.instrument_driver import SingleConnectionInstrumentDriver
 from mi.core.instrument.instrument_driver import DriverParameter
 from mi.core.instrument.instrument_driver import ConfigMetadataKey
@@ -162,6 +163,93 @@ class TestUnitInstrumentDriver(MiUnitTestCase):
         self.assertEquals(running_config["foo"], 10)
         self.assertEquals(running_config["bar"], 15)        
         
+    def config_change_events(self):
+        """
+        Values of the CONFIG_CHANGE events sent so far, as (full, value)
+        """
+        events = [call[0][0] for call in self.mock.callback.call_args_list]
+        return [(event['full'], event['value']) for event in events
+                if event['type'] == DriverAsyncEvent.CONFIG_CHANGE]
+
+    def test_config_change(self):
+        """
+        CONFIG_CHANGE events carry the full configuration, and are not sent
+        when no parameter changed.
+        """
+        param_dict = self.driver._protocol._param_dict
+        self.driver.get_resource = lambda *args, **kwargs: param_dict.get_all()
+
+        self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+        param_dict.update("bar=20")
+        self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+        self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+        self.driver.publish_config_snapshot()
+
+        full_config = {"foo": 10, "bar": 20, "baz": 30, "bat": 40}
+        self.assertEqual(self.config_change_events(),
+                         [(True, {"foo": 10, "bar": 15, "baz": 30, "bat": 40}),
+                          (True, full_config),
+                          (True, full_config)])
+
+    def test_config_change_incremental(self):
+        """
+        Incremental CONFIG_CHANGE events carry the changed parameters, the
+        first one, a snapshot on request and the first one after the snapshot
+        interval carry the full configuration.
+        """
+        self.driver._incremental_config_change = True
+        param_dict = self.driver._protocol._param_dict
+        self.driver.get_resource = lambda *args, **kwargs: param_dict.get_all()
+
+        self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+        param_dict.update("bar=20")
+        self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+        self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+        self.driver.publish_config_snapshot()
+
+        full_config = {"foo": 10, "bar": 20, "baz": 30, "bat": 40}
+        self.assertEqual(self.config_change_events(),
+                         [(True, {"foo": 10, "bar": 15, "baz": 30, "bat": 40}),
+                          (False, {"bar": 20}),
+                          (True, full_config)])
+
+        self.driver._config_snapshot_time -= 3600
+        param_dict.update("baz=31")
+        self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+        full_config["baz"] = 31
+        self.assertEqual(self.config_change_events()[-1], (True, full_config))
+
+    def test_config_change_coalesced(self):
+        """
+        The CONFIG_CHANGE events of a command handler are sent as one event
+        when the handler returns.
+        """
+        self.driver._incremental_config_change = True
+        param_dict = self.driver._protocol._param_dict
+        self.driver.get_resource = lambda *args, **kwargs: param_dict.get_all()
+        self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+
+        def handler(event, *args, **kwargs):
+            for value in ("foo=1", "bar=2", "foo=3"):
+                param_dict.update(value)
+                self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+            self.assertEqual(len(self.config_change_events()), 1)
+            return "done"
+
+        self.driver._protocol._protocol_fsm = Mock(name='protocol_fsm')
+        self.driver._protocol._protocol_fsm.on_event.side_effect = handler
+        result = self.driver._handler_connected_protocol_event(DriverEvent.SET)
+        self.assertEqual(result, (None, "done"))
+        self.assertEqual(self.config_change_events()[1:], [(False, {"foo": 3, "bar": 2})])
+
+        # the hold is released when the handler fails
+        self.driver._protocol._protocol_fsm.on_event.side_effect = InstrumentParameterException()
+        self.assertRaises(InstrumentParameterException,
+                          self.driver._handler_connected_protocol_event, DriverEvent.SET)
+        param_dict.update("foo=4")
+        self.driver._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
+        self.assertEqual(self.config_change_events()[-1], (False, {"foo": 4}))
+
     def test_apply_startup_params(self):
         """
         Test to see that calling a driver's apply_startup_params successfully
@@ -10,10 +10,12 @@
 __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
+import gc
 import re
 import time
 import ntplib
 import datetime
+import weakref
 from mock import Mock
 from nose.plugins.attrib import attr
 from mi.core.log import get_logger ; log = get_logger()
@@ -508,6 +510,60 @@ class TestUnitInstrumentProtocol(MiUnitTestCase):
         with self.assertRaises(InstrumentParameterException):
             self.protocol._verify_not_readonly({'rw': 1, 'ro': 2}, startup=True)
 
+    def test_dict_prototype(self):
+        """
+        Parameter and command dictionaries are built once per protocol class
+        and copied to each instance with the functions rebound to it.
+        """
+        builds = []
+
+        class PrototypeProtocol(InstrumentProtocol):
+            def __init__(self, driver_event, width):
+                InstrumentProtocol.__init__(self, driver_event)
+                self.width = width
+                self._build_dict_from_prototype('_param_dict', self._build_param_dict)
+                self._build_dict_from_prototype('_cmd_dict', self._build_command_dict)
+
+            def _format(self, value):
+                return str(value).zfill(self.width)
+
+            def _build_param_dict(self):
+                builds.append(self)
+                self._param_dict.add('closure', r'closure=(\d+)', lambda match: int(match.group(1)),
+                                     lambda value: self._format(value), value=1)
+                self._param_dict.add('method', r'method=(\d+)', lambda match: int(match.group(1)),
+                                     self._format, value=2)
+
+            def _build_command_dict(self):
+                self._cmd_dict.add('cmd', display_name="Command")
+
+        first = PrototypeProtocol(self.event_callback, 2)
+        second = PrototypeProtocol(self.event_callback, 4)
+        self.assertEqual(builds, [first])
+
+        self.assertEqual(first._param_dict.format('closure'), '01')
+        self.assertEqual(second._param_dict.format('closure'), '0001')
+        self.assertEqual(second._param_dict.format('method'), '0002')
+
+        second._param_dict.update('closure=7')
+        self.assertEqual(second._param_dict.get('closure'), 7)
+        self.assertEqual(first._param_dict.get('closure'), 1)
+
+        self.assertEqual(second._cmd_dict.generate_dict(), first._cmd_dict.generate_dict())
+        self.assertIsNot(second._cmd_dict, first._cmd_dict)
+
+        # the prototypes don't keep the protocol that built them alive
+        del builds[:]
+        first_ref = weakref.ref(first)
+        del first
+        gc.collect()
+        self.assertIsNone(first_ref())
+
+        third = PrototypeProtocol(self.event_callback, 3)
+        self.assertEqual(builds, [])
+        self.assertEqual(third._param_dict.format('closure'), '001')
+        self.assertEqual(third._param_dict.format('method'), '002')
+
 
 @attr('UNIT', group='mi')
 class TestUnitCommandInstrumentProtocol(MiUnitTestCase):
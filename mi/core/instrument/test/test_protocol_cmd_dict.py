@@ -284,6 +284,14 @@ class TestUnitProtocolCommandDict(TestUnitStringsDict):
         self.assertEqual(self.cmd_dict.get_command(None), None)
         self.assertEqual(self.cmd_dict.get_command("bad"), None)
 
+    def test_copy(self):
+        copy = self.cmd_dict.copy()
+        self.assertEqual(copy.generate_dict(), self.cmd_dict.generate_dict())
+        self.assertIs(copy.get_command("cmd1"), self.cmd_dict.get_command("cmd1"))
+
+        copy.add("cmd3", display_name="Command 3")
+        self.assertEqual(self.cmd_dict.get_command("cmd3"), None)
+
     def _assert_metadata_change(self):
         new_dict = self.param_dict.generate_dict()
         log.debug("Generated dictionary: %s", new_dict)
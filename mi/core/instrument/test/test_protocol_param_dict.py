@@ -653,3 +653,40 @@ bar=200, baz=300
         self.assertEqual(new_dict["baz"][ParameterDictKey.DISPLAY_NAME], "Baz")
         
         self.assertTrue('extra_param' not in new_dict)
+
+    def test_copy(self):
+        """
+        A copy has its own values and shares the descriptions until they
+        change
+        """
+        self.param_dict.set_value("foo", 1)
+        copy = self.param_dict.copy()
+        self.assertEqual(sorted(copy.get_keys()), sorted(self.param_dict.get_keys()))
+        self.assertEqual(copy.generate_dict(), self.param_dict.generate_dict())
+        self.assertEqual(copy.get("foo"), 1)
+        self.assertIs(copy._param_dict["foo"].description, self.param_dict._param_dict["foo"].description)
+
+        self.assertTrue(copy.update("foo=2"))
+        self.assertEqual(copy.get("foo"), 2)
+        self.assertEqual(self.param_dict.get("foo"), 1)
+
+        copy.set_init_value("foo", 5)
+        self.assertEqual(copy.get_init_value("foo"), 5)
+        self.assertIsNone(self.param_dict.get_init_value("foo"))
+
+        copy.add("new", r'new=(\d+)', lambda match: int(match.group(1)), str)
+        self.assertRaises(KeyError, self.param_dict.get, "new")
+
+    def test_copy_rebind(self):
+        """
+        The rebind function replaces the formatting and value functions
+        """
+        param_dict = ProtocolParameterDict()
+        param_dict.add_parameter(FunctionParameter("func", lambda x: x, str))
+        param_dict.add("regex", r'regex=(\d+)', lambda match: int(match.group(1)), str)
+
+        copy = param_dict.copy(lambda func: repr if func is str else func)
+        self.assertEqual(copy.format("func", "a"), "'a'")
+        self.assertEqual(param_dict.format("func", "a"), "a")
+        self.assertIs(copy._param_dict["func"].f_getval, param_dict._param_dict["func"].f_getval)
+        self.assertIs(copy._param_dict["regex"].regex, param_dict._param_dict["regex"].regex)
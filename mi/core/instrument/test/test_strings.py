@@ -11,9 +11,14 @@ parameter, command, and driver dictionary modules
 __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
+import os
+import shutil
+import tempfile
 import unittest
 from nose.plugins.attrib import attr
 from mi.core.unit_test import MiUnitTestCase
+from mi.core.instrument.instrument_dict import load_cached_yaml
+from mi.core.instrument.instrument_dict import METADATA_CACHE_ENVIRONMENT_VARIABLE
 
 from mi.core.log import get_logger ; log = get_logger()
 
@@ -86,6 +91,66 @@ class TestUnitStringsDict(MiUnitTestCase):
         self.assertTrue(result)
         self._assert_metadata_change()
         
+    def test_metadata_load_copy(self):
+        """
+        Strings loaded into a copy of a dictionary leave the original alone
+        """
+        original = self.param_dict.generate_dict()
+        prototype = self.param_dict
+        self.param_dict = prototype.copy()
+
+        result = self.param_dict.load_strings(devel_path="resource/test_strings.yml")
+        self.assertTrue(result)
+        self._assert_metadata_change()
+        self.assertEqual(prototype.generate_dict(), original)
+
+    def test_metadata_cache(self):
+        """
+        Parsed metadata is cached on disk and refreshed when the file changes
+        """
+        cache_dir = tempfile.mkdtemp()
+        os.environ[METADATA_CACHE_ENVIRONMENT_VARIABLE] = cache_dir
+        try:
+            filename = os.path.join(cache_dir, "cache_test.yml")
+            with open(filename, "w") as outfile:
+                outfile.write("parameters: {a: 1}")
+
+            self.assertEqual(load_cached_yaml(filename), {'parameters': {'a': 1}})
+            self.assertEqual(len([f for f in os.listdir(cache_dir) if f.endswith('.pkl')]), 1)
+            self.assertEqual(load_cached_yaml(filename), {'parameters': {'a': 1}})
+
+            with open(filename, "w") as outfile:
+                outfile.write("parameters: {a: 12}")
+            os.utime(filename, (0, 0))
+            self.assertEqual(load_cached_yaml(filename), {'parameters': {'a': 12}})
+        finally:
+            del os.environ[METADATA_CACHE_ENVIRONMENT_VARIABLE]
+            shutil.rmtree(cache_dir)
+
+    def test_metadata_cache_private(self):
+        """
+        The metadata cache is not used from a directory others can write to
+        """
+        cache_dir = tempfile.mkdtemp()
+        os.chmod(cache_dir, 0777)
+        os.environ[METADATA_CACHE_ENVIRONMENT_VARIABLE] = cache_dir
+        try:
+            filename = os.path.join(cache_dir, "cache_test.yml")
+            with open(filename, "w") as outfile:
+                outfile.write("parameters: {a: 1}")
+
+            self.assertEqual(load_cached_yaml(filename), {'parameters': {'a': 1}})
+            self.assertEqual([f for f in os.listdir(cache_dir) if f.endswith('.pkl')], [])
+
+            # a new directory is created private
+            os.environ[METADATA_CACHE_ENVIRONMENT_VARIABLE] = os.path.join(cache_dir, 'cache')
+            self.assertEqual(load_cached_yaml(filename), {'parameters': {'a': 1}})
+            self.assertEqual(os.stat(os.path.join(cache_dir, 'cache')).st_mode & 0777, 0700)
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, 'cache'))), 1)
+        finally:
+            del os.environ[METADATA_CACHE_ENVIRONMENT_VARIABLE]
+            shutil.rmtree(cache_dir)
+
     @unittest.skip('Should work outside of buildbot, but skip for buildbot')
     def test_metadata_load_default(self):
         # if you dont have an argument, you only have a chance of looking in an egg
@@ -12,7 +12,9 @@ __license__ = 'Apache 2.0'
 
 from gevent import monkey; monkey.patch_all()
 
+import os
 import time
+import tempfile
 import unittest
 import logging
 
@@ -105,4 +107,64 @@ class TestZmqDriverProcess(MiTestCase):
         """
         """
         
-        pass 
+        pass
+
+    def _start_local_process(self):
+        """
+        Run the driver process messaging threads in this process, without
+        a driver, and connect a client to it.
+        """
+        workdir = tempfile.mkdtemp()
+        cmd_port_fname = os.path.join(workdir, 'cmd_port.txt')
+        evt_port_fname = os.path.join(workdir, 'evt_port.txt')
+        driver_process = ZmqDriverProcess(self.dvr_mod, self.dvr_cls,
+                                          cmd_port_fname, evt_port_fname, None)
+        driver_process.start_messaging()
+
+        ports = []
+        for fname in (cmd_port_fname, evt_port_fname):
+            while not os.path.exists(fname):
+                time.sleep(.01)
+            time.sleep(.01)
+            ports.append(int(open(fname).read().strip()))
+            os.remove(fname)
+        os.rmdir(workdir)
+
+        events = []
+        driver_client = ZmqDriverClient(self.host, ports[0], ports[1])
+        driver_client.start_messaging(events.append)
+        self.addCleanup(driver_client.stop_messaging)
+        self.addCleanup(driver_process.stop_messaging)
+        return (driver_process, driver_client, events)
+
+    def test_command_latency(self):
+        """
+        Benchmark command round trips, one at a time and pipelined.
+        """
+        (driver_process, driver_client, events) = self._start_local_process()
+        count = 200
+
+        start_time = time.time()
+        for i in range(count):
+            reply = driver_client.cmd_dvr('process_echo')
+        serial_latency = (time.time() - start_time) / count
+        self.assertTrue(reply.startswith('ping from resource'))
+
+        start_time = time.time()
+        pending = [driver_client.cmd_dvr_async('process_echo') for i in range(count)]
+        replies = [command.get(timeout=10) for command in pending]
+        pipelined_latency = (time.time() - start_time) / count
+        self.assertEqual(len(replies), count)
+
+        mi_logger.info('Command latency: serial %.6fs, pipelined %.6fs per command',
+                       serial_latency, pipelined_latency)
+
+        # The old client slept .5s between reply polls.
+        self.assertLess(serial_latency, .05)
+
+        reply = driver_client.cmd_dvr('test_events', events=['event 1', 'event 2'])
+        self.assertEqual(reply, 'test_events')
+        end_time = time.time() + 5
+        while len(events) < 2 and time.time() < end_time:
+            time.sleep(.01)
+        self.assertEqual(events, ['event 1', 'event 2'])
@@ -18,22 +18,87 @@ c = zdc.ZmqDriverClient('localhost', 5556, 5557)
 """
 
 import thread
+import threading
+import itertools
+import cPickle as pickle
 import logging
 import time
+import uuid
 
 # We import "regular" zmq, not the patched version because
 # we handle the nonblocking sockets directly as they need to work
-# with unpatched threads as well.
+# with unpatched threads as well.  When the calling process has been
+# monkey patched by gevent the green version is used instead, see
+# zmq_module().
 import zmq
 
 from mi.core.instrument.driver_client import DriverClient
 from mi.core.log import get_logger ; log = get_logger()
 
- 
+# Milliseconds between checks of the stop flags while polling sockets.
+POLL_TIMEOUT = 100
+
+
+def zmq_module():
+    """
+    Return the zmq module to use for blocking polls.  If threads have been
+    monkey patched by gevent they are greenlets, and a blocking poll would
+    stall the hub, so the gevent compatible zmq.green is returned instead.
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        return zmq
+
+    if monkey.is_module_patched('thread'):
+        from zmq import green
+        return green
+
+    return zmq
+
+
+class PendingCommand(object):
+    """
+    A driver command that has been sent and is awaiting its reply.
+    """
+    def __init__(self, request_id, msg):
+        self.request_id = request_id
+        self.msg = msg
+        self.reply = None
+        self._done = threading.Event()
+
+    def set_reply(self, reply):
+        self.reply = reply
+        self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def get(self, timeout=None):
+        """
+        Wait for the reply to the command.
+        @param timeout Seconds to wait, None to wait forever.
+        @retval The driver reply.
+        @raise The driver exception if the command failed.
+        @raise zmq.Again if the timeout expires first.
+        """
+        if not self._done.wait(timeout):
+            raise zmq.Again('Timeout waiting for reply to %s' % self.msg.get('cmd'))
+
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        return self.reply
+
+
 class ZmqDriverClient(DriverClient):
     """
     A class for communicating with a ZMQ-based driver process using python
     thread for catching asynchronous driver events.
+
+    Commands are sent over a DEALER socket owned by a single command thread
+    that polls for replies and for new requests, so any number of commands
+    can be in flight at once.  Each command carries a request id frame and
+    replies are matched to their PendingCommand as soon as they arrive.
     """
     
     def __init__(self, host, cmd_port, event_port):
@@ -49,10 +114,18 @@ class ZmqDriverClient(DriverClient):
         self.event_port = event_port
         self.cmd_host_string = 'tcp://%s:%i' % (self.host, self.cmd_port)
         self.event_host_string = 'tcp://%s:%i' % (self.host, self.event_port)
+        self.request_host_string = 'inproc://driver_client_%s' % uuid.uuid4()
         self.zmq_context = None
         self.zmq_cmd_socket = None
         self.event_thread = None
         self.stop_event_thread = True
+        self.cmd_thread = None
+        self.stop_cmd_thread = True
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._request_ids = itertools.count()
+        self._request_sockets = threading.local()
+        self._all_request_sockets = []
         
     def start_messaging(self, evt_callback=None):
         """
@@ -61,43 +134,88 @@ class ZmqDriverClient(DriverClient):
         and starts event thread that listens for events from the driver
         process independently of command request-reply.
         """
-        self.zmq_context = zmq.Context()
-        self.zmq_cmd_socket = self.zmq_context.socket(zmq.REQ)
+        zmq_mod = zmq_module()
+        self.zmq_context = zmq_mod.Context()
+        self.zmq_cmd_socket = self.zmq_context.socket(zmq.DEALER)
+        self.zmq_cmd_socket.setsockopt(zmq.LINGER, 0)
         self.zmq_cmd_socket.connect(self.cmd_host_string)
         log.info('Driver client cmd socket connected to %s.' %
                        self.cmd_host_string)        
         self.evt_callback = evt_callback
-        
+
+        # Requests from any thread are pushed to the command thread over
+        # inproc so that only the command thread touches the DEALER socket.
+        request_socket = self.zmq_context.socket(zmq.PULL)
+        request_socket.bind(self.request_host_string)
+
+        def send_recv_cmd_messages(driver_client, cmd_sock, request_sock):
+            """
+            Forward queued requests to the driver process and deliver
+            replies to the waiting PendingCommand as soon as they arrive.
+            """
+            poller = zmq_mod.Poller()
+            poller.register(cmd_sock, zmq.POLLIN)
+            poller.register(request_sock, zmq.POLLIN)
+
+            while not driver_client.stop_cmd_thread:
+                socks = dict(poller.poll(POLL_TIMEOUT))
+
+                if socks.get(request_sock) == zmq.POLLIN:
+                    while True:
+                        try:
+                            frames = request_sock.recv_multipart(flags=zmq.NOBLOCK)
+                        except zmq.Again:
+                            break
+                        cmd_sock.send_multipart(frames)
+
+                if socks.get(cmd_sock) == zmq.POLLIN:
+                    while True:
+                        try:
+                            frames = cmd_sock.recv_multipart(flags=zmq.NOBLOCK)
+                        except zmq.Again:
+                            break
+                        driver_client._deliver_reply(frames)
+
+            cmd_sock.close()
+            request_sock.close()
+            log.info('Client cmd socket closed.')
+
         def recv_evt_messages(driver_client):
             """
             A looping function that monitors a ZMQ SUB socket for asynchronous
             driver events. Can be run as a thread or greenlet.
             @param driver_client The client object that launches the thread.
             """
-            context = zmq.Context()
+            context = zmq_mod.Context()
             sock = context.socket(zmq.SUB)
             sock.connect(driver_client.event_host_string)
             sock.setsockopt(zmq.SUBSCRIBE, '')
             log.info('Driver client event thread connected to %s.' %
                   driver_client.event_host_string)
 
+            poller = zmq_mod.Poller()
+            poller.register(sock, zmq.POLLIN)
+
             driver_client.stop_event_thread = False
-            #last_time = time.time()
             while not driver_client.stop_event_thread:
+                if not poller.poll(POLL_TIMEOUT):
+                    continue
                 try:
                     evt = sock.recv_pyobj(flags=zmq.NOBLOCK)
-                    log.debug('got event: %s' % str(evt))
+                    log.debug('got event: %s', evt)
                     if driver_client.evt_callback:
                         driver_client.evt_callback(evt)
                 except zmq.ZMQError:
-                    time.sleep(.5)
-                #cur_time = time.time()
-                #if cur_time - last_time > 5:
-                #    log.info('event thread listening')
-                #    last_time = cur_time
+                    pass
             sock.close()
             context.term()
             log.info('Client event socket closed.')
+
+        self.stop_cmd_thread = False
+        self.cmd_thread = threading.Thread(target=send_recv_cmd_messages,
+                                           args=(self, self.zmq_cmd_socket, request_socket))
+        self.cmd_thread.daemon = True
+        self.cmd_thread.start()
         self.event_thread = thread.start_new_thread(recv_evt_messages, (self,))
         log.info('Driver client messaging started.')
         
@@ -108,9 +226,23 @@ class ZmqDriverClient(DriverClient):
         cause event thread to close event socket and context and terminate.
         Await event thread completion and return.
         """
-        
-        self.zmq_cmd_socket.close()
+        self.stop_cmd_thread = True
+        if self.cmd_thread:
+            self.cmd_thread.join()
+        self.cmd_thread = None
+        for sock in self._all_request_sockets:
+            sock.close()
+        self._all_request_sockets = []
+        self._request_sockets = threading.local()
         self.zmq_cmd_socket = None
+
+        # Nothing will answer commands still in flight.
+        with self._pending_lock:
+            pending = self._pending.values()
+            self._pending = {}
+        for command in pending:
+            command.set_reply(zmq.ZMQError('Driver client messaging stopped'))
+
         self.zmq_context.term()
         self.zmq_context = None
         self.stop_event_thread = True                    
@@ -118,51 +250,65 @@ class ZmqDriverClient(DriverClient):
         self.event_thread = None
         self.evt_callback = None
         log.info('Driver client messaging closed.')        
+
+    def _request_socket(self):
+        """
+        @retval this thread's PUSH socket to the command thread.
+        """
+        sock = getattr(self._request_sockets, 'sock', None)
+        if sock is None:
+            sock = self.zmq_context.socket(zmq.PUSH)
+            sock.setsockopt(zmq.LINGER, 0)
+            sock.connect(self.request_host_string)
+            self._request_sockets.sock = sock
+            self._all_request_sockets.append(sock)
+        return sock
+
+    def _deliver_reply(self, frames):
+        """
+        Match a reply from the driver process to its pending command.
+        @param frames [request id, empty delimiter, pickled reply]
+        """
+        request_id = frames[0]
+        with self._pending_lock:
+            pending = self._pending.pop(request_id, None)
+
+        if pending is None:
+            log.warn('Discarding reply to unknown request %s', request_id)
+            return
+
+        reply = pickle.loads(frames[-1])
+        log.debug('Reply: %s.', reply)
+        pending.set_reply(reply)
+
+    def cmd_dvr_async(self, cmd, *args, **kwargs):
+        """
+        Send a driver command without waiting for the reply.
+        @param cmd The driver command identifier.
+        @param args Positional arguments of the command.
+        @param kwargs Keyword arguments of the command.
+        @retval PendingCommand, call get() on it for the result.
+        """
+        # Package command dictionary.
+        msg = {'cmd':cmd,'args':args,'kwargs':kwargs}
+        request_id = str(next(self._request_ids))
+        pending = PendingCommand(request_id, msg)
+        with self._pending_lock:
+            self._pending[request_id] = pending
+
+        log.debug('Sending command %s.', msg)
+        self._request_socket().send_multipart(
+            [request_id, '', pickle.dumps(msg, pickle.HIGHEST_PROTOCOL)])
+        return pending
     
     def cmd_dvr(self, cmd, *args, **kwargs):
         """
         Command a driver by request-reply messaging. Package command
-        message and send on blocking command socket. Block on same socket
-        to receive the reply. Return the driver reply.
+        message and hand it to the command thread, then block until the
+        reply arrives. Return the driver reply.
         @param cmd The driver command identifier.
         @param args Positional arguments of the command.
         @param kwargs Keyword arguments of the command.
         @retval Command result.
         """
-        # Package command dictionary.
-        msg = {'cmd':cmd,'args':args,'kwargs':kwargs}
-        
-        log.debug('Sending command %s.' % str(msg))
-        while True:
-            try:
-                # Attempt command send. Retry if necessary.
-                self.zmq_cmd_socket.send_pyobj(msg)
-                if msg == 'stop_driver_process':
-                    return 'driver stopping'
-
-                # Command sent, break out and wait for reply.
-                break    
-
-            except zmq.ZMQError:
-                # Socket not ready to accept send. Sleep and retry later.
-                time.sleep(.5)
-            
-        log.debug('Awaiting reply.')
-        while True:
-            try:
-                # Attempt reply recv. Retry if necessary.
-                reply = self.zmq_cmd_socket.recv_pyobj(flags=zmq.NOBLOCK)
-                # Reply recieved, break and return.
-                break
-
-            except zmq.ZMQError:
-                # Socket not ready with the reply. Sleep and retry later.
-                time.sleep(.5)
-                
-        log.debug('Reply: %s.' % str(reply))
-        
-        if isinstance(reply, Exception):
-            raise reply
-        else:
-            return reply
-    
+        return self.cmd_dvr_async(cmd, *args, **kwargs).get()
@@ -24,6 +24,7 @@ import time
 import logging
 import sys
 import uuid
+import cPickle as pickle
 
 import zmq
 
@@ -31,6 +32,8 @@ from ooi.exception import ApplicationException
 from mi.core.exceptions import InstrumentException, UnexpectedError
 
 import mi.core.instrument.driver_process as driver_process
+from mi.core.instrument.zmq_driver_client import zmq_module
+from mi.core.instrument.zmq_driver_client import POLL_TIMEOUT
 from mi.core.log import get_logger
 log = get_logger()
 
@@ -46,7 +49,7 @@ def _encode_exception(reply):
 class ZmqDriverProcess(driver_process.DriverProcess):
     """
     A OS-level driver process that communicates with ZMQ sockets.
-    Command-REP and event-PUB sockets monitor and react to comms
+    Command-ROUTER and event-PUB sockets monitor and react to comms
     needs in separate threads, which can be signaled to end
     by setting boolean flags stop_cmd_thread and stop_evt_thread.
     """
@@ -131,38 +134,43 @@ class ZmqDriverProcess(driver_process.DriverProcess):
         on REP and PUB sockets, respectively. Terminate loops and close
         sockets when stop flag is set in driver process.
         """
+        zmq_mod = zmq_module()
+
         def recv_cmd_msg(zmq_driver_process):
             """
-            Await commands on a ZMQ REP socket, forwaring them to the
-            driver for processing and returning the result.
+            Await commands on a ZMQ ROUTER socket, forwaring them to the
+            driver for processing and returning the result.  Every frame
+            before the pickled command (client identity, request id and
+            empty delimiter) is returned with the reply, so both REQ and
+            pipelining DEALER clients are supported.
             """
-            context = zmq.Context()
-            sock = context.socket(zmq.REP)
+            context = zmq_mod.Context()
+            sock = context.socket(zmq.ROUTER)
+            sock.setsockopt(zmq.LINGER, 0)
             zmq_driver_process.cmd_port = sock.bind_to_random_port(zmq_driver_process.cmd_host_string)
             log.info('Driver process cmd socket bound to %i' %
                            zmq_driver_process.cmd_port)
             file(zmq_driver_process.cmd_port_fname,'w+').write(str(zmq_driver_process.cmd_port)+'\n')
 
+            poller = zmq_mod.Poller()
+            poller.register(sock, zmq.POLLIN)
+
             zmq_driver_process.stop_cmd_thread = False
             while not zmq_driver_process.stop_cmd_thread:
+                if not poller.poll(POLL_TIMEOUT):
+                    continue
                 try:
-                    msg = sock.recv_pyobj(flags=zmq.NOBLOCK)
-                    #log.trace('Processing message %s', msg)
-                    reply = zmq_driver_process.cmd_driver(msg)
-                    # if operation raised exception, encode as triple
-                    if isinstance(reply, Exception):
-                        reply = _encode_exception(reply)
-                    # send, send, and resend
-                    while True:
-                        try:
-                            sock.send_pyobj(reply, flags=zmq.NOBLOCK)
-                            break
-                        except zmq.ZMQError:
-                            time.sleep(.1)
-                            if zmq_driver_process.stop_cmd_thread:
-                                break
+                    frames = sock.recv_multipart(flags=zmq.NOBLOCK)
                 except zmq.ZMQError:
-                    time.sleep(.1)
+                    continue
+
+                msg = pickle.loads(frames[-1])
+                #log.trace('Processing message %s', msg)
+                reply = zmq_driver_process.cmd_driver(msg)
+                # if operation raised exception, encode as triple
+                if isinstance(reply, Exception):
+                    reply = _encode_exception(reply)
+                sock.send_multipart(frames[:-1] + [pickle.dumps(reply, pickle.HIGHEST_PROTOCOL)])
                 
             sock.close()
             context.term()
@@ -173,7 +181,7 @@ class ZmqDriverProcess(driver_process.DriverProcess):
             Await events on the driver process event queue and publish them
             on a ZMQ PUB socket to the driver process client.
             """
-            context = zmq.Context()
+            context = zmq_mod.Context()
             sock = context.socket(zmq.PUB)
             zmq_driver_process.evt_port = sock.bind_to_random_port(zmq_driver_process.event_host_string)
             log.info('Driver process event socket bound to %i', zmq_driver_process.evt_port)
@@ -181,22 +189,19 @@ class ZmqDriverProcess(driver_process.DriverProcess):
 
             zmq_driver_process.stop_evt_thread = False
             while not zmq_driver_process.stop_evt_thread:
-                try:
-                    evt = zmq_driver_process.events.pop(0)
-                    #log.trace('Event thread sending event %s',evt)
-                    while evt:
-                        try:
-                            if isinstance(evt, Exception):
-                                evt = _encode_exception(evt)
-                            sock.send_pyobj(evt, flags=zmq.NOBLOCK)
-                            evt = None
-                            log.trace('Event sent!')
-                        except zmq.ZMQError:
-                            time.sleep(.1)
-                            if zmq_driver_process.stop_evt_thread:
-                                break
-                except IndexError:
-                    time.sleep(.1)
+                evt = zmq_driver_process.events.get(timeout=.1)
+                #log.trace('Event thread sending event %s',evt)
+                while evt:
+                    try:
+                        if isinstance(evt, Exception):
+                            evt = _encode_exception(evt)
+                        sock.send_pyobj(evt, flags=zmq.NOBLOCK)
+                        evt = None
+                        log.trace('Event sent!')
+                    except zmq.ZMQError:
+                        time.sleep(.1)
+                        if zmq_driver_process.stop_evt_thread:
+                            break
 
             sock.close()
             context.term()
@@ -23,11 +23,11 @@ to create a logger automatically scoped with the calling package and ready to us
     from ooi.logging import log    # no longer need get_logger at all
 
 """
-import inspect
 import logging
 import os
 import sys
 import yaml
+import weakref
 import pkg_resources
 from types import FunctionType
 from functools import wraps
@@ -42,6 +42,13 @@ LOGGING_PRIMARY_FROM_EGG='mi-logging.yml'
 LOGGING_MI_OVERRIDE='res/config/mi-logging.local.yml'
 LOGGING_CONTAINER_OVERRIDE='res/config/logging.local.yml'
 
+# ooi.logging level of logger.trace
+TRACE_LEVEL = 5
+
+# classes built by a logging metaclass, with the level they log at and
+# their (original, wrapped) methods
+_logged_classes = weakref.WeakKeyDictionary()
+
 
 class LoggerManager(Singleton):
     """
@@ -77,48 +84,115 @@ class LoggerManager(Singleton):
             if debug:
                 print >> sys.stderr, str(os.getpid()) + ' supplemented logging from ' + LOGGING_CONTAINER_OVERRIDE
 
+        refresh_method_logging()
+
+    def set_level(self, name, level):
+        """
+        Change the level of a logger at runtime.  Classes built with
+        get_logging_metaclass start or stop logging their method calls
+        accordingly, functions decorated with log_method do not.
+        @param name logger name, eg. the module of the classes
+        @param level level name or number
+        """
+        logging.getLogger(name).setLevel(level)
+        refresh_method_logging()
+
 
 def get_logging_metaclass(log_level='trace'):
+    """
+    Metaclass logging entry and exit of the methods of its classes at
+    log_level.  Whether the methods are wrapped is decided when the class is
+    created, from the level of the logger of the class module, and again on
+    refresh_method_logging.  When the level is disabled the class keeps its
+    original methods and calls cost nothing extra.
+    """
+    level = _level_number(log_level)
+
     class LoggingMetaClass(type):
         def __new__(mcs, class_name, bases, class_dict):
-            wrapper = log_method(class_name=class_name, log_level=log_level)
-            new_class_dict = {}
-            for attributeName, attribute in class_dict.items():
+            logger = logging.getLogger(class_dict.get('__module__', __name__))
+            methods = {}
+            for attribute_name, attribute in class_dict.items():
                 if type(attribute) == FunctionType:
-                    attribute = wrapper(attribute)
-                new_class_dict[attributeName] = attribute
-            return type.__new__(mcs, class_name, bases, new_class_dict)
+                    func_name = '%s.%s' % (class_name, attribute.__name__)
+                    methods[attribute_name] = (attribute, _wrap_method(attribute, func_name, logger, level))
+
+            enabled = logger.isEnabledFor(level)
+            if enabled:
+                class_dict = dict(class_dict)
+                class_dict.update((name, wrapped) for name, (func, wrapped) in methods.iteritems())
+            cls = type.__new__(mcs, class_name, bases, class_dict)
+            _logged_classes[cls] = [logger, level, enabled, methods]
+            return cls
     return LoggingMetaClass
 
 
+def refresh_method_logging():
+    """
+    Wrap or unwrap the methods of the classes built with
+    get_logging_metaclass to follow the current logger levels.  Functions
+    decorated with log_method are not covered.
+    """
+    for cls, entry in _logged_classes.items():
+        logger, level, enabled, methods = entry
+        if logger.isEnabledFor(level) == enabled:
+            continue
+        entry[2] = enabled = not enabled
+        for name, (func, wrapped) in methods.iteritems():
+            setattr(cls, name, wrapped if enabled else func)
+
+
 def log_method(class_name=None, log_level='trace'):
-    name = "UNKNOWN_MODULE_NAME"
-    stack = inspect.stack()
-    # step through the stack until we leave mi.core.log
-    for frame in stack:
-        module = inspect.getmodule(frame[0])
-        if module:
-            name = module.__name__
-            if name != 'mi.core.log':
-                break
-    logger = logging.getLogger(name)
+    """
+    Decorator logging entry and exit of a function at log_level, when that
+    level is enabled for the logger of the function module at decoration
+    time.  Otherwise the function is returned as is.
+
+    The decorator does not know where the function it returns ends up, so
+    unlike the methods of get_logging_metaclass classes the choice is fixed
+    at import: neither refresh_method_logging nor LoggerManager.set_level
+    wraps a function decorated while the level was disabled, nor unwraps
+    one decorated while it was enabled.  Use the metaclass for tracing that
+    should follow runtime level changes.
+    """
+    level = _level_number(log_level)
 
     def wrapper(func):
+        logger = logging.getLogger(func.__module__)
+        if not logger.isEnabledFor(level):
+            return func
+
         if class_name is not None:
             func_name = '%s.%s' % (class_name, func.__name__)
         else:
             func_name = func.__name__
-
-        @wraps(func)
-        def inner(*args, **kwargs):
-            getattr(logger, log_level)('entered %s | args: %r | kwargs: %r', func_name, args, kwargs)
-            r = func(*args, **kwargs)
-            getattr(logger, log_level)('exiting %s | returning %r', func_name, r)
-            return r
-        return inner
+        return _wrap_method(func, func_name, logger, level)
 
     return wrapper
 
 
+def _wrap_method(func, func_name, logger, level):
+    @wraps(func)
+    def inner(*args, **kwargs):
+        logger.log(level, 'entered %s | args: %r | kwargs: %r', func_name, args, kwargs)
+        r = func(*args, **kwargs)
+        logger.log(level, 'exiting %s | returning %r', func_name, r)
+        return r
+    return inner
+
+
+def _level_number(log_level):
+    """
+    @param log_level level name, eg. 'trace' or 'debug'
+    @retval the level number
+    """
+    level = logging.getLevelName(log_level.upper())
+    if isinstance(level, int):
+        return level
+    if log_level.lower() == 'trace':
+        return TRACE_LEVEL
+    raise ValueError('Unknown log level: %s' % log_level)
+
+
 def get_logger():
     return log
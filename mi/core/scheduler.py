@@ -46,6 +46,10 @@ job = scheduler.add_polled_job(some_callback, test_name, min_interval, max_inter
 
 scheduler.run_polled_job(test_name)
 
+Jobs are kept in a heap ordered by their next fire time so each wakeup of
+the scheduler thread only touches the jobs that are due, rather than every
+job in every job store.
+
 This module extends the Advanced Python Scheduler:
 @see http://packages.python.org/APScheduler
 """
@@ -56,6 +60,8 @@ __license__ = 'Apache 2.0'
 from datetime import timedelta
 from datetime import datetime
 from math import ceil
+import heapq
+import itertools
 
 from apscheduler.scheduler import Scheduler
 from apscheduler.scheduler import JobStoreEvent
@@ -76,6 +82,15 @@ class PolledScheduler(Scheduler):
         ensure we are running in daemon mode, so we won't wait for 
         unfinished threads on shutdown
         """
+        # heap of (next fire time, sequence, job, alias, jobstore).  Entries
+        # are invalidated lazily: only the entry whose sequence matches
+        # _job_sequence[id(job)] is live.
+        self._job_heap = []
+        self._job_sequence = {}
+        self._job_counter = itertools.count()
+        self._polled_jobs = {}
+        self._job_index_dirty = True
+
         Scheduler.__init__(self, {'daemonic': True})
 
     @staticmethod
@@ -144,13 +159,14 @@ class PolledScheduler(Scheduler):
                 raise LookupError("no PolledIntervalJob found named '%s'" % name )
 
             if(job.ready_to_run()):
-                log.debug("Job '%s' is ready to run" % job.name)
+                log.debug("Job '%s' is ready to run", job.name)
                 self._threadpool.submit(self._run_job, job, [datetime.now()])
                 job.compute_next_run_time(now)
                 jobstore.update_job(job)
+                self._push_job(job, alias, jobstore)
                 return True
             else:
-                log.debug("Job '%s' is *NOT* ready to run" % job.name)
+                log.debug("Job '%s' is *NOT* ready to run", job.name)
                 return False
 
         finally:
@@ -164,12 +180,8 @@ class PolledScheduler(Scheduler):
         @param name: name of the job we are looking for
         @return: Tuple containing (job, alias, jobstore)
         """
-        for (alias, jobstore) in self._jobstores.items():
-            for job in tuple(jobstore.jobs):
-                if(isinstance(job, PolledIntervalJob) and name == job.name):
-                    return (job, alias, jobstore)
-
-        return (None, None, None)
+        self._build_job_index()
+        return self._polled_jobs.get(name, (None, None, None))
 
     def get_polled_job(self, name):
         """
@@ -178,49 +190,131 @@ class PolledScheduler(Scheduler):
         @param name: name of the job we are looking for
         @return: PolledIntervalJob with the matching name or None if not found.
         """
+        self._jobstores_lock.acquire()
+        try:
+            return self.get_polled_job_tuple(name)[0]
+        finally:
+            self._jobstores_lock.release()
+
+    def add_jobstore(self, jobstore, alias, quiet=False):
+        """
+        Jobs loaded from a new job store are not in the job heap yet, so
+        flag the index to be rebuilt.
+        """
+        self._job_index_dirty = True
+        Scheduler.add_jobstore(self, jobstore, alias, quiet)
+
+    def remove_jobstore(self, alias, close=True):
+        """
+        Flag the job heap to be rebuilt without the removed job store
+        """
+        Scheduler.remove_jobstore(self, alias, close)
+        self._job_index_dirty = True
+
+    def _build_job_index(self):
+        """
+        Rebuild the job heap and polled job name index from the job stores
+        if a job store has been added or removed since the last build.
+        """
+        if not self._job_index_dirty:
+            return
+
+        self._job_index_dirty = False
+        self._job_heap = []
+        self._job_sequence = {}
+        self._polled_jobs = {}
         for (alias, jobstore) in self._jobstores.items():
             for job in tuple(jobstore.jobs):
-                if(isinstance(job, PolledIntervalJob) and name == job.name):
-                    return job
+                self._push_job(job, alias, jobstore)
+
+    @staticmethod
+    def _next_fire_time(job):
+        """
+        @return: the time the scheduler should next process this job
+        """
+        if isinstance(job, PolledIntervalJob):
+            return job.trigger.get_next_fire_time()
+        return job.next_run_time
 
-        return None
+    def _push_job(self, job, alias, jobstore):
+        """
+        (Re)queue a job by its next fire time, invalidating any earlier heap
+        entry for the job.  Jobs with no fire time are only indexed.
+        """
+        sequence = next(self._job_counter)
+        self._job_sequence[id(job)] = sequence
+        if isinstance(job, PolledIntervalJob):
+            self._polled_jobs[job.name] = (job, alias, jobstore)
+
+        fire_time = self._next_fire_time(job)
+        if fire_time is not None:
+            heapq.heappush(self._job_heap, (fire_time, sequence, job, alias, jobstore))
+
+        # Frequently polled jobs leave a stale entry behind on every pull,
+        # drop them once they outnumber the live entries.
+        if len(self._job_heap) > 2 * len(self._job_sequence) + 64:
+            self._job_heap[:] = [entry for entry in self._job_heap if self._is_live(entry)]
+            heapq.heapify(self._job_heap)
+
+    def _discard_job(self, job):
+        """
+        Drop a job from the heap index.  Its heap entries become stale and
+        are skipped when they reach the top of the heap.
+        """
+        self._job_sequence.pop(id(job), None)
+        if isinstance(job, PolledIntervalJob):
+            entry = self._polled_jobs.get(job.name)
+            if entry and entry[0] is job:
+                del self._polled_jobs[job.name]
+
+    def _is_live(self, entry):
+        return self._job_sequence.get(id(entry[2])) == entry[1]
+
+    def _remove_job(self, job, alias, jobstore):
+        self._discard_job(job)
+        Scheduler._remove_job(self, job, alias, jobstore)
 
     def _process_jobs(self, now, polled=False):
         """
-        Iterates through jobs in every jobstore, starts pending jobs
-        and figures out the next wakeup time.
+        Pops the jobs that are due from the job heap, starts them, requeues
+        them and figures out the next wakeup time.
         """
-        log.debug("_process_jobs started")
-        next_wakeup_time = None
-        next_polled_wakeup_time = None
         self._jobstores_lock.acquire()
         try:
-            log.debug("_process_jobs lock acquired")
-            for (alias, jobstore) in self._jobstores.items():
-                for job in tuple(jobstore.jobs):
-                    log.debug("_process_jobs process job %s" % job)
-                    if isinstance(job, PolledIntervalJob):
-                        next_polled_wakeup_time_job = self._process_polled_job(job, now, alias, jobstore)
-                        if next_polled_wakeup_time is None: next_polled_wakeup_time = next_polled_wakeup_time_job
-                        next_polled_wakeup_time = min(next_polled_wakeup_time, next_polled_wakeup_time_job)
-                    else:
-                        next_wakeup_time_job = self._process_original_job(job, now, alias, jobstore)
-                        if next_wakeup_time is None: next_wakeup_time = next_wakeup_time_job
-                        next_wakeup_time = min(next_wakeup_time, next_wakeup_time_job)
-
-            log.debug("_process_jobs loop complete")
-            log.debug("_process_jobs next polled wakeup %s" % next_polled_wakeup_time)
-            log.debug("_process_jobs next wakeup %s" % next_wakeup_time)
-
-            if(next_polled_wakeup_time and next_wakeup_time):
-                return min(next_polled_wakeup_time, next_wakeup_time)
-            elif(next_wakeup_time == None):
-                return next_polled_wakeup_time
-            else:
-                return next_wakeup_time
+            self._build_job_index()
+            heap = self._job_heap
+
+            while heap and heap[0][0] <= now:
+                entry = heapq.heappop(heap)
+                if not self._is_live(entry):
+                    continue
+
+                (fire_time, sequence, job, alias, jobstore) = entry
+
+                # The fire time may have moved, e.g. a polled trigger
+                # pulled outside run_polled_job.
+                current_fire_time = self._next_fire_time(job)
+                if current_fire_time is None or current_fire_time > now:
+                    self._push_job(job, alias, jobstore)
+                    continue
+
+                log.debug("_process_jobs process job %s", job)
+                if isinstance(job, PolledIntervalJob):
+                    self._process_polled_job(job, now, alias, jobstore)
+                else:
+                    self._process_original_job(job, now, alias, jobstore)
+
+                if self._is_live(entry):
+                    self._push_job(job, alias, jobstore)
+
+            while heap and not self._is_live(heap[0]):
+                heapq.heappop(heap)
+
+            next_wakeup_time = heap[0][0] if heap else None
+            log.debug("_process_jobs next wakeup %s", next_wakeup_time)
+            return next_wakeup_time
         finally:
             self._jobstores_lock.release()
-            log.debug("_process_jobs lock released")
 
     def _process_original_job(self, job, now, alias, jobstore):
         """
@@ -259,15 +353,13 @@ class PolledScheduler(Scheduler):
         next_wakeup_time=job.trigger.get_next_fire_time()
 
         if not next_wakeup_time == None and next_wakeup_time <= now:
-            log.debug("submit job to pool: %s" % job)
+            log.debug("submit job to pool: %s", job)
             if(not self._threadpool._shutdown):
                 self._threadpool.submit(self._run_job, job, [next_wakeup_time])
 
-            # Increase the job's run count
-            if job.coalesce:
-                job.runs += 1
-            else:
-                job.runs += len(run_times)
+            # Increase the job's run count, a polled job only fires once
+            # per wakeup.
+            job.runs += 1
 
             # Update the job.  We don't remove any polled jobs automatically
             job.trigger.pull_trigger()
@@ -304,6 +396,8 @@ class PolledScheduler(Scheduler):
             except KeyError:
                 raise KeyError('No such job store: %s' % jobstore)
             store.add_job(job)
+            self._build_job_index()
+            self._push_job(job, jobstore, store)
         finally:
             self._jobstores_lock.release()
 
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.test.test_common
+@file mi/core/test/test_common.py
+@brief Test the BaseEnum member cache
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import timeit
+
+from mi.core.log import get_logger ; log = get_logger()
+
+from nose.plugins.attrib import attr
+from mi.core.unit_test import MiUnitTest
+from mi.core.common import BaseEnum
+from mi.core.common import InstErrorCode
+
+
+class FirstEnum(BaseEnum):
+    ONE = 'one'
+    TWO = 'two'
+
+
+class SecondEnum(BaseEnum):
+    THREE = 'three'
+
+
+class CombinedEnum(FirstEnum, SecondEnum):
+    FOUR = 'four'
+
+
+@attr('UNIT', group='mi')
+class TestBaseEnum(MiUnitTest):
+    """
+    Test the BaseEnum introspection helpers
+    """
+    def test_list(self):
+        """
+        Values are listed in attribute name order and the list is a copy
+        """
+        self.assertEqual(FirstEnum.list(), ['one', 'two'])
+        self.assertEqual(sorted(CombinedEnum.list()), ['four', 'one', 'three', 'two'])
+
+        values = FirstEnum.list()
+        values.append('bogus')
+        self.assertEqual(FirstEnum.list(), ['one', 'two'])
+        self.assertEqual(FirstEnum.tuple(), ('one', 'two'))
+
+    def test_dict(self):
+        """
+        dict() contains inherited members and is a copy
+        """
+        self.assertEqual(CombinedEnum.dict(), {'ONE': 'one', 'TWO': 'two',
+                                               'THREE': 'three', 'FOUR': 'four'})
+        values = FirstEnum.dict()
+        values['BOGUS'] = 'bogus'
+        self.assertEqual(FirstEnum.dict(), {'ONE': 'one', 'TWO': 'two'})
+
+    def test_has(self):
+        """
+        Membership for hashable and unhashable values
+        """
+        self.assertTrue(CombinedEnum.has('three'))
+        self.assertTrue(CombinedEnum.has('four'))
+        self.assertFalse(FirstEnum.has('four'))
+        self.assertFalse(FirstEnum.has(['one']))
+
+        # InstErrorCode values are lists
+        self.assertTrue(InstErrorCode.has(InstErrorCode.OK))
+        self.assertFalse(InstErrorCode.has('OK'))
+        self.assertTrue(InstErrorCode.is_ok(('OK',)))
+
+    def test_has_performance(self):
+        """
+        has() should not rescan the class on every call
+        """
+        def uncached():
+            values = [getattr(CombinedEnum, a) for a in dir(CombinedEnum)
+                      if not callable(getattr(CombinedEnum, a)) and not a.startswith('__')]
+            return 'four' in values
+
+        cached_time = timeit.timeit(lambda: CombinedEnum.has('four'), number=10000)
+        uncached_time = timeit.timeit(uncached, number=10000)
+        log.debug("BaseEnum.has: cached %f, uncached %f", cached_time, uncached_time)
+        self.assertLess(cached_time, uncached_time)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.test.test_log
+@file mi/core/test/test_log.py
+@author agent
+@brief Test method logging with get_logging_metaclass and log_method
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import time
+import logging
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.log import get_logging_metaclass, log_method, refresh_method_logging, TRACE_LEVEL
+
+from mi.instrument.harvard.massp.turbo import driver as turbo
+
+TURBO_STATUS = '\r'.join(['0011031006000234021', '0011031306002346030', '0011034206000028027',
+                          '0011034606000029032', '0011039806002326041']) + '\r'
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def is_wrapped(cls, name):
+    return cls.__dict__[name].func_code.co_name != name
+
+
+@attr('UNIT', group='mi')
+class TestMethodLogging(MiUnitTest):
+
+    def setUp(self):
+        self.logger = logging.getLogger(__name__)
+        self.handler = RecordingHandler()
+        self.logger.addHandler(self.handler)
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.logger.propagate = True
+        self.logger.setLevel(logging.NOTSET)
+        refresh_method_logging()
+
+    def build_class(self):
+        class Traced(object):
+            __metaclass__ = get_logging_metaclass('debug')
+
+            def add(self, a, b):
+                return a + b
+        return Traced
+
+    def test_disabled(self):
+        """
+        Classes keep their own methods when the level is disabled
+        """
+        traced = self.build_class()
+        self.assertFalse(is_wrapped(traced, 'add'))
+        self.assertEqual(traced().add(1, 2), 3)
+        self.assertEqual(self.handler.messages, [])
+
+    def test_enabled(self):
+        self.logger.setLevel(logging.DEBUG)
+        traced = self.build_class()
+        self.assertTrue(is_wrapped(traced, 'add'))
+        self.assertEqual(traced().add(1, 2), 3)
+        self.assertEqual(len(self.handler.messages), 2)
+        self.assertIn('entered Traced.add', self.handler.messages[0])
+        self.assertIn('returning 3', self.handler.messages[1])
+
+    def test_refresh(self):
+        """
+        Level changes wrap and unwrap the methods of existing classes
+        """
+        traced = self.build_class()
+        self.logger.setLevel(logging.DEBUG)
+        refresh_method_logging()
+        self.assertTrue(is_wrapped(traced, 'add'))
+        traced().add(1, 2)
+        self.assertEqual(len(self.handler.messages), 2)
+
+        self.logger.setLevel(logging.INFO)
+        refresh_method_logging()
+        self.assertFalse(is_wrapped(traced, 'add'))
+        traced().add(1, 2)
+        self.assertEqual(len(self.handler.messages), 2)
+
+    def test_log_method(self):
+        def add(a, b):
+            return a + b
+
+        unwrapped = log_method(log_level='debug')(add)
+        self.assertIs(unwrapped, add)
+        self.logger.setLevel(logging.DEBUG)
+        wrapped = log_method(log_level='debug')(add)
+        self.assertEqual(wrapped(1, 2), 3)
+        self.assertEqual(len(self.handler.messages), 2)
+
+        # the choice is fixed at decoration
+        refresh_method_logging()
+        self.assertEqual(unwrapped(1, 2), 3)
+        self.assertEqual(len(self.handler.messages), 2)
+
+        self.assertRaises(ValueError, get_logging_metaclass, 'bogus')
+
+    def test_got_chunk_benchmark(self):
+        """
+        _got_chunk throughput of the massp turbo protocol with method
+        tracing on and off, logged at info level.  The rates are only
+        logged, they depend on the load of the host.
+        """
+        turbo_logger = logging.getLogger(turbo.__name__)
+        handler = logging.NullHandler()
+        turbo_logger.addHandler(handler)
+        turbo_logger.propagate = False
+        samples = []
+        protocol = turbo.Protocol(turbo.Prompt, turbo.NEWLINE, lambda *args: samples.append(args))
+        del samples[:]
+
+        def timed(count=2000):
+            start = time.time()
+            for _ in xrange(count):
+                protocol._got_chunk(TURBO_STATUS, 0)
+            return count / (time.time() - start)
+
+        try:
+            turbo_logger.setLevel(TRACE_LEVEL)
+            refresh_method_logging()
+            self.assertTrue(is_wrapped(turbo.Protocol, '_got_chunk'))
+            traced = timed()
+
+            turbo_logger.setLevel(logging.INFO)
+            refresh_method_logging()
+            self.assertFalse(is_wrapped(turbo.Protocol, '_got_chunk'))
+            untraced = timed()
+        finally:
+            turbo_logger.removeHandler(handler)
+            turbo_logger.propagate = True
+            turbo_logger.setLevel(logging.NOTSET)
+            refresh_method_logging()
+
+        log.info("massp turbo _got_chunk: %.0f chunks/sec traced, %.0f chunks/sec untraced",
+                 traced, untraced)
+        self.assertEqual(len(samples), 4000)
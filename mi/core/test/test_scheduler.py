@@ -23,6 +23,7 @@ from mi.core.scheduler import PolledScheduler
 from mi.core.scheduler import PolledIntervalTrigger
 from mi.core.scheduler import PolledIntervalJob
 from apscheduler.util import timedelta_seconds
+from apscheduler.jobstores.ram_store import RAMJobStore
 
 @attr('UNIT', group='mi')
 class TestScheduler(MiUnitTest):
@@ -370,3 +371,75 @@ class TestScheduler(MiUnitTest):
         self.assertFalse(job.ready_to_run())
         self.assert_datetime_close(next_time, now + max_interval)
 
+
+####################################################################################################
+#  Test the job heap
+####################################################################################################
+    def test_polled_job_index(self):
+        """
+        Polled jobs are found by name and removed from the index when unscheduled
+        """
+        min_interval = PolledScheduler.interval(seconds=1)
+        max_interval = PolledScheduler.interval(seconds=3)
+        job = self._scheduler.add_polled_job(self._callback, 'test_job', min_interval, max_interval)
+
+        self.assertIs(self._scheduler.get_polled_job('test_job'), job)
+        with self.assertRaises(ValueError):
+            self._scheduler.add_polled_job(self._callback, 'test_job', min_interval, max_interval)
+
+        self._scheduler.unschedule_job(job)
+        self.assertIsNone(self._scheduler.get_polled_job('test_job'))
+        with self.assertRaises(LookupError):
+            self._scheduler.run_polled_job('test_job')
+
+        # Make sure the unscheduled job never fires
+        time.sleep(4)
+        self.assertEqual(len(self._triggered), 0)
+
+    def test_many_jobs(self):
+        """
+        Benchmark 1000 polled jobs.  Only due jobs should be touched on a wakeup
+        and polling a job by name should not scan the job stores.
+
+        The wakeups are driven from the test on a scheduler that is never
+        started, so they don't contend with a scheduler thread for the job
+        store lock.
+        """
+        job_count = 1000
+        min_interval = PolledScheduler.interval(seconds=1)
+        max_interval = PolledScheduler.interval(hours=1)
+
+        scheduler = PolledScheduler()
+        scheduler.add_jobstore(RAMJobStore(), 'default', True)
+        try:
+            start_time = time.time()
+            for i in range(job_count):
+                scheduler.add_polled_job(self._callback, 'job_%d' % i, min_interval, max_interval)
+            # what start() does with the pending jobs, without the thread
+            for job, jobstore in scheduler._pending_jobs:
+                scheduler._real_add_job(job, jobstore, False)
+            del scheduler._pending_jobs[:]
+            log.info("added %d jobs in %f seconds", job_count, time.time() - start_time)
+
+            start_time = time.time()
+            for i in range(job_count):
+                scheduler._process_jobs(datetime.datetime.now())
+            process_time = time.time() - start_time
+            log.info("%d wakeups with %d jobs in %f seconds", job_count, job_count, process_time)
+
+            start_time = time.time()
+            for i in range(job_count):
+                self.assertTrue(scheduler.run_polled_job('job_%d' % i))
+            poll_time = time.time() - start_time
+            log.info("polled %d jobs in %f seconds", job_count, poll_time)
+
+            # Nothing is due so a wakeup should be O(1) rather than O(jobs)
+            self.assertLess(process_time, 1.0)
+            self.assertLess(poll_time, 5.0)
+
+            # the heap should have been compacted as jobs were re-queued
+            self.assertLessEqual(len(scheduler._job_heap), 2 * job_count + 64)
+
+            self.assert_event_triggered()
+        finally:
+            scheduler._threadpool.shutdown()
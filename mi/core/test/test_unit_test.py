@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+"""
+@package mi.core.test.test_unit_test
+@file mi/core/test/test_unit_test.py
+@author agent
+@brief Test the particle dict cache and verification timing of ParticleTestMixin
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import json
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest, ParticleTestMixin
+from mi.core.instrument.data_particle import DataParticleKey
+
+PARTICLE = json.dumps({DataParticleKey.PKT_FORMAT_ID: 'JSON_Data',
+                       DataParticleKey.PKT_VERSION: 1,
+                       DataParticleKey.STREAM_NAME: 'ctd',
+                       DataParticleKey.PORT_TIMESTAMP: 3600000000.0,
+                       DataParticleKey.DRIVER_TIMESTAMP: 3600000000.0,
+                       DataParticleKey.PREFERRED_TIMESTAMP: DataParticleKey.PORT_TIMESTAMP,
+                       DataParticleKey.QUALITY_FLAG: 'ok',
+                       DataParticleKey.VALUES: []})
+
+
+@attr('UNIT', group='mi')
+class TestParticleTestMixin(MiUnitTest, ParticleTestMixin):
+
+    def test_dict_cached(self):
+        """
+        A JSON particle is decoded once per test
+        """
+        sample_dict = self.convert_data_particle_to_dict(PARTICLE)
+        self.assertIs(self.convert_data_particle_to_dict(PARTICLE), sample_dict)
+        self.assertIs(self.convert_data_particle_to_dict(unicode(PARTICLE)), sample_dict)
+
+        decoded = json.loads(PARTICLE)
+        other = PARTICLE.replace('ctd', 'raw')
+        self.cache_particle_dict(other, decoded)
+        self.assertIs(self.convert_data_particle_to_dict(other), decoded)
+
+    def test_verification_time(self):
+        self.assert_data_particle_header(PARTICLE, 'ctd')
+        self.assert_data_particle_header(PARTICLE, 'ctd')
+        (count, seconds) = self._particle_verification
+        self.assertEqual(count, 2)
+        self.assertGreaterEqual(seconds, 0.0)
+
+        self.assertRaises(AssertionError, self.assert_data_particle_header, PARTICLE, 'ctd', True)
+        self.assertEqual(self._particle_verification[0], 3)
+
+        self.finish_particle_verification()
+        self.assertIsNone(self._particle_dicts)
+        self.assertIsNone(self._particle_verification)
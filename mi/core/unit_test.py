@@ -10,12 +10,17 @@ We have the stand alone test case for tests that don't require or can't
 integrate with the common ION test case.
 """
 
+# Needed because we import the time module below.  With out this '.' is search first
+# and we import mi.core.time.
+from __future__ import absolute_import
 
 from mi.core.log import get_logger
 log = get_logger()
 
+import time
 import unittest
 import json 
+import functools
 
 from pyon.util.unit_test import IonUnitTestCase
 from pyon.util.unit_test import PyonTestCase
@@ -63,12 +68,86 @@ class MiIntTestCase(IonIntegrationTestCase):
     def shortDescription(self):
         return None
 
+# a test spending longer than this verifying particles is logged as slow
+SLOW_PARTICLE_VERIFICATION = 1.0
+
+
+def particle_verification(func):
+    """
+    Decorator adding the time spent in a particle assert method to the
+    particle verification time of the test.
+    """
+    @functools.wraps(func)
+    def timed(self, *args, **kwargs):
+        start = time.time()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self.add_particle_verification_time(time.time() - start)
+    return timed
+
+
 class ParticleTestMixin(object):
     """
     A class with some methods to test data particles. Intended to be mixed
     into test classes so that particles can be tested in different areas of
     the MI code base.
+
+    Particles published by drivers are JSON strings.  The decoded dict of
+    each string is kept until the test finishes, so the header and
+    parameter asserts on the same particle decode it once.
     """
+    _particle_dicts = None
+    _particle_verification = None
+
+    def _start_particle_verification(self):
+        """
+        Set up the particle dict cache and verification time of the test,
+        and have them reported and released when it finishes.
+        """
+        self._particle_dicts = {}
+        self._particle_verification = [0, 0.0]
+        if hasattr(self, 'addCleanup'):
+            self.addCleanup(self.finish_particle_verification)
+
+    def finish_particle_verification(self):
+        """
+        Log the time the test spent in particle asserts, as a warning when it
+        is more than SLOW_PARTICLE_VERIFICATION seconds, and release the
+        particle dict cache.
+        """
+        (count, seconds) = self._particle_verification or (0, 0.0)
+        self._particle_dicts = None
+        self._particle_verification = None
+        if not count:
+            return
+
+        test_id = self.id() if hasattr(self, 'id') else self.__class__.__name__
+        if seconds > SLOW_PARTICLE_VERIFICATION:
+            log.warn("%s: slow particle verification, %d asserts in %.3fs", test_id, count, seconds)
+        else:
+            log.info("%s: %d particle asserts in %.3fs", test_id, count, seconds)
+
+    def cache_particle_dict(self, data_particle, sample_dict):
+        """
+        Remember the dict of a JSON particle string, e.g. when the event
+        callback already decoded it.
+        @param data_particle JSON particle string
+        @param sample_dict decoded particle
+        """
+        if self._particle_dicts is None:
+            self._start_particle_verification()
+        self._particle_dicts[data_particle] = sample_dict
+
+    def add_particle_verification_time(self, seconds):
+        """
+        Add to the particle verification time of the current test.
+        @param seconds time spent verifying particles
+        """
+        if self._particle_verification is None:
+            self._start_particle_verification()
+        self._particle_verification[0] += 1
+        self._particle_verification[1] += seconds
 
     def convert_data_particle_to_dict(self, data_particle):
         """
@@ -79,8 +158,13 @@ class ParticleTestMixin(object):
         """
         if (isinstance(data_particle, DataParticle)):
             sample_dict = data_particle.generate_dict()
-        elif (isinstance(data_particle, str)):
-            sample_dict = json.loads(data_particle)
+        elif (isinstance(data_particle, basestring)):
+            if self._particle_dicts is None:
+                self._start_particle_verification()
+            sample_dict = self._particle_dicts.get(data_particle)
+            if sample_dict is None:
+                sample_dict = json.loads(data_particle)
+                self._particle_dicts[data_particle] = sample_dict
         elif (isinstance(data_particle, dict)):
             sample_dict = data_particle
         else:
@@ -116,7 +200,7 @@ class ParticleTestMixin(object):
             if(key == None):
                 raise IDKException("value_id not defined")
 
-            if(key in result.keys()):
+            if(key in result):
                 raise IDKException("duplicate value detected for %s" % key)
 
             result[key] = param.get('value')
@@ -135,6 +219,7 @@ class ParticleTestMixin(object):
 
         self.assertEqual(driver_keys, test_config_keys)
 
+    @particle_verification
     def assert_data_particle_header(self, data_particle, stream_name, require_instrument_timestamp=False):
         """
         Verify a data particle header is formatted properly
@@ -163,6 +248,3 @@ class ParticleTestMixin(object):
         if(require_instrument_timestamp):
             self.assertIsNotNone(sample_dict.get(DataParticleKey.INTERNAL_TIMESTAMP))
             self.assertIsInstance(sample_dict.get(DataParticleKey.INTERNAL_TIMESTAMP), float)
-
-
-
@@ -35,6 +35,7 @@ from mi.core.instrument.driver_dict import DriverDict
 from mi.core.instrument.protocol_param_dict import ParameterDictType
 from mi.core.instrument.protocol_param_dict import Parameter
 from mi.core.common import BaseEnum
+from mi.dataset.particle_batch import ParticleBatch
 
 class DataSourceConfigKey(BaseEnum):
     HARVESTER = 'harvester'
@@ -115,6 +116,8 @@ class DataSetDriverConfigKeys(BaseEnum):
     CLASS = "class"
     URI = "uri"
     CLASS_ARGS = "class_args"
+    MMAP_INPUT = "mmap_input"
+    PARTICLE_BATCH = "particle_batch"
 
 class DataSetDriver(object):
     """
@@ -150,7 +153,9 @@ class DataSetDriver(object):
     """
     def __init__(self, config, memento, data_callback, state_callback, event_callback, exception_callback):
         self._config = copy.deepcopy(config)
-        self._data_callback = data_callback
+        # parsers publish through _publish_data, which hands particles to the agent
+        self._agent_data_callback = data_callback
+        self._data_callback = self._publish_data
         self._state_callback = state_callback
         self._event_callback = event_callback
         self._exception_callback = exception_callback
@@ -440,6 +445,24 @@ class DataSetDriver(object):
     def _new_file_exception(self):
         raise NotImplementedException('virtual methond needs to be specialized')
 
+    def _publish_data(self, data):
+        """
+        Publish parsed data to the agent, expanding any particle batches into
+        the particles the agent publishes.
+        @param data A particle or ParticleBatch, or a list of them
+        """
+        if isinstance(data, ParticleBatch):
+            data = data.particles()
+        elif isinstance(data, list) and any(isinstance(d, ParticleBatch) for d in data):
+            particles = []
+            for d in data:
+                if isinstance(d, ParticleBatch):
+                    particles.extend(d.particles())
+                else:
+                    particles.append(d)
+            data = particles
+        self._agent_data_callback(data)
+
     def _sample_exception_callback(self, exception):
         """
         Publish an event when a sample exception is detected
@@ -11,8 +11,11 @@ out of files and feed them into the system.
 __author__ = 'Steve Foley'
 __license__ = 'Apache 2.0'
 
+import os
+import mmap
 import time
 import ntplib
+from collections import deque
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -23,6 +26,10 @@ from mi.core.exceptions import NotImplementedException, UnexpectedDataException
 from mi.dataset.dataset_driver import DataSetDriverConfigKeys
 
 
+# records get_records_iter requests from get_records at a time
+RECORD_ITER_BATCH_SIZE = 256
+
+
 class Parser(object):
     """ abstract class to show API needed for plugin poller objects """
 
@@ -85,6 +92,27 @@ class Parser(object):
         """
         raise NotImplementedException("get_records() not overridden!")
 
+    def get_records_iter(self, num_records=None, batch_size=RECORD_ITER_BATCH_SIZE):
+        """
+        Generator over the particles, for callers streaming them rather than
+        collecting lists. Records are pulled from get_records batch_size at
+        a time, so they are published, and the state pushed to the driver,
+        a batch at a time when the batch is fetched.
+        @param num_records The maximum number of records to produce, None
+           for all records up to the end of the file
+        @param batch_size The number of records requested from get_records
+           at a time
+        """
+        while num_records is None or num_records > 0:
+            count = batch_size if num_records is None else min(batch_size, num_records)
+            records = self.get_records(count)
+            if not records:
+                return
+            if num_records is not None:
+                num_records -= len(records)
+            for record in records:
+                yield record
+
     def set_state(self, state):
         """
         Set the state of the last published data block.
@@ -144,13 +172,51 @@ class Parser(object):
         return particle
 
 
+# Window sizes used when reading through a memory mapping
+MMAP_BLOCK_SIZE = 262144
+MMAP_MAX_BLOCK_SIZE = 16777216
+# Maximum number of records in a particle batch
+PARTICLE_BATCH_SIZE = 65536
+
+
 class BufferLoadingParser(Parser):
     """
     This class loads data values into a record buffer, then offers up
     records from this buffer as they are requested. Parsers dont have
     to operate this way, but it can keep memory in check and smooth out
     stream inputs if they dont all come at once.
+
+    With mmap input (the class level _mmap_input default, or the
+    DataSetDriverConfigKeys.MMAP_INPUT config value) the file behind the
+    stream handle is memory mapped and handed to the chunker in large
+    windows instead of 1024 byte reads. The stream handle position is kept
+    in step with the window so parsers seeking in set_state work unchanged.
+
+    Parsers supporting it (_particle_batch_support) produce ParticleBatch
+    records when the DataSetDriverConfigKeys.PARTICLE_BATCH config value is
+    set: their parse_chunks appends rows to self._open_batch, which is closed
+    with the _read_state every PARTICLE_BATCH_SIZE records and at the end of
+    the file. get_records then returns and publishes batches holding up to
+    the requested number of records.
+
+    parse_chunks may return (particle, position) pairs, position being the
+    integer _position_key value of the state after the record, rather than
+    a copy of the state per record. The state is then only built, from the
+    _read_state, for the last record of each get_records call. This only
+    suits parsers whose state changes in nothing but its position while
+    parsing.
+
+    The record buffer is a deque, records being handed out with
+    _pop_records. Parsers keeping their own list in _record_buffer still
+    work with _pop_records, but pay for the copy of what remains on every
+    yank.
     """
+    _mmap_input = False
+    _mmap = None
+    _particle_batch_support = False
+    _particle_batch = False
+    _open_batch = None
+    _position_key = 'position'
 
     def __init__(self, config, stream_handle, state, sieve_fn,
                  state_callback, publish_callback, exception_callback=None):
@@ -171,14 +237,25 @@ class BufferLoadingParser(Parser):
            ultimately from the agent) where we send our error events to
            be published into ION
         """
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._timestamp = 0.0
         self.file_complete = False
+        self._mmap = None
+        self._mmap_block_size = MMAP_BLOCK_SIZE
 
         super(BufferLoadingParser, self).__init__(config, stream_handle, state,
                                                   sieve_fn, state_callback,
                                                   publish_callback,
                                                   exception_callback)
+        if config:
+            self._mmap_input = config.get(DataSetDriverConfigKeys.MMAP_INPUT,
+                                          self._mmap_input)
+            if config.get(DataSetDriverConfigKeys.PARTICLE_BATCH):
+                if self._particle_batch_support:
+                    self._particle_batch = True
+                else:
+                    log.warn("%s does not produce particle batches, publishing particles",
+                             self.__class__.__name__)
 
     def get_records(self, num_records):
         """
@@ -191,12 +268,22 @@ class BufferLoadingParser(Parser):
         if num_records <= 0:
             return []
         try:
-            while len(self._record_buffer) < num_records:
-                self._load_particle_buffer()        
+            while self._buffered_record_count() < num_records:
+                self._load_particle_buffer()
         except EOFError:
             self._process_end_of_file()
+        if self._particle_batch:
+            return self._yank_batches(num_records)
         return self._yank_particles(num_records)
 
+    def _buffered_record_count(self):
+        """
+        @retval The number of records in the record buffer
+        """
+        if self._particle_batch:
+            return sum(len(batch) for batch in self._record_buffer)
+        return len(self._record_buffer)
+
     def _process_end_of_file(self):
         """
         Confirm that the chunker does not have any extra bytes left at the end of the file
@@ -219,19 +306,16 @@ class BufferLoadingParser(Parser):
         cannot be collected (perhaps due to an EOF), the list will have the
         elements it was able to collect.
         """
-        if len(self._record_buffer) < num_records:
-            num_to_fetch = len(self._record_buffer)
-        else:
-            num_to_fetch = num_records
         log.trace("Yanking %s records of %s requested",
-                  num_to_fetch,
+                  min(num_records, len(self._record_buffer)),
                   num_records)
 
         return_list = []
-        records_to_return = self._record_buffer[:num_to_fetch]
-        self._record_buffer = self._record_buffer[num_to_fetch:]
+        records_to_return = self._pop_records(num_records)
         if len(records_to_return) > 0:
             self._state = records_to_return[-1][1]  # state side of tuple of last entry
+            if not isinstance(self._state, dict):
+                self._state = self._position_state(self._state)
             # strip the state info off of them now that we have what we need
             for item in records_to_return:
                 log.debug("Record to return: %s", item)
@@ -246,15 +330,91 @@ class BufferLoadingParser(Parser):
 
         return return_list
 
+    def _pop_records(self, num_records):
+        """
+        Remove records from the front of the record buffer.
+        @param num_records The number of records to remove
+        @retval A list of up to num_records records
+        """
+        buffer = self._record_buffer
+        if not isinstance(buffer, deque):
+            records = buffer[:num_records]
+            del buffer[:num_records]
+            return records
+        popleft = buffer.popleft
+        return [popleft() for _ in xrange(min(num_records, len(buffer)))]
+
+    def _position_state(self, position):
+        """
+        Build the state of a record buffered with just its position.
+        @param position The position after the record
+        @retval A copy of the _read_state with that position
+        """
+        state = dict(self._read_state)
+        state[self._position_key] = position
+        return state
+
+    def _yank_batches(self, num_records):
+        """
+        Batch mode counterpart of _yank_particles: take up to num_records
+        records out of the buffered batches, splitting the last one if
+        needed, publish the batches and push the state after the last
+        record to the driver.
+        @param num_records The number of records to remove from the buffer
+        @retval A list of ParticleBatch holding at most num_records records
+        """
+        return_list = []
+        remaining = num_records
+        while self._record_buffer and remaining > 0:
+            batch = self._record_buffer.popleft()
+            if len(batch) > remaining:
+                batch, rest = batch.split(remaining)
+                self._record_buffer.appendleft(rest)
+            if len(batch):
+                return_list.append(batch)
+                remaining -= len(batch)
+
+        if return_list:
+            self._state = return_list[-1].state
+            self._publish_sample(return_list)
+            file_ingested = self.file_complete and not self._record_buffer
+            self._state_callback(self._state, file_ingested)
+
+        return return_list
+
     def _load_particle_buffer(self):
         """
         Load up the internal record buffer with some particles based on a
         gather from the get_block method.
         """
+        if self._particle_batch:
+            return self._load_batch_buffer()
+
         while self.get_block():
             result = self.parse_chunks()
             self._record_buffer.extend(result)
 
+    def _load_batch_buffer(self):
+        """
+        Batch mode counterpart of _load_particle_buffer, parse_chunks adding
+        the records to the open batch.
+        """
+        try:
+            while self.get_block():
+                self.parse_chunks()
+                if self._open_batch is not None and len(self._open_batch) >= PARTICLE_BATCH_SIZE:
+                    self._close_batch()
+        finally:
+            self._close_batch()
+
+    def _close_batch(self):
+        """
+        Move the open batch, if it has any record, to the record buffer.
+        """
+        if self._open_batch is not None and len(self._open_batch):
+            self._record_buffer.append(self._open_batch.freeze(self._read_state))
+        self._open_batch = None
+
     def get_block(self, size=1024):
         """
         Get a block of characters for processing
@@ -262,6 +422,9 @@ class BufferLoadingParser(Parser):
         @retval The length of data retreived
         @throws EOFError when the end of the file is reached
         """
+        if self._mmap_input and self._map_input():
+            return self._get_mapped_block(size)
+
         # read in some more data
         data = self._stream_handle.read(size)
         if data:
@@ -271,6 +434,61 @@ class BufferLoadingParser(Parser):
             self.file_complete = True
             raise EOFError
 
+    def _map_input(self):
+        """
+        Map the file behind the stream handle if not mapped yet, or map it
+        again if it has grown since. Falls back to plain reads for handles
+        without a file descriptor (eg. StringIO) and empty files.
+        @retval True if the input is mapped
+        """
+        try:
+            file_size = os.fstat(self._stream_handle.fileno()).st_size
+            if self._mmap is not None and len(self._mmap) == file_size:
+                return True
+            self._close_mapping()
+            if file_size == 0:
+                return False
+            self._mmap = mmap.mmap(self._stream_handle.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except (AttributeError, EnvironmentError, ValueError) as e:
+            log.debug("Unable to map input, using plain reads: %s", e)
+            self._mmap_input = False
+            return False
+        return True
+
+    def _close_mapping(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _get_mapped_block(self, size):
+        """
+        Hand the chunker the next window of the mapping, starting at the
+        stream handle position. The window doubles, up to
+        MMAP_MAX_BLOCK_SIZE, while windows yield no complete data chunk
+        (records spanning windows, long runs of noise) and shrinks back
+        towards MMAP_BLOCK_SIZE once they do.
+        @param size The minimum size of the window
+        @retval The length of data retrieved
+        @throws EOFError when the end of the file is reached
+        """
+        position = self._stream_handle.tell()
+        if position >= len(self._mmap):
+            self._close_mapping()
+            self.file_complete = True
+            raise EOFError
+
+        end = min(position + max(size, self._mmap_block_size), len(self._mmap))
+        self._stream_handle.seek(end)
+        self._chunker.add_chunk(self._mmap[position:end],
+                                ntplib.system_to_ntp_time(time.time()))
+
+        if self._chunker.data_chunk_list:
+            self._mmap_block_size = max(self._mmap_block_size / 2, MMAP_BLOCK_SIZE)
+        else:
+            self._mmap_block_size = min(self._mmap_block_size * 2, MMAP_MAX_BLOCK_SIZE)
+        return end - position
+
     def parse_chunks(self):
         """
         Parse out any pending data chunks in the chunker. If
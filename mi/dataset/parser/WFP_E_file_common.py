@@ -10,6 +10,7 @@ __author__ = 'Emily Hahn, Mike Nicoletti, Maria Lutz'
 __license__ = 'Apache 2.0'
 
 import re
+from collections import deque
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -75,7 +76,7 @@ class WfpEFileParser(BufferLoadingParser):
                  *args, **kwargs):
 
         self._timestamp = 0.0
-        self._record_buffer = []  # holds tuples of (record, state)
+        self._record_buffer = deque()  # holds tuples of (record, state)
         self._read_state = {StateKey.POSITION: 0}
         super(WfpEFileParser, self).__init__(config,
                                              stream_handle,
@@ -131,7 +132,7 @@ class WfpEFileParser(BufferLoadingParser):
         if not (StateKey.POSITION in state_obj):
             raise DatasetParserException("Invalid state keys")
         self._chunker.clean_all_chunks()
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
         self._stream_handle.seek(state_obj[StateKey.POSITION])
@@ -13,13 +13,13 @@ initial release
 __author__ = 'Jeff Roy'
 __license__ = 'Apache 2.0'
 
-import copy
 import datetime as dt
 import ntplib
 import re
 import struct
 
 from calendar import timegm
+from collections import deque
 
 from mi.core.log import get_logger
 
@@ -1057,7 +1057,7 @@ class AdcpPd0Parser(BufferLoadingParser):
         if not ((StateKey.POSITION in state_obj)):
             raise DatasetParserException("Invalid state keys")
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
         self._chunker.clean_all_chunks()
@@ -1077,7 +1077,7 @@ class AdcpPd0Parser(BufferLoadingParser):
         it is a valid data piece, build a particle, update the position and
         timestamp. Go until the chunker has no more valid data.
         @retval a list of tuples with sample particles encountered in this
-            parsing, plus the state. An empty list of nothing was parsed.
+            parsing, plus the position after each. An empty list of nothing was parsed.
         """
         result_particles = []
         (nd_timestamp, non_data, non_start, non_end) = self._chunker.get_next_non_data_with_index(clean=False)
@@ -1092,7 +1092,7 @@ class AdcpPd0Parser(BufferLoadingParser):
             if sample:
                 # create particle
                 log.trace("Extracting sample chunk %s with read_state: %s", chunk, self._read_state)
-                result_particles.append((sample, copy.copy(self._read_state)))
+                result_particles.append((sample, self._read_state[StateKey.POSITION]))
 
             (nd_timestamp, non_data, non_start, non_end) = self._chunker.get_next_non_data_with_index(clean=False)
             (timestamp, chunk, start, end) = self._chunker.get_next_data_with_index()
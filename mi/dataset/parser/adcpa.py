@@ -26,6 +26,7 @@ import re
 from calendar import timegm
 from functools import partial
 from struct import unpack
+from collections import deque
 
 from mi.core.log import get_logger
 from mi.core.common import BaseEnum
@@ -973,7 +974,7 @@ class AdcpaParser(BufferLoadingParser):
                                           *args,
                                           **kwargs)
         self._timestamp = 0.0
-        self._record_buffer = []  # holds tuples of (record, state)
+        self._record_buffer = deque()  # holds tuples of (record, state)
         self._read_state = {StateKey.POSITION: 0}
         if state:
             self.set_state(self._state)
@@ -992,7 +993,7 @@ class AdcpaParser(BufferLoadingParser):
         if not StateKey.POSITION in state_obj:
             raise DatasetParserException("Invalid state keys")
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
@@ -17,6 +17,7 @@ from functools import partial
 import copy
 import re
 import string
+from collections import deque
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -261,7 +262,7 @@ class CsppParser(BufferLoadingParser):
         self._data_particle_class = particle_classes_dict.get(DATA_PARTICLE_CLASS_KEY)
 
         # Initialize the record buffer to an empty list
-        self._record_buffer = []
+        self._record_buffer = deque()
 
         # Initialize the read state
         self._read_state = {StateKey.POSITION: 0, StateKey.METADATA_EXTRACTED: False}
@@ -295,7 +296,7 @@ class CsppParser(BufferLoadingParser):
         self._read_state = state_obj
 
         # Clear the record buffer
-        self._record_buffer = []
+        self._record_buffer = deque()
 
         # Need to seek the correct position in the file stream using the read state position.
         self._stream_handle.seek(self._read_state[StateKey.POSITION])
@@ -29,6 +29,7 @@ import copy
 from functools import partial
 import re
 import struct
+from collections import deque
 
 from mi.core.time import string_to_ntp_date_time
 
@@ -802,7 +803,7 @@ class CtdmoRecoveredCtParser(BufferLoadingParser, CtdmoParser):
             raise DatasetParserException('%s missing in state keys' %
                                          CtdmoStateKey.SERIAL_NUMBER)
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
@@ -19,6 +19,7 @@ import ntplib
 from functools import partial
 from dateutil import parser
 from dateutil import tz
+from collections import deque
 
 from mi.core.log import get_logger ; log = get_logger()
 
@@ -125,7 +126,7 @@ class CtdpfParser(BufferLoadingParser):
                                           *args,
                                           **kwargs)
         self._timestamp = 0.0
-        self._record_buffer = [] # holds tuples of (record, state)
+        self._record_buffer = deque() # holds tuples of (record, state)
         self._read_state = {StateKey.POSITION:0, StateKey.TIMESTAMP:0.0}
                 
         if state:
@@ -147,7 +148,7 @@ class CtdpfParser(BufferLoadingParser):
         
         self._timestamp = state_obj[StateKey.TIMESTAMP]
         self._timestamp += 1
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
         
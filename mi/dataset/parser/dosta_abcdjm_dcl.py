@@ -29,6 +29,7 @@ import calendar
 import copy
 from functools import partial
 import re
+from collections import deque
 
 from mi.core.instrument.chunker import \
     StringChunker
@@ -340,7 +341,7 @@ class DostaAbcdjmDclParser(BufferLoadingParser):
             raise DatasetParserException('%s missing in state keys' %
                                          DostaStateKey.POSITION)
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
@@ -21,6 +21,7 @@ import sys
 
 from math import copysign
 from functools import partial
+from collections import deque
 
 from mi.core.log import get_logger
 from mi.core.common import BaseEnum
@@ -28,6 +29,7 @@ from mi.core.exceptions import SampleException, DatasetParserException, Unexpect
 from mi.core.instrument.chunker import StringChunker
 from mi.core.instrument.data_particle import DataParticle, DataParticleKey
 from mi.dataset.dataset_parser import BufferLoadingParser
+from mi.dataset.particle_batch import ParticleBatch
 
 # start the logger
 log = get_logger()
@@ -95,6 +97,9 @@ class GliderParticle(DataParticle):
     # contain actual science data for this instrument. This flag
     # will be set to true if we have found data when parsed.
     common_parameters = GliderParticleKey.list()
+    # all the parameters of the particle, in publishing order, needed to
+    # build particle batches
+    parameters = None
 
     def _parsed_values(self, key_list):
 
@@ -181,6 +186,7 @@ class CtdgvParticleKey(GliderParticleKey):
 class CtdgvTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.CTDGV_M_GLIDER_INSTRUMENT
     science_parameters = CtdgvParticleKey.science_parameter_list()
+    parameters = CtdgvParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -196,6 +202,7 @@ class CtdgvTelemeteredDataParticle(GliderParticle):
 class CtdgvRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.CTDGV_M_GLIDER_INSTRUMENT_RECOVERED
     science_parameters = CtdgvParticleKey.science_parameter_list()
+    parameters = CtdgvParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -235,6 +242,7 @@ class DostaRecoveredParticleKey(GliderParticleKey):
 class DostaTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.DOSTA_ABCDJM_GLIDER_INSTRUMENT
     science_parameters = DostaTelemeteredParticleKey.science_parameter_list()
+    parameters = DostaTelemeteredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -250,6 +258,7 @@ class DostaTelemeteredDataParticle(GliderParticle):
 class DostaRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.DOSTA_ABCDJM_GLIDER_RECOVERED
     science_parameters = DostaRecoveredParticleKey.science_parameter_list()
+    parameters = DostaRecoveredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -277,6 +286,7 @@ class FlordParticleKey(GliderParticleKey):
 class FlordTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.FLORD_M_GLIDER_INSTRUMENT
     science_parameters = FlordParticleKey.science_parameter_list()
+    parameters = FlordParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -292,6 +302,7 @@ class FlordTelemeteredDataParticle(GliderParticle):
 class FlordRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.FLORD_M_GLIDER_INSTRUMENT_RECOVERED
     science_parameters = FlordParticleKey.science_parameter_list()
+    parameters = FlordParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -329,6 +340,7 @@ class FlortRecoveredParticleKey(GliderParticleKey):
 class FlortTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.FLORT_M_GLIDER_INSTRUMENT
     science_parameters = FlortTelemeteredParticleKey.science_parameter_list()
+    parameters = FlortTelemeteredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -344,6 +356,7 @@ class FlortTelemeteredDataParticle(GliderParticle):
 class FlortRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.FLORT_M_GLIDER_RECOVERED
     science_parameters = FlortRecoveredParticleKey.science_parameter_list()
+    parameters = FlortRecoveredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -372,6 +385,7 @@ class ParadRecoveredParticleKey(GliderParticleKey):
 class ParadTelemeteredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.PARAD_M_GLIDER_INSTRUMENT
     science_parameters = ParadTelemeteredParticleKey.science_parameter_list()
+    parameters = ParadTelemeteredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -387,6 +401,7 @@ class ParadTelemeteredDataParticle(GliderParticle):
 class ParadRecoveredDataParticle(GliderParticle):
     _data_particle_type = DataParticleType.PARAD_M_GLIDER_RECOVERED
     science_parameters = ParadRecoveredParticleKey.science_parameter_list()
+    parameters = ParadRecoveredParticleKey.list()
 
     def _build_parsed_values(self):
         """
@@ -853,6 +868,15 @@ class EngineeringScienceRecoveredDataParticle(GliderParticle):
         # need to exclude m times
         return self._parsed_values(EngineeringScienceRecoveredDataParticle.keys_exclude_times)
 
+def _batch_raw_data(value_ids, row):
+    """
+    Rebuild the glider data dictionary a particle is built from out of a
+    particle batch row, without the parameters the file does not have.
+    """
+    return dict((value_id, {'Name': value_id, 'Data': value})
+                for value_id, value in zip(value_ids, row) if value is not None)
+
+
 class GliderParser(BufferLoadingParser):
     """
     GliderParser parses a Slocum Electric Glider data file that has been
@@ -860,7 +884,11 @@ class GliderParser(BufferLoadingParser):
     science data file, and holds the self describing header data in a header
     dictionary and the data in a data dictionary using the column labels as the
     dictionary keys. These dictionaries are used to build the particles.
+
+    In particle batch mode the rows are instead converted straight into
+    ParticleBatch rows, only for the columns of the particle.
     """
+    _particle_batch_support = True
     def __init__(self,
                  config,
                  state,
@@ -877,7 +905,7 @@ class GliderParser(BufferLoadingParser):
 
         self._stream_handle = stream_handle
 
-        self._record_buffer = []  # holds tuples of (record, state)
+        self._record_buffer = deque()  # holds tuples of (record, state)
         self._read_state = {StateKey.POSITION: 0}
 
         # specific to the gliders with ascii data, parse the header rows of the input file
@@ -900,6 +928,12 @@ class GliderParser(BufferLoadingParser):
         if state:
             self.set_state(state)
 
+        self._batch_columns = None
+        if self._particle_batch and self._particle_class.parameters is None:
+            log.warn("%s does not define its parameters, publishing particles",
+                     self._particle_class.__name__)
+            self._particle_batch = False
+
     def _read_header(self):
         """
         Read the header for a glider file.
@@ -1048,7 +1082,7 @@ class GliderParser(BufferLoadingParser):
         if not (StateKey.POSITION in state_obj):
             raise DatasetParserException("Invalid state keys")
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
@@ -1085,7 +1119,6 @@ class GliderParser(BufferLoadingParser):
         data_dict = {}
         num_columns = self._header_dict['sensors_per_cycle']
         data_labels = self._header_dict['labels']
-        num_bytes = self._header_dict['num_of_bytes']
 
         data = data_record.strip().split()
 
@@ -1106,37 +1139,7 @@ class GliderParser(BufferLoadingParser):
         for ii in range(0, num_columns, 1):
             log.trace("GliderParser._read_data(): index: %d label: %s, value: %s", ii, data_labels[ii], data[ii])
 
-            valuePreConversion = data[ii]
-
-            # Check if this data value is a NaN...
-            if valuePreConversion == "NaN":
-                # data is NaN, convert it to a float
-                value = float(valuePreConversion)
-            # Determine what type of data the value is - int or float, or neither
-            else:
-
-                # determine what type of data the value is, based on the number of bytes attribute
-                if (num_bytes[ii] == 1) or (num_bytes[ii] == 2):
-                        stringConverter = int
-                elif (num_bytes[ii] == 4) or (num_bytes[ii] == 8):
-                        stringConverter = float
-                else:
-                        stringConverter = None
-
-                # check to see if this is a latitude/longitude string
-                if ('_lat' in data_labels[ii]) or ('_lon' in data_labels[ii]):
-                    # convert latitude/longitude strings to decimal degrees
-                    value = self._string_to_ddegrees(data[ii])
-
-                    log.trace("GliderParser._read_data(): converted lat/lon %s from %s to %10.5f", data_labels[ii], data[ii], value)
-
-                else:
-                    # convert the string to and int or float, or leave it as a string
-                    if stringConverter is not None:
-                        value = stringConverter(data[ii])
-                    else:
-                        log.trace("GliderParser._read_data(): data value %s was not an int or a float", data[ii])
-                        value = data[ii]
+            value = self._convert_value(ii, data[ii])
 
             data_dict[data_labels[ii]] = {
                 'Name': data_labels[ii],
@@ -1147,6 +1150,47 @@ class GliderParser(BufferLoadingParser):
 
         return data_dict
 
+    def _convert_value(self, ii, valuePreConversion):
+        """
+        Convert a value of the data file to the type of its column.
+        @param ii The column index
+        @param valuePreConversion The value string
+        """
+        data_labels = self._header_dict['labels']
+        num_bytes = self._header_dict['num_of_bytes']
+
+        # Check if this data value is a NaN...
+        if valuePreConversion == "NaN":
+            # data is NaN, convert it to a float
+            return float(valuePreConversion)
+
+        # Determine what type of data the value is - int or float, or neither
+        # based on the number of bytes attribute
+        if (num_bytes[ii] == 1) or (num_bytes[ii] == 2):
+            stringConverter = int
+        elif (num_bytes[ii] == 4) or (num_bytes[ii] == 8):
+            stringConverter = float
+        else:
+            stringConverter = None
+
+        # check to see if this is a latitude/longitude string
+        if ('_lat' in data_labels[ii]) or ('_lon' in data_labels[ii]):
+            # convert latitude/longitude strings to decimal degrees
+            value = self._string_to_ddegrees(valuePreConversion)
+
+            log.trace("GliderParser._convert_value(): converted lat/lon %s from %s to %10.5f",
+                      data_labels[ii], valuePreConversion, value)
+
+        else:
+            # convert the string to and int or float, or leave it as a string
+            if stringConverter is not None:
+                value = stringConverter(valuePreConversion)
+            else:
+                log.trace("GliderParser._convert_value(): data value %s was not an int or a float", valuePreConversion)
+                value = valuePreConversion
+
+        return value
+
     def get_block(self, size=1024):
         """
         Need to overload the base class behavior so we can get the last
@@ -1155,7 +1199,10 @@ class GliderParser(BufferLoadingParser):
         length = super(GliderParser, self).get_block(size)
         log.debug("Buffer read bytes: %d", length)
 
-        if length != size:
+        # mapped input comes in windows larger than size, only the last one
+        # is the end of the file
+        if length != size and (self._mmap is None or
+                               self._stream_handle.tell() >= len(self._mmap)):
             self._chunker.add_chunk("\n", ntplib.system_to_ntp_time(time.time()))
 
         return length
@@ -1164,9 +1211,12 @@ class GliderParser(BufferLoadingParser):
         """
         Create particles out of chunks and raise an event
         @retval a list of tuples with sample particles encountered in this
-            parsing, plus the state. An empty list is returned if nothing was
-            parsed.
+            parsing, plus the position after each. An empty list is returned
+            if nothing was parsed.
         """
+        if self._particle_batch:
+            return self._parse_chunks_batch()
+
         # set defaults
         result_particles = []
 
@@ -1225,7 +1275,7 @@ class GliderParser(BufferLoadingParser):
                     log.debug("===> ## ## ## GliderParser.parse_chunks(): PARTICLE NAMED %s CREATED ", particle._data_particle_type)
                     log.debug("===> ## ## ## Particle Params = %s", particle.generate_dict())
 
-                    result_particles.append((particle, copy.copy(self._read_state)))
+                    result_particles.append((particle, self._read_state[StateKey.POSITION]))
                 else:
                     log.debug("No science data found in particle. %s", data_dict)
 
@@ -1239,6 +1289,66 @@ class GliderParser(BufferLoadingParser):
         # publish the results
         return result_particles
 
+    def _get_batch_columns(self):
+        """
+        Work out, once per file, where the particle parameters are in a row.
+        The parameters the file has come first, as they do in the particles.
+        @retval tuple of (list of parameters, list of (parameter column index
+            or None), timestamp column index or None, list of science
+            parameter column indexes)
+        """
+        if self._batch_columns is None:
+            labels = self._header_dict['labels']
+            parameters = [key for key in self._particle_class.parameters if key in labels] + \
+                         [key for key in self._particle_class.parameters if key not in labels]
+            indexes = [labels.index(key) if key in labels else None for key in parameters]
+            time_index = labels.index('m_present_time') if 'm_present_time' in labels else None
+            science = [labels.index(key) for key in self._particle_class.science_parameters
+                       if key in labels]
+            self._batch_columns = (parameters, indexes, time_index, science)
+        return self._batch_columns
+
+    def _parse_chunks_batch(self):
+        """
+        Particle batch version of parse_chunks, converting only the particle
+        columns of each row and appending them to the open ParticleBatch.
+        @retval an empty list, the records are in the open batch.
+        """
+        (parameters, indexes, time_index, science) = self._get_batch_columns()
+        num_columns = self._header_dict['sensors_per_cycle']
+        if self._open_batch is None:
+            self._open_batch = ParticleBatch(self._particle_class, parameters,
+                                             StateKey.POSITION, _batch_raw_data)
+        batch = self._open_batch
+
+        (nd_timestamp, non_data, non_start, non_end) = self._chunker.get_next_non_data_with_index(clean=False)
+        (chunker_timestamp, data_record, start, end) = self._chunker.get_next_data_with_index()
+        self.handle_non_data(non_data, non_start, non_end, start)
+
+        while data_record is not None:
+            self._read_state[StateKey.POSITION] += end
+
+            data = data_record.split()
+            if not data:
+                pass
+            elif len(data) != num_columns:
+                self._exception_callback(SampleException(
+                    'Glider data file does not have the same number of columns as described '
+                    'in the header.\nDescribed: %d, Actual: %d' % (num_columns, len(data))))
+            elif time_index is None:
+                self._exception_callback(SampleException(
+                    "GliderParser.parse_chunks(): unable to find timestamp in data"))
+            elif any(data[ii] != "NaN" for ii in science):
+                values = [None if ii is None else self._convert_value(ii, data[ii]) for ii in indexes]
+                timestamp = ntplib.system_to_ntp_time(self._convert_value(time_index, data[time_index]))
+                batch.append(values, timestamp, self._read_state[StateKey.POSITION])
+
+            (nd_timestamp, non_data, non_start, non_end) = self._chunker.get_next_non_data_with_index(clean=False)
+            (chunker_timestamp, data_record, start, end) = self._chunker.get_next_data_with_index()
+            self.handle_non_data(non_data, non_start, non_end, start)
+
+        return []
+
     def handle_non_data(self, non_data, non_start, non_end, start):
         """
         Handle any non-data that is found in the file
@@ -1318,6 +1428,7 @@ class GliderParser(BufferLoadingParser):
 
 
 class GliderEngineeringParser(GliderParser):
+    _particle_batch_support = False
 
     def __init__(self,
                  config,
@@ -1362,7 +1473,7 @@ class GliderEngineeringParser(GliderParser):
             log.debug('state_obj %s', state_obj)
             raise DatasetParserException("Invalid state keys")
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
@@ -19,6 +19,7 @@ import ntplib
 import time
 from dateutil import parser
 from functools import partial
+from collections import deque
 
 from mi.core.log import get_logger ; log = get_logger()
 from mi.core.common import BaseEnum
@@ -158,7 +159,7 @@ class Issmcnsm_dostadParser(BufferLoadingParser):
                                                     *args,
                                                     **kwargs)
         self._timestamp = 0.0
-        self._record_buffer = [] # holds tuples of (record, state)
+        self._record_buffer = deque() # holds tuples of (record, state)
         self._read_state = {StateKey.POSITION:0, StateKey.TIMESTAMP:0.0}
 
         if state:
@@ -176,7 +177,7 @@ class Issmcnsm_dostadParser(BufferLoadingParser):
         if not ((StateKey.POSITION in state_obj) and (StateKey.TIMESTAMP in state_obj)):
             raise DatasetParserException("Invalid state keys")
         self._timestamp = state_obj[StateKey.TIMESTAMP]
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
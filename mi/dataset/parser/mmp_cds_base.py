@@ -42,9 +42,17 @@ UNABLE_TO_ITERATE_THROUGH_UNPACKED_MSGPACK_MSG = "Unable to iterate through unpa
 # A message to be reported when the format of the unpacked msgpack data does nto match expected
 UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG = "Unexpected unpacked msgpack format"
 
+# The number of bytes read from the file at a time in streaming mode
+STREAMING_BLOCK_SIZE = 65536
+
+
+class ParserConfigKey(BaseEnum):
+    STREAMING = 'streaming'  # True to unpack the file incrementally, see MmpCdsParser
+
 
 class StateKey(BaseEnum):
     PARTICLES_RETURNED = 'particles_returned'  # holds the number of particles returned
+    POSITION = 'position'  # streaming mode only, byte offset following the last particle returned
 
 
 class MmpCdsParserDataParticleKey(BaseEnum):
@@ -111,6 +119,12 @@ class MmpCdsParserDataParticle(DataParticle):
 class MmpCdsParser(BufferLoadingParser):
     """
     Class for parsing data as received from a McLane Moored Profiler connected to a cabled docking station.
+
+    By default the whole file is read and unpacked at once, and the state only records the number of particles
+    returned.  With ParserConfigKey.STREAMING set in the config the file is instead fed to a msgpack Unpacker
+    STREAMING_BLOCK_SIZE bytes at a time, particles are only built for the records needed to satisfy
+    get_records, and the state also records the byte offset after the last particle returned so a restarted
+    parser seeks straight to it.  Memory use is then independent of the file size.
     """
 
     def __init__(self,
@@ -132,6 +146,15 @@ class MmpCdsParser(BufferLoadingParser):
         # Initialize the record buffer to an empty list
         self._record_buffer = []
 
+        self._streaming = bool(config.get(ParserConfigKey.STREAMING, False))
+
+        # streaming mode: the unpacker, the file offset it was started at, the number of records unpacked
+        # and the number of records still to be skipped to honor a state without a position
+        self._unpacker = None
+        self._unpacker_start = 0
+        self._records_unpacked = 0
+        self._records_to_skip = 0
+
         if state is None:
             state = {StateKey.PARTICLES_RETURNED: 0}
 
@@ -171,8 +194,111 @@ class MmpCdsParser(BufferLoadingParser):
         # Set the state and read state to the provide state
         self._state = state_obj
 
-        # Always seek to the beginning of the buffer to read all records
-        self._stream_handle.seek(0)
+        if self._streaming:
+            self._set_streaming_state(state_obj)
+        else:
+            # Always seek to the beginning of the buffer to read all records
+            self._stream_handle.seek(0)
+
+    def _set_streaming_state(self, state_obj):
+        """
+        Start a new unpacker at the position in the state.  A state without a position (as produced when not
+        streaming) starts at the beginning of the file and skips the particles already returned.
+        @param state_obj the state to start from
+        """
+        position = state_obj.get(StateKey.POSITION)
+        particles_returned = state_obj[StateKey.PARTICLES_RETURNED]
+
+        if position is None:
+            position = 0
+            self._records_unpacked = 0
+            self._records_to_skip = particles_returned
+        else:
+            self._records_unpacked = particles_returned
+            self._records_to_skip = 0
+
+        self._unpacker = msgpack.Unpacker()
+        self._unpacker_start = position
+        self._stream_handle.seek(position)
+        self.file_complete = False
+
+    def _load_particle_buffer(self):
+        """
+        In streaming mode read and unpack a single block, so get_records only reads as far into the file as
+        it needs to.
+        @throws EOFError when the end of the file is reached.
+        """
+        if not self._streaming:
+            super(MmpCdsParser, self)._load_particle_buffer()
+            return
+
+        data = self._stream_handle.read(STREAMING_BLOCK_SIZE)
+        if not data:
+            self.file_complete = True
+            raise EOFError
+
+        self._unpacker.feed(data)
+        self._record_buffer.extend(self._parse_unpacked())
+        gevent.sleep(0)
+
+    def _parse_unpacked(self):
+        """
+        Build the particles for the records completed by the data fed to the unpacker so far.
+        @return a list of (particle, state) tuples
+        """
+        result_particles = []
+
+        try:
+            for unpacked_data in self._unpacker:
+                position = self._unpacker_start + self._unpacker.tell()
+                self._records_unpacked += 1
+
+                if self._records_to_skip > 0:
+                    self._records_to_skip -= 1
+                    continue
+
+                sample = self._build_sample(unpacked_data)
+                if sample:
+                    result_particles.append((sample, {StateKey.PARTICLES_RETURNED: self._records_unpacked,
+                                                      StateKey.POSITION: position}))
+
+        except (TypeError, ValueError):
+            log.warn(UNABLE_TO_ITERATE_THROUGH_UNPACKED_MSGPACK_MSG)
+            raise SampleException(UNABLE_TO_ITERATE_THROUGH_UNPACKED_MSGPACK_MSG)
+
+        return result_particles
+
+    def _process_end_of_file(self):
+        """
+        In streaming mode report bytes left in the unpacker that do not form a complete record.
+        """
+        if not self._streaming:
+            super(MmpCdsParser, self)._process_end_of_file()
+            return
+
+        position = self._unpacker_start + self._unpacker.tell()
+        if self._stream_handle.tell() > position:
+            log.warn("Have %d extra unexplained bytes at the end of the file",
+                     self._stream_handle.tell() - position)
+
+    def _build_sample(self, unpacked_data):
+        """
+        Build the particle for one unpacked record.
+        @param unpacked_data the unpacked msgpack record
+        @return the particle, or None if one could not be extracted
+        @throws SampleException if the record does not have the expected format
+        """
+        # The expectation is that an unpacked list item associated with a McLane Moored Profiler cabled
+        # docking station data chunk consists of a list of three items
+        if isinstance(unpacked_data, tuple) or isinstance(unpacked_data, list) and \
+                len(unpacked_data) == NUM_MMP_CDS_UNPACKED_ITEMS:
+
+            # Extract the sample an provide the particle class which could be different for each
+            # derived MmpCdsParser
+            return self._extract_sample(self._particle_class, None, unpacked_data, None)
+
+        log.debug(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG)
+        raise SampleException(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG)
 
     def _yank_particles(self, num_records):
         """
@@ -183,6 +309,10 @@ class MmpCdsParser(BufferLoadingParser):
         cannot be collected (perhaps due to an EOF), the list will have the
         elements it was able to collect.
         """
+        if self._streaming:
+            # the buffer holds (particle, state) tuples for the particles not yet returned
+            return super(MmpCdsParser, self)._yank_particles(num_records)
+
         particles_returned = 0
 
         if self._state is not None and StateKey.PARTICLES_RETURNED in self._state and \
@@ -299,22 +429,11 @@ class MmpCdsParser(BufferLoadingParser):
                 # Let's iterate through each unpacked list item
                 for unpacked_data in unpacker:
 
-                    # The expectation is that an unpacked list item associated with a McLane Moored Profiler cabled
-                    # docking station data chunk consists of a list of three items
-                    if isinstance(unpacked_data, tuple) or isinstance(unpacked_data, list) and \
-                            len(unpacked_data) == NUM_MMP_CDS_UNPACKED_ITEMS:
-
-                        # Extract the sample an provide the particle class which could be different for each
-                        # derived MmpCdsParser
-                        sample = self._extract_sample(self._particle_class, None, unpacked_data, None)
-
-                        # If we extracted a sample, add it to the list of samples to retrun
-                        if sample:
-                            samples.append(sample)
+                    sample = self._build_sample(unpacked_data)
 
-                    else:
-                        log.debug(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG)
-                        raise SampleException(UNEXPECTED_UNPACKED_MSGPACK_FORMAT_MSG)
+                    # If we extracted a sample, add it to the list of samples to retrun
+                    if sample:
+                        samples.append(sample)
 
                     # Let's call gevent.sleep with 0 to allow for the CPU to be used by another gevent thread just
                     # in case we are dealing with a large list of unpacked msgpack data
@@ -13,12 +13,14 @@ initial release
 __author__ = 'Emily Hahn'
 __license__ = 'Apache 2.0'
 
+import re
 import copy
 import ntplib
 import struct
 import binascii
 from datetime import datetime
 import time
+from collections import deque
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -39,6 +41,12 @@ ACCEL_ID = b'\xcb'
 RATE_ID = b'\xcf'
 ACCEL_BYTES = 43
 RATE_BYTES = 31
+RECORD_BYTES = {ACCEL_ID: ACCEL_BYTES, RATE_ID: RATE_BYTES}
+
+# either record ID, where a record may start
+ID_REGEX = re.compile(b'[' + ACCEL_ID + RATE_ID + b']')
+# the checksum ending a record
+CHECKSUM_STRUCT = struct.Struct('>H')
 
 MAX_TIMER = 4294967296
 TIMER_TO_SECONDS = 62500.0
@@ -197,6 +205,10 @@ class MopakODclParser(BufferLoadingParser):
 
         self.timer_diff = None
 
+        # (data length, resume index, first bytes) of a sieve call finding
+        # no record, see sieve_function
+        self._sieve_resume = None
+
         self._read_state = {StateKey.POSITION: 0, StateKey.TIMER_ROLLOVER: 0, StateKey.TIMER_START: None}
         # convert the date / time string from the file name to a starting time in seconds UTC
 
@@ -230,86 +242,81 @@ class MopakODclParser(BufferLoadingParser):
         Sort through the raw data to identify new blocks of data that need processing.
         This is needed instead of a regex because blocks are identified by position
         in this binary file.
+
+        The data is searched for the next ID byte rather than stepped through
+        byte by byte.  A candidate record whose checksum does not match is
+        checked for the nearest ID byte inside it, which is tried next.  When
+        there is none, the candidate is returned as a block anyway so it is
+        known to be processed.
+
+        The chunker hands the sieve the data after the last block found, so
+        until a record turns up it sees the same, growing, data again.  A
+        call finding nothing remembers where it stopped and the next one
+        resumes there instead of scanning the noise from the start again.
         """
+        raw_data_len = len(raw_data)
         data_index = 0
+        resume = self._sieve_resume
+        self._sieve_resume = None
+        if resume and raw_data_len >= resume[0] and raw_data.startswith(resume[2]):
+            data_index = resume[1]
+
         return_list = []
-        raw_data_len = len(raw_data)
+        while True:
+            match = ID_REGEX.search(raw_data, data_index)
+            if match is None:
+                data_index = raw_data_len
+                break
+            data_index = match.start()
+            # if the remaining bytes are less than the data rate bytes we're done
+            if raw_data_len - data_index < RATE_BYTES:
+                break
 
-        while data_index < raw_data_len:
-            # check if this is a status or data sample message
-            if raw_data[data_index] == ACCEL_ID:
-                if (data_index + ACCEL_BYTES) <= raw_data_len:
-                    # start of accel record
-                    if self.compare_checksum(raw_data[data_index:data_index+ACCEL_BYTES]):
-                        return_list.append((data_index, data_index + ACCEL_BYTES))
-                        data_index += ACCEL_BYTES
-                    else:
-                        log.debug('checking accel for ID in 0x%s since checksums didnt match',
-                                  binascii.hexlify(raw_data[data_index:data_index+ACCEL_BYTES]))
-                        another_accel = raw_data[data_index+1:data_index+ACCEL_BYTES].find(ACCEL_ID)
-                        another_rate = raw_data[data_index+1:data_index+ACCEL_BYTES].find(RATE_ID)
-                        if another_accel == -1 and another_rate == -1:
-                            # no other possible starts in here, add to chunk so we know this is processed
-                            return_list.append((data_index, data_index + ACCEL_BYTES))
-                            data_index += ACCEL_BYTES
-                        elif another_accel != -1:
-                            data_index += (another_accel + 1)
-                        elif another_rate != -1:
-                            data_index += (another_rate + 1)
-                else:
-                    # not enough bytes for accel yet, jump to end
-                    data_index = raw_data_len
-            elif raw_data[data_index] == RATE_ID:
-                if (data_index + RATE_BYTES) <= raw_data_len:
-                    # start of rate record
-                    if self.compare_checksum(raw_data[data_index:data_index+RATE_BYTES]):
-                        return_list.append((data_index, data_index + RATE_BYTES))
-                        data_index += RATE_BYTES
-                    else:
-                        log.debug('checking rate for ID in 0x%s since checksums didnt match',
-                                  binascii.hexlify(raw_data[data_index:data_index+RATE_BYTES]))
-                        another_accel = raw_data[data_index+1:data_index+RATE_BYTES].find(ACCEL_ID)
-                        another_rate = raw_data[data_index+1:data_index+RATE_BYTES].find(RATE_ID)
-                        if another_accel == -1 and another_rate == -1:
-                            # no other possible starts in here, add to chunk so we know this is processed
-                            return_list.append((data_index, data_index + RATE_BYTES))
-                            data_index += RATE_BYTES
-                        elif another_accel != -1:
-                            data_index += (another_accel + 1)
-                        elif another_rate != -1:
-                            data_index += (another_rate + 1)
-                else:
-                    # not enough bytes for rate yet, jump to end
-                    data_index = raw_data_len
+            record_end = data_index + RECORD_BYTES[match.group()]
+            if record_end > raw_data_len:
+                # not enough bytes for this record yet
+                break
+
+            if self._checksum_matches(raw_data, data_index, record_end):
+                return_list.append((data_index, record_end))
+                data_index = record_end
+                continue
+
+            log.debug('checking record at %d for ID since checksums didnt match', data_index)
+            another = ID_REGEX.search(raw_data, data_index + 1, record_end)
+            if another is None:
+                # no other possible starts in here, add to chunk so we know this is processed
+                return_list.append((data_index, record_end))
+                data_index = record_end
             else:
-                data_index += 1
+                data_index = another.start()
 
-            remain_bytes = raw_data_len - data_index
-            # if the remaining bytes are less than the data rate bytes we're done
-            if remain_bytes < RATE_BYTES:
-                break
+        if not return_list:
+            self._sieve_resume = (raw_data_len, data_index, raw_data[:RATE_BYTES])
         return return_list
 
+    @staticmethod
+    def _checksum_matches(raw_data, start, end):
+        """
+        @param raw_data data holding a candidate record
+        @param start index of the record ID byte
+        @param end index after the record checksum
+        @retval True if the checksum ending the record matches
+        """
+        return CHECKSUM_STRUCT.unpack_from(raw_data, end - 2)[0] == \
+            sum(bytearray(raw_data[start:end - 2])) & 0xFFFF
+
     def compare_checksum(self, raw_bytes):
-        rcv_chksum = struct.unpack('>H', raw_bytes[-2:])
+        rcv_chksum = CHECKSUM_STRUCT.unpack_from(raw_bytes, len(raw_bytes) - 2)[0]
         calc_chksum = self.calc_checksum(raw_bytes[:-2])
-        if rcv_chksum[0] == calc_chksum:
+        if rcv_chksum == calc_chksum:
             return True
-        log.debug('checksum received %d does not match calculated %d', rcv_chksum[0], calc_chksum)
+        log.debug('checksum received %d does not match calculated %d', rcv_chksum, calc_chksum)
         return False
 
     def calc_checksum(self, raw_bytes):
-        n_bytes = len(raw_bytes)
-        # unpack raw bytes into unsigned chars
-        unpack_str = '>'
-        for i in range(0, n_bytes):
-            unpack_str = unpack_str + 'B'
-        fields = struct.unpack(unpack_str, raw_bytes)
-        sum_fields = sum(fields)
-        # since we are summing as unsigned short, limit range to 0 to 65535
-        while sum_fields > 65535:
-            sum_fields -= 65536
-        return sum_fields
+        # sum as unsigned short, limiting the range to 0 to 65535
+        return sum(bytearray(raw_bytes)) & 0xFFFF
 
     def set_state(self, state_obj):
         """
@@ -323,8 +330,9 @@ class MopakODclParser(BufferLoadingParser):
            not (StateKey.TIMER_ROLLOVER in state_obj) or \
            not (StateKey.TIMER_START in state_obj):
             raise DatasetParserException("Invalid state keys: %s" % state_obj)
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._chunker.clean_all_chunks()
+        self._sieve_resume = None
         self._state = state_obj
         self._read_state = state_obj
         self._stream_handle.seek(state_obj[StateKey.POSITION])
@@ -361,7 +369,7 @@ class MopakODclParser(BufferLoadingParser):
                     fields = struct.unpack('>I', chunk[37:41])
                 else:
                     log.info("Ignoring accel record whose checksum doesn't match")
-            elif chunk[0] == RATE_ID and self.compare_checksum(chunk[:RATE_BYTES]):
+            elif chunk[0] == RATE_ID:
                 if self.compare_checksum(chunk[:RATE_BYTES]):
                     # particle-ize the data block received, return the record
                     fields = struct.unpack('>I', chunk[25:29])
@@ -18,6 +18,7 @@ import re
 import ntplib
 
 from functools import partial
+from collections import deque
 from mi.core.log import get_logger ; log = get_logger()
 from mi.core.common import BaseEnum
 from mi.core.instrument.chunker import StringChunker
@@ -138,7 +139,7 @@ class NutnrbParser(BufferLoadingParser):
                                           **kwargs)
 
         self._timestamp = 0.0
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._read_state = {StateKey.POSITION:0}
 
         if state:
@@ -154,7 +155,7 @@ class NutnrbParser(BufferLoadingParser):
             raise DatasetParserException("Invalid state structure")
         if not (StateKey.POSITION in state_obj):
             raise DatasetParserException("Invalid state keys")
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
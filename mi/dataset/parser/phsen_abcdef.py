@@ -18,6 +18,7 @@ import re
 import time
 from functools import partial
 from dateutil import parser
+from collections import deque
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -368,7 +369,7 @@ class PhsenRecoveredParser(BufferLoadingParser):
         if not ((StateKey.START_OF_DATA in state_obj)):
             raise DatasetParserException("Missing state key %s" % StateKey.START_OF_DATA)
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
         self._chunker.clean_all_chunks()
@@ -19,6 +19,7 @@ import ntplib
 import time
 from dateutil import parser
 from functools import partial
+from collections import deque
 
 from mi.core.log import get_logger ; log = get_logger()
 from mi.core.common import BaseEnum
@@ -140,7 +141,7 @@ class RteODclParser(BufferLoadingParser):
         if not ((StateKey.POSITION in state_obj)):
             raise DatasetParserException("Invalid state keys")
         
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
         self._chunker.clean_all_chunks()
@@ -18,6 +18,7 @@ import struct
 import gevent
 import time
 import ntplib
+from collections import deque
 
 from mi.core.common import BaseEnum
 from mi.core.log import get_logger; log = get_logger()
@@ -113,7 +114,7 @@ class SioParser(BufferLoadingParser):
         self.input_file = stream_handle
         self._mid_sample_packets = 0
         self._position = [0,0] # store both the start and end point for this read of data within the file
-        self._record_buffer = []  # holds list of records
+        self._record_buffer = deque()  # holds records
         self.recovered = recovered
         self._samples_to_throw_out = None
 
@@ -443,7 +444,7 @@ class SioParser(BufferLoadingParser):
         else:
             self._position = [state_obj[StateKey.UNPROCESSED_DATA][0][START_IDX],
                               state_obj[StateKey.UNPROCESSED_DATA][0][START_IDX]]
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
@@ -532,19 +533,14 @@ class SioParser(BufferLoadingParser):
         cannot be collected (perhaps due to an EOF), the list will have the
         elements it was able to collect.
         """
-        return_list = []
         if self._samples_to_throw_out is not None:
-            records_to_return = self._record_buffer[self._samples_to_throw_out:(num_to_fetch+self._samples_to_throw_out)]
-            self._record_buffer = self._record_buffer[(num_to_fetch+self._samples_to_throw_out):]
+            self._pop_records(self._samples_to_throw_out)
 
             # reset samples to throw out
             self._samples_to_throw_out = None
-        else:
-            records_to_return = self._record_buffer[:num_to_fetch]
-            self._record_buffer = self._record_buffer[num_to_fetch:]
-        if len(records_to_return) > 0:
-            for item in records_to_return:
-                return_list.append(item)
+
+        return_list = self._pop_records(num_to_fetch)
+        if len(return_list) > 0:
             self._publish_sample(return_list)
 
             # need to keep track of which records have actually been returned
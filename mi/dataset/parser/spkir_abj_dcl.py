@@ -36,6 +36,7 @@ import copy
 from functools import partial
 import re
 import struct
+from collections import deque
 
 from mi.core.instrument.chunker import \
     StringChunker
@@ -401,7 +402,7 @@ class SpkirAbjDclParser(BufferLoadingParser):
             raise DatasetParserException('%s missing in state keys' %
                                          SpkirStateKey.POSITION)
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
@@ -382,6 +382,36 @@ class AdcpsJlnParserUnitTestCase(ParserUnitTestCase):
 
         fid.close()
 
+    def test_mmap_input(self):
+        """
+        Memory mapped input gives the same particles and states as stream
+        reads, including when starting part way through the file.
+        """
+        fid = open(os.path.join(RESOURCE_PATH, 'ADCP_CCE1T_20.000'), 'rb')
+
+        self.parser = AdcpPd0Parser(self.config, {StateKey.POSITION: 0}, fid,
+                                    self.state_callback, self.pub_callback, self.exception_callback)
+        expected = self.parser.get_records(20)
+        expected_state = self.state_callback_value
+
+        fid.seek(0)
+        mmap_config = dict(self.config)
+        mmap_config[DataSetDriverConfigKeys.MMAP_INPUT] = True
+        self.parser = AdcpPd0Parser(mmap_config, {StateKey.POSITION: 0}, fid,
+                                    self.state_callback, self.pub_callback, self.exception_callback)
+        particles = self.parser.get_records(20)
+        self.assertEqual(particles, expected)
+        self.assertEqual(self.state_callback_value, expected_state)
+        self.assertTrue(self.fid_ingested_value)
+
+        new_state = {StateKey.POSITION: 6000}
+        self.parser = AdcpPd0Parser(mmap_config, new_state, fid,
+                                    self.state_callback, self.pub_callback, self.exception_callback)
+        particles = self.parser.get_records(5)
+        self.assert_result(self.test04, particles[0])
+
+        fid.close()
+
     def test_bad_data(self):
         """
         Ensure that bad data is skipped when it exists.
@@ -337,6 +337,31 @@ class FlortdParserUnitTestCase(ParserUnitTestCase):
         # make sure there were no exceptions
         self.assertEqual(self.exception_callback_value, None)
 
+    def test_records_iter_recov(self):
+        """
+        test that streaming the particles a few at a time gives the same
+        particles and final state as getting them at once
+        """
+        self.stream_handle = open(os.path.join(RESOURCE_PATH, 'FLO15908.DAT'))
+        self.build_recov_parser()
+
+        result = list(self.parser.get_records_iter(batch_size=7))
+        self.stream_handle.close()
+        self.assertEqual(len(result), 96)
+        self.assertEqual(result[0], self.particle_a_recov)
+        self.assertEqual(result[-1], self.particle_long_last)
+        self.assertEqual(self.publish_callback_value[-1], self.particle_long_last)
+        self.assert_state([],[], recov_flag=True)
+
+        self.stream_handle = open(os.path.join(RESOURCE_PATH, 'FLO15908.DAT'))
+        self.build_recov_parser()
+        result = list(self.parser.get_records_iter(3, batch_size=2))
+        self.stream_handle.close()
+        self.assertEqual(result, [self.particle_a_recov, self.particle_b_recov, self.particle_c_recov])
+
+        # make sure there were no exceptions
+        self.assertEqual(self.exception_callback_value, None)
+
     def test_mid_state_start(self):
         """
         test starting a parser with a state in the middle of processing
@@ -7,6 +7,13 @@
 @brief Test code for a Glider data parser.
 """
 
+import gc
+import os
+import time
+import shutil
+import types
+import logging
+import tempfile
 from StringIO import StringIO
 
 import numpy as np
@@ -19,7 +26,8 @@ from nose.plugins.attrib import attr
 
 from mi.core.exceptions import SampleException
 from mi.dataset.test.test_parser import ParserUnitTestCase
-from mi.dataset.dataset_driver import DataSetDriverConfigKeys
+from mi.dataset.dataset_driver import DataSetDriverConfigKeys, DataSourceConfigKey, DriverStateKey
+from mi.dataset.driver.moas.gl.ctdgv.driver import CTDGVDataSetDriver, DataTypeKey
 from mi.dataset.parser.glider import GliderParser, GliderEngineeringParser, StateKey
 from mi.dataset.parser.glider import CtdgvRecoveredDataParticle, CtdgvTelemeteredDataParticle, CtdgvParticleKey
 from mi.dataset.parser.glider import DostaTelemeteredDataParticle, DostaTelemeteredParticleKey
@@ -40,6 +48,7 @@ from mi.dataset.parser.glider import EngineeringRecoveredParticleKey
 from mi.dataset.parser.glider import EngineeringRecoveredDataParticle
 from mi.dataset.parser.glider import EngineeringScienceRecoveredParticleKey
 from mi.dataset.parser.glider import EngineeringScienceRecoveredDataParticle
+from mi.dataset.particle_batch import ParticleBatch
 
 
 
@@ -815,4 +824,368 @@ class ENGRecoveredGliderTest(GliderParserUnitTestCase):
         self.reset_eng_parser({StateKey.POSITION: 10795, StateKey.SENT_METADATA: True})
         self.assert_generate_particle(EngineeringRecoveredDataParticle, record_2, 10795)
         self.assert_generate_particle(EngineeringScienceRecoveredDataParticle, record_sci_2, 12479)
-        self.assert_no_more_data()
\ No newline at end of file
+        self.assert_no_more_data()
+
+
+def reachable_objects(root):
+    """
+    Count the objects reachable from root, other than classes, modules and
+    functions.
+    """
+    seen = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, types.ClassType, types.ModuleType,
+                                               types.FunctionType, types.MethodType)):
+            continue
+        seen.add(id(obj))
+        stack.extend(gc.get_referents(obj))
+    return len(seen)
+
+
+def ctdgv_rows(count):
+    """
+    Synthetic CTDGV rows following HEADER, every tenth row without science data.
+    """
+    rows = []
+    for index in range(count):
+        timestamp = 1378349241.82962 + index
+        if index % 10 == 9:
+            science = 'NaN NaN NaN'
+        else:
+            science = '4.0%04d 0.%03d 15.%04d' % (index % 10000, index % 1000, index % 10000)
+        rows.append('NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN %d %f '
+                    'NaN NaN NaN NaN NaN NaN %d %f NaN NaN %s' %
+                    (121147 + index, timestamp, 121147 + index, timestamp, science))
+    return '\n' + '\n'.join(rows) + '\n'
+
+
+def int_pressure_header():
+    """
+    HEADER with sci_water_pressure stored in 2 bytes, so read as an int.
+    """
+    lines = HEADER.split('\n')
+    num_bytes = lines[-1].split()
+    num_bytes[lines[-3].split().index('sci_water_pressure')] = '2'
+    lines[-1] = ' '.join(num_bytes) + ' '
+    return '\n'.join(lines)
+
+
+def int_pressure_rows(count):
+    """
+    Rows following int_pressure_header, every third one without pressure.
+    """
+    rows = []
+    for index in range(count):
+        timestamp = 1378349241.82962 + index
+        pressure = 'NaN' if index % 3 == 2 else '%d' % index
+        rows.append('NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN NaN %d %f '
+                    'NaN NaN NaN NaN NaN NaN %d %f NaN NaN 4.%04d %s 15.%04d' %
+                    (121147 + index, timestamp, 121147 + index, timestamp, index, pressure, index))
+    return '\n' + '\n'.join(rows) + '\n'
+
+
+@attr('UNIT', group='mi')
+class CTDGVBatchGliderTest(GliderParserUnitTestCase):
+    """
+    Test cases for ctdgv glider data published as particle batches
+    """
+    config = {
+        DataSetDriverConfigKeys.PARTICLE_MODULE: 'mi.dataset.parser.glider',
+        DataSetDriverConfigKeys.PARTICLE_CLASS: 'CtdgvTelemeteredDataParticle'
+    }
+    batch_config = dict(config)
+    batch_config[DataSetDriverConfigKeys.PARTICLE_BATCH] = True
+
+    def values(self, particle_dict):
+        return dict((value['value_id'], value['value']) for value in particle_dict['values'])
+
+    def test_batch(self):
+        """
+        Batches hold the same records, and resume from the same states, as particles.
+        """
+        data = ctdgv_rows(200)
+        self.set_data(HEADER, data)
+        self.reset_parser()
+        particles = []
+        particle_states = []
+        while True:
+            records = self.parser.get_records(7)
+            if not records:
+                break
+            particles.extend(records)
+            particle_states.append(self.state_callback_values[-1])
+
+        self.config = self.batch_config
+        self.set_data(HEADER, data)
+        self.reset_parser()
+        batches = []
+        batch_states = []
+        while True:
+            records = self.parser.get_records(7)
+            if not records:
+                break
+            self.assertEqual(len(records), 1)
+            self.assertIsInstance(records[0], ParticleBatch)
+            self.assertEqual(self.publish_callback_values[-1], records)
+            batches.extend(records)
+            batch_states.append(self.state_callback_values[-1])
+
+        self.assertEqual(batch_states, particle_states)
+        self.assertTrue(self.file_ingested)
+
+        dicts = [particle_dict for batch in batches for particle_dict in batch.generate_dicts()]
+        self.assertEqual(len(dicts), 180)
+        self.assertEqual(len(particles), 180)
+        for particle, particle_dict in zip(particles, dicts):
+            expected = particle.generate_dict()
+            self.assertEqual(self.values(particle_dict), self.values(expected))
+            self.assertEqual(particle_dict['internal_timestamp'], expected['internal_timestamp'])
+            self.assertEqual(particle_dict['stream_name'], expected['stream_name'])
+
+        # and can be turned back into particles
+        self.assertEqual(self.values(batches[0].particles()[0].generate_dict()),
+                         self.values(particles[0].generate_dict()))
+
+        # resume in the middle of the file
+        self.set_data(HEADER, data)
+        self.reset_parser(particle_states[5])
+        batch = self.parser.get_records(1)[0]
+        self.assertEqual(self.values(next(batch.generate_dicts())),
+                         self.values(particles[42].generate_dict()))
+
+    def typed_values(self, particle_dict):
+        return [(value['value_id'], value['value'], type(value['value']))
+                for value in particle_dict['values']]
+
+    def test_batch_exact(self):
+        """
+        Batches publish the same values, of the same types and in the same
+        order, as particles, for an int column with missing values and a
+        parameter the file does not have.
+        """
+        header = int_pressure_header()
+        data = int_pressure_rows(30)
+        self.set_data(header, data)
+        self.reset_parser()
+        particles = self.parser.get_records(30)
+        self.assertEqual(len(particles), 30)
+
+        self.config = self.batch_config
+        self.set_data(header, data)
+        self.reset_parser()
+        batch = self.parser.get_records(30)[0]
+        # the NaN of the int pressure column keeps it from being a float array
+        self.assertIsInstance(batch.columns['sci_water_pressure'], list)
+        self.assertEqual(batch.columns['sci_water_pressure'][:2], [0, 1])
+
+        expected = [self.typed_values(particle.generate_dict()) for particle in particles]
+        self.assertEqual(expected[1][-2:], [('sci_water_temp', 15.0001, float),
+                                            ('sci_ctd41cp_timestamp', None, type(None))])
+        self.assertEqual(expected[1][-3], ('sci_water_pressure', 1, int))
+        self.assertEqual(expected[2][-3], ('sci_water_pressure', None, type(None)))
+
+        self.assertEqual([self.typed_values(particle_dict) for particle_dict in batch.generate_dicts()],
+                         expected)
+        self.assertEqual([self.typed_values(particle.generate_dict()) for particle in batch.particles()],
+                         expected)
+
+    def test_driver_publish(self):
+        """
+        The dataset driver publishes the particles of the batches its parser
+        produces.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, 'unit_363.mrg'), 'w') as data_file:
+            data_file.write(HEADER + ctdgv_rows(30))
+
+        self.error_callback_values = []
+        published = {}
+        for config in (self.config, self.batch_config):
+            driver_config = {
+                DataSourceConfigKey.HARVESTER: {
+                    DataTypeKey.CTDGV_TELEMETERED: {
+                        DataSetDriverConfigKeys.DIRECTORY: directory,
+                        DataSetDriverConfigKeys.PATTERN: '*.mrg'
+                    }
+                },
+                DataSourceConfigKey.PARSER: dict(config)
+            }
+            data = []
+            driver = CTDGVDataSetDriver(driver_config, None, data.append,
+                                        lambda state: None, lambda **kwargs: None,
+                                        self.error_callback)
+            driver._driver_state[DataTypeKey.CTDGV_TELEMETERED]['unit_363.mrg'] = \
+                {DriverStateKey.PARSER_STATE: None}
+            driver._got_file('unit_363.mrg', DataTypeKey.CTDGV_TELEMETERED)
+            published[config is self.batch_config] = [particle for published_data in data
+                                                      for particle in published_data]
+
+        self.assertEqual(self.error_callback_values, [])
+        self.assertEqual(len(published[False]), 27)
+        for particle in published[True]:
+            self.assertIsInstance(particle, CtdgvTelemeteredDataParticle)
+        self.assertEqual([self.typed_values(particle.generate_dict()) for particle in published[True]],
+                         [self.typed_values(particle.generate_dict()) for particle in published[False]])
+
+    def buffered_objects(self, config, row_count):
+        """
+        Load a file completely into the record buffer.
+        @retval (objects held by the buffer per record, seconds per record)
+        """
+        self.config = config
+        self.set_data(HEADER, ctdgv_rows(row_count))
+        self.reset_parser()
+        logging.disable(logging.DEBUG)
+        start = time.time()
+        try:
+            self.parser._load_particle_buffer()
+        except EOFError:
+            pass
+        finally:
+            logging.disable(logging.NOTSET)
+        elapsed = time.time() - start
+        return float(reachable_objects(self.parser._record_buffer)) / row_count, elapsed / row_count
+
+    def test_batch_allocations(self):
+        """
+        Objects held per record by particles (on a sample) and by batches
+        (on 100k rows).
+        """
+        particle_objects, particle_time = self.buffered_objects(self.config, 2000)
+        batch_objects, batch_time = self.buffered_objects(self.batch_config, 100000)
+        log.info("per record: particles %.1f objects %.1fus, batches %.3f objects %.1fus",
+                 particle_objects, particle_time * 1e6, batch_objects, batch_time * 1e6)
+        self.assertLess(batch_objects * 10, particle_objects)
+
+
+@attr('UNIT', group='mi')
+class CTDGVPositionGliderTest(GliderParserUnitTestCase):
+    """
+    Regression benchmark for a 50k record glider file, with records buffered
+    with their position rather than a copy of the state.
+    """
+    config = {
+        DataSetDriverConfigKeys.PARTICLE_MODULE: 'mi.dataset.parser.glider',
+        DataSetDriverConfigKeys.PARTICLE_CLASS: 'CtdgvTelemeteredDataParticle'
+    }
+    # every tenth row has no science data
+    ROW_COUNT = 55556
+
+    def test_50k_records(self):
+        data = ctdgv_rows(self.ROW_COUNT)
+        self.set_data(HEADER, data)
+        self.reset_parser()
+        logging.disable(logging.DEBUG)
+        try:
+            start = time.time()
+            first = self.parser.get_records(1000)
+            self.assertIsInstance(self.parser._record_buffer[0][1], int)
+            count = len(first)
+            while True:
+                records = self.parser.get_records(1000)
+                if not records:
+                    break
+                count += len(records)
+            elapsed = time.time() - start
+        finally:
+            logging.disable(logging.NOTSET)
+
+        log.info("%d glider records in %f secs, %.1fus per record",
+                 count, elapsed, elapsed / count * 1e6)
+        self.assertEqual(count, self.ROW_COUNT - self.ROW_COUNT // 10)
+
+        # the state after a record is the position at the end of its row
+        rows = data.split('\n')[1:]
+        science_rows = [index for index in range(self.ROW_COUNT) if index % 10 != 9]
+        position = len(HEADER) + 1 + sum(len(row) + 1 for row in rows[:science_rows[999] + 1])
+        self.assertEqual(self.state_callback_values[0], {StateKey.POSITION: position})
+        self.assertEqual(self.state_callback_values[-1], {StateKey.POSITION: len(HEADER) + len(data)})
+        self.assertTrue(self.file_ingested)
+
+        # resume after the first 1000 records
+        self.set_data(HEADER, data)
+        self.reset_parser(dict(self.state_callback_values[0]))
+        records = self.parser.get_records(1)
+        self.assertEqual(records[0].contents['internal_timestamp'],
+                         first[-1].contents['internal_timestamp'] + 1)
+
+    def test_records_iter(self):
+        """
+        Streaming the records gives the same particles and states as
+        getting them all at once.
+        """
+        data = ctdgv_rows(2000)
+        self.set_data(HEADER, data)
+        self.reset_parser({})
+        expected = [particle.contents['internal_timestamp']
+                     for particle in self.parser.get_records(2000)]
+        expected_state = self.state_callback_values[-1]
+
+        self.set_data(HEADER, data)
+        self.reset_parser({})
+        timestamps = [particle.contents['internal_timestamp']
+                      for particle in self.parser.get_records_iter(batch_size=64)]
+        self.assertEqual(timestamps, expected)
+        self.assertEqual(len(self.state_callback_values), (len(expected) + 63) // 64)
+        self.assertEqual(self.state_callback_values[-1], expected_state)
+        self.assertTrue(self.file_ingested)
+
+        self.set_data(HEADER, data)
+        self.reset_parser({})
+        records = self.parser.get_records_iter(100, batch_size=64)
+        self.assertEqual(len(list(records)), 100)
+        self.assertEqual(len(self.parser._record_buffer), len(expected) - 100)
+
+    def test_single_record_yank(self):
+        """
+        Records yanked one at a time from a large buffer, as throttled
+        drivers do, take constant time each.
+        """
+        self.set_data(HEADER, ctdgv_rows(self.ROW_COUNT))
+        self.reset_parser({})
+        logging.disable(logging.DEBUG)
+        try:
+            self.parser.get_records(1)
+            buffered = len(self.parser._record_buffer)
+            start = time.time()
+            count = 0
+            while self.parser.get_records(1):
+                count += 1
+            elapsed = time.time() - start
+        finally:
+            logging.disable(logging.NOTSET)
+
+        log.info("%d single record yanks in %f secs, %.1fus each",
+                 count, elapsed, elapsed / count * 1e6)
+        self.assertEqual(count, buffered)
+        self.assertTrue(self.file_ingested)
+
+    def test_mmap_input(self):
+        """
+        Mapped input, in windows larger than the read size, gives the same
+        records and states.
+        """
+        def contents(particles):
+            return [(particle.contents['internal_timestamp'], particle._build_parsed_values())
+                    for particle in particles]
+
+        data = ctdgv_rows(2000)
+        self.set_data(HEADER, data)
+        self.reset_parser({})
+        expected = contents(self.parser.get_records(2000))
+        expected_state = self.state_callback_values[-1]
+
+        self.test_data = tempfile.TemporaryFile()
+        self.test_data.write(HEADER + data)
+        self.test_data.seek(0)
+        self.config = dict(self.config)
+        self.config[DataSetDriverConfigKeys.MMAP_INPUT] = True
+        self.reset_parser({})
+        records = self.parser.get_records(2000)
+        self.assertEqual(len(records), len(expected))
+        self.assertTrue(contents(records) == expected)
+        self.assertEqual(self.state_callback_values[-1], expected_state)
+        self.test_data.close()
@@ -9,6 +9,9 @@
 import ntplib
 import struct
 import os
+import random
+import logging
+from StringIO import StringIO
 from datetime import datetime
 import time
 from nose.plugins.attrib import attr
@@ -21,6 +24,10 @@ from mi.dataset.dataset_driver import DataSetDriverConfigKeys
 from mi.dataset.parser.mopak_o_dcl import MopakODclParser, StateKey
 from mi.dataset.parser.mopak_o_dcl import \
     MopakODclParser, \
+    ACCEL_ID, \
+    RATE_ID, \
+    ACCEL_BYTES, \
+    RATE_BYTES, \
     MopakODclAccelParserDataParticle, \
     MopakODclAccelParserRecoveredDataParticle, \
     MopakODclRateParserDataParticle, \
@@ -32,11 +39,29 @@ RESOURCE_PATH = os.path.join(Config().base_dir(), 'mi',
                              'dataset', 'driver', 'cg_stc_eng',
                              'stc', 'resource')
 
+
+def build_record(record_id, timer, payload=None):
+    """
+    Build an accel or rate record with a valid checksum
+    @param record_id ACCEL_ID or RATE_ID
+    @param timer timer count to put in the record
+    @param payload data bytes before the timer, zeros if not given
+    """
+    n_bytes = ACCEL_BYTES if record_id == ACCEL_ID else RATE_BYTES
+    if payload is None:
+        payload = b'\x00' * (n_bytes - 7)
+    record = record_id + payload + struct.pack('>I', timer)
+    return record + struct.pack('>H', sum(bytearray(record)) & 0xFFFF)
+
+
 @attr('UNIT', group='mi')
 class MopakODclParserUnitTestCase(ParserUnitTestCase):
     """
     MopakODcl Parser unit test suite
     """
+    # records in the noise benchmark
+    BENCHMARK_RECORDS = 20000
+
     def state_callback(self, state, file_ingested):
         """ Call back method to watch what comes in via the position callback """
         self.state_callback_value = state
@@ -472,3 +497,86 @@ class MopakODclParserUnitTestCase(ParserUnitTestCase):
                                            self.state_callback, self.pub_callback,
                                            self.except_callback)
 
+    def test_sieve_nearest_id(self):
+        """
+        Test that a rate record starting inside a bad accel record is found,
+        even with an accel ID further on in the bad record
+        """
+        self.stream_handle = StringIO(b'')
+        self.parser = MopakODclParser(self.config, self.start_state, self.stream_handle,
+                                      '20140120_140004.mopak.log',
+                                      self.state_callback, self.pub_callback,
+                                      self.except_callback)
+        rate = build_record(RATE_ID, 100, ACCEL_ID * (RATE_BYTES - 7))
+        accel = build_record(ACCEL_ID, 200)
+        data = ACCEL_ID + b'\x00\x00' + rate + accel
+        self.assertEqual(self.parser.sieve_function(data),
+                         [(3, 3 + RATE_BYTES), (3 + RATE_BYTES, len(data))])
+
+    def test_sieve_resume(self):
+        """
+        Test that the sieve picks up where a call finding no records stopped
+        """
+        self.stream_handle = StringIO(b'')
+        self.parser = MopakODclParser(self.config, self.start_state, self.stream_handle,
+                                      '20140120_140004.mopak.log',
+                                      self.state_callback, self.pub_callback,
+                                      self.except_callback)
+        noise = b'\x00' * 1000 + RATE_ID
+        self.assertEqual(self.parser.sieve_function(noise), [])
+        self.assertEqual(self.parser._sieve_resume[1], 1000)
+
+        accel = build_record(ACCEL_ID, 200)
+        self.assertEqual(self.parser.sieve_function(noise + accel), [(1001, 1001 + ACCEL_BYTES)])
+        self.assertEqual(self.parser._sieve_resume, None)
+
+        # different data is sieved from the start
+        self.assertEqual(self.parser.sieve_function(noise), [])
+        self.assertEqual(self.parser.sieve_function(accel + noise), [(0, ACCEL_BYTES)])
+
+    def test_noise_benchmark(self):
+        """
+        Test finding the records in a stream with gaps of zeros, noise and
+        runs of ID bytes between them, logging the throughput
+        """
+        rand = random.Random(50)
+        chunks = []
+        for index in range(self.BENCHMARK_RECORDS):
+            record_id = rand.choice([ACCEL_ID, RATE_ID])
+            n_bytes = ACCEL_BYTES if record_id == ACCEL_ID else RATE_BYTES
+            payload = bytes(bytearray(rand.getrandbits(8) for _ in range(n_bytes - 7)))
+            chunks.append(build_record(record_id, 33456 + index * 625, payload))
+            gap = rand.random()
+            if gap < 0.02:
+                chunks.append(b'\x00' * rand.randint(1, 20000))
+            elif gap < 0.04:
+                chunks.append(bytes(bytearray(rand.randrange(0x80) for _ in range(rand.randint(1, 200)))))
+            elif gap < 0.05:
+                chunks.append(rand.choice([ACCEL_ID, RATE_ID]) * rand.randint(1, 60))
+        # the file ends with a record
+        chunks.append(build_record(ACCEL_ID, 33456 + self.BENCHMARK_RECORDS * 625))
+        data = b''.join(chunks)
+
+        self.stream_handle = StringIO(data)
+        self.parser = MopakODclParser(self.config, self.start_state, self.stream_handle,
+                                      '20140120_140004.mopak.log',
+                                      self.state_callback, self.pub_callback,
+                                      self.except_callback)
+        logging.disable(logging.ERROR)
+        try:
+            start = time.time()
+            count = 0
+            while True:
+                result = self.parser.get_records(1000)
+                if not result:
+                    break
+                count += len(result)
+            elapsed = time.time() - start
+        finally:
+            logging.disable(logging.NOTSET)
+
+        log.info("%d mopak records from %d bytes in %f secs, %.2f MB/s",
+                 count, len(data), elapsed, len(data) / elapsed / 1e6)
+        self.assertEqual(count, self.BENCHMARK_RECORDS + 1)
+        self.assertEqual(self.publish_callback_value[-1].raw_data, chunks[-1])
+        self.assert_(isinstance(self.exception_callback_value, SampleException))
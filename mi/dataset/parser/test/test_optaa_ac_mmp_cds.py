@@ -24,6 +24,7 @@ from mi.dataset.test.test_parser import ParserUnitTestCase
 from mi.dataset.dataset_driver import DataSetDriverConfigKeys
 from mi.dataset.parser.optaa_ac_mmp_cds import OptaaAcMmpCdsParser
 from mi.dataset.parser.mmp_cds_base import StateKey
+from mi.dataset.parser.mmp_cds_base import ParserConfigKey
 
 # Resource path for ctdpf ckl mmp cds
 RESOURCE_PATH = os.path.join(Config().base_dir(), 'mi', 'dataset', 'driver', 'optaa_ac', 'mmp_cds', 'resource')
@@ -260,6 +261,65 @@ class OptaaAcMmpCdsParserUnitTestCase(ParserUnitTestCase):
 
         stream_handle.close()
 
+    def test_streaming(self):
+        """
+        This test verifies that the streaming mode returns the same particles as the default mode, records
+        a byte position in the state, and resumes from either kind of state.
+        """
+        config = dict(self.config)
+        config[ParserConfigKey.STREAMING] = True
+
+        file_path = os.path.join(RESOURCE_PATH, 'large_import.mpk')
+        stream_handle = open(file_path, 'rb')
+
+        parser = OptaaAcMmpCdsParser(config, None, stream_handle,
+                                     self.state_callback, self.pub_callback)
+
+        test_data = self.get_dict_from_yml('large_import.yml')
+
+        particles = parser.get_records(100)
+        self.assertEqual(len(particles), 100)
+        for i in range(len(particles)):
+            self.assert_result(test_data['data'][i], particles[i])
+
+        # only part of the file has been read
+        self.assertLess(stream_handle.tell(), os.path.getsize(file_path))
+
+        state = copy.copy(self.state_callback_value)
+        self.assertEqual(state[StateKey.PARTICLES_RETURNED], 100)
+        self.assertIn(StateKey.POSITION, state)
+
+        # resume from the position in the state
+        parser = OptaaAcMmpCdsParser(config, state, stream_handle,
+                                     self.state_callback, self.pub_callback)
+        particles = parser.get_records(2000)
+        self.assertEqual(len(particles), 900)
+        for i in range(len(particles)):
+            self.assert_result(test_data['data'][100+i], particles[i])
+        self.assertEqual(self.state_callback_value[StateKey.PARTICLES_RETURNED], 1000)
+        self.assertTrue(self.file_ingested_value)
+
+        # resume from a state produced without streaming
+        parser = OptaaAcMmpCdsParser(config, {StateKey.PARTICLES_RETURNED: 250}, stream_handle,
+                                     self.state_callback, self.pub_callback)
+        particles = parser.get_records(10)
+        for i in range(len(particles)):
+            self.assert_result(test_data['data'][250+i], particles[i])
+        self.assertEqual(self.state_callback_value[StateKey.PARTICLES_RETURNED], 260)
+
+        stream_handle.close()
+
+        file_path = os.path.join(RESOURCE_PATH, 'not-msg-pack.mpk')
+        stream_handle = open(file_path, 'rb')
+
+        parser = OptaaAcMmpCdsParser(config, None, stream_handle,
+                                     self.state_callback, self.pub_callback)
+
+        with self.assertRaises(SampleException):
+            parser.get_records(1)
+
+        stream_handle.close()
+
     def test_bad_data_one(self):
         """
         This test verifies that a SampleException is raised when msgpack data is malformed.
@@ -24,6 +24,7 @@ from mi.dataset.test.test_parser import ParserUnitTestCase
 from mi.dataset.dataset_driver import DataSetDriverConfigKeys
 from mi.dataset.parser.vel3d_a_mmp_cds import Vel3dAMmpCdsParser
 from mi.dataset.parser.mmp_cds_base import StateKey
+from mi.dataset.parser.mmp_cds_base import ParserConfigKey
 
 # Resource path for acmpf ckl mmp cds
 RESOURCE_PATH = os.path.join(Config().base_dir(), 'mi', 'dataset', 'driver', 'vel3d_a', 'mmp_cds', 'resource')
@@ -238,6 +239,36 @@ class Vel3dAMmpCdsParserUnitTestCase(ParserUnitTestCase):
 
         stream_handle.close()
 
+    def test_streaming(self):
+        """
+        This test verifies that the streaming mode resumes from the position in its state and produces the
+        same particles as the default mode.
+        """
+        config = dict(self.config)
+        config[ParserConfigKey.STREAMING] = True
+
+        file_path = os.path.join(RESOURCE_PATH, 'state_test.mpk')
+        stream_handle = open(file_path, 'rb')
+
+        parser = Vel3dAMmpCdsParser(config, None, stream_handle,
+                                    self.state_callback, self.pub_callback)
+        particles = parser.get_records(190)
+        self.assertEqual(len(particles), 190)
+
+        state = copy.copy(self.state_callback_value)
+        self.assertEqual(state[StateKey.PARTICLES_RETURNED], 190)
+
+        parser = Vel3dAMmpCdsParser(config, state, stream_handle,
+                                    self.state_callback, self.pub_callback)
+        particles = parser.get_records(7)
+        self.assertEqual(len(particles), 7)
+
+        test_data = self.get_dict_from_yml('second_data.yml')
+        for n in range(3):
+            self.assert_result(test_data['data'][n], particles[3+n])
+
+        stream_handle.close()
+
     def test_bad_data_one(self):
         """
         This test verifies that a SampleException is raised when msgpack data is malformed.
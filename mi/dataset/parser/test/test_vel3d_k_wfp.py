@@ -9,6 +9,7 @@
 
 import inspect
 import ntplib
+import tempfile
 
 from nose.plugins.attrib import attr
 from StringIO import StringIO
@@ -446,6 +447,36 @@ class Vel3dKWfpParserUnitTestCase(ParserUnitTestCase):
 
         log.info("=================== END MID-STATE ======================")
 
+    def test_mmap_input(self):
+        """
+        Read the records through a memory mapped file.
+        """
+        input_file = tempfile.TemporaryFile()
+        input_file.write(RECORD_4_DATA)
+        input_file.seek(0)
+        self.config[DataSetDriverConfigKeys.MMAP_INPUT] = True
+        self.parser = self.create_parser(input_file, self.state)
+
+        result = self.parser.get_records(1)
+        self.verify_contents(result, self.expected_particle1)
+        self.verify_file_info(False, FILE_HEADER_SIZE + DATA_RECORD_SIZE)
+        # the whole file is in a single window, unmapped at the end of file
+        self.assertTrue(self.parser.file_complete)
+        self.assertIsNone(self.parser._mmap)
+
+        result = self.parser.get_records(3)
+        self.assertEqual(result, [self.expected_particle2,
+            self.expected_particle3, self.expected_particle4])
+
+        # restart after record 2
+        position = FILE_HEADER_SIZE + (2 * DATA_RECORD_SIZE)
+        new_state = {Vel3dKWfpStateKey.POSITION: position,
+                     Vel3dKWfpStateKey.RECORD_NUMBER: 2}
+        self.parser = self.create_parser(input_file, new_state)
+        result = self.parser.get_records(1)
+        self.verify_contents(result, self.expected_particle3)
+        input_file.close()
+
     def test_missing_sync(self):
         """
         Ensure that bad data is skipped when a sync is missing.
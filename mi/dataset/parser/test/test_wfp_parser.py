@@ -9,6 +9,7 @@ would lead to different subclasses of the test suites
 """
 
 import gevent
+import tempfile
 from StringIO import StringIO
 from nose.plugins.attrib import attr
 
@@ -200,6 +201,34 @@ Date,[mA],[V],[dbar],Par[mV],scatSig,chlSig,CDOMSig
         self.assertEqual(self.position_callback_value[StateKey.POSITION], 703)
         self.assertEqual(self.publish_callback_value[-1], self.particle_z)
 
+    def test_mmap_input(self):
+        """
+        Memory mapped input gives the same particles and positions as
+        stream reads.
+        """
+        input_file = tempfile.TemporaryFile()
+        input_file.write(WfpParserUnitTestCase.LONG_DATA)
+        input_file.seek(0)
+        self.config[DataSetDriverConfigKeys.MMAP_INPUT] = True
+        self.parser = WfpParser(self.config, self.position, input_file,
+                                  self.pos_callback, self.pub_callback)
+
+        result = self.parser.get_records(1)
+        self.assert_result(result, 213, self.particle_a)
+        # the whole file is in a single window, unmapped at the end of file
+        self.assertTrue(self.parser.file_complete)
+        self.assertIsNone(self.parser._mmap)
+        result = self.parser.get_records(44)
+        self.assertEqual(result[-1], self.particle_z)
+        self.assertEqual(self.parser._state[StateKey.POSITION], 703)
+
+        new_state = {StateKey.POSITION: 213}
+        self.parser = WfpParser(self.config, new_state, input_file,
+                                  self.pos_callback, self.pub_callback)
+        result = self.parser.get_records(1)
+        self.assert_result(result, 262, self.particle_b)
+        input_file.close()
+
     def test_mid_state_start(self):
         new_state = {StateKey.POSITION: 313}
         self.stream_handle = StringIO(WfpParserUnitTestCase.TEST_DATA)
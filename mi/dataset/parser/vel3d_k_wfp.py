@@ -29,6 +29,7 @@ import copy
 import ntplib
 import re
 import struct
+from collections import deque
 
 from mi.core.log import get_logger; log = get_logger()
 from mi.core.common import BaseEnum
@@ -626,7 +627,7 @@ class Vel3dKWfpParser(BufferLoadingParser):
 
             raise DatasetParserException("Invalid state keys")
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
         self.input_file.seek(state_obj[Vel3dKWfpStateKey.POSITION])
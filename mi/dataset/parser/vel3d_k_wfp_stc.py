@@ -29,6 +29,7 @@ import gevent
 import ntplib
 import re
 import struct
+from collections import deque
 
 from mi.core.common import BaseEnum
 from mi.core.exceptions import SampleException, DatasetParserException
@@ -390,7 +391,7 @@ class Vel3dKWfpStcParser(BufferLoadingParser):
         # Initialize parent data.
         #
         self._timestamp = 0.0
-        self._record_buffer = []
+        self._record_buffer = deque()
 
         self._state = state_obj
         self._read_state = state_obj
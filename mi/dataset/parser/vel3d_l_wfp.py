@@ -18,6 +18,7 @@ __license__ = 'Apache 2.0'
 import calendar
 import copy
 import struct
+from collections import deque
 
 from mi.core.log import get_logger; log = get_logger()
 from mi.core.common import BaseEnum
@@ -645,7 +646,7 @@ class Vel3dLWfpParser(BufferLoadingParser, Vel3dLParser):
             raise DatasetParserException("State key %s missing" %
                                          Vel3dLWfpStateKey.PARTICLE_NUMBER)
 
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
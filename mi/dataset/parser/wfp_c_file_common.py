@@ -18,6 +18,7 @@ import re
 import ntplib
 import struct
 import binascii
+from collections import deque
 
 from mi.core.log import get_logger ; log = get_logger()
 from mi.core.common import BaseEnum
@@ -178,7 +179,7 @@ class WfpCFileCommonParser(BufferLoadingParser):
         (StateKey.METADATA_SENT in state_obj):
             raise DatasetParserException("Invalid state keys")
         self._chunker.clean_all_chunks()
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._saved_header = None
         self._state = state_obj
         self._read_state = state_obj
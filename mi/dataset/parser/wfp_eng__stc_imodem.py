@@ -16,6 +16,7 @@ __license__ = 'Apache 2.0'
 import copy
 import ntplib
 import struct
+from collections import deque
 
 from mi.core.log import get_logger
 log = get_logger()
@@ -58,7 +59,7 @@ class WfpEngStcImodemParser(WfpEFileParser):
         if not (StateKey.POSITION in state_obj):
             raise DatasetParserException("Invalid state keys")
         self._chunker.clean_all_chunks()
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._saved_header = None
         self._state = state_obj
         self._read_state = state_obj
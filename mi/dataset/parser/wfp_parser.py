@@ -11,12 +11,12 @@ files. It initially holds WFP-specific logic, ultimately more than that.
 __author__ = 'Roger Unwin'
 __license__ = 'Apache 2.0'
 
-import copy
 import re
 import time
 import ntplib
 from dateutil import parser
 from functools import partial
+from collections import deque
 
 from mi.core.log import get_logger ; log = get_logger()
 
@@ -238,7 +238,7 @@ class WfpParser(BufferLoadingParser):
                  *args, **kwargs):
 
         self._timestamp = 0.0
-        self._record_buffer = [] # holds tuples of (record, state)
+        self._record_buffer = deque() # holds tuples of (record, state)
         self._read_state = {StateKey.POSITION:0}
         super(WfpParser, self).__init__(config,
                                           stream_handle,
@@ -258,7 +258,7 @@ class WfpParser(BufferLoadingParser):
         it is a valid data piece, build a particle, update the position and
         timestamp. Go until the chunker has no more valid data.
         @retval a list of tuples with sample particles encountered in this
-            parsing, plus the state. An empty list of nothing was parsed.
+            parsing, plus the position after each. An empty list of nothing was parsed.
         """
 
         result_particles = []
@@ -281,7 +281,7 @@ class WfpParser(BufferLoadingParser):
                     # create particle
                     self._increment_state(end)
 
-                    result_particles.append((sample, copy.copy(self._read_state)))
+                    result_particles.append((sample, self._read_state[StateKey.POSITION]))
             else:
                 log.error("Unhandled chunk: %s", chunk)
                 #raise SampleException("Unhandled chunk: %s", chunk)
@@ -309,7 +309,7 @@ class WfpParser(BufferLoadingParser):
         self._chunker.raw_chunk_list = []
         self._chunker.data_chunk_list = []
         self._chunker.nondata_chunk_list = []
-        self._record_buffer = []
+        self._record_buffer = deque()
         self._state = state_obj
         self._read_state = state_obj
 
@@ -489,7 +489,7 @@ class Vel3dkParser(WfpParser):
                  *args, **kwargs):
 
         self._timestamp = 0.0
-        self._record_buffer = [] # holds tuples of (record, state)
+        self._record_buffer = deque() # holds tuples of (record, state)
         self._read_state = {StateKey.POSITION:0}
 
         super(BufferLoadingParser, self).__init__(config,
@@ -511,7 +511,7 @@ class Vel3dkParser(WfpParser):
         it is a valid data piece, build a particle, update the position and
         timestamp. Go until the chunker has no more valid data.
         @retval a list of tuples with sample particles encountered in this
-            parsing, plus the state. An empty list of nothing was parsed.
+            parsing, plus the position after each. An empty list of nothing was parsed.
         """
 
         result_particles = []
@@ -534,7 +534,7 @@ class Vel3dkParser(WfpParser):
                     # create particle
                     self._increment_state(end)
 
-                    result_particles.append((sample, copy.copy(self._read_state)))
+                    result_particles.append((sample, self._read_state[StateKey.POSITION]))
             else:
                 log.error("Unhandled chunk: %s", chunk)
                 #raise SampleException("Unhandled chunk: %s", chunk)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.particle_batch
+@file mi/dataset/particle_batch.py
+@author agent
+@brief Columnar batches of records for high rate dataset parsers
+
+A ParticleBatch holds many records of a single stream as parallel columns
+(NumPy arrays for columns of ints or of floats) with the parser state after the last
+record, instead of one DataParticle, parsed value list and state copy per
+record. Parsers opt in with the DataSetDriverConfigKeys.PARTICLE_BATCH
+config value, in which case BufferLoadingParser.get_records returns, and
+publishes, batches rather than particles.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import time
+import ntplib
+import numpy as np
+
+from mi.core.log import get_logger
+log = get_logger()
+from mi.core.exceptions import NotImplementedException
+from mi.core.instrument.data_particle import DataParticleKey, DataParticleValue
+
+
+class ParticleBatch(object):
+    """
+    Records of one stream as parallel columns.
+
+    Rows are appended while parsing and turned into columns by freeze, after
+    which the batch can be split, iterated as particle dictionaries or, for
+    consumers that only take particles, turned back into particles.
+    """
+
+    def __init__(self, particle_class, value_ids, position_key='position',
+                 raw_data_fn=None):
+        """
+        @param particle_class The DataParticle class of the records
+        @param value_ids The parameter names, in the order of the row values
+        @param position_key State key holding the file position of a record
+        @param raw_data_fn Optional function(value_ids, row) returning the
+           raw data to build a particle_class instance from, used by particles()
+        """
+        self.particle_class = particle_class
+        self.stream_name = particle_class.type()
+        self.value_ids = list(value_ids)
+        self.position_key = position_key
+        self.raw_data_fn = raw_data_fn
+        self.columns = None
+        self.internal_timestamps = None
+        self.positions = None
+        self.state = None
+        self._state_template = None
+        self._rows = []
+        self._timestamps = []
+        self._positions = []
+
+    def __len__(self):
+        if self.positions is None:
+            return len(self._positions)
+        return len(self.positions)
+
+    def append(self, values, internal_timestamp, position):
+        """
+        Add a record
+        @param values Sequence of values in value_ids order, None for values
+           the record does not have
+        @param internal_timestamp The NTP timestamp of the record
+        @param position The file position after the record
+        """
+        self._rows.append(values)
+        self._timestamps.append(internal_timestamp)
+        self._positions.append(position)
+
+    def freeze(self, state):
+        """
+        Turn the appended rows into columns. Columns holding only ints, or
+        only floats, become NumPy arrays, anything else stays a list so the
+        values keep their python types.
+        @param state The parser state to base the end of batch state on, its
+           position is replaced with the position of the last record
+        @retval this batch
+        """
+        if self._rows:
+            columns = zip(*self._rows)
+        else:
+            columns = [()] * len(self.value_ids)
+
+        self.columns = {}
+        for value_id, column in zip(self.value_ids, columns):
+            self.columns[value_id] = self._column(column)
+
+        self.internal_timestamps = np.asarray(self._timestamps, dtype=np.float64)
+        self.positions = np.asarray(self._positions, dtype=np.int64)
+        self._rows = self._timestamps = self._positions = None
+
+        self._state_template = state
+        self.state = self.state_at(len(self) - 1) if len(self) else dict(state)
+        return self
+
+    @staticmethod
+    def _column(values):
+        """
+        @param values The values of a column
+        @retval A NumPy array if the values are all ints or all floats and
+           the array gives them back unchanged, otherwise a list
+        """
+        value_types = set(type(value) for value in values)
+        if len(value_types) == 1 and value_types.pop() in (int, float):
+            array = np.asarray(values)
+            # ints too large for int64 make an object array
+            if array.dtype.kind in 'if':
+                return array
+        return list(values)
+
+    def state_at(self, index):
+        """
+        @param index Index of a record in the batch
+        @retval The parser state after the record
+        """
+        state = dict(self._state_template)
+        state[self.position_key] = int(self.positions[index])
+        return state
+
+    def split(self, count):
+        """
+        Split a frozen batch, the columns of both parts being views on
+        the columns of this one.
+        @param count Number of records in the first part
+        @retval tuple of (first count records, remaining records)
+        """
+        return self._slice(0, count), self._slice(count, len(self))
+
+    def _slice(self, start, end):
+        batch = ParticleBatch(self.particle_class, self.value_ids,
+                              self.position_key, self.raw_data_fn)
+        batch.columns = dict((value_id, column[start:end])
+                             for value_id, column in self.columns.iteritems())
+        batch.internal_timestamps = self.internal_timestamps[start:end]
+        batch.positions = self.positions[start:end]
+        batch._rows = batch._timestamps = batch._positions = None
+        batch._state_template = self._state_template
+        batch.state = batch.state_at(end - start - 1) if end > start else dict(self.state)
+        return batch
+
+    def rows(self):
+        """
+        Iterate over the records as lists of python values in value_ids
+        order, NaN being replaced with None.
+        """
+        columns = [self.columns[value_id] for value_id in self.value_ids]
+        # tolist() converts a whole numeric column to python values at once
+        columns = [column.tolist() if isinstance(column, np.ndarray) else column
+                   for column in columns]
+        for row in zip(*columns):
+            yield [None if value != value else value for value in row]
+
+    def generate_dicts(self):
+        """
+        Iterate over the records in the DataParticle.generate_dict format.
+        """
+        driver_timestamp = ntplib.system_to_ntp_time(time.time())
+        for timestamp, row in zip(self.internal_timestamps.tolist(), self.rows()):
+            yield {
+                DataParticleKey.PKT_FORMAT_ID: DataParticleValue.JSON_DATA,
+                DataParticleKey.PKT_VERSION: 1,
+                DataParticleKey.INTERNAL_TIMESTAMP: timestamp,
+                DataParticleKey.DRIVER_TIMESTAMP: driver_timestamp,
+                DataParticleKey.PREFERRED_TIMESTAMP: DataParticleKey.INTERNAL_TIMESTAMP,
+                DataParticleKey.QUALITY_FLAG: DataParticleValue.OK,
+                DataParticleKey.STREAM_NAME: self.stream_name,
+                DataParticleKey.VALUES: [{DataParticleKey.VALUE_ID: value_id,
+                                          DataParticleKey.VALUE: value}
+                                         for value_id, value in zip(self.value_ids, row)]
+            }
+
+    def particles(self):
+        """
+        Build particle_class instances for the records, for consumers that
+        do not take batches.
+        @throws NotImplementedException if the batch has no raw_data_fn
+        """
+        if self.raw_data_fn is None:
+            raise NotImplementedException("No raw data function for %s batches" % self.stream_name)
+
+        columns = [self.columns[value_id] for value_id in self.value_ids]
+        columns = [column.tolist() if isinstance(column, np.ndarray) else column
+                   for column in columns]
+        return [self.particle_class(self.raw_data_fn(self.value_ids, row),
+                                    internal_timestamp=timestamp,
+                                    preferred_timestamp=DataParticleKey.INTERNAL_TIMESTAMP)
+                for timestamp, row in zip(self.internal_timestamps.tolist(), zip(*columns))]
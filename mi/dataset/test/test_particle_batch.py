@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+"""
+@package mi.dataset.test.test_particle_batch
+@file mi/dataset/test/test_particle_batch.py
+@author agent
+@brief Test code for columnar particle batches
+"""
+
+import numpy as np
+from nose.plugins.attrib import attr
+
+from mi.core.instrument.data_particle import DataParticle, DataParticleKey
+from mi.core.exceptions import NotImplementedException
+from mi.dataset.particle_batch import ParticleBatch
+from mi.dataset.test.test_parser import ParserUnitTestCase
+
+
+class BatchTestParticle(DataParticle):
+    _data_particle_type = 'batch_test'
+
+    def _build_parsed_values(self):
+        return [{DataParticleKey.VALUE_ID: key, DataParticleKey.VALUE: value}
+                for key, value in self.raw_data]
+
+
+@attr('UNIT', group='mi')
+class ParticleBatchUnitTestCase(ParserUnitTestCase):
+
+    def build_batch(self, count=5):
+        batch = ParticleBatch(BatchTestParticle, ['temp', 'count', 'name'],
+                              raw_data_fn=lambda value_ids, row: zip(value_ids, row))
+        for index in range(count):
+            temp = float('NaN') if index == 2 else 10.0 + index
+            batch.append([temp, index, 'row%d' % index], 3600.0 + index, 100 * (index + 1))
+        return batch.freeze({'position': 0, 'other': 'kept'})
+
+    def test_freeze(self):
+        batch = self.build_batch()
+        self.assertEqual(len(batch), 5)
+        self.assertIsInstance(batch.columns['temp'], np.ndarray)
+        self.assertEqual(batch.columns['count'].dtype.kind, 'i')
+        self.assertEqual(batch.columns['name'], ['row0', 'row1', 'row2', 'row3', 'row4'])
+        self.assertEqual(batch.state, {'position': 500, 'other': 'kept'})
+        self.assertEqual(batch.state_at(1), {'position': 200, 'other': 'kept'})
+
+    def test_freeze_mixed_types(self):
+        batch = ParticleBatch(BatchTestParticle, ['count'],
+                              raw_data_fn=lambda value_ids, row: zip(value_ids, row))
+        for index, value in enumerate([1, 2.5, None]):
+            batch.append([value], 3600.0 + index, index)
+        batch.freeze({'position': 0})
+        self.assertEqual(batch.columns['count'], [1, 2.5, None])
+        values = [particle_dict[DataParticleKey.VALUES][0]['value']
+                  for particle_dict in batch.generate_dicts()]
+        self.assertEqual([(value, type(value)) for value in values],
+                         [(1, int), (2.5, float), (None, type(None))])
+
+    def test_split(self):
+        head, tail = self.build_batch().split(2)
+        self.assertEqual((len(head), len(tail)), (2, 3))
+        self.assertEqual(head.state['position'], 200)
+        self.assertEqual(tail.state['position'], 500)
+        self.assertEqual(tail.columns['count'].tolist(), [2, 3, 4])
+
+        head, tail = tail.split(3)
+        self.assertEqual(len(tail), 0)
+        self.assertEqual(tail.state['position'], 500)
+
+    def test_generate_dicts(self):
+        batch = self.build_batch()
+        dicts = list(batch.generate_dicts())
+        self.assertEqual(len(dicts), 5)
+        self.assertEqual(dicts[1][DataParticleKey.STREAM_NAME], 'batch_test')
+        self.assertEqual(dicts[1][DataParticleKey.INTERNAL_TIMESTAMP], 3601.0)
+        self.assertEqual(dicts[1][DataParticleKey.VALUES],
+                         [{'value_id': 'temp', 'value': 11.0},
+                          {'value_id': 'count', 'value': 1},
+                          {'value_id': 'name', 'value': 'row1'}])
+        # NaN is published as None
+        self.assertIsNone(dicts[2][DataParticleKey.VALUES][0]['value'])
+
+    def test_particles(self):
+        particles = self.build_batch().particles()
+        self.assertEqual(len(particles), 5)
+        self.assertIsInstance(particles[3], BatchTestParticle)
+        self.assertEqual(particles[3].raw_data, [('temp', 13.0), ('count', 3), ('name', 'row3')])
+
+        batch = ParticleBatch(BatchTestParticle, ['temp']).freeze({'position': 0})
+        with self.assertRaises(NotImplementedException):
+            batch.particles()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+
+"""
+@package mi.idk.event_waiter
+@file mi/idk/event_waiter.py
+@author agent
+@brief Collect asynchronous driver events and wait on them
+
+The DriverEventWaiter is handed to ZmqDriverClient.start_messaging as the
+event callback (directly, or through the test case event_received method).
+Tests block on it until a matching STATE_CHANGE, SAMPLE or CONFIG_CHANGE
+event arrives rather than polling the driver and sleeping for the worst
+case.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import json
+import time
+import threading
+
+from mi.core.log import get_logger ; log = get_logger()
+
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.instrument.data_particle import DataParticleKey
+
+
+class DriverEventWaiter(object):
+    """
+    Event list shared between the driver client event thread and a test.
+    Sample events are indexed by stream name as they arrive so waiting on
+    a stream does not parse every sample again on each event.  The decoded
+    particles are kept for get_particle.
+    """
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.events = []
+        self._samples = {}
+        self._particles = {}
+        # time the last event of each type arrived, None for any type
+        self._event_times = {}
+
+    def event_received(self, evt):
+        """
+        Driver client event callback, record the event and wake up waiters.
+        @param evt: the driver event, normally a dict with a type and a value
+        """
+        with self._condition:
+            self.events.append(evt)
+            now = time.time()
+            self._event_times[None] = now
+            if isinstance(evt, dict):
+                self._event_times[evt.get('type')] = now
+            if isinstance(evt, dict) and evt.get('type') == DriverAsyncEvent.SAMPLE:
+                self._samples.setdefault(self._stream_name(evt), []).append(evt)
+            self._condition.notify_all()
+
+    def clear(self):
+        """
+        Start a new event list.  Lists handed out before are left as is.
+        """
+        with self._condition:
+            self.events = []
+            self._samples = {}
+            self._particles = {}
+
+    def get_events(self, event_type=None):
+        """
+        @param event_type: type of event we are looking for, None for all
+        @return: list of events received
+        """
+        if event_type is None:
+            return self.events
+        return [evt for evt in self.events
+                if isinstance(evt, dict) and evt.get('type') == event_type]
+
+    def get_sample_events(self, stream_name=None):
+        """
+        @param stream_name: stream of the particles we are looking for,
+                            None for all
+        @return: list of sample events
+        """
+        if stream_name is None:
+            return self.get_events(DriverAsyncEvent.SAMPLE)
+        return list(self._samples.get(stream_name, []))
+
+    def wait_for(self, predicate, timeout):
+        """
+        Block until predicate, called with the event list, returns a true
+        value or the timeout expires.
+        @param predicate: function of the event list
+        @param timeout: how long to wait, in seconds
+        @return: the last predicate value
+        """
+        end_time = time.time() + timeout
+        with self._condition:
+            while True:
+                result = predicate(self.events)
+                remaining = end_time - time.time()
+                if result or remaining <= 0:
+                    return result
+                self._condition.wait(remaining)
+
+    def wait_for_state(self, state, timeout, start=0):
+        """
+        Wait for a STATE_CHANGE event to the given state.
+        @param state: protocol state we are looking for
+        @param timeout: how long to wait, in seconds
+        @param start: index in the event list to start looking from
+        @return: the event, None if it didn't arrive in time
+        """
+        def match(events):
+            for evt in events[start:]:
+                if isinstance(evt, dict) and evt.get('type') == DriverAsyncEvent.STATE_CHANGE \
+                        and evt.get('value') == state:
+                    return evt
+        return self.wait_for(match, timeout)
+
+    def wait_for_samples(self, stream_name, count=1, timeout=10):
+        """
+        Wait for sample events of a stream.
+        @param stream_name: stream of the particles we are looking for
+        @param count: number of samples we are looking for
+        @param timeout: how long to wait, in seconds
+        @return: the sample events received, fewer than count on timeout
+        """
+        self.wait_for(lambda events: len(self._samples.get(stream_name, [])) >= count, timeout)
+        return self.get_sample_events(stream_name)
+
+    def wait_for_config_change(self, timeout, start=0):
+        """
+        Wait for a CONFIG_CHANGE event.
+        @param timeout: how long to wait, in seconds
+        @param start: index in the event list to start looking from
+        @return: the event, None if it didn't arrive in time
+        """
+        def match(events):
+            for evt in events[start:]:
+                if isinstance(evt, dict) and evt.get('type') == DriverAsyncEvent.CONFIG_CHANGE:
+                    return evt
+        return self.wait_for(match, timeout)
+
+    def wait_for_quiet(self, quiet_time, timeout, event_type=None):
+        """
+        Wait until no event has arrived for a while, so late events from a
+        command are not left to show up after the event list is cleared.
+        @param quiet_time: seconds without an event
+        @param timeout: how long to wait, in seconds
+        @param event_type: type of event to wait on, None for all
+        @return: True if the events went quiet, False on timeout
+        """
+        end_time = time.time() + timeout
+        with self._condition:
+            while True:
+                now = time.time()
+                quiet_end = self._event_times.get(event_type, 0) + quiet_time
+                if now >= quiet_end:
+                    return True
+                if now >= end_time:
+                    return False
+                self._condition.wait(min(quiet_end, end_time) - now)
+
+    def get_particle(self, evt):
+        """
+        @param evt: a sample event
+        @return: the particle of the event as a dict, decoded once
+        @throws ValueError if the event value is not a JSON particle
+        """
+        value = evt.get('value')
+        if not isinstance(value, basestring):
+            return value
+
+        particle = self._particles.get(value)
+        if particle is None:
+            particle = json.loads(value)
+            self._particles[value] = particle
+        return particle
+
+    def _stream_name(self, evt):
+        """
+        @return: the stream name of the particle in a sample event
+        """
+        try:
+            particle = self.get_particle(evt)
+        except ValueError:
+            log.warn("Sample event value is not a particle: %r", evt.get('value'))
+            return None
+        if isinstance(particle, dict):
+            return particle.get(DataParticleKey.STREAM_NAME)
@@ -0,0 +1,118 @@
+"""
+@package mi.idk.regex_audit
+@file mi/idk/regex_audit.py
+@author agent
+@brief Find particle methods compiling a regex on every call
+
+Particle classes commonly provide a regex_compiled method returning
+re.compile(cls.regex()).  These are called for every chunk and every
+particle built, and the re module cache is small enough that a driver with
+a few large status patterns keeps recompiling them.  The audit imports the
+driver modules under a package and lists the DataParticle methods calling
+re.compile, so they can be moved to a module level pattern or to a compile
+once class like the SeaBirdParticle.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import sys
+import inspect
+import pkgutil
+from types import CodeType, FunctionType
+
+from mi.core.log import get_logger ; log = get_logger()
+
+from mi.core.instrument.data_particle import DataParticle
+
+DEFAULT_PACKAGE = 'mi.instrument'
+
+
+class RegexAudit(object):
+    """
+    Scan the DataParticle subclasses of a package for methods calling
+    re.compile.
+    """
+    def __init__(self, package=DEFAULT_PACKAGE):
+        """
+        @param package: name of the package or module to scan, test modules
+                        in a package are skipped
+        """
+        self.package = package
+        self.findings = []
+        self.import_errors = {}
+
+    def run(self):
+        """
+        Import every module of the package and check the particle classes
+        defined in them.
+        @return: list of (class name, method name) calling re.compile
+        """
+        self.findings = []
+        self.import_errors = {}
+        for module in self._modules():
+            for name, cls in sorted(vars(module).items()):
+                if inspect.isclass(cls) and issubclass(cls, DataParticle) \
+                        and cls.__module__ == module.__name__:
+                    self.findings.extend(('%s.%s' % (cls.__module__, name), method)
+                                         for method in self.compiling_methods(cls))
+        return self.findings
+
+    @staticmethod
+    def compiling_methods(cls):
+        """
+        @param cls: class to check, inherited methods are not included
+        @return: sorted names of the methods of the class calling re.compile
+        """
+        result = []
+        for name, attribute in cls.__dict__.items():
+            if isinstance(attribute, (staticmethod, classmethod)):
+                attribute = attribute.__func__
+            if isinstance(attribute, FunctionType) and _calls_compile(attribute.func_code):
+                result.append(name)
+        return sorted(result)
+
+    def report(self, out=sys.stdout):
+        """
+        Write the findings of the last run, one method per line.
+        """
+        for class_name, method in self.findings:
+            out.write("%s.%s\n" % (class_name, method))
+        out.write("%d methods compile a regex on each call, %d modules not imported\n" %
+                  (len(self.findings), len(self.import_errors)))
+
+    def _modules(self):
+        """
+        Import and yield the modules of the package.  Modules failing to
+        import are recorded in import_errors.
+        """
+        def onerror(name):
+            self.import_errors[name] = sys.exc_info()[1]
+
+        try:
+            package = __import__(self.package, fromlist=['__name__'])
+        except Exception as e:
+            self.import_errors[self.package] = e
+            return
+
+        yield package
+        if not hasattr(package, '__path__'):
+            return
+        for _, name, _ in pkgutil.walk_packages(package.__path__, self.package + '.', onerror):
+            if '.test' in name:
+                continue
+            try:
+                yield __import__(name, fromlist=['__name__'])
+            except Exception as e:
+                log.debug("regex audit failed to import %s: %s", name, e)
+                self.import_errors[name] = e
+
+
+def _calls_compile(code):
+    """
+    @param code: code object, nested functions are checked too
+    @return: True if the code looks up re.compile
+    """
+    if 're' in code.co_names and 'compile' in code.co_names:
+        return True
+    return any(_calls_compile(const) for const in code.co_consts if isinstance(const, CodeType))
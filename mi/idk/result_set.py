@@ -72,16 +72,30 @@ data:
 New sequence flag indicates that we are at the beginning of a new sequence of
 contiguous records, but these are not used currently.
 
+Large result sets can also be written as JSON lines, in a file with a .jsonl
+extension.  The first line is the header, each following line one record:
+
+{"particle_object": "CtdpfParserDataParticleKey", "particle_type": "ctdpf_parsed"}
+{"_index": 1, "internal_timestamp": "2013-07-26T21:01:03", "temperature": 4.1870, ...}
+{"_index": 2, "internal_timestamp": "2013-07-26T21:01:04", "temperature": 4.1872, ...}
+
+Expected internal timestamps are converted to ntp once, when the file is read.
 """
 
 __author__ = 'Bill French'
 __license__ = 'Apache 2.0'
 
 import re
+import json
 import yaml
 import ntplib
+import calendar
 import time
-from dateutil import parser
+
+try:
+    from yaml import CLoader as Loader
+except ImportError:
+    from yaml import Loader
 
 from mi.core.instrument.data_particle import DataParticle
 
@@ -90,6 +104,11 @@ from mi.core.log import get_logger ; log = get_logger()
 DATE_PATTERN = r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z?$'
 DATE_MATCHER = re.compile(DATE_PATTERN)
 
+JSON_LINES_EXTENSION = '.jsonl'
+
+# record keys which are not particle values
+RESERVED_KEYS = ['_index', '_new_sequence', 'internal_timestamp', 'particle_object', 'particle_type']
+
 class ResultSet(object):
     """
     Result Set object
@@ -99,8 +118,11 @@ class ResultSet(object):
         self.yaml = dict()
 
         log.debug("read result file: %s" % result_file_path)
-        stream = file(result_file_path, 'r')
-        result_set = yaml.load(stream)
+        with open(result_file_path, 'r') as stream:
+            if result_file_path.endswith(JSON_LINES_EXTENSION):
+                result_set = self._read_json_lines(stream)
+            else:
+                result_set = yaml.load(stream, Loader=Loader)
 
         self._set_result_set(result_set)
 
@@ -185,6 +207,7 @@ class ResultSet(object):
             IOError("header.particle_type not defined")
 
         self._result_set_data = {}
+        self._expected_keys = {}
         data = result_set.get("data")
         if not data: raise IOError("Missing result set data")
 
@@ -198,8 +221,31 @@ class ResultSet(object):
                 log.error("Duplicate particle definition for _index %s: %s", index, particle)
                 raise IOError("Duplicate definition found for index: %s"% index)
 
+            expected_time = particle.get('internal_timestamp')
+            if isinstance(expected_time, basestring):
+                particle['internal_timestamp'] = self._string_to_ntp_date_time(expected_time)
+
             self._result_set_data[index] = particle
-            log.trace("Result set data: %s", self._result_set_data)
+            self._expected_keys[index] = sorted(key for key in particle if key not in RESERVED_KEYS)
+
+        log.trace("Result set data: %s", self._result_set_data)
+
+    @staticmethod
+    def _read_json_lines(stream):
+        """
+        Read a JSON lines result set, a header line followed by a line per
+        record.
+        @param stream: open result set file
+        @return: result set dictionary, like the yml files
+        """
+        lines = (line for line in stream if line.strip())
+        try:
+            header = json.loads(next(lines, 'null'))
+            data = [json.loads(line) for line in lines]
+        except ValueError as e:
+            raise IOError("Invalid JSON lines result set: %s" % e)
+
+        return {"header": header, "data": data}
 
     def _verify_set(self, particles):
         """
@@ -246,10 +292,12 @@ class ResultSet(object):
             if particle_def is None:
                 errors.append("no particle result defined for index %d" % index)
 
-            # Otherwise lets do some validation
+            # Otherwise lets do some validation, generating the particle
+            # dictionary once for both checks
             else:
-                errors += self._get_particle_header_errors(particle, particle_def)
-                errors += self._get_particle_data_errors(particle, particle_def)
+                particle_dict = self._particle_as_dict(particle)
+                errors += self._get_particle_header_errors(particle, particle_def, particle_dict)
+                errors += self._get_particle_data_errors(particle, particle_def, particle_dict)
 
             if len(errors):
                 self._add_to_report("Failed particle validation for index %d" % index)
@@ -281,14 +329,15 @@ class ResultSet(object):
 
         return True
 
-    def _get_particle_header_errors(self, particle, particle_def):
+    def _get_particle_header_errors(self, particle, particle_def, particle_dict=None):
         """
         Verify all parameters defined in the header:
         - Stream type
         - Internal timestamp
         """
         errors = []
-        particle_dict = self._particle_as_dict(particle)
+        if particle_dict is None:
+            particle_dict = self._particle_as_dict(particle)
         particle_timestamp = particle_dict.get('internal_timestamp')
         expected_time = particle_def.get('internal_timestamp')
         allow_diff = .000001
@@ -300,13 +349,9 @@ class ResultSet(object):
             errors.append("particle_timestamp expected, but not defined in particle")
 
         elif particle_timestamp:
-            if isinstance(expected_time, str):
-                expected = self._string_to_ntp_date_time(expected_time)
-            else:
-                # if not a string, timestamp should alread be in ntp
-                expected = expected_time
+            # string timestamps were converted to ntp when the file was read
+            expected = expected_time
             ts_diff =  abs(particle_timestamp - expected)
-            log.debug("verify timestamp: abs(%s - %s) = %s", expected, particle_timestamp, ts_diff)
 
             if ts_diff > allow_diff:
                 errors.append("expected internal_timestamp mismatch, %.9f != %.9f (%.9f)" %
@@ -323,15 +368,16 @@ class ResultSet(object):
 
         return errors
 
-    def _get_particle_data_errors(self, particle, particle_def):
+    def _get_particle_data_errors(self, particle, particle_def, particle_dict=None):
         """
         Verify that all data parameters are present and have the
         expected value
         """
         errors = []
-        particle_dict = self._particle_as_dict(particle)
-        log.debug("Particle to test: %s", particle_dict)
-        log.debug("Particle definition: %s", particle_def)
+        if particle_dict is None:
+            particle_dict = self._particle_as_dict(particle)
+        log.trace("Particle to test: %s", particle_dict)
+        log.trace("Particle definition: %s", particle_def)
         particle_values = particle_dict['values']
 
         expected_new_sequence = particle_dict.get("new_sequence", False)
@@ -361,26 +407,21 @@ class ResultSet(object):
             errors.append("New sequence flag mismatch, expected: %s, received: %s" %
                           (expected_new_sequence, particle_new_sequence))
 
-        expected_keys = []
-        for (key, value) in particle_def.items():
-            if(key not in ['_index', '_new_sequence', 'internal_timestamp', 'particle_object', 'particle_type']):
-                expected_keys.append(key)
+        expected_keys = self._expected_keys.get(particle_def.get('_index'))
+        if expected_keys is None:
+            expected_keys = sorted(key for key in particle_def if key not in RESERVED_KEYS)
 
-        particle_keys = []
-        pv = {}
-        for value in particle_values:
-            particle_keys.append(value['value_id'])
-            pv[value['value_id']] = value['value']
+        pv = dict((value['value_id'], value['value']) for value in particle_values)
+        particle_keys = sorted(value['value_id'] for value in particle_values)
 
-        if sorted(expected_keys) != sorted(particle_keys):
+        if expected_keys != particle_keys:
             errors.append("expected / particle keys mismatch: %s != %s" %
-                          (sorted(expected_keys), sorted(particle_keys)))
+                          (expected_keys, particle_keys))
 
         else:
             for key in expected_keys:
                 expected_value = particle_def[key]
                 particle_value = pv[key]
-                log.debug("Verify value for '%s'", key)
                 e = self._verify_value(expected_value, particle_value)
                 if e:
                     errors.append("'%s' %s"  % (key, e))
@@ -403,12 +444,10 @@ class ResultSet(object):
             round_factor = None
 
         if ex_value is None:
-            log.debug("No value to compare, ignoring")
             return None
 
         if round_factor is not None and particle_value is not None:
             particle_value = round(particle_value, round_factor)
-            log.debug("rounded value to %s", particle_value)
 
         if ex_value != particle_value:
             return "value mismatch, %s != %s (decimals may be rounded)" % (ex_value, particle_value)
@@ -423,22 +462,19 @@ class ResultSet(object):
         @throws InstrumentParameterException if datestr cannot be formatted to
         a date.
         """
-        if not isinstance(datestr, str):
+        if not isinstance(datestr, basestring):
             raise IOError('Value %s is not a string.' % str(datestr))
-        if not DATE_MATCHER.match(datestr):
+        match = DATE_MATCHER.match(datestr)
+        if not match:
             raise ValueError("date string not in ISO8601 format YYYY-MM-DDTHH:MM:SS.SSSSZ")
 
         try:
-            # This assumes input date string are in UTC (=GMT)
-            if datestr[-1:] != 'Z':
-                datestr += 'Z'
-
-            # the parsed date time represents a GMT time, but strftime
-            # does not take timezone into account, so these are seconds from the
-            # local start of 1970
-            local_sec = float(parser.parse(datestr).strftime("%s.%f"))
-            # remove the local time zone to convert to gmt (seconds since gmt jan 1 1970)
-            gmt_sec = local_sec - time.timezone
+            # This assumes input date string are in UTC (=GMT), the fraction
+            # of a second is added back as text so the float is the same as
+            # parsing the full seconds string
+            fraction = match.group(1) or ''
+            seconds = calendar.timegm(time.strptime(datestr[:19], "%Y-%m-%dT%H:%M:%S"))
+            gmt_sec = float("%d%s" % (seconds, fraction))
             # convert to ntp (seconds since gmt jan 1 1900)
             timestamp = ntplib.system_to_ntp_time(gmt_sec)
 
@@ -0,0 +1,22 @@
+__author__ = 'agent'
+
+import argparse
+
+from mi.idk.regex_audit import RegexAudit, DEFAULT_PACKAGE
+
+def run():
+    opts = parseArgs()
+
+    app = RegexAudit(opts.package)
+    app.run()
+    app.report()
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description='List particle methods compiling a regex on every call.')
+    parser.add_argument('package', nargs="?", default=DEFAULT_PACKAGE, help='package to scan')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+"""
+@package mi.idk.test.test_event_waiter
+@file mi.idk/test/test_event_waiter.py
+@author agent
+@brief test waiting on driver events
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import json
+import time
+import threading
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.instrument.instrument_driver import DriverProtocolState
+from mi.idk.event_waiter import DriverEventWaiter
+
+
+def sample_event(stream_name):
+    return {'type': DriverAsyncEvent.SAMPLE,
+            'value': json.dumps({'stream_name': stream_name, 'values': []}),
+            'time': time.time()}
+
+
+def state_event(state):
+    return {'type': DriverAsyncEvent.STATE_CHANGE, 'value': state, 'time': time.time()}
+
+
+@attr('UNIT', group='mi')
+class TestDriverEventWaiter(MiUnitTest):
+
+    def setUp(self):
+        self.waiter = DriverEventWaiter()
+
+    def send_later(self, events, delay=0.05):
+        """
+        Deliver events from another thread, like the driver client event thread
+        """
+        def send():
+            for evt in events:
+                time.sleep(delay)
+                self.waiter.event_received(evt)
+        thread = threading.Thread(target=send)
+        thread.start()
+        return thread
+
+    def test_wait_for_state(self):
+        self.send_later([state_event(DriverProtocolState.COMMAND),
+                         state_event(DriverProtocolState.AUTOSAMPLE)])
+        start = time.time()
+        evt = self.waiter.wait_for_state(DriverProtocolState.AUTOSAMPLE, 5)
+        self.assertEqual(evt['value'], DriverProtocolState.AUTOSAMPLE)
+        self.assertLess(time.time() - start, 1)
+
+        # only events after start are considered
+        self.assertIsNone(self.waiter.wait_for_state(DriverProtocolState.COMMAND, 0.1, start=2))
+
+    def test_wait_for_samples(self):
+        self.send_later([sample_event('ctd'), 'not a dict', sample_event('raw'), sample_event('ctd')])
+        samples = self.waiter.wait_for_samples('ctd', 2, 5)
+        self.assertEqual(len(samples), 2)
+        self.assertEqual(len(self.waiter.get_sample_events()), 3)
+        self.assertEqual(len(self.waiter.get_events()), 4)
+
+        start = time.time()
+        samples = self.waiter.wait_for_samples('ctd', 3, 0.2)
+        self.assertEqual(len(samples), 2)
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+    def test_wait_for_config_change(self):
+        self.send_later([{'type': DriverAsyncEvent.CONFIG_CHANGE, 'value': {'a': 1}}])
+        evt = self.waiter.wait_for_config_change(5)
+        self.assertEqual(evt['value'], {'a': 1})
+        self.assertIsNone(self.waiter.wait_for_config_change(0.1, start=1))
+
+    def test_wait_for_quiet(self):
+        self.assertTrue(self.waiter.wait_for_quiet(0.1, 0))
+
+        config_change = {'type': DriverAsyncEvent.CONFIG_CHANGE, 'value': {'a': 1}}
+        thread = self.send_later([config_change] * 3, 0.1)
+        self.waiter.wait_for_config_change(5)
+        start = time.time()
+        self.assertTrue(self.waiter.wait_for_quiet(0.3, 5, DriverAsyncEvent.CONFIG_CHANGE))
+        self.assertGreaterEqual(time.time() - start, 0.4)
+        self.assertEqual(len(self.waiter.get_events(DriverAsyncEvent.CONFIG_CHANGE)), 3)
+        thread.join()
+
+        # other event types don't count
+        self.send_later([state_event(DriverProtocolState.COMMAND)] * 3, 0.1)
+        self.assertTrue(self.waiter.wait_for_quiet(0.2, 0, DriverAsyncEvent.CONFIG_CHANGE))
+        self.assertFalse(self.waiter.wait_for_quiet(1, 0.15))
+
+    def test_get_particle(self):
+        evt = sample_event('ctd')
+        self.waiter.event_received(evt)
+        particle = self.waiter.get_particle(evt)
+        self.assertEqual(particle['stream_name'], 'ctd')
+        self.assertIs(self.waiter.get_particle(evt), particle)
+        self.assertEqual(self.waiter.get_particle({'value': {'a': 1}}), {'a': 1})
+        self.assertRaises(ValueError, self.waiter.get_particle, {'value': 'not json'})
+
+    def test_clear(self):
+        self.waiter.event_received(sample_event('ctd'))
+        events = self.waiter.get_events()
+        self.waiter.clear()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(self.waiter.get_events(), [])
+        self.assertEqual(self.waiter.get_sample_events('ctd'), [])
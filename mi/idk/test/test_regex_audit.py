@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""
+@package mi.idk.test.test_regex_audit
+@file mi/idk/test/test_regex_audit.py
+@author agent
+@brief Test the particle regex audit
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import re
+from StringIO import StringIO
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.instrument.data_particle import DataParticle
+from mi.idk.regex_audit import RegexAudit
+
+PATTERN = re.compile(r'(\d+)')
+
+
+class CompilingParticle(DataParticle):
+    @staticmethod
+    def regex_compiled():
+        return re.compile(r'(\d+)')
+
+    def _build_parsed_values(self):
+        def match(data):
+            return re.compile(r'(\d+)').match(data)
+        return match(self.raw_data).group(1)
+
+
+class ModulePatternParticle(DataParticle):
+    @staticmethod
+    def regex_compiled():
+        return PATTERN
+
+    def _build_parsed_values(self):
+        return PATTERN.match(self.raw_data).group(1)
+
+
+@attr('UNIT', group='mi')
+class TestRegexAudit(MiUnitTest):
+
+    def test_compiling_methods(self):
+        self.assertEqual(RegexAudit.compiling_methods(CompilingParticle),
+                         ['_build_parsed_values', 'regex_compiled'])
+        self.assertEqual(RegexAudit.compiling_methods(ModulePatternParticle), [])
+
+    def test_run(self):
+        """
+        The SeaBirdParticle classes compile once, their regex_compiled
+        methods are not reported
+        """
+        audit = RegexAudit('mi.instrument.seabird.sbe16plus_v2')
+        findings = audit.run()
+        log.info("regex audit findings: %s, import errors: %s", findings, audit.import_errors)
+        self.assertEqual([f for f in findings if f[1] == 'regex_compiled'], [])
+
+        out = StringIO()
+        audit.report(out)
+        self.assertIn('methods compile a regex on each call', out.getvalue())
+
+        audit = RegexAudit(__name__)
+        self.assertEqual(audit.run(), [(__name__ + '.CompilingParticle', '_build_parsed_values'),
+                                       (__name__ + '.CompilingParticle', 'regex_compiled')])
+        self.assertEqual(audit.import_errors, {})
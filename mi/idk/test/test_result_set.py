@@ -12,6 +12,8 @@ __license__ = 'Apache 2.0'
 
 import os
 import re
+import time
+import tempfile
 
 from nose.plugins.attrib import attr
 from mock import Mock
@@ -195,3 +197,55 @@ class TestResultSet(MiUnitTest):
 
         self.assertTrue(rs.verify([particle_a]))
         self.assertIsNone(rs.report())
+
+    def test_json_lines(self):
+        """
+        A JSON lines result set verifies the same as the yml one
+        """
+        rs = ResultSet(self._get_result_set_file("record_set_files/test_data_1.txt.result.jsonl"))
+
+        base_timestamp = 3583861263.0
+        particle_a = CtdpfParserDataParticle("10.5914,  4.1870,  161.06,   2693.0",
+                                             internal_timestamp=base_timestamp, new_sequence=True)
+        particle_b = CtdpfParserDataParticle("10.5915,  4.1871,  161.07,   2693.1",
+                                             internal_timestamp=base_timestamp)
+
+        self.assertTrue(rs.verify([particle_a, particle_b]))
+        self.assertIsNone(rs.report())
+
+        self.assertFalse(rs.verify([particle_b, particle_a]))
+        self.assertIsNotNone(rs.report())
+
+    def test_timestamps_converted_on_load(self):
+        """
+        Expected internal timestamps are ntp floats once the file is read
+        """
+        rs = ResultSet(self._get_result_set_file("record_set_files/test_data_1.txt.result.yml"))
+        self.assertEqual(rs._result_set_data[1]['internal_timestamp'], 3583861263.0)
+        self.assertEqual(rs._result_set_data[2]['internal_timestamp'], 3583861263.0)
+        self.assertEqual(rs._expected_keys[1], ['conductivity', 'oxygen', 'pressure', 'temperature'])
+
+    def test_verify_rate(self):
+        """
+        Time the verification of a larger result set
+        """
+        count = 2000
+        base_timestamp = 3583861263.0
+        (fd, path) = tempfile.mkstemp(suffix=".result.jsonl")
+        particles = []
+        with os.fdopen(fd, 'w') as f:
+            f.write('{"particle_object": "CtdpfParserDataParticle", "particle_type": "ctdpf_parsed"}\n')
+            for index in range(count):
+                f.write('{"_index": %d, "internal_timestamp": "2013-07-26T21:%02d:%02d.5", "temperature": 4.1870, '
+                        '"conductivity": 10.5914, "pressure": 161.06, "oxygen": %d.0}\n' %
+                        (index + 1, 1 + (index + 3) / 60, (index + 3) % 60, index))
+                particles.append(CtdpfParserDataParticle("10.5914,  4.1870,  161.06,   %d.0" % index,
+                                                         internal_timestamp=base_timestamp + index + .5))
+
+        start = time.time()
+        rs = ResultSet(path)
+        load_time = time.time() - start
+        start = time.time()
+        self.assertTrue(rs.verify(particles))
+        log.info("result set of %d records: load %.3fs, verify %.3fs", count, load_time, time.time() - start)
+        os.remove(path)
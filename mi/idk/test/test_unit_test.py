@@ -15,6 +15,9 @@ import unittest
 
 from mi.core.log import get_logger ; log = get_logger()
 from mi.idk.unit_test import InstrumentDriverTestCase
+from mi.idk.unit_test import DriverTestMixin
+from mi.idk.unit_test import ParameterTestConfigKey
+from mi.core.instrument.data_particle import DataParticleKey
 
 from mi.core.common import BaseEnum
 
@@ -207,3 +210,61 @@ class TestEnumHasNotDuplicates(InstrumentDriverTestCase):
 
         self.assert_enum_has_no_duplicates(MyEnum)
         self.assertTrue(self._false_result)
+
+
+def particle(**values):
+    """
+    Minimal particle dict with the given values
+    """
+    return {DataParticleKey.VALUES: [{DataParticleKey.VALUE_ID: key, DataParticleKey.VALUE: value}
+                                     for (key, value) in values.items()]}
+
+
+@attr('UNIT', group='mi')
+class TestParameterExpectation(DriverTestMixin):
+    """
+    Test the particle parameter asserts and their cached parameter expectations.
+    """
+    def setUp(self):
+        self._parameters = {
+            'count': {ParameterTestConfigKey.TYPE: int, ParameterTestConfigKey.NAME: 'count'},
+            'name': {ParameterTestConfigKey.TYPE: unicode, ParameterTestConfigKey.REQUIRED: False},
+            'flag': bool,
+        }
+
+    def test_assert_parameters(self):
+        self.assert_data_particle_parameters(particle(count=1, name=u'a', flag=True), self._parameters)
+        self.assert_data_particle_parameters(particle(count=1, flag=True), self._parameters)
+
+        # missing required parameter, unknown parameter and wrong type
+        self.assertRaises(AssertionError, self.assert_data_particle_parameters,
+                          particle(name=u'a', flag=True), self._parameters)
+        self.assertRaises(AssertionError, self.assert_data_particle_parameters,
+                          particle(count=1, flag=True, other=1), self._parameters)
+        self.assertRaises(AssertionError, self.assert_data_particle_parameters,
+                          particle(count=1.5, flag=True), self._parameters)
+        self.assertRaises(AssertionError, self.assert_data_particle_parameters,
+                          particle(count=1, flag=None), self._parameters)
+
+        # key and name don't match
+        self._parameters['count'][ParameterTestConfigKey.NAME] = 'total'
+        self.assertRaises(AssertionError, self.assert_data_particle_parameters,
+                          particle(count=1, flag=True), self._parameters)
+
+    def test_changed_in_place(self):
+        """
+        Changing a parameter dict in place changes the expectation
+        """
+        (required, optional, types) = self.get_parameter_expectation(self._parameters)
+        self.assertEqual(required, set(['count', 'flag']))
+        self.assertEqual(optional, set(['name']))
+        self.assertIs(self.get_parameter_expectation(self._parameters)[0], required)
+
+        self._parameters['name'][ParameterTestConfigKey.REQUIRED] = True
+        self.assertRaises(AssertionError, self.assert_data_particle_parameters,
+                          particle(count=1, flag=True), self._parameters)
+
+        self._parameters['count'][ParameterTestConfigKey.TYPE] = float
+        self.assertRaises(AssertionError, self.assert_data_particle_parameters,
+                          particle(count=1, name=u'a', flag=True), self._parameters)
+        self.assert_data_particle_parameters(particle(count=1.5, name=u'a', flag=True), self._parameters)
@@ -42,6 +42,7 @@ from mock import Mock
 from mi.core.unit_test import MiIntTestCase
 from mi.core.unit_test import MiUnitTest
 from mi.core.unit_test import ParticleTestMixin
+from mi.core.unit_test import particle_verification
 from mi.core.port_agent_simulator import TCPSimulatorServer
 from mi.core.instrument.instrument_driver import InstrumentDriver
 from mi.core.instrument.instrument_driver import DriverParameter
@@ -68,6 +69,7 @@ from mi.idk.comm_config import CommConfig
 from mi.idk.comm_config import ConfigTypes
 from mi.idk.config import Config
 from mi.idk.common import Singleton
+from mi.idk.event_waiter import DriverEventWaiter
 from mi.idk.instrument_agent_client import InstrumentAgentClient
 from mi.idk.instrument_agent_client import InstrumentAgentDataSubscribers
 from mi.idk.instrument_agent_client import InstrumentAgentEventSubscribers
@@ -275,7 +277,16 @@ class InstrumentDriverTestConfig(Singleton):
 class DriverTestMixin(MiUnitTest, ParticleTestMixin):
     """
     Base class for data particle mixin.  Used for data particle validation.
+
+    The key sets and types of each parameter dict, normally a class level
+    dict per stream, are worked out on first use and kept in
+    _parameter_expectations for the rest of the test run.  They are keyed
+    on the names, types and required flags, so a dict changed in place gets
+    a new entry.
     """
+    # frozenset of (key, type, required, name) -> (required keys, optional keys, {key: (type, required)})
+    _parameter_expectations = {}
+
     _raw_sample_parameters = {
         RawDataParticleKey.PAYLOAD: {'type': unicode, 'value': u'SWFtIEFwdWJsaXNoZWQgTWVzc2FnZQ=='},
         RawDataParticleKey.LENGTH: {'type': int, 'value': 22},
@@ -292,6 +303,7 @@ class DriverTestMixin(MiUnitTest, ParticleTestMixin):
         self.assert_data_particle_header(data_particle, CommonDataParticleType.RAW)
         self.assert_data_particle_parameters(data_particle, self._raw_sample_parameters, verify_values)
 
+    @particle_verification
     def assert_data_particle_parameters(self, data_particle, param_dict, verify_values=False):
         """
         Verify data particle parameters.  Does a quick conversion of the values to a dict
@@ -304,6 +316,46 @@ class DriverTestMixin(MiUnitTest, ParticleTestMixin):
         sample_dict = self.get_data_particle_values_as_dict(data_particle)
         self.assert_parameters(sample_dict, param_dict, verify_values)
 
+    def get_parameter_expectation(self, param_dict):
+        """
+        Split a parameter dict in required and optional keys and the expected
+        type of each key.  The names are verified the first time a dict with
+        these contents is seen, the result is cached for the following calls.
+        @param param_dict: dict with parameter names and types
+        @return: (required key set, optional key set, {key: (type, required)})
+        """
+        types = {}
+        signature = []
+        for key, param_def in param_dict.items():
+            if isinstance(param_def, dict):
+                param_type = param_def.get(ParameterTestConfigKey.TYPE)
+                required = param_def.get(ParameterTestConfigKey.REQUIRED, True)
+                name = param_def.get(ParameterTestConfigKey.NAME)
+            else:
+                param_type = param_def
+                required = True
+                name = None
+            types[key] = (param_type, required)
+            signature.append((key, param_type, required, name))
+
+        try:
+            signature = frozenset(signature)
+            entry = self._parameter_expectations.get(signature)
+        except TypeError:
+            # unhashable definitions are not cached
+            signature = entry = None
+        if entry is not None:
+            return entry
+
+        self.assert_parameter_names(param_dict)
+
+        required_keys = set(key for key, (param_type, required) in types.items() if required)
+        optional_keys = set(types) - required_keys
+        entry = (required_keys, optional_keys, types)
+        if signature is not None:
+            self._parameter_expectations[signature] = entry
+        return entry
+
     def assert_driver_parameter_definition(self, driver, param_dict):
         """
         Verify the parameters have been defined as expected in the driver protocol.
@@ -419,7 +471,7 @@ class DriverTestMixin(MiUnitTest, ParticleTestMixin):
         self.assertIsInstance(current_parameters, dict)
         self.assertIsInstance(param_dict, dict)
 
-        self.assert_parameter_names(param_dict)
+        self.get_parameter_expectation(param_dict)
         self.assert_parameter_set(current_parameters, param_dict)
         self.assert_parameter_types(current_parameters, param_dict)
 
@@ -460,41 +512,20 @@ class DriverTestMixin(MiUnitTest, ParticleTestMixin):
         self.assertIsInstance(sample_values, dict)
         self.assertIsInstance(param_dict, dict)
 
-        required_keys = []
-        optional_keys = []
+        (required_keys, optional_keys, types) = self.get_parameter_expectation(param_dict)
 
         # get all the sample parameter names
-        sample_keys = sample_values.keys()
-        log.info("Sample Keys: %s", sample_keys)
-
-        # split the parameters into optional and required
-        for key, param in param_dict.items():
-            if isinstance(param, dict):
-                required = param.get(ParameterTestConfigKey.REQUIRED, True)
-                if required:
-                    required_keys.append(key)
-                else:
-                    optional_keys.append(key)
-            else:
-                required_keys.append(key)
-
-        log.info("Required Keys: %s", required_keys)
-        log.info("Optional Keys: %s", optional_keys)
+        sample_keys = set(sample_values)
+        log.debug("Sample Keys: %s", sample_keys)
 
         # Lets verify all required parameters are there
-        for required in required_keys:
-            self.assertTrue(required in sample_keys, msg="particle missing parameter '%s', a required key" % required)
-            sample_keys.remove(required)
-
-        # Now lets look for optional fields and removed them from the parameter list
-        for optional in optional_keys:
-            if optional in sample_keys:
-                sample_keys.remove(optional)
+        missing_keys = sorted(required_keys - sample_keys)
+        self.assertEqual(missing_keys, [], msg="particle missing parameters %s, required keys" % missing_keys)
 
-        log.info("Unknown Keys: %s", sample_keys)
-
-        # If there is anything left in the sample keys then it's a problem
-        self.assertEqual(len(sample_keys), 0)
+        # If there is anything left that isn't an optional field then it's a problem
+        unknown_keys = sample_keys - required_keys - optional_keys
+        log.debug("Unknown Keys: %s", unknown_keys)
+        self.assertEqual(len(unknown_keys), 0, msg="unknown particle parameters: %s" % sorted(unknown_keys))
 
     def assert_parameter_value(self, sample_values, param_dict):
         """
@@ -531,23 +562,14 @@ class DriverTestMixin(MiUnitTest, ParticleTestMixin):
         @param sample_values: parsed data particle to inspect
         @param param_dict: dictionary containing parameter validation information
         """
-        for (param_name, param_value) in sample_values.items():
-            log.debug("Data Particle Parameter (%s): %s", param_name, type(param_value))
+        (required_keys, optional_keys, types) = self.get_parameter_expectation(param_dict)
 
+        for (param_name, param_value) in sample_values.items():
             # get the parameter type
-            param_def = param_dict.get(param_name)
-            self.assertIsNotNone(param_def)
-            if isinstance(param_def, dict):
-                param_type = param_def.get(ParameterTestConfigKey.TYPE)
-                self.assertIsNotNone(param_type)
-            else:
-                param_type = param_def
-
-            # is this a required parameter
-            if isinstance(param_def, dict):
-                required = param_def.get(ParameterTestConfigKey.REQUIRED, True)
-            else:
-                required = param_def
+            expected = types.get(param_name)
+            self.assertIsNotNone(expected, msg="unknown parameter %s" % param_name)
+            (param_type, required) = expected
+            self.assertIsNotNone(param_type)
 
             if required:
                 self.assertIsNotNone(param_value, msg="%s required field None" % param_name)
@@ -840,7 +862,10 @@ class InstrumentDriverTestCase(MiIntTestCase):
         """
         @brief Clear the event list.
         """
-        self.events = []
+        if getattr(self, 'event_waiter', None) is None:
+            self.event_waiter = DriverEventWaiter()
+        self.event_waiter.clear()
+        self.events = self.event_waiter.events
 
     def get_events(self, event_type=None):
         """
@@ -848,10 +873,7 @@ class InstrumentDriverTestCase(MiIntTestCase):
         will only contain events of that type.
         @param event_type: type of event we are looking for
         """
-        if event_type is None:
-            return self.events
-        else:
-            return [evt for evt in self.events if evt['type'] == event_type]
+        return self.event_waiter.get_events(event_type)
 
     def get_sample_events(self, event_type=None):
         """
@@ -859,24 +881,13 @@ class InstrumentDriverTestCase(MiIntTestCase):
         @param event_type: what type of data particle are we looking for
         @return: list of data sample events
         """
-        samples = self.get_events(DriverAsyncEvent.SAMPLE)
-        if event_type is None:
-            return samples
-        else:
-            result = []
-            for evt in samples:
-                value = evt.get('value')
-                particle = json.loads(value)
-                if particle and particle.get('stream_name') == event_type:
-                    result.append(evt)
-
-            return result
+        return self.event_waiter.get_sample_events(event_type)
 
     def event_received(self, evt):
         """
         @brief Simple callback to catch events from the driver for verification.
         """
-        self.events.append(evt)
+        self.event_waiter.event_received(evt)
 
     @staticmethod
     def create_serial_comm_config(comm_config):
@@ -1285,6 +1296,7 @@ class InstrumentDriverUnitTestCase(InstrumentDriverTestCase):
         if event_type == DriverAsyncEvent.SAMPLE:
             sample_value = event['value']
             particle_dict = json.loads(sample_value)
+            self.cache_particle_dict(sample_value, particle_dict)
             self._data_particle_received.append(sample_value)
 
     def compare_parsed_data_particle(self, particle_type, raw_input, happy_structure):
@@ -1400,7 +1412,7 @@ class InstrumentDriverUnitTestCase(InstrumentDriverTestCase):
         driver._protocol.got_raw(port_agent_packet)
         self.assertEqual(len(self._data_particle_received), 1)
         particle = self._data_particle_received.pop()
-        particle_dict = json.loads(particle)
+        particle_dict = self.convert_data_particle_to_dict(particle)
         log.debug("Raw Particle: %s", particle_dict)
 
         # Verify the data particle
@@ -1435,7 +1447,7 @@ class InstrumentDriverUnitTestCase(InstrumentDriverTestCase):
         # Find all particles of the correct data particle types (not raw)
         particles = []
         for p in self._data_particle_received:
-            particle_dict = json.loads(p)
+            particle_dict = self.convert_data_particle_to_dict(p)
             stream_type = particle_dict.get('stream_name')
             self.assertIsNotNone(stream_type)
             if stream_type != CommonDataParticleType.RAW:
@@ -1564,16 +1576,19 @@ class InstrumentDriverIntegrationTestCase(InstrumentDriverTestCase):  # Must inh
         @param target_state: State we expect the protocol to be in
         @param timeout: how long to wait for the driver to change states
         """
-        end_time = time.time() + timeout
+        # state changes after the current state is read are seen as events
+        start = len(self.events)
+        state = self.driver_client.cmd_dvr('get_resource_state')
+        if state == target_state:
+            log.debug("Current state match: %s", state)
+            return
 
-        while time.time() <= end_time:
-            state = self.driver_client.cmd_dvr('get_resource_state')
-            if state == target_state:
-                log.debug("Current state match: %s", state)
-                return
-            log.debug("state mismatch %s != %s, sleep for a bit", state, target_state)
-            time.sleep(2)
+        log.debug("state mismatch %s != %s, waiting for a state change", state, target_state)
+        if self.event_waiter.wait_for_state(target_state, timeout, start):
+            log.debug("State change to %s", target_state)
+            return
 
+        state = self.driver_client.cmd_dvr('get_resource_state')
         log.error("Failed to transition state to %s, current state: %s", target_state, state)
         self.fail("Failed to transition state to %s, current state: %s" % (target_state, state))
 
@@ -1704,7 +1719,10 @@ class InstrumentDriverIntegrationTestCase(InstrumentDriverTestCase):  # Must inh
             self.assert_set(param, value, True)
             self.assert_get(param, value)
 
-            time.sleep(1)
+            # only the absence of an event takes the whole second.  A set can
+            # send more than one event, let them all arrive before pass #2.
+            self.event_waiter.wait_for_config_change(1)
+            self.event_waiter.wait_for_quiet(0.5, 5, DriverAsyncEvent.CONFIG_CHANGE)
             events = self.get_events(DriverAsyncEvent.CONFIG_CHANGE)
 
             log.debug("got config change events: %d", len(events))
@@ -1717,7 +1735,7 @@ class InstrumentDriverIntegrationTestCase(InstrumentDriverTestCase):  # Must inh
             # config change event
             self.clear_events()
             self.assert_set(param, value, True)
-            time.sleep(1)
+            self.event_waiter.wait_for_config_change(1)
             events = self.get_events(DriverAsyncEvent.CONFIG_CHANGE)
             log.debug("pass #2 got config change events: %d", len(events))
             self.assertEqual(len(events), 0)
@@ -1869,16 +1887,21 @@ class InstrumentDriverIntegrationTestCase(InstrumentDriverTestCase):  # Must inh
         @param regex: regex to match reply
         @param value_function: function that will return a value to be tested
         @param state: desired protocol state after the command is run.
-        @param delay: how long to wait, in seconds, after the command is executed before we can run tests
+        @param delay: how long to wait, in seconds, after the command is executed before we can run tests.
+                      With a state, the wait ends as soon as the driver changes to that state.
         @param regex_options: options to pass to the regular expression compile
         @param assert_function: assert method to call
         """
         # Execute the command
+        start = len(self.events)
         reply = value = self.driver_client.cmd_dvr('execute_resource', command, )
         log.debug("Execute driver command: %s", command)
         log.debug("Reply type: %s", type(reply))
 
-        if delay:
+        if delay and state is not None:
+            log.debug("waiting up to %d for state %s", delay, state)
+            self.event_waiter.wait_for_state(state, delay, start)
+        elif delay:
             log.debug("sleeping for a bit: %d", delay)
             time.sleep(delay)
 
@@ -1930,11 +1953,14 @@ class InstrumentDriverIntegrationTestCase(InstrumentDriverTestCase):  # Must inh
         @param command: command used to generate the particle
         @param particle_type: particle type we are looking for
         @param particle_callback: callback used to validate the particle
-        @param timeout: command timeout
+        @param delay: how long to wait for the particle
+        @param timeout: how long to wait for the particle, overrides delay
         """
-        self.assert_driver_command(command, delay=delay)
+        self.assert_driver_command(command)
 
-        samples = self.get_sample_events(particle_type)
+        if timeout is None:
+            timeout = delay
+        samples = self.event_waiter.wait_for_samples(particle_type, 1, timeout)
         self.assertGreaterEqual(len(samples), 1)
 
         sample = samples.pop()
@@ -1943,7 +1969,7 @@ class InstrumentDriverIntegrationTestCase(InstrumentDriverTestCase):  # Must inh
         value = sample.get('value')
         self.assertIsNotNone(value)
 
-        particle = json.loads(value)
+        particle = self.event_waiter.get_particle(sample)
         self.assertIsNotNone(particle)
 
         particle_callback(particle)
@@ -1955,28 +1981,22 @@ class InstrumentDriverIntegrationTestCase(InstrumentDriverTestCase):  # Must inh
         @param particle_callback: callback used to validate the particle
         @param timeout: how long should we wait for a particle
         """
-        end_time = time.time() + timeout
-
-        while True:
-            samples = self.get_sample_events(particle_type)
-            if len(samples) >= particle_count:
-                for sample in samples:
-                    self.assertIsNotNone(sample)
+        samples = self.event_waiter.wait_for_samples(particle_type, particle_count, timeout)
+        log.trace("Found %d samples, looking for %d", len(samples), particle_count)
+        self.assertGreaterEqual(len(samples), particle_count, msg="Timeout waiting for sample")
 
-                    value = sample.get('value')
-                    self.assertIsNotNone(value)
+        for sample in samples:
+            self.assertIsNotNone(sample)
 
-                    particle = json.loads(value)
-                    self.assertIsNotNone(particle)
+            value = sample.get('value')
+            self.assertIsNotNone(value)
 
-                    # So we have found one particle and verified it.  We are done here!
-                    particle_callback(particle)
-                log.debug('Found %d particles and all particles verified', len(samples))
-                return
+            particle = self.event_waiter.get_particle(sample)
+            self.assertIsNotNone(particle)
 
-            log.trace("Only found %d samples, looking for %d", len(samples), particle_count)
-            self.assertGreater(end_time, time.time(), msg="Timeout waiting for sample")
-            time.sleep(.3)
+            # So we have found one particle and verified it.  We are done here!
+            particle_callback(particle)
+        log.debug('Found %d particles and all particles verified', len(samples))
 
     def assert_scheduled_event(self, job_name, assert_callback=None, autosample_command=None, delay=5):
         """
@@ -2072,7 +2092,7 @@ class InstrumentDriverIntegrationTestCase(InstrumentDriverTestCase):  # Must inh
             'And I am important event #2!'
         ]
         reply = self.driver_client.cmd_dvr('test_events', events=events)
-        gevent.sleep(1)
+        self.event_waiter.wait_for(lambda received: len(received) >= len(events), 1)
 
         # Confirm the events received are as expected.
         self.assertEqual(self.events, events)
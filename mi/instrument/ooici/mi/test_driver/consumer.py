@@ -0,0 +1,174 @@
+"""
+@package mi.instrument.ooici.mi.test_driver.consumer
+@file marine-integrations/mi/instrument/ooici/mi/test_driver/consumer.py
+@author agent
+@brief Consumer side statistics for the test driver packet generator
+
+A PacketStatistics object can be passed as the event callback of a driver
+client.  It decodes the packet header the test driver places at the start
+of every raw payload and keeps per stream counts of received, lost,
+duplicate and out of order packets along with end to end latencies.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import json
+import time
+import base64
+
+from mi.core.log import get_logger ; log = get_logger()
+
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.instrument.data_particle import RawDataParticleKey
+
+from mi.instrument.ooici.mi.test_driver.driver import PACKET_HEADER
+
+
+def percentile(values, fraction):
+    """
+    Nearest rank percentile of a sorted list.
+    @param values sorted list of numbers
+    @param fraction percentile as a fraction between 0 and 1
+    @retval the percentile value or None if values is empty
+    """
+    if not values:
+        return None
+    index = int(round(fraction * (len(values) - 1)))
+    return values[index]
+
+
+class StreamStatistics(object):
+    """
+    Counters for a single generator stream.
+    """
+    def __init__(self):
+        self.received = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.highest = -1
+        self.seen = set()
+        self.latencies = []
+        self.bytes = 0
+
+    def add(self, sequence, latency, size):
+        if sequence in self.seen:
+            self.duplicates += 1
+            return
+
+        self.seen.add(sequence)
+        self.received += 1
+        self.bytes += size
+        self.latencies.append(latency)
+
+        if sequence < self.highest:
+            self.reordered += 1
+        else:
+            self.highest = sequence
+
+    def lost(self):
+        """
+        Packets below the highest sequence seen that never arrived.
+        """
+        return self.highest + 1 - self.received
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        return {
+            'received': self.received,
+            'lost': self.lost(),
+            'duplicates': self.duplicates,
+            'reordered': self.reordered,
+            'bytes': self.bytes,
+            'latency_min': latencies[0] if latencies else None,
+            'latency_p50': percentile(latencies, .5),
+            'latency_p95': percentile(latencies, .95),
+            'latency_p99': percentile(latencies, .99),
+            'latency_max': latencies[-1] if latencies else None,
+        }
+
+
+class PacketStatistics(object):
+    """
+    Driver event callback that accumulates packet statistics from the test
+    driver's SAMPLE events.  Latency is measured against the local clock so
+    the producer and consumer should share a host or a synchronised clock.
+    """
+    def __init__(self):
+        self.streams = {}
+        self.errors = 0
+        self.start_time = None
+        self.last_time = None
+
+    def __call__(self, event, value=None):
+        """
+        Event callback entry point.  Accepts either a driver client event
+        dict or the (event type, value) pair a protocol publishes with.
+        @param event driver event dict or event type
+        @param value event value when event is an event type
+        """
+        if isinstance(event, dict):
+            event, value = event.get('type'), event.get('value')
+        if event != DriverAsyncEvent.SAMPLE:
+            return
+
+        now = time.time()
+        try:
+            particle = value
+            if isinstance(particle, basestring):
+                particle = json.loads(particle)
+            payload = None
+            for item in particle[DataParticleKey.VALUES]:
+                if item[DataParticleKey.VALUE_ID] == RawDataParticleKey.PAYLOAD:
+                    payload = base64.b64decode(item[DataParticleKey.VALUE])
+                    break
+            stream, sequence, sent = PACKET_HEADER.unpack_from(payload)
+        except Exception as e:
+            log.debug("PacketStatistics: unable to decode sample: %s", e)
+            self.errors += 1
+            return
+
+        self.add(stream, sequence, sent, len(payload), now)
+
+    def add(self, stream, sequence, sent, size, received=None):
+        """
+        Record a packet.
+        @param stream stream index from the packet header
+        @param sequence sequence number from the packet header
+        @param sent send time from the packet header
+        @param size payload size in bytes
+        @param received receive time, defaults to now
+        """
+        if received is None:
+            received = time.time()
+        if self.start_time is None:
+            self.start_time = received
+        self.last_time = received
+
+        stats = self.streams.get(stream)
+        if stats is None:
+            stats = self.streams[stream] = StreamStatistics()
+        stats.add(sequence, received - sent, size)
+
+    def report(self):
+        """
+        @retval dict with an entry per stream plus totals and the achieved rate
+        """
+        streams = dict((stream, stats.report()) for stream, stats in self.streams.iteritems())
+        received = sum(s['received'] for s in streams.itervalues())
+
+        elapsed = 0
+        if self.start_time is not None:
+            elapsed = self.last_time - self.start_time
+
+        return {
+            'streams': streams,
+            'received': received,
+            'lost': sum(s['lost'] for s in streams.itervalues()),
+            'duplicates': sum(s['duplicates'] for s in streams.itervalues()),
+            'reordered': sum(s['reordered'] for s in streams.itervalues()),
+            'errors': self.errors,
+            'elapsed': elapsed,
+            'rate': (received - 1) / elapsed if elapsed > 0 else None,
+        }
@@ -7,6 +7,13 @@ Release notes:
 
 This driver is used for coi testing
 
+In autosample the driver publishes raw particles from one or more
+concurrent streams, paced against absolute deadlines so the achieved rate
+does not drift with processing time.  Every payload starts with a packet
+header holding the stream index, a per stream sequence number and the send
+time, which the consumer module uses to measure loss, reordering and
+latency.
+
 """
 
 __author__ = 'Bill French'
@@ -14,6 +21,7 @@ __license__ = 'Apache 2.0'
 
 import string
 import time
+import math
 import random
 import struct
 import base64
@@ -21,6 +29,7 @@ import base64
 from mi.core.log import get_logger ; log = get_logger()
 
 from threading import Thread
+from threading import Event
 
 import mi.core.time
 
@@ -50,6 +59,13 @@ NEWLINE = '\r\n'
 # default timeout.
 TIMEOUT = 10
 
+# stream index, sequence number, send time (seconds since the epoch)
+PACKET_HEADER = struct.Struct('>HQd')
+
+# Generators more than this many seconds behind schedule resynchronise
+# rather than publishing the backlog as fast as possible.
+MAX_SCHEDULE_LAG = 5
+
 ###
 #    Driver Constant Definitions
 ###
@@ -101,6 +117,22 @@ class ParameterName(DriverParameter):
     """
     PAYLOAD_SIZE = 'PAYLOAD_SIZE'
     SAMPLE_INTERVAL = 'SAMPLE_INTERVAL'
+    SAMPLE_RATE = 'SAMPLE_RATE'
+    RATE_PROFILE = 'RATE_PROFILE'
+    BURST_SIZE = 'BURST_SIZE'
+    RAMP_TIME = 'RAMP_TIME'
+    STREAM_COUNT = 'STREAM_COUNT'
+
+class RateProfile(BaseEnum):
+    """
+    How packets are spread over time by the packet generator.
+    CONSTANT - evenly spaced at the target rate
+    BURST - BURST_SIZE packets back to back, averaging the target rate
+    RAMP - rate increases linearly from zero to the target over RAMP_TIME
+    """
+    CONSTANT = 'CONSTANT'
+    BURST = 'BURST'
+    RAMP = 'RAMP'
 
 class Prompt(BaseEnum):
     """
@@ -148,6 +180,42 @@ class TestDataParticle(RawDataParticle):
         return result
 
 
+def packet_schedule(start, rate, profile=RateProfile.CONSTANT, burst_size=1, ramp_time=0):
+    """
+    Generate the deadline, in seconds since the epoch, for each packet.
+    @param start time of the first deadline
+    @param rate target rate in packets per second
+    @param profile a RateProfile value
+    @param burst_size packets per burst for the BURST profile
+    @param ramp_time seconds to reach the target rate for the RAMP profile
+    """
+    if rate <= 0:
+        raise InstrumentParameterException('Sample rate must be positive: %s' % rate)
+
+    count = 0
+    if profile == RateProfile.BURST:
+        burst_size = max(1, burst_size)
+        while True:
+            deadline = start + (count // burst_size) * burst_size / float(rate)
+            yield deadline
+            count += 1
+
+    elif profile == RateProfile.RAMP and ramp_time > 0:
+        # packets sent by the end of the ramp
+        ramp_count = rate * ramp_time / 2.0
+        while True:
+            if count < ramp_count:
+                yield start + math.sqrt(2.0 * count * ramp_time / rate)
+            else:
+                yield start + ramp_time + (count - ramp_count) / rate
+            count += 1
+
+    else:
+        while True:
+            yield start + count / float(rate)
+            count += 1
+
+
 ###############################################################################
 # Driver
 ###############################################################################
@@ -295,6 +363,9 @@ class Protocol(CommandResponseInstrumentProtocol):
 
         self._payload_cache = {}
 
+        self._stop_generator = Event()
+        self._generator_threads = []
+
 
     @staticmethod
     def sieve_function(raw_data):
@@ -331,6 +402,51 @@ class Protocol(CommandResponseInstrumentProtocol):
                       direct_access = True,
                       default_value = 1)
         )
+        self._param_dict.add_parameter(
+            Parameter(ParameterName.SAMPLE_RATE,
+                      float,
+                      type=ParameterDictType.FLOAT,
+                      display_name="Sample Rate (packets/sec), 0 to use the sample interval",
+                      startup_param = True,
+                      direct_access = True,
+                      default_value = 0.0)
+        )
+        self._param_dict.add_parameter(
+            Parameter(ParameterName.RATE_PROFILE,
+                      str,
+                      type=ParameterDictType.STRING,
+                      display_name="Rate Profile",
+                      startup_param = True,
+                      direct_access = True,
+                      default_value = RateProfile.CONSTANT)
+        )
+        self._param_dict.add_parameter(
+            Parameter(ParameterName.BURST_SIZE,
+                      int,
+                      type=ParameterDictType.INT,
+                      display_name="Burst Size (packets)",
+                      startup_param = True,
+                      direct_access = True,
+                      default_value = 10)
+        )
+        self._param_dict.add_parameter(
+            Parameter(ParameterName.RAMP_TIME,
+                      int,
+                      type=ParameterDictType.INT,
+                      display_name="Ramp Time (sec)",
+                      startup_param = True,
+                      direct_access = True,
+                      default_value = 60)
+        )
+        self._param_dict.add_parameter(
+            Parameter(ParameterName.STREAM_COUNT,
+                      int,
+                      type=ParameterDictType.INT,
+                      display_name="Stream Count",
+                      startup_param = True,
+                      direct_access = True,
+                      default_value = 1)
+        )
 
     def _got_chunk(self, chunk):
         """
@@ -518,35 +634,83 @@ class Protocol(CommandResponseInstrumentProtocol):
     # Helpers
     ########################################################################
     def _start_packet_generator(self):
+        """
+        Start one generator thread per stream.  Stream n publishes payloads
+        of (n + 1) * PAYLOAD_SIZE bytes at the configured rate and profile.
+        """
         packet_size = self._param_dict.get(ParameterName.PAYLOAD_SIZE)
+        self._verify_payload_size(packet_size)
         sample_interval = self._param_dict.get(ParameterName.SAMPLE_INTERVAL)
+        rate = self._param_dict.get(ParameterName.SAMPLE_RATE)
+        if not rate:
+            rate = 1.0 / sample_interval
+
+        profile = self._param_dict.get(ParameterName.RATE_PROFILE)
+        if not RateProfile.has(profile):
+            raise InstrumentParameterException('Unknown rate profile: %s' % profile)
+        burst_size = self._param_dict.get(ParameterName.BURST_SIZE)
+        ramp_time = self._param_dict.get(ParameterName.RAMP_TIME)
+        stream_count = max(1, self._param_dict.get(ParameterName.STREAM_COUNT))
+
+        self._stop_generator = Event()
+        self._generator_threads = []
+        start = time.time()
+        for stream in range(stream_count):
+            stream_packet_size = packet_size * (stream + 1)
+            self._generate_payload_value(stream_packet_size)
+            schedule = packet_schedule(start, rate, profile, burst_size, ramp_time)
+            thread = Thread(target=self._generate_packets,
+                            args=(stream_packet_size, schedule, self._publish_packet, stream))
+            thread.start()
+            self._generator_threads.append(thread)
+
+    def _generate_packets(self, packet_size, schedule, publish_callback, stream=0):
+        """
+        Publish packets at the deadlines from schedule until stopped.
+        Waiting for an absolute deadline, rather than sleeping for an
+        interval after each packet, keeps the rate from drifting with the
+        time spent publishing.
+        """
+        log.debug("_generate_packets, starting packet generator %d. packet_size: %s",
+                  stream, packet_size)
+
+        sequence = 0
+        lag = 0
+        for deadline in schedule:
+            deadline += lag
+            delay = deadline - time.time()
+            if delay > 0:
+                if self._stop_generator.wait(delay):
+                    break
+            elif delay < -MAX_SCHEDULE_LAG:
+                log.warning("_generate_packets, stream %d is %.1fs behind schedule, resynchronising",
+                            stream, -delay)
+                lag -= delay
+
+            if self._stop_generator.is_set():
+                break
+
+            publish_callback(packet_size, stream, sequence)
+            sequence += 1
+
+        log.debug("_generate_packets, stopping packet generator %d after %d packets", stream, sequence)
 
-        self._generate_payload_value(packet_size)
-
-        self._stop_generator_thread = False
-        self._generator_thread = Thread(
-            target=self._generate_packets,
-            args=(packet_size, sample_interval, self._publish_packet ))
-        self._generator_thread.start()
-
-    def _generate_packets(self, *args, **kwargs):
-        packet_size = args[0]
-        sample_interval = args[1]
-        publish_callback = args[2]
-
-        log.debug("_generate_packets, starting packet generator. packet_size: %s, sample_interval: %s", packet_size, sample_interval)
-
-        while(self._stop_generator_thread != True):
-            publish_callback(packet_size)
-            time.sleep(sample_interval)
-
-        log.debug("_generate_packets, stopping packet generator")
+    @staticmethod
+    def _verify_payload_size(packet_size):
+        """
+        Payloads start with the packet header, so can not be smaller.
+        @raise InstrumentParameterException if packet_size is smaller
+        """
+        if packet_size < PACKET_HEADER.size:
+            raise InstrumentParameterException('Payload size must be at least %d bytes: %s' %
+                                               (PACKET_HEADER.size, packet_size))
 
-    def _publish_packet(self, packet_size):
-        buf = self._get_payload_value(packet_size)
+    def _publish_packet(self, packet_size, stream=0, sequence=0):
+        buf = PACKET_HEADER.pack(stream, sequence, time.time()) + \
+            self._get_payload_value(packet_size)[PACKET_HEADER.size:]
         particle = TestDataParticle(buf, port_timestamp=mi.core.time.time_to_ntp_date_time())
 
-        log.debug("_publish_packet, packet size: %d", len(buf))
+        log.trace("_publish_packet, stream %d, sequence %d, packet size: %d", stream, sequence, len(buf))
         self._driver_event(DriverAsyncEvent.SAMPLE, particle.generate())
 
     def _get_payload_value(self, packet_size):
@@ -557,16 +721,17 @@ class Protocol(CommandResponseInstrumentProtocol):
 
     def _generate_payload_value(self, packet_size):
         log.debug("generating new value, packet size: %s", packet_size)
-        charlist = [random.choice(string.letters) for _ in range(packet_size)]
-        buf = struct.pack('%sc' % len(charlist), *charlist)
+        buf = ''.join([random.choice(string.letters) for _ in range(packet_size)])
         self._payload_cache[packet_size] = buf
         return buf
 
     def _stop_packet_generator(self):
-        log.debug("_stop_packet_generator: Signal the packet generator to stop")
-        self._stop_generator_thread = True
+        log.debug("_stop_packet_generator: Signal the packet generators to stop")
+        self._stop_generator.set()
 
-        self._generator_thread.join(60)
+        for thread in self._generator_threads:
+            thread.join(60)
+        self._generator_threads = []
 
     def _set_params(self, *args, **kwargs):
         """
@@ -587,6 +752,9 @@ class Protocol(CommandResponseInstrumentProtocol):
         except IndexError:
             pass
 
+        if ParameterName.PAYLOAD_SIZE in params:
+            self._verify_payload_size(params[ParameterName.PAYLOAD_SIZE])
+
         for (key, val) in params.iteritems():
             log.debug("KEY = " + str(key) + " VALUE = " + str(val))
             if self._param_dict.get(key) != val:
@@ -16,6 +16,7 @@ USAGE:
 __author__ = 'Bill French'
 __license__ = 'Apache 2.0'
 
+import time
 import unittest
 import gevent
 
@@ -41,6 +42,7 @@ from mi.core.instrument.instrument_driver import DriverConnectionState
 from mi.core.instrument.instrument_driver import DriverProtocolState
 from mi.core.instrument.data_particle import RawDataParticle
 from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.exceptions import InstrumentParameterException
 
 from ion.agents.instrument.instrument_agent import InstrumentAgentState
 from ion.agents.instrument.direct_access.direct_access_server import DirectAccessTypes
@@ -55,6 +57,11 @@ from mi.instrument.ooici.mi.test_driver.driver import ParameterName
 from mi.instrument.ooici.mi.test_driver.driver import Protocol
 from mi.instrument.ooici.mi.test_driver.driver import Prompt
 from mi.instrument.ooici.mi.test_driver.driver import NEWLINE
+from mi.instrument.ooici.mi.test_driver.driver import PACKET_HEADER
+from mi.instrument.ooici.mi.test_driver.driver import RateProfile
+from mi.instrument.ooici.mi.test_driver.driver import TestDataParticle
+from mi.instrument.ooici.mi.test_driver.driver import packet_schedule
+from mi.instrument.ooici.mi.test_driver.consumer import PacketStatistics
 
 ###
 #   Driver parameters for the tests
@@ -184,6 +191,95 @@ class DriverUnitTest(InstrumentDriverUnitTestCase, DriverTestMixinSub):
         self.assertEquals(sorted(driver_capabilities),
                           sorted(protocol._filter_capabilities(test_capabilities)))
 
+    def test_packet_schedule(self):
+        """
+        Verify the generator deadlines for each rate profile
+        """
+        def deadlines(count, *args):
+            schedule = packet_schedule(100.0, *args)
+            return [next(schedule) for _ in range(count)]
+
+        self.assertEqual(deadlines(4, 10), [100.0, 100.1, 100.2, 100.3])
+        self.assertEqual(deadlines(6, 10, RateProfile.BURST, 3), [100.0, 100.0, 100.0, 100.3, 100.3, 100.3])
+
+        # Ramp to 10 packets/sec over 2 seconds: 10 packets sent during the ramp
+        ramp = deadlines(12, 10, RateProfile.RAMP, 1, 2)
+        self.assertEqual(ramp[0], 100.0)
+        self.assertTrue(all(a < b for a, b in zip(ramp, ramp[1:])))
+        self.assertAlmostEqual(ramp[10], 102.0)
+        self.assertAlmostEqual(ramp[11], 102.1)
+
+        with self.assertRaises(InstrumentParameterException):
+            deadlines(1, 0)
+
+    def test_payload_size(self):
+        """
+        Verify payloads smaller than the packet header are rejected
+        """
+        protocol = Protocol(Prompt, NEWLINE, lambda *args: None)
+        protocol._param_dict.set_value(ParameterName.PAYLOAD_SIZE, 64)
+        with self.assertRaises(InstrumentParameterException):
+            protocol._set_params({ParameterName.PAYLOAD_SIZE: PACKET_HEADER.size - 1})
+        self.assertEqual(protocol._param_dict.get(ParameterName.PAYLOAD_SIZE), 64)
+
+        protocol._set_params({ParameterName.PAYLOAD_SIZE: PACKET_HEADER.size})
+        self.assertEqual(protocol._param_dict.get(ParameterName.PAYLOAD_SIZE), PACKET_HEADER.size)
+
+        protocol._param_dict.set_value(ParameterName.PAYLOAD_SIZE, 1)
+        with self.assertRaises(InstrumentParameterException):
+            protocol._start_packet_generator()
+
+    def test_packet_statistics(self):
+        """
+        Verify the consumer decodes packet headers and counts loss, duplicates and reordering
+        """
+        stats = PacketStatistics()
+
+        def publish(stream, sequence):
+            buf = PACKET_HEADER.pack(stream, sequence, time.time()) + 'x' * 10
+            stats({'type': DriverAsyncEvent.SAMPLE, 'value': TestDataParticle(buf).generate()})
+
+        for sequence in [0, 1, 3, 2, 2, 5]:
+            publish(0, sequence)
+        publish(1, 0)
+        stats({'type': DriverAsyncEvent.STATE_CHANGE, 'value': ProtocolState.COMMAND})
+
+        report = stats.report()
+        self.assertEqual(report['received'], 6)
+        self.assertEqual(report['lost'], 1)
+        self.assertEqual(report['duplicates'], 1)
+        self.assertEqual(report['reordered'], 1)
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(report['streams'][0]['bytes'], 5 * (PACKET_HEADER.size + 10))
+        self.assertGreaterEqual(report['streams'][0]['latency_min'], 0)
+
+    def test_packet_generator(self):
+        """
+        Verify the generator threads publish at the target rate on every stream
+        """
+        stats = PacketStatistics()
+        protocol = Protocol(Prompt, NEWLINE, stats)
+        protocol._param_dict.set_value(ParameterName.PAYLOAD_SIZE, 64)
+        protocol._param_dict.set_value(ParameterName.SAMPLE_INTERVAL, 1)
+        protocol._param_dict.set_value(ParameterName.SAMPLE_RATE, 50.0)
+        protocol._param_dict.set_value(ParameterName.RATE_PROFILE, RateProfile.CONSTANT)
+        protocol._param_dict.set_value(ParameterName.BURST_SIZE, 10)
+        protocol._param_dict.set_value(ParameterName.RAMP_TIME, 0)
+        protocol._param_dict.set_value(ParameterName.STREAM_COUNT, 2)
+
+        protocol._start_packet_generator()
+        time.sleep(1)
+        protocol._stop_packet_generator()
+
+        report = stats.report()
+        log.debug("packet generator report: %s", report)
+        self.assertEqual(sorted(report['streams'].keys()), [0, 1])
+        self.assertEqual(report['lost'], 0)
+        self.assertEqual(report['streams'][1]['bytes'], report['streams'][1]['received'] * 128)
+        for stream in report['streams'].values():
+            self.assertGreaterEqual(stream['received'], 40)
+            self.assertLessEqual(stream['received'], 52)
+
 
 ###############################################################################
 #                            INTEGRATION TESTS                                #
@@ -219,6 +315,9 @@ class DriverIntegrationTest(InstrumentDriverIntegrationTestCase, DriverTestMixin
         # Verify defaults
         self.assert_get(ParameterName.PAYLOAD_SIZE, 1024)
         self.assert_get(ParameterName.SAMPLE_INTERVAL, 1)
+        self.assert_get(ParameterName.SAMPLE_RATE, 0.0)
+        self.assert_get(ParameterName.RATE_PROFILE, RateProfile.CONSTANT)
+        self.assert_get(ParameterName.STREAM_COUNT, 1)
 
         # Try and update
         self.assert_set(ParameterName.PAYLOAD_SIZE, 2048, False)
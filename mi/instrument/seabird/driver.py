@@ -13,6 +13,10 @@ __license__ = 'Apache 2.0'
 
 import re
 
+from types import FunctionType
+from cStringIO import StringIO
+from xml.etree import cElementTree
+
 from mi.core.log import get_logger ; log = get_logger()
 
 from mi.core.exceptions import NotImplementedException
@@ -50,12 +54,114 @@ DEFAULT_ENCODER_KEY = '__default__'
 # Particles
 ###############################################################################
 
+# static methods returning a compiled pattern, called once per class
+COMPILED_REGEX_METHODS = ('regex_compiled', 'resp_regex_compiled')
+
+# static methods returning the pattern string, checked at class creation
+REGEX_METHODS = ('regex', 'resp_regex')
+
+
+def _compile_once(func):
+    """
+    Wrap a function returning a compiled regex so it is only called once.
+    @param func: function without arguments returning a compiled regex
+    @return: function returning the same compiled regex on every call
+    """
+    cache = []
+
+    def compiled():
+        if not cache:
+            cache.append(func())
+        return cache[0]
+    compiled.__name__ = func.__name__
+    compiled.__doc__ = func.__doc__
+    compiled.compile_once = True
+    return compiled
+
+
+def _compile_multiline(regexs):
+    """
+    @param regexs: dictionary of uncompiled multiline regexs
+    @return: dictionary of the same regexs compiled with re.DOTALL
+    """
+    result = {}
+    for (key, regex) in regexs.iteritems():
+        result[key] = re.compile(regex, re.DOTALL)
+    return result
+
+
+class SeaBirdParticleMetaClass(type):
+    """
+    Metaclass of the SBE particles.  When a particle class is created the
+    patterns returned by its regex, resp_regex and regex_multiline methods
+    are compiled, so a bad pattern fails on import rather than on the first
+    sample, and the compiled multiline patterns are kept on the class.
+    regex_compiled and resp_regex_compiled refer to their class by name, so
+    they can't run yet; they are wrapped to compile on their first call and
+    return the same pattern object after that.
+    """
+    def __new__(mcs, class_name, bases, class_dict):
+        class_dict = dict(class_dict)
+
+        for name in COMPILED_REGEX_METHODS:
+            method = class_dict.get(name)
+            if isinstance(method, staticmethod):
+                class_dict[name] = staticmethod(_compile_once(method.__get__(None, object)))
+
+        for name in REGEX_METHODS:
+            method = class_dict.get(name)
+            if isinstance(method, staticmethod):
+                regex = method.__get__(None, object)()
+                if regex is not None:
+                    mcs._check_regex(class_name, name, regex)
+
+        multiline = class_dict.get('regex_multiline')
+        if isinstance(multiline, FunctionType):
+            class_dict['_multiline_compiled'] = mcs._precompile_multiline(class_name, multiline)
+
+        return type.__new__(mcs, class_name, bases, class_dict)
+
+    @staticmethod
+    def _check_regex(class_name, name, regex):
+        try:
+            re.compile(regex, re.DOTALL)
+        except re.error as e:
+            raise re.error("%s.%s: %s" % (class_name, name, e))
+
+    @staticmethod
+    def _precompile_multiline(class_name, multiline):
+        """
+        Compile the regex_multiline patterns of a class.  The method is
+        called without an instance, which works for the SBE particles since
+        their patterns are constants.
+        @return: dictionary of compiled regexs, None if the patterns depend
+                 on the instance and have to be compiled on each call
+        """
+        try:
+            regexs = multiline(None)
+        except (AttributeError, TypeError) as e:
+            log.debug("%s.regex_multiline needs an instance, not precompiled: %s", class_name, e)
+            return None
+
+        if regexs is None:
+            return None
+
+        for (key, regex) in regexs.iteritems():
+            SeaBirdParticleMetaClass._check_regex(class_name, 'regex_multiline[%s]' % key, regex)
+        return _compile_multiline(regexs)
+
+
 class SeaBirdParticle(DataParticle):
     """
     Overload the base particle to add in some common parsing logic for SBE
     instruments.  Add regex methods to help identify and parse multiline
     strings.
     """
+    __metaclass__ = SeaBirdParticleMetaClass
+
+    # compiled regex_multiline patterns, shared by all instances of a class
+    _multiline_compiled = None
+
     @staticmethod
     def regex():
         '''
@@ -86,14 +192,14 @@ class SeaBirdParticle(DataParticle):
     def regex_multiline_compiled(self):
         '''
         return a dictionary containing compiled regex used to match patterns
-        in SBE multiline results.
+        in SBE multiline results.  The patterns are compiled once per class
+        when it is created, the dictionary is shared so don't modify it.
         @return: dictionary of compiled regexs
         '''
-        result = {}
-        for (key, regex) in self.regex_multiline().iteritems():
-            result[key] = re.compile(regex, re.DOTALL)
+        if self._multiline_compiled is not None:
+            return self._multiline_compiled
 
-        return result
+        return _compile_multiline(self.regex_multiline())
 
     def encoders(self):
         '''
@@ -117,13 +223,12 @@ class SeaBirdParticle(DataParticle):
 
         log.debug("Let the parsing begin!")
         matchers = self.regex_multiline_compiled()
-        regexs = self.regex_multiline()
 
         for line in split_fun(self.raw_data):
             log.trace("Line: %s" % line)
-            for key in matchers.keys():
-                log.trace("match: %s" % regexs.get(key))
-                match = matchers[key].search(line)
+            for key, matcher in matchers.iteritems():
+                log.trace("match: %s" % matcher.pattern)
+                match = matcher.search(line)
                 if(match):
                     encoder = self._get_encoder(key)
                     if(encoder):
@@ -167,15 +272,52 @@ class SeaBirdParticle(DataParticle):
         '''
         NotImplementedException()
 
+    def _parse_xml(self):
+        """
+        Parse the XML in raw_data in a single pass with cElementTree
+        iterparse.  While parsing, every element is indexed by tag under
+        each of its ancestors, so the _extract_xml_* lookups below are
+        dictionary lookups instead of a walk of the document per parameter.
+        @return: root element of the document
+        @throws SampleException if raw_data isn't well formed XML
+        """
+        index = {}
+        path = []
+        root = None
+        try:
+            for (event, element) in cElementTree.iterparse(StringIO(self.raw_data), events=('start', 'end')):
+                if event == 'start':
+                    path.append(element)
+                    index[element] = {}
+                else:
+                    path.pop()
+                    for parent in path:
+                        index[parent].setdefault(element.tag, []).append(element)
+                    root = element
+        except SyntaxError as e:
+            raise SampleException("_parse_xml: %s in input data: [%s]" % (e, self.raw_data))
+
+        self._xml_index = index
+        return root
+
     def _extract_xml_elements(self, node, tag, raise_exception_if_none_found=True):
         """
         extract elements with tag from an XML node
-        @param: node - XML node to look in
+        @param: node - XML node to look in, an element returned by _parse_xml
+                       or a minidom node
         @param: tag - tag of elements to look for
         @param: raise_exception_if_none_found - raise an exception if no element is found
         @return: return list of elements found; empty list if none found
         """
-        elements = node.getElementsByTagName(tag)
+        if hasattr(node, 'getElementsByTagName'):
+            elements = node.getElementsByTagName(tag)
+        else:
+            descendants = getattr(self, '_xml_index', {}).get(node)
+            if descendants is None:
+                elements = [element for element in node.iter(tag) if element is not node]
+            else:
+                elements = descendants.get(tag, [])
+
         if raise_exception_if_none_found and len(elements) == 0:
             raise SampleException("_extract_xml_elements: No %s in input data: [%s]" % (tag, self.raw_data))
         return elements
@@ -189,16 +331,29 @@ class SeaBirdParticle(DataParticle):
         @return: return value of element
         """
         elements = self._extract_xml_elements(node, tag, raise_exception_if_none_found)
-        children = elements[0].childNodes
-        if raise_exception_if_none_found and len(children) == 0:
+        if hasattr(elements[0], 'childNodes'):
+            children = elements[0].childNodes
+            value = children[0].nodeValue if len(children) else None
+        else:
+            value = elements[0].text
+
+        if raise_exception_if_none_found and value is None:
             raise SampleException("_extract_xml_element_value: No value for %s in input data: [%s]" % (tag, self.raw_data))
-        return children[0].nodeValue
-    
+        return value
+
     def _get_xml_parameter(self, xml_element, parameter_name, type=float):
+        """
+        Build a particle value from the element mapped to parameter_name by
+        _map_param_to_xml_tag.
+        @param: xml_element - XML node to look in
+        @param: parameter_name - particle key of the value
+        @param: type - conversion function of the element value
+        @return: particle value dictionary
+        """
         return {DataParticleKey.VALUE_ID: parameter_name,
-                DataParticleKey.VALUE: type(self._extract_xml_element_value(xml_element, 
+                DataParticleKey.VALUE: type(self._extract_xml_element_value(xml_element,
                                                                             self._map_param_to_xml_tag(parameter_name)))}
-        
+
     ########################################################################
     # Static helpers.
     ########################################################################
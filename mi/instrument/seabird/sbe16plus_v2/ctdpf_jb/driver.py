@@ -40,8 +40,6 @@ from mi.core.exceptions import InstrumentProtocolException
 from mi.core.exceptions import InstrumentParameterException
 from mi.core.exceptions import SampleException
 
-from xml.dom.minidom import parseString
-
 from mi.core.instrument.protocol_param_dict import ParameterDictVisibility
 from mi.core.instrument.protocol_param_dict import ParameterDictType
 
@@ -321,10 +319,9 @@ class SBE19ConfigurationParticle(SeaBirdParticle):
             raise SampleException("No regex match of parsed configuration data: [%s]" %
                                   self.raw_data)
 
-        dom = parseString(self.raw_data)
-        root = dom.documentElement
-        log.debug("root.tagName = %s", root.tagName)
-        serial_number = int(root.getAttribute(SERIAL_NUMBER))
+        root = self._parse_xml()
+        log.debug("root.tag = %s", root.tag)
+        serial_number = int(root.get(SERIAL_NUMBER, ''))
         result = [{DataParticleKey.VALUE_ID: SBE19ConfigurationParticleKey.SERIAL_NUMBER,
                    DataParticleKey.VALUE: serial_number}]
 
@@ -443,14 +440,13 @@ class SBE19StatusParticle(SeaBirdParticle):
             raise SampleException("No regex match of parsed status data: [%s]" %
                                   self.raw_data)
 
-        dom = parseString(self.raw_data)
-        root = dom.documentElement
-        log.debug("root.tagName = %s", root.tagName)
-        serial_number = int(root.getAttribute(SERIAL_NUMBER))
+        root = self._parse_xml()
+        log.debug("root.tag = %s", root.tag)
+        serial_number = int(root.get(SERIAL_NUMBER, ''))
         date_time = self._extract_xml_element_value(root, DATE_TIME)
         logging_status = self._extract_xml_element_value(root, LOGGING_STATE)
         event_summary = self._extract_xml_elements(root, EVENT_SUMMARY)[0]
-        number_of_events = int(event_summary.getAttribute(NUMBER_OF_EVENTS))
+        number_of_events = int(event_summary.get(NUMBER_OF_EVENTS, ''))
         result = [{DataParticleKey.VALUE_ID: SBE19StatusParticleKey.SERIAL_NUMBER,
                    DataParticleKey.VALUE: serial_number},
                   {DataParticleKey.VALUE_ID: SBE19StatusParticleKey.DATE_TIME,
@@ -565,10 +561,9 @@ class SBE19HardwareParticle(SeaBirdParticle):
             raise SampleException("No regex match of parsed hardware data: [%s]" %
                                   self.raw_data)
 
-        dom = parseString(self.raw_data)
-        root = dom.documentElement
-        log.debug("root.tagName = %s", root.tagName)
-        serial_number = int(root.getAttribute(SERIAL_NUMBER))
+        root = self._parse_xml()
+        log.debug("root.tag = %s", root.tag)
+        serial_number = int(root.get(SERIAL_NUMBER, ''))
 
         firmware_version = self._extract_xml_element_value(root, FIRMWARE_VERSION)
         firmware_date = self._extract_xml_element_value(root, FIRMWARE_DATE)
@@ -579,8 +574,8 @@ class SBE19HardwareParticle(SeaBirdParticle):
         pcb_serial_number = []
         pcb_assembly = []
         for assembly in pcb_assembly_elements:
-            pcb_serial_number.append(assembly.getAttribute(PCB_SERIAL_NUMBER))
-            pcb_assembly.append(assembly.getAttribute(ASSEMBLY_NUMBER))
+            pcb_serial_number.append(assembly.get(PCB_SERIAL_NUMBER, ''))
+            pcb_assembly.append(assembly.get(ASSEMBLY_NUMBER, ''))
 
         temperature_sensor_serial_number = 0
         conductivity_sensor_serial_number = 0
@@ -595,7 +590,7 @@ class SBE19HardwareParticle(SeaBirdParticle):
         sensors = self._extract_xml_elements(internal_sensors_element, SENSOR)
 
         for sensor in sensors:
-            sensor_id = sensor.getAttribute(ID)
+            sensor_id = sensor.get(ID, '')
             if sensor_id == TEMPERATURE_SENSOR_ID:
                 temperature_sensor_serial_number = int(self._extract_xml_element_value(sensor, SERIAL_NUMBER))
             elif sensor_id == CONDUCTIVITY_SENSOR_ID:
@@ -608,7 +603,7 @@ class SBE19HardwareParticle(SeaBirdParticle):
         sensors = self._extract_xml_elements(external_sensors_element, SENSOR)
 
         for sensor in sensors:
-            sensor_id = sensor.getAttribute(ID)
+            sensor_id = sensor.get(ID, '')
             if sensor_id == VOLT0:
                 volt0_serial_number = self._extract_xml_element_value(sensor, SERIAL_NUMBER)
                 volt0_type = self._extract_xml_element_value(sensor, TYPE)
@@ -814,17 +809,16 @@ class SBE19CalibrationParticle(SeaBirdParticle):
             raise SampleException("No regex match of parsed calibration data: [%s]" %
                                   self.raw_data)
 
-        dom = parseString(self.raw_data)
-        root = dom.documentElement
-        log.debug("root.tagName = %s", root.tagName)
-        serial_number = int(root.getAttribute(SERIAL_NUMBER))
+        root = self._parse_xml()
+        log.debug("root.tag = %s", root.tag)
+        serial_number = int(root.get(SERIAL_NUMBER, ''))
         result = [{DataParticleKey.VALUE_ID: SBE19CalibrationParticleKey.SERIAL_NUMBER,
                    DataParticleKey.VALUE: serial_number},
         ]
 
         calibration_elements = self._extract_xml_elements(root, CALIBRATION)
         for calibration in calibration_elements:
-            id_attr = calibration.getAttribute(ID)
+            id_attr = calibration.get(ID, '')
             if id_attr == TEMPERATURE_SENSOR_ID:
                 result.append(
                     self._get_xml_parameter(calibration, SBE19CalibrationParticleKey.TEMP_SENSOR_SERIAL_NUMBER, int))
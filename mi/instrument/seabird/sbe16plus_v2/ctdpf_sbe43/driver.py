@@ -31,8 +31,6 @@ from mi.core.exceptions import InstrumentProtocolException
 from mi.core.exceptions import InstrumentParameterException
 from mi.core.exceptions import SampleException
 
-from xml.dom.minidom import parseString
-
 from mi.core.instrument.protocol_param_dict import ParameterDictVisibility
 from mi.core.instrument.protocol_param_dict import ParameterDictType
 
@@ -323,14 +321,13 @@ class SBE43StatusParticle(SeaBirdParticle):
             raise SampleException("No regex match of parsed status data: [%s]" %
                                   self.raw_data)
 
-        dom = parseString(self.raw_data)
-        root = dom.documentElement
-        log.debug("root.tagName = %s", root.tagName)
-        serial_number = int(root.getAttribute(SERIAL_NUMBER))
+        root = self._parse_xml()
+        log.debug("root.tag = %s", root.tag)
+        serial_number = int(root.get(SERIAL_NUMBER, ''))
         date_time = self._extract_xml_element_value(root, DATE_TIME)
         logging_status = self._extract_xml_element_value(root, LOGGING_STATE)
         event_summary = self._extract_xml_elements(root, EVENT_SUMMARY)[0]
-        number_of_events = int(event_summary.getAttribute(NUMBER_OF_EVENTS))
+        number_of_events = int(event_summary.get(NUMBER_OF_EVENTS, ''))
         result = [{DataParticleKey.VALUE_ID: SBE43StatusParticleKey.SERIAL_NUMBER,
                    DataParticleKey.VALUE: serial_number},
                   {DataParticleKey.VALUE_ID: SBE43StatusParticleKey.DATE_TIME,
@@ -451,10 +448,9 @@ class SBE43HardwareParticle(SeaBirdParticle):
             raise SampleException("No regex match of parsed hardware data: [%s]" %
                                   self.raw_data)
 
-        dom = parseString(self.raw_data)
-        root = dom.documentElement
-        log.debug("root.tagName = %s", root.tagName)
-        serial_number = int(root.getAttribute(SERIAL_NUMBER))
+        root = self._parse_xml()
+        log.debug("root.tag = %s", root.tag)
+        serial_number = int(root.get(SERIAL_NUMBER, ''))
 
         firmware_version = self._extract_xml_element_value(root, FIRMWARE_VERSION)
         firmware_date = self._extract_xml_element_value(root, FIRMWARE_DATE)
@@ -465,8 +461,8 @@ class SBE43HardwareParticle(SeaBirdParticle):
         pcb_serial_number = []
         pcb_assembly = []
         for assembly in pcb_assembly_elements:
-            pcb_serial_number.append(assembly.getAttribute(PCB_SERIAL_NUMBER))
-            pcb_assembly.append(assembly.getAttribute(ASSEMBLY_NUMBER))
+            pcb_serial_number.append(assembly.get(PCB_SERIAL_NUMBER, ''))
+            pcb_assembly.append(assembly.get(ASSEMBLY_NUMBER, ''))
 
         temperature_sensor_serial_number = 0
         conductivity_sensor_serial_number = 0
@@ -479,7 +475,7 @@ class SBE43HardwareParticle(SeaBirdParticle):
         sensors = self._extract_xml_elements(internal_sensors_element, SENSOR)
 
         for sensor in sensors:
-            sensor_id = sensor.getAttribute(ID)
+            sensor_id = sensor.get(ID, '')
             if sensor_id == TEMPERATURE_SENSOR_ID:
                 temperature_sensor_serial_number = int(self._extract_xml_element_value(sensor, SERIAL_NUMBER))
             elif sensor_id == CONDUCTIVITY_SENSOR_ID:
@@ -492,7 +488,7 @@ class SBE43HardwareParticle(SeaBirdParticle):
         sensors = self._extract_xml_elements(external_sensors_element, SENSOR)
 
         for sensor in sensors:
-            sensor_id = sensor.getAttribute(ID)
+            sensor_id = sensor.get(ID, '')
             if sensor_id == VOLT0:
                 volt0_serial_number = self._extract_xml_element_value(sensor, SERIAL_NUMBER)
                 volt0_type = self._extract_xml_element_value(sensor, TYPE)
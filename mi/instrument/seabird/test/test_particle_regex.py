@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+"""
+@package mi.instrument.seabird.test.test_particle_regex
+@file mi/instrument/seabird/test/test_particle_regex.py
+@author agent
+@brief Test the compile once regexs of the SeaBirdParticle
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import re
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.instrument.seabird.driver import SeaBirdParticle, NEWLINE
+from mi.instrument.seabird.sbe16plus_v2.driver import SBE16StatusParticle
+from mi.instrument.seabird.sbe16plus_v2.driver import SBE16DataParticle
+from mi.instrument.seabird.sbe16plus_v2.ctdpf_jb.driver import OptodeSettingsParticle
+
+VALID_DS_RESPONSE = NEWLINE.join([
+    'SBE 16plus V 2.5  SERIAL NO. 6841    28 Feb 2013 16:39:31',
+    'vbatt = 23.4, vlith =  8.0, ioper =  61.4 ma, ipump =   0.3 ma,',
+    'status = not logging',
+    'samples = 0, free = 4386542',
+    'sample interval = 10 seconds, number of measurements per sample = 4',
+    'pump = run pump during sample, delay before sampling = 0.0 seconds, delay after sampling = 0.0 seconds',
+    'transmit real-time = yes',
+    'battery cutoff =  7.5 volts',
+    'pressure sensor = strain gauge, range = 160.0',
+    'SBE 38 = no, SBE 50 = no, WETLABS = no, OPTODE = no, SBE63 = no, Gas Tension Device = no',
+    'Ext Volt 0 = yes, Ext Volt 1 = yes',
+    'Ext Volt 2 = yes, Ext Volt 3 = yes',
+    'Ext Volt 4 = yes, Ext Volt 5 = yes',
+    'echo characters = yes',
+    'output format = raw HEX',
+    'serial sync mode disabled']) + NEWLINE
+
+
+@attr('UNIT', group='mi')
+class TestSeaBirdParticleRegex(MiUnitTest):
+
+    def test_regex_compiled(self):
+        """
+        regex_compiled returns the same pattern on every call
+        """
+        for particle_class in (SBE16DataParticle, SBE16StatusParticle, OptodeSettingsParticle):
+            pattern = particle_class.regex_compiled()
+            self.assertIs(particle_class.regex_compiled(), pattern)
+            self.assertEqual(pattern.pattern, particle_class.regex())
+
+        self.assertTrue(SBE16StatusParticle.regex_compiled().flags & re.DOTALL)
+        self.assertFalse(SBE16DataParticle.regex_compiled().flags & re.DOTALL)
+
+    def test_regex_multiline_compiled(self):
+        """
+        The multiline patterns are compiled when the class is created and
+        shared by its instances
+        """
+        particle = SBE16StatusParticle(VALID_DS_RESPONSE)
+        compiled = particle.regex_multiline_compiled()
+        self.assertIs(compiled, SBE16StatusParticle(VALID_DS_RESPONSE).regex_multiline_compiled())
+        self.assertEqual(sorted(compiled.keys()), sorted(particle.regex_multiline().keys()))
+        for key, regex in particle.regex_multiline().iteritems():
+            self.assertEqual(compiled[key].pattern, regex)
+
+        self.assertIsNone(SeaBirdParticle._multiline_compiled)
+        self.assertIsNone(SBE16DataParticle._multiline_compiled)
+
+    def test_instance_multiline(self):
+        """
+        Patterns depending on the instance are compiled on each call
+        """
+        class InstanceParticle(SeaBirdParticle):
+            def regex_multiline(self):
+                return {'value': self.pattern}
+
+        self.assertIsNone(InstanceParticle._multiline_compiled)
+        particle = InstanceParticle('a = 1')
+        particle.pattern = r'a = (\d)'
+        self.assertEqual(particle.regex_multiline_compiled()['value'].pattern, r'a = (\d)')
+
+    def test_bad_regex(self):
+        """
+        A bad pattern fails when the class is created
+        """
+        with self.assertRaises(re.error):
+            class BadParticle(SeaBirdParticle):
+                @staticmethod
+                def regex():
+                    return r'(unbalanced'
+
+        with self.assertRaises(re.error):
+            class BadMultilineParticle(SeaBirdParticle):
+                def regex_multiline(self):
+                    return {'value': r'value = ([\d'}
+
+    def test_multiline_values(self):
+        """
+        The status particle parses as before, and time it
+        """
+        particle = SBE16StatusParticle(VALID_DS_RESPONSE)
+        values = dict((v['value_id'], v['value']) for v in particle._build_parsed_values())
+        self.assertEqual(values['serial_number'], 6841)
+        self.assertEqual(values['battery_voltage_main'], 23.4)
+
+        count = 200
+        start = time.time()
+        for _ in xrange(count):
+            SBE16StatusParticle(VALID_DS_RESPONSE)._build_parsed_values()
+        log.info("SBE16 status particle: %.1f us per particle", (time.time() - start) / count * 1e6)
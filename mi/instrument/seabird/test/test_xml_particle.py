@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+"""
+@package mi.instrument.seabird.test.test_xml_particle
+@file mi/instrument/seabird/test/test_xml_particle.py
+@author agent
+@brief Test the cElementTree parsing of the SBE16plus XML responses
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import os
+import json
+import time
+from xml.dom.minidom import parseString
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.exceptions import SampleException
+
+from mi.instrument.seabird.sbe16plus_v2.ctdpf_jb import driver as ctdpf_jb
+from mi.instrument.seabird.sbe16plus_v2.ctdbp_no import driver as ctdbp_no
+from mi.instrument.seabird.sbe16plus_v2.ctdpf_sbe43 import driver as ctdpf_sbe43
+from mi.instrument.seabird.sbe16plus_v2.ctdpf_jb.driver import SBE19StatusParticle, SBE19StatusParticleKey
+
+# getHD, getCC, getCD and getSD responses from the driver tests, with the
+# particle values as published when the particles were parsed with minidom.
+RESOURCE_FILE = os.path.join(os.path.dirname(__file__), 'resource', 'xml_particles.json')
+
+DRIVERS = {'ctdpf_jb': ctdpf_jb, 'ctdbp_no': ctdbp_no, 'ctdpf_sbe43': ctdpf_sbe43}
+
+
+@attr('UNIT', group='mi')
+class SeaBirdXmlParticleUnitTest(MiUnitTest):
+
+    def setUp(self):
+        with open(RESOURCE_FILE) as f:
+            self.records = json.load(f)
+
+    def particle_class(self, record):
+        return getattr(DRIVERS[record['driver']], record['particle'])
+
+    def status_response(self):
+        for record in self.records:
+            if record['particle'] == 'SBE19StatusParticle':
+                return str(record['raw'])
+
+    def test_values_unchanged(self):
+        for record in self.records:
+            particle = self.particle_class(record)(str(record['raw']))
+            values = json.loads(json.dumps(particle._build_parsed_values()))
+            self.assertEqual(values, record['values'], record['particle'])
+
+    def test_minidom_node(self):
+        """
+        The _extract_xml_* and _get_xml_parameter calls still take minidom
+        nodes
+        """
+        particle = SBE19StatusParticle(self.status_response())
+        root = parseString(particle.raw_data).documentElement
+        power = particle._extract_xml_elements(root, 'Power')[0]
+        self.assertEqual(particle._get_xml_parameter(power, SBE19StatusParticleKey.BATTERY_VOLTAGE_MAIN)['value'],
+                         13.0)
+
+        root = particle._parse_xml()
+        power = particle._extract_xml_elements(root, 'Power')[0]
+        self.assertEqual(particle._get_xml_parameter(power, SBE19StatusParticleKey.BATTERY_VOLTAGE_MAIN)['value'],
+                         13.0)
+        self.assertEqual(particle._extract_xml_elements(root, 'Bogus', False), [])
+        with self.assertRaises(SampleException):
+            particle._extract_xml_elements(power, 'Bytes')
+        with self.assertRaises(SampleException):
+            particle._extract_xml_element_value(root, 'EventSummary')
+
+    def test_bad_xml(self):
+        response = self.status_response().replace('</Power>', '</Pwr>')
+        particle = SBE19StatusParticle(response)
+        with self.assertRaises(SampleException):
+            particle._build_parsed_values()
+
+    def test_parse_rate(self):
+        """
+        Time the status particle with cElementTree against a walk of the
+        minidom document per parameter
+        """
+        particle = SBE19StatusParticle(self.status_response())
+        count = 200
+
+        start = time.time()
+        for _ in xrange(count):
+            root = parseString(particle.raw_data).documentElement
+            for key in (SBE19StatusParticleKey.BATTERY_VOLTAGE_MAIN, SBE19StatusParticleKey.BATTERY_VOLTAGE_LITHIUM,
+                        SBE19StatusParticleKey.OPERATIONAL_CURRENT, SBE19StatusParticleKey.PUMP_CURRENT):
+                particle._get_xml_parameter(root, key)
+        minidom_time = time.time() - start
+
+        start = time.time()
+        for _ in xrange(count):
+            particle._build_parsed_values()
+        parse_time = time.time() - start
+
+        log.info("SBE19 status: %.1f us per particle, minidom parse and 4 values %.1f us",
+                 parse_time / count * 1e6, minidom_time / count * 1e6)
@@ -21,6 +21,7 @@ __license__ = 'Apache 2.0'
 import re
 import time
 import datetime
+import binascii
 
 from mi.core.log import get_logger
 
@@ -37,6 +38,10 @@ from mi.core.util import dict_equal
 from mi.core.common import BaseEnum
 from mi.core.instrument.data_particle import DataParticle
 from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.instrument.data_particle import SchemaDataParticle
+from mi.core.instrument.data_particle import ParticleSchema
+from mi.core.instrument.data_particle import HexField
+from mi.core.instrument.data_particle import BitFlags
 from mi.core.instrument.data_particle import CommonDataParticleType
 from mi.core.instrument.instrument_driver import SingleConnectionInstrumentDriver
 from mi.core.instrument.instrument_driver import DriverEvent
@@ -315,7 +320,7 @@ class SamiBatteryVoltageDataParticleKey(BaseEnum):
     BATTERY_VOLTAGE = 'pco2w_battery_voltage'
 
 
-class SamiBatteryVoltageDataParticle(DataParticle):
+class SamiBatteryVoltageDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into an regular status data particle
     structure.
@@ -324,16 +329,8 @@ class SamiBatteryVoltageDataParticle(DataParticle):
 
     _data_particle_type = SamiDataParticleType.BATTERY_VOLTAGE
 
-    def _build_parsed_values(self):
-        matched = BATTERY_VOLTAGE_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
-
-        result = [{DataParticleKey.VALUE_ID: SamiBatteryVoltageDataParticleKey.BATTERY_VOLTAGE,
-                   DataParticleKey.VALUE: int(matched.group(1), 16)}]
-
-        return result
+    _schema = ParticleSchema(BATTERY_VOLTAGE_REGEX_MATCHER, [
+        HexField(SamiBatteryVoltageDataParticleKey.BATTERY_VOLTAGE, 1)])
 
 
 class SamiThermistorVoltageDataParticleKey(BaseEnum):
@@ -343,7 +340,7 @@ class SamiThermistorVoltageDataParticleKey(BaseEnum):
     THERMISTOR_VOLTAGE = 'pco2w_thermistor_voltage'
 
 
-class SamiThermistorVoltageDataParticle(DataParticle):
+class SamiThermistorVoltageDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into an regular status data particle
     structure.
@@ -351,16 +348,8 @@ class SamiThermistorVoltageDataParticle(DataParticle):
     """
     _data_particle_type = SamiDataParticleType.THERMISTOR_VOLTAGE
 
-    def _build_parsed_values(self):
-        matched = SAMI_THERMISTOR_VOLTAGE_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
-
-        result = [{DataParticleKey.VALUE_ID: SamiThermistorVoltageDataParticleKey.THERMISTOR_VOLTAGE,
-                   DataParticleKey.VALUE: int(matched.group(1), 16)}]
-
-        return result
+    _schema = ParticleSchema(SAMI_THERMISTOR_VOLTAGE_REGEX_MATCHER, [
+        HexField(SamiThermistorVoltageDataParticleKey.THERMISTOR_VOLTAGE, 1)])
 
 
 class SamiRegularStatusDataParticleKey(BaseEnum):
@@ -391,7 +380,7 @@ class SamiRegularStatusDataParticleKey(BaseEnum):
     UNIQUE_ID = 'unique_id'
 
 
-class SamiRegularStatusDataParticle(DataParticle):
+class SamiRegularStatusDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into an regular status data particle
     structure.
@@ -400,87 +389,42 @@ class SamiRegularStatusDataParticle(DataParticle):
 
     _data_particle_type = SamiDataParticleType.REGULAR_STATUS
 
-    def _build_parsed_values(self):
-        """
-        Parse regular status values from raw data into a dictionary
-        """
-
-        ### Regular Status Messages
-        # Produced in response to S0 command, or automatically at 1 Hz. All
-        # regular status messages are preceeded by the ':' character and
-        # terminate with a '/r'. Sample string:
-        #
-        #   :CEE90B1B004100000100000000021254
-        #
-        # These messages consist of the time since the last configuration,
-        # status flags, the number of data records, the number of error
-        # records, the number of bytes stored (including configuration bytes),
-        # and the instrument's unique id.
-        ###
-
-        matched = SAMI_REGULAR_STATUS_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
-
-        particle_keys = [SamiRegularStatusDataParticleKey.ELAPSED_TIME_CONFIG,
-                         SamiRegularStatusDataParticleKey.CLOCK_ACTIVE,
-                         SamiRegularStatusDataParticleKey.RECORDING_ACTIVE,
-                         SamiRegularStatusDataParticleKey.RECORD_END_ON_TIME,
-                         SamiRegularStatusDataParticleKey.RECORD_MEMORY_FULL,
-                         SamiRegularStatusDataParticleKey.RECORD_END_ON_ERROR,
-                         SamiRegularStatusDataParticleKey.DATA_DOWNLOAD_OK,
-                         SamiRegularStatusDataParticleKey.FLASH_MEMORY_OPEN,
-                         SamiRegularStatusDataParticleKey.BATTERY_LOW_PRESTART,
-                         SamiRegularStatusDataParticleKey.BATTERY_LOW_MEASUREMENT,
-                         SamiRegularStatusDataParticleKey.BATTERY_LOW_BANK,
-                         SamiRegularStatusDataParticleKey.BATTERY_LOW_EXTERNAL,
-                         SamiRegularStatusDataParticleKey.EXTERNAL_DEVICE1_FAULT,
-                         SamiRegularStatusDataParticleKey.EXTERNAL_DEVICE2_FAULT,
-                         SamiRegularStatusDataParticleKey.EXTERNAL_DEVICE3_FAULT,
-                         SamiRegularStatusDataParticleKey.FLASH_ERASED,
-                         SamiRegularStatusDataParticleKey.POWER_ON_INVALID,
-                         SamiRegularStatusDataParticleKey.NUM_DATA_RECORDS,
-                         SamiRegularStatusDataParticleKey.NUM_ERROR_RECORDS,
-                         SamiRegularStatusDataParticleKey.NUM_BYTES_STORED,
-                         SamiRegularStatusDataParticleKey.UNIQUE_ID]
-
-        result = []
-        grp_index = 1  # used to index through match groups, starting at 1
-        bit_index = 0  # used to index through the bit fields represented by
-        # the two bytes after CLOCK_ACTIVE.
-
-        for key in particle_keys:
-            if key in [SamiRegularStatusDataParticleKey.CLOCK_ACTIVE,
-                       SamiRegularStatusDataParticleKey.RECORDING_ACTIVE,
-                       SamiRegularStatusDataParticleKey.RECORD_END_ON_TIME,
-                       SamiRegularStatusDataParticleKey.RECORD_MEMORY_FULL,
-                       SamiRegularStatusDataParticleKey.RECORD_END_ON_ERROR,
-                       SamiRegularStatusDataParticleKey.DATA_DOWNLOAD_OK,
-                       SamiRegularStatusDataParticleKey.FLASH_MEMORY_OPEN,
-                       SamiRegularStatusDataParticleKey.BATTERY_LOW_PRESTART,
-                       SamiRegularStatusDataParticleKey.BATTERY_LOW_MEASUREMENT,
-                       SamiRegularStatusDataParticleKey.BATTERY_LOW_BANK,
-                       SamiRegularStatusDataParticleKey.BATTERY_LOW_EXTERNAL,
-                       SamiRegularStatusDataParticleKey.EXTERNAL_DEVICE1_FAULT,
-                       SamiRegularStatusDataParticleKey.EXTERNAL_DEVICE2_FAULT,
-                       SamiRegularStatusDataParticleKey.EXTERNAL_DEVICE3_FAULT,
-                       SamiRegularStatusDataParticleKey.FLASH_ERASED,
-                       SamiRegularStatusDataParticleKey.POWER_ON_INVALID]:
-                # if the keys match values represented by the bits in the two
-                # byte status flags value, parse bit-by-bit using the bit-shift
-                # operator to determine the boolean value.
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(2), 16) & (1 << bit_index))})
-                bit_index += 1  # bump the bit index
-                grp_index = 3  # set the right group index for when we leave this part of the loop.
-            else:
-                # otherwise all values in the string are parsed to integers
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: int(matched.group(grp_index), 16)})
-                grp_index += 1
-
-        return result
+    ### Regular Status Messages
+    # Produced in response to S0 command, or automatically at 1 Hz. All
+    # regular status messages are preceeded by the ':' character and
+    # terminate with a '/r'. Sample string:
+    #
+    #   :CEE90B1B004100000100000000021254
+    #
+    # These messages consist of the time since the last configuration,
+    # status flags, the number of data records, the number of error
+    # records, the number of bytes stored (including configuration bytes),
+    # and the instrument's unique id.
+    ###
+
+    _schema = ParticleSchema(SAMI_REGULAR_STATUS_REGEX_MATCHER, [
+        HexField(SamiRegularStatusDataParticleKey.ELAPSED_TIME_CONFIG, 1),
+        # the two byte status flags value, one boolean per bit
+        BitFlags(2, [SamiRegularStatusDataParticleKey.CLOCK_ACTIVE,
+                     SamiRegularStatusDataParticleKey.RECORDING_ACTIVE,
+                     SamiRegularStatusDataParticleKey.RECORD_END_ON_TIME,
+                     SamiRegularStatusDataParticleKey.RECORD_MEMORY_FULL,
+                     SamiRegularStatusDataParticleKey.RECORD_END_ON_ERROR,
+                     SamiRegularStatusDataParticleKey.DATA_DOWNLOAD_OK,
+                     SamiRegularStatusDataParticleKey.FLASH_MEMORY_OPEN,
+                     SamiRegularStatusDataParticleKey.BATTERY_LOW_PRESTART,
+                     SamiRegularStatusDataParticleKey.BATTERY_LOW_MEASUREMENT,
+                     SamiRegularStatusDataParticleKey.BATTERY_LOW_BANK,
+                     SamiRegularStatusDataParticleKey.BATTERY_LOW_EXTERNAL,
+                     SamiRegularStatusDataParticleKey.EXTERNAL_DEVICE1_FAULT,
+                     SamiRegularStatusDataParticleKey.EXTERNAL_DEVICE2_FAULT,
+                     SamiRegularStatusDataParticleKey.EXTERNAL_DEVICE3_FAULT,
+                     SamiRegularStatusDataParticleKey.FLASH_ERASED,
+                     SamiRegularStatusDataParticleKey.POWER_ON_INVALID]),
+        HexField(SamiRegularStatusDataParticleKey.NUM_DATA_RECORDS, 3),
+        HexField(SamiRegularStatusDataParticleKey.NUM_ERROR_RECORDS, 4),
+        HexField(SamiRegularStatusDataParticleKey.NUM_BYTES_STORED, 5),
+        HexField(SamiRegularStatusDataParticleKey.UNIQUE_ID, 6)])
 
 
 class SamiControlRecordDataParticleKey(BaseEnum):
@@ -514,7 +458,7 @@ class SamiControlRecordDataParticleKey(BaseEnum):
     CHECKSUM = 'checksum'
 
 
-class SamiControlRecordDataParticle(DataParticle):
+class SamiControlRecordDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into a control record data particle
     structure.
@@ -523,89 +467,44 @@ class SamiControlRecordDataParticle(DataParticle):
 
     _data_particle_type = SamiDataParticleType.CONTROL_RECORD
 
-    def _build_parsed_values(self):
-        """
-        Parse control record values from raw data into a dictionary
-        """
-
-        ### Control Records
-        # Produced by the instrument periodically in reponse to certain events
-        # (e.g. when the Flash memory is opened). The messages are preceded by
-        # a '*' character and terminated with a '\r'. Sample string:
-        #
-        #   *541280CEE90B170041000001000000000200AF
-        #
-        # A full description of the control record strings can be found in the
-        # vendor supplied SAMI Record Format document.
-        ###
-
-        matched = SAMI_CONTROL_RECORD_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
-
-        particle_keys = [SamiControlRecordDataParticleKey.UNIQUE_ID,
-                         SamiControlRecordDataParticleKey.RECORD_LENGTH,
-                         SamiControlRecordDataParticleKey.RECORD_TYPE,
-                         SamiControlRecordDataParticleKey.RECORD_TIME,
-                         SamiControlRecordDataParticleKey.CLOCK_ACTIVE,
-                         SamiControlRecordDataParticleKey.RECORDING_ACTIVE,
-                         SamiControlRecordDataParticleKey.RECORD_END_ON_TIME,
-                         SamiControlRecordDataParticleKey.RECORD_MEMORY_FULL,
-                         SamiControlRecordDataParticleKey.RECORD_END_ON_ERROR,
-                         SamiControlRecordDataParticleKey.DATA_DOWNLOAD_OK,
-                         SamiControlRecordDataParticleKey.FLASH_MEMORY_OPEN,
-                         SamiControlRecordDataParticleKey.BATTERY_LOW_PRESTART,
-                         SamiControlRecordDataParticleKey.BATTERY_LOW_MEASUREMENT,
-                         SamiControlRecordDataParticleKey.BATTERY_LOW_BANK,
-                         SamiControlRecordDataParticleKey.BATTERY_LOW_EXTERNAL,
-                         SamiControlRecordDataParticleKey.EXTERNAL_DEVICE1_FAULT,
-                         SamiControlRecordDataParticleKey.EXTERNAL_DEVICE2_FAULT,
-                         SamiControlRecordDataParticleKey.EXTERNAL_DEVICE3_FAULT,
-                         SamiControlRecordDataParticleKey.FLASH_ERASED,
-                         SamiControlRecordDataParticleKey.POWER_ON_INVALID,
-                         SamiControlRecordDataParticleKey.NUM_DATA_RECORDS,
-                         SamiControlRecordDataParticleKey.NUM_ERROR_RECORDS,
-                         SamiControlRecordDataParticleKey.NUM_BYTES_STORED,
-                         SamiControlRecordDataParticleKey.CHECKSUM]
-
-        result = []
-        grp_index = 1  # used to index through match groups, starting at 1/
-        bit_index = 0  # used to index through the bit fields represented by
-        # the two bytes after CLOCK_ACTIVE.
-
-        for key in particle_keys:
-            if key in [SamiControlRecordDataParticleKey.CLOCK_ACTIVE,
-                       SamiControlRecordDataParticleKey.RECORDING_ACTIVE,
-                       SamiControlRecordDataParticleKey.RECORD_END_ON_TIME,
-                       SamiControlRecordDataParticleKey.RECORD_MEMORY_FULL,
-                       SamiControlRecordDataParticleKey.RECORD_END_ON_ERROR,
-                       SamiControlRecordDataParticleKey.DATA_DOWNLOAD_OK,
-                       SamiControlRecordDataParticleKey.FLASH_MEMORY_OPEN,
-                       SamiControlRecordDataParticleKey.BATTERY_LOW_PRESTART,
-                       SamiControlRecordDataParticleKey.BATTERY_LOW_MEASUREMENT,
-                       SamiControlRecordDataParticleKey.BATTERY_LOW_BANK,
-                       SamiControlRecordDataParticleKey.BATTERY_LOW_EXTERNAL,
-                       SamiControlRecordDataParticleKey.EXTERNAL_DEVICE1_FAULT,
-                       SamiControlRecordDataParticleKey.EXTERNAL_DEVICE2_FAULT,
-                       SamiControlRecordDataParticleKey.EXTERNAL_DEVICE3_FAULT,
-                       SamiControlRecordDataParticleKey.FLASH_ERASED,
-                       SamiControlRecordDataParticleKey.POWER_ON_INVALID]:
-                # if the keys match values represented by the bits in the two
-                # byte status flags value included in all control records,
-                # parse bit-by-bit using the bit-shift operator to determine
-                # boolean value.
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(5), 16) & (1 << bit_index))})
-                bit_index += 1  # bump the bit index
-                grp_index = 6  # set the right group index for when we leave this part of the loop.
-            else:
-                # otherwise all values in the string are parsed to integers
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: int(matched.group(grp_index), 16)})
-                grp_index += 1
-
-        return result
+    ### Control Records
+    # Produced by the instrument periodically in reponse to certain events
+    # (e.g. when the Flash memory is opened). The messages are preceded by
+    # a '*' character and terminated with a '\r'. Sample string:
+    #
+    #   *541280CEE90B170041000001000000000200AF
+    #
+    # A full description of the control record strings can be found in the
+    # vendor supplied SAMI Record Format document.
+    ###
+
+    _schema = ParticleSchema(SAMI_CONTROL_RECORD_REGEX_MATCHER, [
+        HexField(SamiControlRecordDataParticleKey.UNIQUE_ID, 1),
+        HexField(SamiControlRecordDataParticleKey.RECORD_LENGTH, 2),
+        HexField(SamiControlRecordDataParticleKey.RECORD_TYPE, 3),
+        HexField(SamiControlRecordDataParticleKey.RECORD_TIME, 4),
+        # the two byte status flags value included in all control records,
+        # one boolean per bit
+        BitFlags(5, [SamiControlRecordDataParticleKey.CLOCK_ACTIVE,
+                     SamiControlRecordDataParticleKey.RECORDING_ACTIVE,
+                     SamiControlRecordDataParticleKey.RECORD_END_ON_TIME,
+                     SamiControlRecordDataParticleKey.RECORD_MEMORY_FULL,
+                     SamiControlRecordDataParticleKey.RECORD_END_ON_ERROR,
+                     SamiControlRecordDataParticleKey.DATA_DOWNLOAD_OK,
+                     SamiControlRecordDataParticleKey.FLASH_MEMORY_OPEN,
+                     SamiControlRecordDataParticleKey.BATTERY_LOW_PRESTART,
+                     SamiControlRecordDataParticleKey.BATTERY_LOW_MEASUREMENT,
+                     SamiControlRecordDataParticleKey.BATTERY_LOW_BANK,
+                     SamiControlRecordDataParticleKey.BATTERY_LOW_EXTERNAL,
+                     SamiControlRecordDataParticleKey.EXTERNAL_DEVICE1_FAULT,
+                     SamiControlRecordDataParticleKey.EXTERNAL_DEVICE2_FAULT,
+                     SamiControlRecordDataParticleKey.EXTERNAL_DEVICE3_FAULT,
+                     SamiControlRecordDataParticleKey.FLASH_ERASED,
+                     SamiControlRecordDataParticleKey.POWER_ON_INVALID]),
+        HexField(SamiControlRecordDataParticleKey.NUM_DATA_RECORDS, 6),
+        HexField(SamiControlRecordDataParticleKey.NUM_ERROR_RECORDS, 7),
+        HexField(SamiControlRecordDataParticleKey.NUM_BYTES_STORED, 8),
+        HexField(SamiControlRecordDataParticleKey.CHECKSUM, 9)])
 
 
 class SamiConfigDataParticleKey(BaseEnum):
@@ -649,6 +548,45 @@ class SamiConfigDataParticleKey(BaseEnum):
     # the portions of the configuration that is unique to each.
 
 
+# Schema fields of the configuration record common to all SAMI instruments,
+# regex groups 1 through 20. The instrument drivers add their own fields
+# for groups 21 onwards.
+SAMI_CONFIG_SCHEMA_FIELDS = [
+    HexField(SamiConfigDataParticleKey.LAUNCH_TIME, 1),
+    HexField(SamiConfigDataParticleKey.START_TIME_OFFSET, 2),
+    HexField(SamiConfigDataParticleKey.RECORDING_TIME, 3),
+    # one byte mode bits
+    BitFlags(4, [SamiConfigDataParticleKey.PMI_SAMPLE_SCHEDULE,
+                 SamiConfigDataParticleKey.SAMI_SAMPLE_SCHEDULE,
+                 SamiConfigDataParticleKey.SLOT1_FOLLOWS_SAMI_SCHEDULE,
+                 SamiConfigDataParticleKey.SLOT1_INDEPENDENT_SCHEDULE,
+                 SamiConfigDataParticleKey.SLOT2_FOLLOWS_SAMI_SCHEDULE,
+                 SamiConfigDataParticleKey.SLOT2_INDEPENDENT_SCHEDULE,
+                 SamiConfigDataParticleKey.SLOT3_FOLLOWS_SAMI_SCHEDULE,
+                 SamiConfigDataParticleKey.SLOT3_INDEPENDENT_SCHEDULE]),
+    HexField(SamiConfigDataParticleKey.TIMER_INTERVAL_SAMI, 5),
+    HexField(SamiConfigDataParticleKey.DRIVER_ID_SAMI, 6),
+    HexField(SamiConfigDataParticleKey.PARAMETER_POINTER_SAMI, 7),
+    HexField(SamiConfigDataParticleKey.TIMER_INTERVAL_DEVICE1, 8),
+    HexField(SamiConfigDataParticleKey.DRIVER_ID_DEVICE1, 9),
+    HexField(SamiConfigDataParticleKey.PARAMETER_POINTER_DEVICE1, 10),
+    HexField(SamiConfigDataParticleKey.TIMER_INTERVAL_DEVICE2, 11),
+    HexField(SamiConfigDataParticleKey.DRIVER_ID_DEVICE2, 12),
+    HexField(SamiConfigDataParticleKey.PARAMETER_POINTER_DEVICE2, 13),
+    HexField(SamiConfigDataParticleKey.TIMER_INTERVAL_DEVICE3, 14),
+    HexField(SamiConfigDataParticleKey.DRIVER_ID_DEVICE3, 15),
+    HexField(SamiConfigDataParticleKey.PARAMETER_POINTER_DEVICE3, 16),
+    HexField(SamiConfigDataParticleKey.TIMER_INTERVAL_PRESTART, 17),
+    HexField(SamiConfigDataParticleKey.DRIVER_ID_PRESTART, 18),
+    HexField(SamiConfigDataParticleKey.PARAMETER_POINTER_PRESTART, 19),
+    # global configuration bits, bits 3 through 6 are not used
+    BitFlags(20, [SamiConfigDataParticleKey.USE_BAUD_RATE_57600,
+                  SamiConfigDataParticleKey.SEND_RECORD_TYPE,
+                  SamiConfigDataParticleKey.SEND_LIVE_RECORDS,
+                  None, None, None, None,
+                  SamiConfigDataParticleKey.EXTEND_GLOBAL_CONFIG])]
+
+
 class QueuedCommands():
     """
     Structure to buffer commands which are received when a sample is being taken
@@ -704,6 +642,14 @@ class SamiProtocol(CommandResponseInstrumentProtocol):
     Should be sub-classed in specific driver.
     """
 
+    # (regex matcher, particle class) for each record type the chunker sieves
+    # out, in sieve order. Records without a particle class, like errors,
+    # are sieved out but not published. Set by device specific subclasses.
+    _chunk_particles = []
+
+    # Matchers of the records with a checksum to verify when published
+    _checksum_matchers = []
+
     def __init__(self, prompts, newline, driver_event):
         """
         Protocol constructor.
@@ -868,9 +814,10 @@ class SamiProtocol(CommandResponseInstrumentProtocol):
 
         # Construct the parameter dictionary containing device
         # parameters, current parameter values, and set formatting
-        # functions.
-        self._build_param_dict()
-        self._build_command_dict()
+        # functions.  They only depend on the protocol class, so they are
+        # built once per class and copied.
+        self._build_dict_from_prototype('_param_dict', self._build_param_dict)
+        self._build_dict_from_prototype('_cmd_dict', self._build_command_dict)
         self._build_driver_dict()
 
         # engineering parameters can be added in sub classes
@@ -917,6 +864,9 @@ class SamiProtocol(CommandResponseInstrumentProtocol):
 
         self._queued_commands = QueuedCommands()
 
+        # sieve matches of the records found by the last sieve, by record
+        self._chunk_matches = {}
+
         # initialize scheduler
         if not self._scheduler:
             self.initialize_scheduler()
@@ -2079,27 +2029,16 @@ class SamiProtocol(CommandResponseInstrumentProtocol):
         if config_change:
             self._driver_event(DriverAsyncEvent.CONFIG_CHANGE)
 
-    def _verify_checksum(self, chunk, matcher):
+    def _verify_checksum(self, chunk):
         """
         Verify checksum of sample returned from instrument
         @param chunk returned from instrument
-        @param matcher regular expression to match sample
         @raise SampleException checksum is invalid
         """
-        matched = matcher.match(chunk)
-        record_type = matched.group(3)
-        log.debug('Protocol.verify_checksum(): sample record_type = %s', record_type)
-        log.debug('Protocol.verify_checksum(): sample chunk = %s', chunk)
-
         ## Remove any whitespace
         sample_string = chunk.rstrip()
-        checksum = sample_string[-2:]
-        checksum_int = int(checksum, 16)
-        log.debug('Checksum = %s hex, %d dec', checksum, checksum_int)
-        calculated_checksum_string = sample_string[3:-2]
-        log.debug('Checksum String = %s', calculated_checksum_string)
-        calculated_checksum = self.calc_crc(calculated_checksum_string)
-        log.debug('Checksum/Calculated Checksum = %d/%d', checksum_int, calculated_checksum)
+        checksum_int = int(sample_string[-2:], 16)
+        calculated_checksum = self.calc_crc(sample_string[3:-2])
 
         if checksum_int != calculated_checksum:
             log.error("Sample Checksum Invalid %d/%d, throwing exception.", checksum_int, calculated_checksum)
@@ -2124,11 +2063,12 @@ class SamiProtocol(CommandResponseInstrumentProtocol):
         @param s: string for check-sum analysis.
         """
 
-        cs = 0
-        for index in xrange(0, len(s), 2):
-            cs += int(s[index:index+2], 16)
-        cs &= 0xFF
-        return cs
+        # sum the bytes at C speed rather than converting each hex pair
+        cs = sum(bytearray(binascii.unhexlify(s[:len(s) & ~1])))
+        if len(s) & 1:
+            # a trailing single hex digit counts as a byte of its own
+            cs += int(s[-1], 16)
+        return cs & 0xFF
 
     def _build_param_dict(self):
         """
@@ -2311,12 +2251,69 @@ class SamiProtocol(CommandResponseInstrumentProtocol):
 
         log.debug('Protocol._pre_sample_processing(): None')
 
-    def _got_chunk(self, chunk, timestamp):
+    @classmethod
+    def _find_records(cls, raw_data):
         """
-        Received matched data from chunker. Overridden by device specific subclasses.
+        Find the records in raw data
+        @param raw_data: data to search
+        @retval list of (matcher, particle class, match) tuples for the
+                records found
         """
+        return [(matcher, particle_class, match)
+                for matcher, particle_class in cls._chunk_particles
+                for match in matcher.finditer(raw_data)]
 
-        raise NotImplementedException()
+    @classmethod
+    def sieve_function(cls, raw_data):
+        """
+        The method that splits samples
+        :param raw_data: data to filter
+        """
+        return [(match.start(), match.end()) for matcher, particle_class, match in cls._find_records(raw_data)]
+
+    def _sieve(self, raw_data):
+        """
+        Chunker sieve that keeps the match of each record for _got_chunk, so
+        records are matched once.  Only the matches of the last sieve are
+        kept: got_data hands its records to _got_chunk before the next sieve,
+        and records the chunker never hands out, e.g. when it rejects the
+        sieve list or is reset, go with the next sieve.
+        :param raw_data: data to filter
+        """
+        self._chunk_matches = {}
+        return_list = []
+        for record in self._find_records(raw_data):
+            match = record[2]
+            self._chunk_matches[match.group()] = record
+            return_list.append((match.start(), match.end()))
+        return return_list
+
+    def _got_chunk(self, chunk, timestamp):
+        """
+        Received matched data from chunker. Publish the particle of the
+        record type the sieve matched, and verify the checksum of samples.
+        """
+        found = self._chunk_matches.pop(chunk, None)
+        if found is None:
+            # not seen by the sieve, e.g. a second copy of an identical record
+            for matcher, particle_class in self._chunk_particles:
+                match = matcher.match(chunk)
+                if match:
+                    found = (matcher, particle_class, match)
+                    break
+            else:
+                return
+
+        matcher, particle_class, match = found
+        if particle_class is None:
+            return
+
+        particle = particle_class(chunk, port_timestamp=timestamp, match=match)
+        if self._driver_event:
+            self._driver_event(DriverAsyncEvent.SAMPLE, particle.generate())
+
+        if matcher in self._checksum_matchers:
+            self._verify_checksum(chunk)
 
     def _get_specific_configuration_string_parameters(self):
         """
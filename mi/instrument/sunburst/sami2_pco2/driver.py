@@ -27,6 +27,10 @@ from mi.core.exceptions import InstrumentTimeoutException
 from mi.core.common import BaseEnum
 from mi.core.instrument.data_particle import DataParticle
 from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.instrument.data_particle import SchemaDataParticle
+from mi.core.instrument.data_particle import ParticleSchema
+from mi.core.instrument.data_particle import HexField
+from mi.core.instrument.data_particle import BitFlags
 from mi.core.instrument.protocol_param_dict import ParameterDictType
 from mi.core.instrument.protocol_param_dict import ParameterDictVisibility
 from mi.instrument.sunburst.driver import SamiDataParticleType
@@ -34,6 +38,7 @@ from mi.instrument.sunburst.driver import SamiParameter
 from mi.core.instrument.instrument_driver import ResourceAgentState
 from mi.instrument.sunburst.driver import SamiInstrumentCommand
 from mi.instrument.sunburst.driver import SamiConfigDataParticleKey
+from mi.instrument.sunburst.driver import SAMI_CONFIG_SCHEMA_FIELDS
 from mi.instrument.sunburst.driver import SamiInstrumentDriver
 from mi.instrument.sunburst.driver import SamiProtocol
 from mi.instrument.sunburst.driver import SAMI_NEWLINE
@@ -181,62 +186,37 @@ class Pco2wSamiSampleDataParticleKey(BaseEnum):
     CHECKSUM = 'checksum'
 
 
-class Pco2wSamiSampleDataParticle(DataParticle):
+class Pco2wSamiSampleDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into a SAMI2-PCO2 sample data particle
     structure.
-    @throw SampleException If there is a problem with sample creation
-    """
-
-    _data_particle_type = Pco2wSamiDataParticleType.SAMI_SAMPLE
-
-    def _build_parsed_values(self):
-        """
-        Parse SAMI2-PCO2 measurement records from raw data into a dictionary
-
-        SAMI Sample Record
-        Regular SAMI (PCO2) data records produced by the instrument on either
-        command or via an internal schedule. Like the control records, the
-        messages are preceded by a '*' character and terminated with a '\r'.
-        Sample string:
 
-          *542705CEE91CC800400019096206800730074C2CE04274003B0018096106800732074E0D82066124
+    SAMI Sample Record
+    Regular SAMI (PCO2) data records produced by the instrument on either
+    command or via an internal schedule. Like the control records, the
+    messages are preceded by a '*' character and terminated with a '\r'.
+    Sample string:
 
-        A full description of the data record strings can be found in the
-        vendor supplied SAMI Record Format document.
-        """
-
-        matched = PCO2W_SAMPLE_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
+      *542705CEE91CC800400019096206800730074C2CE04274003B0018096106800732074E0D82066124
 
-        particle_keys = [Pco2wSamiSampleDataParticleKey.UNIQUE_ID,
-                         Pco2wSamiSampleDataParticleKey.RECORD_LENGTH,
-                         Pco2wSamiSampleDataParticleKey.RECORD_TYPE,
-                         Pco2wSamiSampleDataParticleKey.RECORD_TIME,
-                         Pco2wSamiSampleDataParticleKey.LIGHT_MEASUREMENTS,
-                         Pco2wSamiSampleDataParticleKey.VOLTAGE_BATTERY,
-                         Pco2wSamiSampleDataParticleKey.THERMISTER_RAW,
-                         Pco2wSamiSampleDataParticleKey.CHECKSUM]
+    A full description of the data record strings can be found in the
+    vendor supplied SAMI Record Format document.
 
-        result = []
-        grp_index = 1
+    @throw SampleException If there is a problem with sample creation
+    """
 
-        for key in particle_keys:
-            if key in [Pco2wSamiSampleDataParticleKey.LIGHT_MEASUREMENTS]:
-                # parse group 5 into 14, 2 byte (4 character) values stored in
-                # an array.
-                light = matched.group(grp_index)
-                light = [int(light[i:i + 4], 16) for i in xrange(0, len(light), 4)]
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: light})
-            else:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: int(matched.group(grp_index), 16)})
-            grp_index += 1
+    _data_particle_type = Pco2wSamiDataParticleType.SAMI_SAMPLE
 
-        return result
+    _schema = ParticleSchema(PCO2W_SAMPLE_REGEX_MATCHER, [
+        HexField(Pco2wSamiSampleDataParticleKey.UNIQUE_ID, 1),
+        HexField(Pco2wSamiSampleDataParticleKey.RECORD_LENGTH, 2),
+        HexField(Pco2wSamiSampleDataParticleKey.RECORD_TYPE, 3),
+        HexField(Pco2wSamiSampleDataParticleKey.RECORD_TIME, 4),
+        # 14, 2 byte (4 character) light measurements
+        HexField(Pco2wSamiSampleDataParticleKey.LIGHT_MEASUREMENTS, 5, width=4),
+        HexField(Pco2wSamiSampleDataParticleKey.VOLTAGE_BATTERY, 6),
+        HexField(Pco2wSamiSampleDataParticleKey.THERMISTER_RAW, 7),
+        HexField(Pco2wSamiSampleDataParticleKey.CHECKSUM, 8)])
 
 
 class Pco2wSamiConfigurationDataParticleKey(SamiConfigDataParticleKey):
@@ -256,6 +236,22 @@ class Pco2wSamiConfigurationDataParticleKey(SamiConfigDataParticleKey):
     NUMBER_EXTRA_PUMP_CYCLES = 'cycle_rate'
 
 
+# Schema fields of the configuration record common to the PCO2W
+# instruments, regex groups 1 through 29
+PCO2W_CONFIG_SCHEMA_FIELDS = SAMI_CONFIG_SCHEMA_FIELDS + [
+    HexField(Pco2wSamiConfigurationDataParticleKey.PUMP_PULSE, 21),
+    HexField(Pco2wSamiConfigurationDataParticleKey.PUMP_DURATION, 22),
+    HexField(Pco2wSamiConfigurationDataParticleKey.SAMPLES_PER_MEASUREMENT, 23),
+    HexField(Pco2wSamiConfigurationDataParticleKey.CYCLES_BETWEEN_BLANKS, 24),
+    HexField(Pco2wSamiConfigurationDataParticleKey.NUMBER_REAGENT_CYCLES, 25),
+    HexField(Pco2wSamiConfigurationDataParticleKey.NUMBER_BLANK_CYCLES, 26),
+    HexField(Pco2wSamiConfigurationDataParticleKey.FLUSH_PUMP_INTERVAL, 27),
+    # SAMI bit switches
+    BitFlags(28, [Pco2wSamiConfigurationDataParticleKey.DISABLE_START_BLANK_FLUSH,
+                  Pco2wSamiConfigurationDataParticleKey.MEASURE_AFTER_PUMP_PULSE]),
+    HexField(Pco2wSamiConfigurationDataParticleKey.NUMBER_EXTRA_PUMP_CYCLES, 29)]
+
+
 ###############################################################################
 # Driver
 ###############################################################################
@@ -23,6 +23,8 @@ from mi.core.exceptions import SampleException
 
 from mi.core.instrument.data_particle import DataParticle
 from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.instrument.data_particle import SchemaDataParticle
+from mi.core.instrument.data_particle import ParticleSchema
 from mi.core.instrument.chunker import StringChunker
 from mi.core.instrument.protocol_param_dict import ParameterDictType
 from mi.core.instrument.protocol_param_dict import ParameterDictVisibility
@@ -36,6 +38,7 @@ from mi.instrument.sunburst.driver import Prompt, SamiBatteryVoltageDataParticle
 from mi.instrument.sunburst.driver import SamiRegularStatusDataParticle
 from mi.instrument.sunburst.driver import SamiControlRecordDataParticle
 from mi.instrument.sunburst.sami2_pco2.driver import Pco2wSamiConfigurationDataParticleKey
+from mi.instrument.sunburst.sami2_pco2.driver import PCO2W_CONFIG_SCHEMA_FIELDS
 from mi.instrument.sunburst.sami2_pco2.driver import Pco2wInstrumentDriver
 from mi.instrument.sunburst.sami2_pco2.driver import Pco2wProtocol
 from mi.instrument.sunburst.driver import SAMI_REGULAR_STATUS_REGEX_MATCHER
@@ -159,7 +162,7 @@ class Pco2waConfigurationDataParticleKey(Pco2wSamiConfigurationDataParticleKey):
     """
 
 
-class Pco2waConfigurationDataParticle(DataParticle):
+class Pco2waConfigurationDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into a configuration record data particle
     structure.
@@ -168,127 +171,26 @@ class Pco2waConfigurationDataParticle(DataParticle):
 
     _data_particle_type = DataParticleType.PCO2W_A_CONFIGURATION
 
-    def _build_parsed_values(self):
-        """
-        Parse configuration record values from raw data into a dictionary
-        """
-
-        ### SAMI-PCO2 Configuration String
-        # Configuration string either sent to the instrument to configure it
-        # (via the L5A command), or retrieved from the instrument in response
-        # to the L command. Sample string (shown broken in multiple lines,
-        # would not be received this way):
-        #
-        #   CEE90B0002C7EA0001E133800A000E100402000E10010B000000000D000000000D
-        #   000000000D071020FF54181C010038000000000000000000000000000000000000
-        #   000000000000000000000000000000000000000000000000000000000000000000
-        #   000000000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #
-        # A full description of the configuration string can be found in the
-        # vendor supplied Low Level Operation of the SAMI/AFT document.
-        ###
-
-        matched = PCO2WA_CONFIGURATION_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
-
-        particle_keys = [Pco2waConfigurationDataParticleKey.LAUNCH_TIME,
-                         Pco2waConfigurationDataParticleKey.START_TIME_OFFSET,
-                         Pco2waConfigurationDataParticleKey.RECORDING_TIME,
-                         Pco2waConfigurationDataParticleKey.PMI_SAMPLE_SCHEDULE,
-                         Pco2waConfigurationDataParticleKey.SAMI_SAMPLE_SCHEDULE,
-                         Pco2waConfigurationDataParticleKey.SLOT1_FOLLOWS_SAMI_SCHEDULE,
-                         Pco2waConfigurationDataParticleKey.SLOT1_INDEPENDENT_SCHEDULE,
-                         Pco2waConfigurationDataParticleKey.SLOT2_FOLLOWS_SAMI_SCHEDULE,
-                         Pco2waConfigurationDataParticleKey.SLOT2_INDEPENDENT_SCHEDULE,
-                         Pco2waConfigurationDataParticleKey.SLOT3_FOLLOWS_SAMI_SCHEDULE,
-                         Pco2waConfigurationDataParticleKey.SLOT3_INDEPENDENT_SCHEDULE,
-                         Pco2waConfigurationDataParticleKey.TIMER_INTERVAL_SAMI,
-                         Pco2waConfigurationDataParticleKey.DRIVER_ID_SAMI,
-                         Pco2waConfigurationDataParticleKey.PARAMETER_POINTER_SAMI,
-                         Pco2waConfigurationDataParticleKey.TIMER_INTERVAL_DEVICE1,
-                         Pco2waConfigurationDataParticleKey.DRIVER_ID_DEVICE1,
-                         Pco2waConfigurationDataParticleKey.PARAMETER_POINTER_DEVICE1,
-                         Pco2waConfigurationDataParticleKey.TIMER_INTERVAL_DEVICE2,
-                         Pco2waConfigurationDataParticleKey.DRIVER_ID_DEVICE2,
-                         Pco2waConfigurationDataParticleKey.PARAMETER_POINTER_DEVICE2,
-                         Pco2waConfigurationDataParticleKey.TIMER_INTERVAL_DEVICE3,
-                         Pco2waConfigurationDataParticleKey.DRIVER_ID_DEVICE3,
-                         Pco2waConfigurationDataParticleKey.PARAMETER_POINTER_DEVICE3,
-                         Pco2waConfigurationDataParticleKey.TIMER_INTERVAL_PRESTART,
-                         Pco2waConfigurationDataParticleKey.DRIVER_ID_PRESTART,
-                         Pco2waConfigurationDataParticleKey.PARAMETER_POINTER_PRESTART,
-                         Pco2waConfigurationDataParticleKey.USE_BAUD_RATE_57600,
-                         Pco2waConfigurationDataParticleKey.SEND_RECORD_TYPE,
-                         Pco2waConfigurationDataParticleKey.SEND_LIVE_RECORDS,
-                         Pco2waConfigurationDataParticleKey.EXTEND_GLOBAL_CONFIG,
-                         Pco2waConfigurationDataParticleKey.PUMP_PULSE,
-                         Pco2waConfigurationDataParticleKey.PUMP_DURATION,
-                         Pco2waConfigurationDataParticleKey.SAMPLES_PER_MEASUREMENT,
-                         Pco2waConfigurationDataParticleKey.CYCLES_BETWEEN_BLANKS,
-                         Pco2waConfigurationDataParticleKey.NUMBER_REAGENT_CYCLES,
-                         Pco2waConfigurationDataParticleKey.NUMBER_BLANK_CYCLES,
-                         Pco2waConfigurationDataParticleKey.FLUSH_PUMP_INTERVAL,
-                         Pco2waConfigurationDataParticleKey.DISABLE_START_BLANK_FLUSH,
-                         Pco2waConfigurationDataParticleKey.MEASURE_AFTER_PUMP_PULSE,
-                         Pco2waConfigurationDataParticleKey.NUMBER_EXTRA_PUMP_CYCLES]
-
-        result = []
-        grp_index = 1  # used to index through match groups, starting at 1
-        mode_index = 0  # index through the bit fields for MODE_BITS,
-        # GLOBAL_CONFIGURATION and SAMI_BIT_SWITCHES.
-        glbl_index = 0
-        sami_index = 0
-
-        for key in particle_keys:
-            if key in [Pco2waConfigurationDataParticleKey.PMI_SAMPLE_SCHEDULE,
-                       Pco2waConfigurationDataParticleKey.SAMI_SAMPLE_SCHEDULE,
-                       Pco2waConfigurationDataParticleKey.SLOT1_FOLLOWS_SAMI_SCHEDULE,
-                       Pco2waConfigurationDataParticleKey.SLOT1_INDEPENDENT_SCHEDULE,
-                       Pco2waConfigurationDataParticleKey.SLOT2_FOLLOWS_SAMI_SCHEDULE,
-                       Pco2waConfigurationDataParticleKey.SLOT2_INDEPENDENT_SCHEDULE,
-                       Pco2waConfigurationDataParticleKey.SLOT3_FOLLOWS_SAMI_SCHEDULE,
-                       Pco2waConfigurationDataParticleKey.SLOT3_INDEPENDENT_SCHEDULE]:
-                # if the keys match values represented by the bits in the one
-                # byte mode bits value, parse bit-by-bit using the bit-shift
-                # operator to determine the boolean value.
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(4), 16) & (1 << mode_index))})
-                mode_index += 1  # bump the bit index
-                grp_index = 5  # set the right group index for when we leave this part of the loop.
-
-            elif key in [Pco2waConfigurationDataParticleKey.USE_BAUD_RATE_57600,
-                         Pco2waConfigurationDataParticleKey.SEND_RECORD_TYPE,
-                         Pco2waConfigurationDataParticleKey.SEND_LIVE_RECORDS,
-                         Pco2waConfigurationDataParticleKey.EXTEND_GLOBAL_CONFIG]:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(20), 16) & (1 << glbl_index))})
-
-                glbl_index += 1  # bump the bit index
-                # skip bit indices 3 through 6
-                if glbl_index == 3:
-                    glbl_index = 7
-                grp_index = 21  # set the right group index for when we leave this part of the loop.
-
-            elif key in [Pco2waConfigurationDataParticleKey.DISABLE_START_BLANK_FLUSH,
-                         Pco2waConfigurationDataParticleKey.MEASURE_AFTER_PUMP_PULSE]:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(28), 16) & (1 << sami_index))})
-                sami_index += 1  # bump the bit index
-                grp_index = 29  # set the right group index for when we leave this part of the loop.
-
-            else:
-                # otherwise all values in the string are parsed to integers
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: int(matched.group(grp_index), 16)})
-                grp_index += 1
-
-        return result
+    ### SAMI-PCO2 Configuration String
+    # Configuration string either sent to the instrument to configure it
+    # (via the L5A command), or retrieved from the instrument in response
+    # to the L command. Sample string (shown broken in multiple lines,
+    # would not be received this way):
+    #
+    #   CEE90B0002C7EA0001E133800A000E100402000E10010B000000000D000000000D
+    #   000000000D071020FF54181C010038000000000000000000000000000000000000
+    #   000000000000000000000000000000000000000000000000000000000000000000
+    #   000000000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #
+    # A full description of the configuration string can be found in the
+    # vendor supplied Low Level Operation of the SAMI/AFT document.
+    ###
+
+    _schema = ParticleSchema(PCO2WA_CONFIGURATION_REGEX_MATCHER, PCO2W_CONFIG_SCHEMA_FIELDS)
 
 
 ###############################################################################
@@ -333,6 +235,14 @@ class Protocol(Pco2wProtocol):
     Subclasses CommandResponseInstrumentProtocol
     """
 
+    _chunk_particles = [(SAMI_REGULAR_STATUS_REGEX_MATCHER, SamiRegularStatusDataParticle),
+                        (SAMI_CONTROL_RECORD_REGEX_MATCHER, SamiControlRecordDataParticle),
+                        (PCO2W_SAMPLE_REGEX_MATCHER, Pco2wSamiSampleDataParticle),
+                        (PCO2WA_CONFIGURATION_REGEX_MATCHER, Pco2waConfigurationDataParticle),
+                        (SAMI_ERROR_REGEX_MATCHER, None)]
+
+    _checksum_matchers = [PCO2W_SAMPLE_REGEX_MATCHER]
+
     def __init__(self, prompts, newline, driver_event):
         """
         Protocol constructor.
@@ -355,7 +265,7 @@ class Protocol(Pco2wProtocol):
         self._protocol_fsm.start(ProtocolState.UNKNOWN)
 
         # build the chunker
-        self._chunker = StringChunker(Protocol.sieve_function)
+        self._chunker = StringChunker(self._sieve)
 
     def _filter_capabilities(self, events):
         """
@@ -364,48 +274,6 @@ class Protocol(Pco2wProtocol):
 
         return [x for x in events if Capability.has(x)]
 
-    @staticmethod
-    def sieve_function(raw_data):
-        """
-        The method that splits samples
-        :param raw_data: data to filter
-        """
-
-        return_list = []
-
-        sieve_matchers = [SAMI_REGULAR_STATUS_REGEX_MATCHER,
-                          SAMI_CONTROL_RECORD_REGEX_MATCHER,
-                          PCO2W_SAMPLE_REGEX_MATCHER,
-                          PCO2WA_CONFIGURATION_REGEX_MATCHER,
-                          SAMI_ERROR_REGEX_MATCHER]
-
-        for matcher in sieve_matchers:
-            for match in matcher.finditer(raw_data):
-                return_list.append((match.start(), match.end()))
-
-        return return_list
-
-    def _got_chunk(self, chunk, timestamp):
-        """
-        The base class got_data has gotten a chunk from the chunker. Pass it to
-        extract_sample with the appropriate particle objects and REGEXes.
-        """
-
-        if any([self._extract_sample(SamiRegularStatusDataParticle, SAMI_REGULAR_STATUS_REGEX_MATCHER,
-                                     chunk, timestamp),
-                self._extract_sample(SamiControlRecordDataParticle, SAMI_CONTROL_RECORD_REGEX_MATCHER,
-                                     chunk, timestamp),
-                self._extract_sample(Pco2waConfigurationDataParticle, PCO2WA_CONFIGURATION_REGEX_MATCHER,
-                                     chunk, timestamp)]):
-            return
-
-        sample = self._extract_sample(Pco2wSamiSampleDataParticle, PCO2W_SAMPLE_REGEX_MATCHER, chunk, timestamp)
-
-        log.debug('Protocol._got_chunk(): get_current_state() == %s', self.get_current_state())
-
-        if sample:
-            self._verify_checksum(chunk, PCO2W_SAMPLE_REGEX_MATCHER)
-
     ########################################################################
     # Build Command, Driver and Parameter dictionaries
     ########################################################################
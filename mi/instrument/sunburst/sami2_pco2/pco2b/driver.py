@@ -27,6 +27,9 @@ from mi.core.exceptions import InstrumentTimeoutException
 from mi.core.common import BaseEnum
 from mi.core.instrument.data_particle import DataParticle
 from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.instrument.data_particle import SchemaDataParticle
+from mi.core.instrument.data_particle import ParticleSchema
+from mi.core.instrument.data_particle import HexField
 from mi.core.instrument.chunker import StringChunker
 from mi.core.instrument.protocol_param_dict import ParameterDictType
 from mi.core.instrument.protocol_param_dict import ParameterDictVisibility
@@ -40,6 +43,7 @@ from mi.instrument.sunburst.driver import Prompt, SamiBatteryVoltageDataParticle
 from mi.instrument.sunburst.driver import SamiRegularStatusDataParticle
 from mi.instrument.sunburst.driver import SamiControlRecordDataParticle
 from mi.instrument.sunburst.sami2_pco2.driver import Pco2wSamiConfigurationDataParticleKey
+from mi.instrument.sunburst.sami2_pco2.driver import PCO2W_CONFIG_SCHEMA_FIELDS
 from mi.instrument.sunburst.sami2_pco2.driver import Pco2wInstrumentDriver
 from mi.instrument.sunburst.sami2_pco2.driver import Pco2wProtocol
 from mi.instrument.sunburst.driver import SAMI_REGULAR_STATUS_REGEX_MATCHER
@@ -195,7 +199,7 @@ class Pco2wbDev1SampleDataParticleKey(BaseEnum):
     CHECKSUM = 'checksum'
 
 
-class Pco2wbDev1SampleDataParticle(DataParticle):
+class Pco2wbDev1SampleDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into a device 1 sample data particle
     structure.
@@ -203,43 +207,25 @@ class Pco2wbDev1SampleDataParticle(DataParticle):
     """
     _data_particle_type = DataParticleType.PCO2W_B_DEV1_SAMPLE
 
-    def _build_parsed_values(self):
-        """
-        Parse device 1 values from raw data into a dictionary
-        """
-
-        ### Device 1 Sample Record (External Pump)
-        # Device 1 data records produced by the instrument on either command or
-        # via an internal schedule whenever the external pump is run (via the
-        # R1 command). Like the control records and SAMI data, these messages
-        # are preceded by a '*' character and terminated with a '\r'. Sample
-        # string:
-        #
-        #   *540711CEE91DE2CE
-        #
-        # A full description of the device 1 data record strings can be found
-        # in the vendor supplied SAMI Record Format document.
-        ###
-
-        matched = PCO2WB_DEV1_SAMPLE_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
-
-        particle_keys = [Pco2wbDev1SampleDataParticleKey.UNIQUE_ID,
-                         Pco2wbDev1SampleDataParticleKey.RECORD_LENGTH,
-                         Pco2wbDev1SampleDataParticleKey.RECORD_TYPE,
-                         Pco2wbDev1SampleDataParticleKey.RECORD_TIME,
-                         Pco2wbDev1SampleDataParticleKey.CHECKSUM]
-
-        result = []
-        grp_index = 1
-
-        for key in particle_keys:
-            result.append({DataParticleKey.VALUE_ID: key,
-                           DataParticleKey.VALUE: int(matched.group(grp_index), 16)})
-            grp_index += 1
-        return result
+    ### Device 1 Sample Record (External Pump)
+    # Device 1 data records produced by the instrument on either command or
+    # via an internal schedule whenever the external pump is run (via the
+    # R1 command). Like the control records and SAMI data, these messages
+    # are preceded by a '*' character and terminated with a '\r'. Sample
+    # string:
+    #
+    #   *540711CEE91DE2CE
+    #
+    # A full description of the device 1 data record strings can be found
+    # in the vendor supplied SAMI Record Format document.
+    ###
+
+    _schema = ParticleSchema(PCO2WB_DEV1_SAMPLE_REGEX_MATCHER, [
+        HexField(Pco2wbDev1SampleDataParticleKey.UNIQUE_ID, 1),
+        HexField(Pco2wbDev1SampleDataParticleKey.RECORD_LENGTH, 2),
+        HexField(Pco2wbDev1SampleDataParticleKey.RECORD_TYPE, 3),
+        HexField(Pco2wbDev1SampleDataParticleKey.RECORD_TIME, 4),
+        HexField(Pco2wbDev1SampleDataParticleKey.CHECKSUM, 5)])
 
 
 class Pco2wConfigurationDataParticleKey(Pco2wSamiConfigurationDataParticleKey):
@@ -250,7 +236,7 @@ class Pco2wConfigurationDataParticleKey(Pco2wSamiConfigurationDataParticleKey):
     EXTERNAL_PUMP_SETTINGS = 'external_pump_setting'
 
 
-class Pco2wConfigurationDataParticle(DataParticle):
+class Pco2wConfigurationDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into a configuration record data particle
     structure.
@@ -259,128 +245,27 @@ class Pco2wConfigurationDataParticle(DataParticle):
 
     _data_particle_type = DataParticleType.PCO2W_B_CONFIGURATION
 
-    def _build_parsed_values(self):
-        """
-        Parse configuration record values from raw data into a dictionary
-        """
-
-        ### SAMI-PCO2 Configuration String
-        # Configuration string either sent to the instrument to configure it
-        # (via the L5A command), or retrieved from the instrument in response
-        # to the L command. Sample string (shown broken in multiple lines,
-        # would not be received this way):
-        #
-        #   CEE90B0002C7EA0001E133800A000E100402000E10010B000000000D000000000D
-        #   000000000D071020FF54181C010038140000000000000000000000000000000000
-        #   000000000000000000000000000000000000000000000000000000000000000000
-        #   000000000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
-        #
-        # A full description of the configuration string can be found in the
-        # vendor supplied Low Level Operation of the SAMI/AFT document.
-        ###
-
-        matched = PCO2WB_CONFIGURATION_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
-
-        particle_keys = [Pco2wConfigurationDataParticleKey.LAUNCH_TIME,
-                         Pco2wConfigurationDataParticleKey.START_TIME_OFFSET,
-                         Pco2wConfigurationDataParticleKey.RECORDING_TIME,
-                         Pco2wConfigurationDataParticleKey.PMI_SAMPLE_SCHEDULE,
-                         Pco2wConfigurationDataParticleKey.SAMI_SAMPLE_SCHEDULE,
-                         Pco2wConfigurationDataParticleKey.SLOT1_FOLLOWS_SAMI_SCHEDULE,
-                         Pco2wConfigurationDataParticleKey.SLOT1_INDEPENDENT_SCHEDULE,
-                         Pco2wConfigurationDataParticleKey.SLOT2_FOLLOWS_SAMI_SCHEDULE,
-                         Pco2wConfigurationDataParticleKey.SLOT2_INDEPENDENT_SCHEDULE,
-                         Pco2wConfigurationDataParticleKey.SLOT3_FOLLOWS_SAMI_SCHEDULE,
-                         Pco2wConfigurationDataParticleKey.SLOT3_INDEPENDENT_SCHEDULE,
-                         Pco2wConfigurationDataParticleKey.TIMER_INTERVAL_SAMI,
-                         Pco2wConfigurationDataParticleKey.DRIVER_ID_SAMI,
-                         Pco2wConfigurationDataParticleKey.PARAMETER_POINTER_SAMI,
-                         Pco2wConfigurationDataParticleKey.TIMER_INTERVAL_DEVICE1,
-                         Pco2wConfigurationDataParticleKey.DRIVER_ID_DEVICE1,
-                         Pco2wConfigurationDataParticleKey.PARAMETER_POINTER_DEVICE1,
-                         Pco2wConfigurationDataParticleKey.TIMER_INTERVAL_DEVICE2,
-                         Pco2wConfigurationDataParticleKey.DRIVER_ID_DEVICE2,
-                         Pco2wConfigurationDataParticleKey.PARAMETER_POINTER_DEVICE2,
-                         Pco2wConfigurationDataParticleKey.TIMER_INTERVAL_DEVICE3,
-                         Pco2wConfigurationDataParticleKey.DRIVER_ID_DEVICE3,
-                         Pco2wConfigurationDataParticleKey.PARAMETER_POINTER_DEVICE3,
-                         Pco2wConfigurationDataParticleKey.TIMER_INTERVAL_PRESTART,
-                         Pco2wConfigurationDataParticleKey.DRIVER_ID_PRESTART,
-                         Pco2wConfigurationDataParticleKey.PARAMETER_POINTER_PRESTART,
-                         Pco2wConfigurationDataParticleKey.USE_BAUD_RATE_57600,
-                         Pco2wConfigurationDataParticleKey.SEND_RECORD_TYPE,
-                         Pco2wConfigurationDataParticleKey.SEND_LIVE_RECORDS,
-                         Pco2wConfigurationDataParticleKey.EXTEND_GLOBAL_CONFIG,
-                         Pco2wConfigurationDataParticleKey.PUMP_PULSE,
-                         Pco2wConfigurationDataParticleKey.PUMP_DURATION,
-                         Pco2wConfigurationDataParticleKey.SAMPLES_PER_MEASUREMENT,
-                         Pco2wConfigurationDataParticleKey.CYCLES_BETWEEN_BLANKS,
-                         Pco2wConfigurationDataParticleKey.NUMBER_REAGENT_CYCLES,
-                         Pco2wConfigurationDataParticleKey.NUMBER_BLANK_CYCLES,
-                         Pco2wConfigurationDataParticleKey.FLUSH_PUMP_INTERVAL,
-                         Pco2wConfigurationDataParticleKey.DISABLE_START_BLANK_FLUSH,
-                         Pco2wConfigurationDataParticleKey.MEASURE_AFTER_PUMP_PULSE,
-                         Pco2wConfigurationDataParticleKey.NUMBER_EXTRA_PUMP_CYCLES,
-                         Pco2wConfigurationDataParticleKey.EXTERNAL_PUMP_SETTINGS]
-
-        result = []
-        grp_index = 1  # used to index through match groups, starting at 1
-        mode_index = 0  # index through the bit fields for MODE_BITS,
-        # GLOBAL_CONFIGURATION and SAMI_BIT_SWITCHES.
-        glbl_index = 0
-        sami_index = 0
-
-        for key in particle_keys:
-            if key in [Pco2wConfigurationDataParticleKey.PMI_SAMPLE_SCHEDULE,
-                       Pco2wConfigurationDataParticleKey.SAMI_SAMPLE_SCHEDULE,
-                       Pco2wConfigurationDataParticleKey.SLOT1_FOLLOWS_SAMI_SCHEDULE,
-                       Pco2wConfigurationDataParticleKey.SLOT1_INDEPENDENT_SCHEDULE,
-                       Pco2wConfigurationDataParticleKey.SLOT2_FOLLOWS_SAMI_SCHEDULE,
-                       Pco2wConfigurationDataParticleKey.SLOT2_INDEPENDENT_SCHEDULE,
-                       Pco2wConfigurationDataParticleKey.SLOT3_FOLLOWS_SAMI_SCHEDULE,
-                       Pco2wConfigurationDataParticleKey.SLOT3_INDEPENDENT_SCHEDULE]:
-                # if the keys match values represented by the bits in the one
-                # byte mode bits value, parse bit-by-bit using the bit-shift
-                # operator to determine the boolean value.
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(4), 16) & (1 << mode_index))})
-                mode_index += 1  # bump the bit index
-                grp_index = 5  # set the right group index for when we leave this part of the loop.
-
-            elif key in [Pco2wConfigurationDataParticleKey.USE_BAUD_RATE_57600,
-                         Pco2wConfigurationDataParticleKey.SEND_RECORD_TYPE,
-                         Pco2wConfigurationDataParticleKey.SEND_LIVE_RECORDS,
-                         Pco2wConfigurationDataParticleKey.EXTEND_GLOBAL_CONFIG]:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(20), 16) & (1 << glbl_index))})
-
-                glbl_index += 1  # bump the bit index
-                # skip bit indices 3 through 6
-                if glbl_index == 3:
-                    glbl_index = 7
-                grp_index = 21  # set the right group index for when we leave this part of the loop.
-
-            elif key in [Pco2wConfigurationDataParticleKey.DISABLE_START_BLANK_FLUSH,
-                         Pco2wConfigurationDataParticleKey.MEASURE_AFTER_PUMP_PULSE]:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(28), 16) & (1 << sami_index))})
-                sami_index += 1  # bump the bit index
-                grp_index = 29  # set the right group index for when we leave this part of the loop.
-
-            else:
-                # otherwise all values in the string are parsed to integers
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: int(matched.group(grp_index), 16)})
-                grp_index += 1
-
-        return result
+    ### SAMI-PCO2 Configuration String
+    # Configuration string either sent to the instrument to configure it
+    # (via the L5A command), or retrieved from the instrument in response
+    # to the L command. Sample string (shown broken in multiple lines,
+    # would not be received this way):
+    #
+    #   CEE90B0002C7EA0001E133800A000E100402000E10010B000000000D000000000D
+    #   000000000D071020FF54181C010038140000000000000000000000000000000000
+    #   000000000000000000000000000000000000000000000000000000000000000000
+    #   000000000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #   FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF
+    #
+    # A full description of the configuration string can be found in the
+    # vendor supplied Low Level Operation of the SAMI/AFT document.
+    ###
+
+    _schema = ParticleSchema(PCO2WB_CONFIGURATION_REGEX_MATCHER, PCO2W_CONFIG_SCHEMA_FIELDS + [
+        HexField(Pco2wConfigurationDataParticleKey.EXTERNAL_PUMP_SETTINGS, 30)])
 
 
 ###############################################################################
@@ -425,6 +310,15 @@ class Protocol(Pco2wProtocol):
     Subclasses CommandResponseInstrumentProtocol
     """
 
+    _chunk_particles = [(SAMI_REGULAR_STATUS_REGEX_MATCHER, SamiRegularStatusDataParticle),
+                        (SAMI_CONTROL_RECORD_REGEX_MATCHER, SamiControlRecordDataParticle),
+                        (PCO2W_SAMPLE_REGEX_MATCHER, Pco2wSamiSampleDataParticle),
+                        (PCO2WB_DEV1_SAMPLE_REGEX_MATCHER, Pco2wbDev1SampleDataParticle),
+                        (PCO2WB_CONFIGURATION_REGEX_MATCHER, Pco2wConfigurationDataParticle),
+                        (SAMI_ERROR_REGEX_MATCHER, None)]
+
+    _checksum_matchers = [PCO2W_SAMPLE_REGEX_MATCHER, PCO2WB_DEV1_SAMPLE_REGEX_MATCHER]
+
     def __init__(self, prompts, newline, driver_event):
         """
         Protocol constructor.
@@ -482,7 +376,7 @@ class Protocol(Pco2wProtocol):
         self._protocol_fsm.start(ProtocolState.UNKNOWN)
 
         # build the chunker
-        self._chunker = StringChunker(Protocol.sieve_function)
+        self._chunker = StringChunker(self._sieve)
 
         self._engineering_parameters.append(Parameter.EXTERNAL_PUMP_DELAY)
 
@@ -577,54 +471,6 @@ class Protocol(Pco2wProtocol):
 
         time.sleep(external_pump_delay)
 
-    @staticmethod
-    def sieve_function(raw_data):
-        """
-        The method that splits samples
-        :param raw_data: data to filter
-        """
-
-        return_list = []
-
-        sieve_matchers = [SAMI_REGULAR_STATUS_REGEX_MATCHER,
-                          SAMI_CONTROL_RECORD_REGEX_MATCHER,
-                          PCO2W_SAMPLE_REGEX_MATCHER,
-                          PCO2WB_DEV1_SAMPLE_REGEX_MATCHER,
-                          PCO2WB_CONFIGURATION_REGEX_MATCHER,
-                          SAMI_ERROR_REGEX_MATCHER]
-
-        for matcher in sieve_matchers:
-            for match in matcher.finditer(raw_data):
-                return_list.append((match.start(), match.end()))
-
-        return return_list
-
-    def _got_chunk(self, chunk, timestamp):
-        """
-        The base class got_data has gotten a chunk from the chunker. Pass it to
-        extract_sample with the appropriate particle objects and REGEXes.
-        """
-
-        if any([
-                self._extract_sample(SamiRegularStatusDataParticle, SAMI_REGULAR_STATUS_REGEX_MATCHER,
-                                     chunk, timestamp),
-                self._extract_sample(SamiControlRecordDataParticle, SAMI_CONTROL_RECORD_REGEX_MATCHER,
-                                     chunk, timestamp),
-                self._extract_sample(Pco2wConfigurationDataParticle, PCO2WB_CONFIGURATION_REGEX_MATCHER,
-                                     chunk, timestamp)]):
-            return
-
-        dev1_sample = self._extract_sample(Pco2wbDev1SampleDataParticle, PCO2WB_DEV1_SAMPLE_REGEX_MATCHER, chunk,
-                                           timestamp)
-        sami_sample = self._extract_sample(Pco2wSamiSampleDataParticle, PCO2W_SAMPLE_REGEX_MATCHER, chunk, timestamp)
-
-        log.debug('Protocol._got_chunk(): get_current_state() == %s', self.get_current_state())
-
-        if sami_sample:
-            self._verify_checksum(chunk, PCO2W_SAMPLE_REGEX_MATCHER)
-        elif dev1_sample:
-            self._verify_checksum(chunk, PCO2WB_DEV1_SAMPLE_REGEX_MATCHER)
-
     ########################################################################
     # Build Command, Driver and Parameter dictionaries
     ########################################################################
@@ -31,6 +31,9 @@ from mi.core.common import BaseEnum
 from mi.core.instrument.chunker import StringChunker
 from mi.core.instrument.data_particle import DataParticle
 from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.instrument.data_particle import SchemaDataParticle
+from mi.core.instrument.data_particle import ParticleSchema
+from mi.core.instrument.data_particle import HexField
 from mi.core.instrument.instrument_fsm import ThreadSafeFSM
 from mi.core.instrument.instrument_driver import ResourceAgentState
 from mi.core.instrument.protocol_param_dict import ParameterDictType
@@ -42,6 +45,7 @@ from mi.instrument.sunburst.driver import SamiInstrumentCommand
 from mi.instrument.sunburst.driver import SamiRegularStatusDataParticle
 from mi.instrument.sunburst.driver import SamiControlRecordDataParticle
 from mi.instrument.sunburst.driver import SamiConfigDataParticleKey
+from mi.instrument.sunburst.driver import SAMI_CONFIG_SCHEMA_FIELDS
 from mi.instrument.sunburst.driver import SamiInstrumentDriver
 from mi.instrument.sunburst.driver import SamiProtocol
 
@@ -256,7 +260,7 @@ class PhsenSamiSampleDataParticleKey(BaseEnum):
     CHECKSUM = 'checksum'
 
 
-class PhsenSamiSampleDataParticle(DataParticle):
+class PhsenSamiSampleDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into a SAMI2-PH sample data particle
     structure.
@@ -264,68 +268,21 @@ class PhsenSamiSampleDataParticle(DataParticle):
     """
     _data_particle_type = DataParticleType.PHSEN_DATA_RECORD
 
-    def _build_parsed_values(self):
-        """
-        Parse SAMI2-PH values from raw data into a dictionary
-        """
-
-        matched = PHSEN_SAMPLE_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
-
-        particle_keys = [PhsenSamiSampleDataParticleKey.UNIQUE_ID,
-                         PhsenSamiSampleDataParticleKey.RECORD_LENGTH,
-                         PhsenSamiSampleDataParticleKey.RECORD_TYPE,
-                         PhsenSamiSampleDataParticleKey.RECORD_TIME,
-                         PhsenSamiSampleDataParticleKey.START_THERMISTOR,
-                         PhsenSamiSampleDataParticleKey.REF_MEASUREMENTS,
-                         PhsenSamiSampleDataParticleKey.PH_MEASUREMENTS,
-                         PhsenSamiSampleDataParticleKey.RESERVED_UNUSED,
-                         PhsenSamiSampleDataParticleKey.VOLTAGE_BATTERY,
-                         PhsenSamiSampleDataParticleKey.END_THERMISTOR,
-                         PhsenSamiSampleDataParticleKey.CHECKSUM]
-
-        result = []
-        grp_index = 1  # regex group index counter
-        unhex = lambda x: int(x, 16)
-
-        # Create secondary regexes to read the ref set and ph set into
-        # lists before putting into the data particle.
-
-        # From the regex data sample match, group 5 is a set of 16
-        # reference light measurements, and group 6 is a set of 92 light
-        # measurements from which determines pH
-        ref_measurements_string = matched.groups()[5]
-        ph_measurements_string = matched.groups()[6]
-
+    _schema = ParticleSchema(PHSEN_SAMPLE_REGEX_MATCHER, [
+        HexField(PhsenSamiSampleDataParticleKey.UNIQUE_ID, 1),
+        HexField(PhsenSamiSampleDataParticleKey.RECORD_LENGTH, 2),
+        HexField(PhsenSamiSampleDataParticleKey.RECORD_TYPE, 3),
+        HexField(PhsenSamiSampleDataParticleKey.RECORD_TIME, 4),
+        HexField(PhsenSamiSampleDataParticleKey.START_THERMISTOR, 5),
         # 16 reference light measurements each 2 bytes (4 hex digits)
-        ref_regex = r'([0-9A-Fa-f]{4})' * 16
-        ref_regex_matcher = re.compile(ref_regex)
-        ref_match = ref_regex_matcher.match(ref_measurements_string)
-        ref_measurements = map(unhex, list(ref_match.groups()))
-
-        # 92 ph measurements (23 sets of 4 measurement types)
-        # each 2 bytes (4 hex digits)
-        ph_regex = r'([0-9A-Fa-f]{4})' * 92
-        ph_regex_matcher = re.compile(ph_regex)
-        ph_match = ph_regex_matcher.match(ph_measurements_string)
-        ph_measurements = map(unhex, list(ph_match.groups()))
-
-        # fill out the data particle with values
-        for key in particle_keys:
-            if key is PhsenSamiSampleDataParticleKey.REF_MEASUREMENTS:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: ref_measurements})
-            elif key is PhsenSamiSampleDataParticleKey.PH_MEASUREMENTS:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: ph_measurements})
-            else:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: unhex(matched.group(grp_index))})
-            grp_index += 1
-
-        return result
+        HexField(PhsenSamiSampleDataParticleKey.REF_MEASUREMENTS, 6, width=4),
+        # 92 ph measurements (23 sets of 4 measurement types) each 2 bytes
+        # (4 hex digits)
+        HexField(PhsenSamiSampleDataParticleKey.PH_MEASUREMENTS, 7, width=4),
+        HexField(PhsenSamiSampleDataParticleKey.RESERVED_UNUSED, 8),
+        HexField(PhsenSamiSampleDataParticleKey.VOLTAGE_BATTERY, 9),
+        HexField(PhsenSamiSampleDataParticleKey.END_THERMISTOR, 10),
+        HexField(PhsenSamiSampleDataParticleKey.CHECKSUM, 11)])
 
 
 class PhsenConfigDataParticleKey(SamiConfigDataParticleKey):
@@ -349,7 +306,7 @@ class PhsenConfigDataParticleKey(SamiConfigDataParticleKey):
     SALINITY_DELAY = 'salinity_delay'
 
 
-class PhsenConfigDataParticle(DataParticle):
+class PhsenConfigDataParticle(SchemaDataParticle):
     """
     Routines for parsing raw data into a configuration record data particle
     structure.
@@ -357,98 +314,21 @@ class PhsenConfigDataParticle(DataParticle):
     """
     _data_particle_type = DataParticleType.PHSEN_CONFIGURATION
 
-    def _build_parsed_values(self):
-        """
-        Parse configuration record values from raw data into a dictionary
-        """
-
-        matched = PHSEN_CONFIGURATION_REGEX_MATCHER.match(self.raw_data)
-        if not matched:
-            raise SampleException("No regex match of parsed sample data: [%s]" %
-                                  self.decoded_raw)
-
-        particle_keys = [PhsenConfigDataParticleKey.LAUNCH_TIME,
-                         PhsenConfigDataParticleKey.START_TIME_OFFSET,
-                         PhsenConfigDataParticleKey.RECORDING_TIME,
-                         PhsenConfigDataParticleKey.PMI_SAMPLE_SCHEDULE,
-                         PhsenConfigDataParticleKey.SAMI_SAMPLE_SCHEDULE,
-                         PhsenConfigDataParticleKey.SLOT1_FOLLOWS_SAMI_SCHEDULE,
-                         PhsenConfigDataParticleKey.SLOT1_INDEPENDENT_SCHEDULE,
-                         PhsenConfigDataParticleKey.SLOT2_FOLLOWS_SAMI_SCHEDULE,
-                         PhsenConfigDataParticleKey.SLOT2_INDEPENDENT_SCHEDULE,
-                         PhsenConfigDataParticleKey.SLOT3_FOLLOWS_SAMI_SCHEDULE,
-                         PhsenConfigDataParticleKey.SLOT3_INDEPENDENT_SCHEDULE,
-                         PhsenConfigDataParticleKey.TIMER_INTERVAL_SAMI,
-                         PhsenConfigDataParticleKey.DRIVER_ID_SAMI,
-                         PhsenConfigDataParticleKey.PARAMETER_POINTER_SAMI,
-                         PhsenConfigDataParticleKey.TIMER_INTERVAL_DEVICE1,
-                         PhsenConfigDataParticleKey.DRIVER_ID_DEVICE1,
-                         PhsenConfigDataParticleKey.PARAMETER_POINTER_DEVICE1,
-                         PhsenConfigDataParticleKey.TIMER_INTERVAL_DEVICE2,
-                         PhsenConfigDataParticleKey.DRIVER_ID_DEVICE2,
-                         PhsenConfigDataParticleKey.PARAMETER_POINTER_DEVICE2,
-                         PhsenConfigDataParticleKey.TIMER_INTERVAL_DEVICE3,
-                         PhsenConfigDataParticleKey.DRIVER_ID_DEVICE3,
-                         PhsenConfigDataParticleKey.PARAMETER_POINTER_DEVICE3,
-                         PhsenConfigDataParticleKey.TIMER_INTERVAL_PRESTART,
-                         PhsenConfigDataParticleKey.DRIVER_ID_PRESTART,
-                         PhsenConfigDataParticleKey.PARAMETER_POINTER_PRESTART,
-                         PhsenConfigDataParticleKey.USE_BAUD_RATE_57600,
-                         PhsenConfigDataParticleKey.SEND_RECORD_TYPE,
-                         PhsenConfigDataParticleKey.SEND_LIVE_RECORDS,
-                         PhsenConfigDataParticleKey.EXTEND_GLOBAL_CONFIG,
-                         PhsenConfigDataParticleKey.NUMBER_SAMPLES_AVERAGED,
-                         PhsenConfigDataParticleKey.NUMBER_FLUSHES,
-                         PhsenConfigDataParticleKey.PUMP_ON_FLUSH,
-                         PhsenConfigDataParticleKey.PUMP_OFF_FLUSH,
-                         PhsenConfigDataParticleKey.NUMBER_REAGENT_PUMPS,
-                         PhsenConfigDataParticleKey.VALVE_DELAY,
-                         PhsenConfigDataParticleKey.PUMP_ON_IND,
-                         PhsenConfigDataParticleKey.PV_OFF_IND,
-                         PhsenConfigDataParticleKey.NUMBER_BLANKS,
-                         PhsenConfigDataParticleKey.PUMP_MEASURE_T,
-                         PhsenConfigDataParticleKey.PUMP_OFF_TO_MEASURE,
-                         PhsenConfigDataParticleKey.MEASURE_TO_PUMP_ON,
-                         PhsenConfigDataParticleKey.NUMBER_MEASUREMENTS,
-                         PhsenConfigDataParticleKey.SALINITY_DELAY]
-
-        result = []
-        grp_index = 1
-        mode_index = 0
-        glbl_index = 0
-        #sami_index = 0
-
-        for key in particle_keys:
-            if key in [PhsenConfigDataParticleKey.PMI_SAMPLE_SCHEDULE,
-                       PhsenConfigDataParticleKey.SAMI_SAMPLE_SCHEDULE,
-                       PhsenConfigDataParticleKey.SLOT1_FOLLOWS_SAMI_SCHEDULE,
-                       PhsenConfigDataParticleKey.SLOT1_INDEPENDENT_SCHEDULE,
-                       PhsenConfigDataParticleKey.SLOT2_FOLLOWS_SAMI_SCHEDULE,
-                       PhsenConfigDataParticleKey.SLOT2_INDEPENDENT_SCHEDULE,
-                       PhsenConfigDataParticleKey.SLOT3_FOLLOWS_SAMI_SCHEDULE,
-                       PhsenConfigDataParticleKey.SLOT3_INDEPENDENT_SCHEDULE]:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(4), 16) & (1 << mode_index))})
-                mode_index += 1
-                grp_index = 5
-
-            elif key in [PhsenConfigDataParticleKey.USE_BAUD_RATE_57600,
-                         PhsenConfigDataParticleKey.SEND_RECORD_TYPE,
-                         PhsenConfigDataParticleKey.SEND_LIVE_RECORDS,
-                         PhsenConfigDataParticleKey.EXTEND_GLOBAL_CONFIG]:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: bool(int(matched.group(20), 16) & (1 << glbl_index))})
-                glbl_index += 1
-                if glbl_index == 3:
-                    glbl_index = 7
-                grp_index = 21
-
-            else:
-                result.append({DataParticleKey.VALUE_ID: key,
-                               DataParticleKey.VALUE: int(matched.group(grp_index), 16)})
-                grp_index += 1
-
-        return result
+    _schema = ParticleSchema(PHSEN_CONFIGURATION_REGEX_MATCHER, SAMI_CONFIG_SCHEMA_FIELDS + [
+        HexField(PhsenConfigDataParticleKey.NUMBER_SAMPLES_AVERAGED, 21),
+        HexField(PhsenConfigDataParticleKey.NUMBER_FLUSHES, 22),
+        HexField(PhsenConfigDataParticleKey.PUMP_ON_FLUSH, 23),
+        HexField(PhsenConfigDataParticleKey.PUMP_OFF_FLUSH, 24),
+        HexField(PhsenConfigDataParticleKey.NUMBER_REAGENT_PUMPS, 25),
+        HexField(PhsenConfigDataParticleKey.VALVE_DELAY, 26),
+        HexField(PhsenConfigDataParticleKey.PUMP_ON_IND, 27),
+        HexField(PhsenConfigDataParticleKey.PV_OFF_IND, 28),
+        HexField(PhsenConfigDataParticleKey.NUMBER_BLANKS, 29),
+        HexField(PhsenConfigDataParticleKey.PUMP_MEASURE_T, 30),
+        HexField(PhsenConfigDataParticleKey.PUMP_OFF_TO_MEASURE, 31),
+        HexField(PhsenConfigDataParticleKey.MEASURE_TO_PUMP_ON, 32),
+        HexField(PhsenConfigDataParticleKey.NUMBER_MEASUREMENTS, 33),
+        HexField(PhsenConfigDataParticleKey.SALINITY_DELAY, 34)])
 
 
 ###############################################################################
@@ -494,6 +374,14 @@ class Protocol(SamiProtocol):
     Subclasses SamiProtocol and CommandResponseInstrumentProtocol
     """
 
+    _chunk_particles = [(SAMI_REGULAR_STATUS_REGEX_MATCHER, SamiRegularStatusDataParticle),
+                        (SAMI_CONTROL_RECORD_REGEX_MATCHER, SamiControlRecordDataParticle),
+                        (PHSEN_SAMPLE_REGEX_MATCHER, PhsenSamiSampleDataParticle),
+                        (PHSEN_CONFIGURATION_REGEX_MATCHER, PhsenConfigDataParticle),
+                        (SAMI_ERROR_REGEX_MATCHER, None)]
+
+    _checksum_matchers = [PHSEN_SAMPLE_REGEX_MATCHER]
+
     def __init__(self, prompts, newline, driver_event):
         """
         Protocol constructor.
@@ -601,7 +489,7 @@ class Protocol(SamiProtocol):
         self._protocol_fsm.start(ProtocolState.UNKNOWN)
 
         # build the chunker bot
-        self._chunker = StringChunker(Protocol.sieve_function)
+        self._chunker = StringChunker(self._sieve)
 
     ########################################################################
     # Command handlers.
@@ -808,48 +696,6 @@ class Protocol(SamiProtocol):
 
         return [x for x in events if Capability.has(x)]
 
-    @staticmethod
-    def sieve_function(raw_data):
-        """
-        The method that splits samples
-        :param raw_data: data to filter
-        """
-
-        return_list = []
-
-        sieve_matchers = [SAMI_REGULAR_STATUS_REGEX_MATCHER,
-                          SAMI_CONTROL_RECORD_REGEX_MATCHER,
-                          PHSEN_SAMPLE_REGEX_MATCHER,
-                          PHSEN_CONFIGURATION_REGEX_MATCHER,
-                          SAMI_ERROR_REGEX_MATCHER]
-
-        for matcher in sieve_matchers:
-            for match in matcher.finditer(raw_data):
-                return_list.append((match.start(), match.end()))
-
-        return return_list
-
-    def _got_chunk(self, chunk, timestamp):
-        """
-        The base class got_data has gotten a chunk from the chunker.  Pass it to extract_sample
-        with the appropriate particle objects and REGEXes.
-        """
-
-        if any([self._extract_sample(SamiRegularStatusDataParticle, SAMI_REGULAR_STATUS_REGEX_MATCHER,
-                                     chunk, timestamp),
-                self._extract_sample(SamiControlRecordDataParticle, SAMI_CONTROL_RECORD_REGEX_MATCHER,
-                                     chunk, timestamp),
-                self._extract_sample(PhsenConfigDataParticle, PHSEN_CONFIGURATION_REGEX_MATCHER,
-                                     chunk, timestamp)]):
-            return
-
-        sample = self._extract_sample(PhsenSamiSampleDataParticle, PHSEN_SAMPLE_REGEX_MATCHER, chunk, timestamp)
-
-        log.debug('Protocol._got_chunk(): get_current_state() == %s', self.get_current_state())
-
-        if sample:
-            self._verify_checksum(chunk, PHSEN_SAMPLE_REGEX_MATCHER)
-
     ########################################################################
     # Build Command
     ########################################################################
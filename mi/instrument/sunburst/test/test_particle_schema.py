@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+
+"""
+@package mi.instrument.sunburst.test.test_particle_schema
+@file mi/instrument/sunburst/test/test_particle_schema.py
+@author agent
+@brief Check the SAMI particle schemas against the hand written particles
+they replaced
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import os
+import json
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.instrument.data_particle import DataParticleKey
+
+from mi.instrument.sunburst.driver import SamiBatteryVoltageDataParticle
+from mi.instrument.sunburst.driver import SamiThermistorVoltageDataParticle
+from mi.instrument.sunburst.driver import SamiRegularStatusDataParticle
+from mi.instrument.sunburst.driver import SamiControlRecordDataParticle
+from mi.instrument.sunburst.sami2_pco2.driver import Pco2wSamiSampleDataParticle
+from mi.instrument.sunburst.sami2_pco2.pco2a.driver import Pco2waConfigurationDataParticle
+from mi.instrument.sunburst.sami2_pco2.pco2b.driver import Pco2wbDev1SampleDataParticle
+from mi.instrument.sunburst.sami2_pco2.pco2b.driver import Pco2wConfigurationDataParticle
+from mi.instrument.sunburst.sami2_ph.ooicore.driver import PhsenSamiSampleDataParticle
+from mi.instrument.sunburst.sami2_ph.ooicore.driver import PhsenConfigDataParticle
+
+# Records, all zero, all F and random, with the particle values as published
+# by the _build_parsed_values implementations the schemas replaced.
+RESOURCE_FILE = os.path.join(os.path.dirname(__file__), 'resource', 'sami_particles.json')
+
+PARTICLES = [SamiBatteryVoltageDataParticle,
+             SamiThermistorVoltageDataParticle,
+             SamiRegularStatusDataParticle,
+             SamiControlRecordDataParticle,
+             Pco2wSamiSampleDataParticle,
+             Pco2waConfigurationDataParticle,
+             Pco2wbDev1SampleDataParticle,
+             Pco2wConfigurationDataParticle,
+             PhsenSamiSampleDataParticle,
+             PhsenConfigDataParticle]
+
+
+@attr('UNIT', group='mi')
+class SamiParticleSchemaUnitTest(MiUnitTest):
+
+    def setUp(self):
+        with open(RESOURCE_FILE) as f:
+            self.records = json.load(f)
+        self.particles = dict((cls.__name__, cls) for cls in PARTICLES)
+
+    def test_values_unchanged(self):
+        """
+        The values of every particle serialize to the same JSON as before
+        """
+        checked = set()
+        for record in self.records:
+            particle = self.particles[record['particle']](str(record['raw']))
+            values = particle.generate_dict()[DataParticleKey.VALUES]
+            self.assertEqual(json.dumps(values), record['values'],
+                             msg='%s %r' % (record['particle'], record['raw']))
+            checked.add(record['particle'])
+        self.assertEqual(checked, set(self.particles))
+
+    def test_build_rate(self):
+        """
+        Log the parse rate of each particle
+        """
+        count = 2000
+        for record in self.records[::6]:
+            particle = self.particles[record['particle']](str(record['raw']))
+            start = time.time()
+            for _ in xrange(count):
+                particle._build_parsed_values()
+            log.info("%s: %.1f us per particle", record['particle'],
+                     (time.time() - start) / count * 1e6)
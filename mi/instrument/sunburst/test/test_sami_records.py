@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+
+"""
+@package mi.instrument.sunburst.test.test_sami_records
+@file mi/instrument/sunburst/test/test_sami_records.py
+@author agent
+@brief Test SAMI record checksums and record dispatch from the chunker
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import json
+import time
+import random
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+from mi.core.exceptions import SampleException
+from mi.core.instrument.port_agent_client import PortAgentPacket
+from mi.core.instrument.instrument_driver import DriverAsyncEvent
+from mi.core.instrument.data_particle import DataParticleKey
+from mi.core.instrument.chunker import StringChunker
+
+from mi.instrument.sunburst.driver import Prompt
+from mi.instrument.sunburst.driver import SamiProtocol
+from mi.instrument.sunburst.driver import SAMI_NEWLINE
+from mi.instrument.sunburst.driver import SamiRegularStatusDataParticle
+from mi.instrument.sunburst.driver import SamiControlRecordDataParticle
+from mi.instrument.sunburst.sami2_ph.ooicore.driver import Protocol
+from mi.instrument.sunburst.sami2_ph.ooicore.driver import DataParticleType
+
+CONTROL_RECORD = '*F81285CDDD74DD0041000003000000000224FC' + SAMI_NEWLINE
+STATUS_MESSAGE = ':CDDD74E10041000003000000000236F8' + SAMI_NEWLINE
+ERROR_CODE = '?0B' + SAMI_NEWLINE
+DATA_SAMPLE = '*F8E70ACDDE9E4F06350BAA077C06A408040BAD077906A307' + \
+              'FE0BA80778069F08010BAA077C06A208020BAB077E06A208040BAB077906A' + \
+              '008010BAA06F806A107FE0BAE04EC06A707EF0BAF027C06A407E20BAA0126' + \
+              '069E07D60BAF00A806A207D60BAC008906A407DF0BAD009206A207E70BAB0' + \
+              '0C206A207F20BB0011306A707F80BAC019106A208000BAE022D069F08010B' + \
+              'AB02E006A008030BAD039706A308000BAB044706A208000BAA04E906A3080' + \
+              '30BAB056D06A408030BAA05DC069F08010BAF063406A608070BAE067406A2' + \
+              '08000BAC06AB069E07FF0BAD06D506A2080200000D650636CE' + SAMI_NEWLINE
+
+
+def hex_pair_crc(s):
+    """
+    The checksum as the instrument documentation describes it, one hex
+    pair at a time
+    """
+    cs = 0
+    for index in xrange(0, len(s), 2):
+        cs += int(s[index:index + 2], 16)
+    return cs & 0xFF
+
+
+def packet(data, timestamp=3600.0):
+    pkt = PortAgentPacket()
+    pkt.attach_data(data)
+    pkt.attach_timestamp(timestamp)
+    pkt.pack_header()
+    return pkt
+
+
+@attr('UNIT', group='mi')
+class SamiRecordUnitTest(MiUnitTest):
+
+    def setUp(self):
+        self.events = []
+        self.protocol = Protocol(Prompt, SAMI_NEWLINE, lambda *args: self.events.append(args))
+        del self.events[:]
+
+    def samples(self):
+        return [json.loads(value)[DataParticleKey.STREAM_NAME]
+                for event, value in self.events if event == DriverAsyncEvent.SAMPLE]
+
+    def test_calc_crc(self):
+        rng = random.Random(7)
+        for length in [0, 1, 2, 3, 38, 941]:
+            s = ''.join(rng.choice('0123456789ABCDEFabcdef') for _ in xrange(length))
+            self.assertEqual(SamiProtocol.calc_crc(s), hex_pair_crc(s))
+
+        sample_string = DATA_SAMPLE.rstrip()
+        self.assertEqual(SamiProtocol.calc_crc(sample_string[3:-2]), int(sample_string[-2:], 16))
+
+    def test_got_data(self):
+        """
+        Records split over packets are published once each, by type
+        """
+        data = STATUS_MESSAGE + ERROR_CODE + DATA_SAMPLE + CONTROL_RECORD
+        self.protocol.got_data(packet(data[:100]))
+        self.protocol.got_data(packet(data[100:]))
+        # the SAMI particle types are those of the last driver imported
+        self.assertEqual(self.samples(), [SamiRegularStatusDataParticle.type(),
+                                          DataParticleType.PHSEN_DATA_RECORD,
+                                          SamiControlRecordDataParticle.type()])
+        self.assertEqual(self.protocol._chunk_matches, {})
+
+        # a chunk the sieve did not see is matched in _got_chunk
+        self.protocol._got_chunk(STATUS_MESSAGE, 3600.0)
+        self.protocol._got_chunk('garbage', 3600.0)
+        self.assertEqual(len(self.samples()), 4)
+
+    def test_sieved_records_dropped(self):
+        """
+        Matches of records the chunker never hands out are not kept
+        """
+        self.protocol._sieve(STATUS_MESSAGE + CONTROL_RECORD)
+        self.assertEqual(len(self.protocol._chunk_matches), 2)
+        self.protocol._chunker = StringChunker(self.protocol._sieve)
+
+        self.protocol.got_data(packet(DATA_SAMPLE))
+        self.assertEqual(self.samples(), [DataParticleType.PHSEN_DATA_RECORD])
+        self.assertEqual(self.protocol._chunk_matches, {})
+
+    def test_bad_checksum(self):
+        """
+        A sample with a bad checksum is published, then rejected
+        """
+        bad_sample = DATA_SAMPLE[:-3] + '00' + SAMI_NEWLINE
+        with self.assertRaises(SampleException):
+            self.protocol.got_data(packet(bad_sample))
+        self.assertEqual(self.samples(), [DataParticleType.PHSEN_DATA_RECORD])
+
+    def test_got_data_rate(self):
+        """
+        Log the got_data rate of pH samples
+        """
+        count = 500
+        start = time.time()
+        for _ in xrange(count):
+            self.protocol.got_data(packet(DATA_SAMPLE))
+        log.info("phsen got_data: %.0f samples/sec", count / (time.time() - start))
+        self.assertEqual(len(self.samples()), count)
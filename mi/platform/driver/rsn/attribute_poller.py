@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+
+"""
+@package mi.platform.driver.rsn.attribute_poller
+@file    mi/platform/driver/rsn/attribute_poller.py
+@author  agent
+@brief   Batched attribute value retrieval for several platforms.
+
+The CI-OMS get_platform_attribute_values operation takes a single platform
+but any number of attributes, so a set of (platform_id, attr_id, from_time)
+requests needs exactly one OMS call per platform involved. AttributePoller
+does that grouping, issues the calls with fan_out (concurrently on a pooled
+client) and remembers the latest NTP timestamp seen for each attribute so
+subsequent polls only ask for, and only return, newer samples.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+
+import threading
+
+from mi.core.log import get_logger ; log = get_logger()
+
+from mi.platform.driver.rsn.oms_client_pool import fan_out
+
+
+class AttributePoller(object):
+    """
+    Groups attribute requests by platform and tracks the last timestamp
+    seen per (platform_id, attr_id).
+    """
+
+    def __init__(self, client=None):
+        """
+        @param client  CIOMSClient or CIOMSClientPool, can be set later
+                       with set_client.
+        """
+        self._client = client
+        self._last_ntp = {}
+        self._lock = threading.Lock()
+
+    def set_client(self, client):
+        self._client = client
+
+    def last_timestamp(self, platform_id, attr_id):
+        """
+        @retval the latest NTP timestamp returned for the attribute, or None.
+        """
+        return self._last_ntp.get((platform_id, attr_id))
+
+    def reset(self, platform_id=None):
+        """
+        Forgets the timestamps seen for the given platform, or for all
+        platforms if None.
+        """
+        with self._lock:
+            if platform_id is None:
+                self._last_ntp.clear()
+            else:
+                for key in [k for k in self._last_ntp if k[0] == platform_id]:
+                    del self._last_ntp[key]
+
+    def group_requests(self, requests):
+        """
+        Groups requests by platform, moving each from_time forward to the
+        last timestamp already seen for the attribute. An attribute requested
+        more than once keeps its earliest from_time.
+
+        @param requests  iterable of (platform_id, attr_id, from_time) with
+                         from_time in NTP.
+        @retval {platform_id: [(attr_id, from_time), ...], ...}
+        """
+        grouped = {}
+        for platform_id, attr_id, from_time in requests:
+            last = self._last_ntp.get((platform_id, attr_id))
+            if last is not None and last > from_time:
+                from_time = last
+            attrs = grouped.setdefault(platform_id, {})
+            if attr_id not in attrs or from_time < attrs[attr_id]:
+                attrs[attr_id] = from_time
+
+        return dict((platform_id, sorted(attrs.iteritems()))
+                    for platform_id, attrs in grouped.iteritems())
+
+    def poll(self, requests):
+        """
+        Retrieves the attribute values for the given requests using one OMS
+        call per platform.
+
+        @param requests  iterable of (platform_id, attr_id, from_time) with
+                         from_time in NTP.
+
+        @retval {platform_id: {attr_id: [(value, timestamp), ...], ...}, ...}
+                Samples already returned by a previous poll are left out. A
+                platform or attribute rejected by the OMS maps to the
+                corresponding InvalidResponse value.
+
+        @raise Exception the first exception raised by an OMS call; no
+               timestamps are recorded in that case.
+        """
+        grouped = self.group_requests(requests)
+        platform_ids = sorted(grouped)
+        calls = [('attr.get_platform_attribute_values', (platform_id, grouped[platform_id]))
+                 for platform_id in platform_ids]
+
+        log.debug("AttributePoller: %d OMS calls for %d platforms",
+                  len(calls), len(platform_ids))
+        responses = fan_out(self._client, calls)
+
+        for platform_id, response in zip(platform_ids, responses):
+            if isinstance(response, Exception):
+                log.warn("AttributePoller: get_platform_attribute_values(%r) failed: %s",
+                         platform_id, response)
+                raise response
+
+        result = {}
+        with self._lock:
+            for platform_id, response in zip(platform_ids, responses):
+                if not isinstance(response, dict) or platform_id not in response:
+                    log.warn("AttributePoller: response does not include platform %r",
+                             platform_id)
+                    result[platform_id] = response
+                    continue
+
+                attr_values = response[platform_id]
+                if not isinstance(attr_values, dict):
+                    # eg. InvalidResponse.PLATFORM_ID
+                    result[platform_id] = attr_values
+                    continue
+
+                result[platform_id] = self._new_values(platform_id, attr_values)
+
+        return result
+
+    def _new_values(self, platform_id, attr_values):
+        """
+        Drops the samples not newer than the last timestamp seen for each
+        attribute and records the new last timestamps.
+        """
+        values = {}
+        for attr_id, samples in attr_values.iteritems():
+            if not isinstance(samples, (list, tuple)):
+                # eg. InvalidResponse.ATTRIBUTE_ID
+                values[attr_id] = samples
+                continue
+
+            key = (platform_id, attr_id)
+            last = self._last_ntp.get(key)
+            if last is not None:
+                samples = [s for s in samples if s[1] > last]
+            if samples:
+                self._last_ntp[key] = max(s[1] for s in samples)
+            values[attr_id] = samples
+
+        return values
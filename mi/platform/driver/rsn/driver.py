@@ -25,6 +25,8 @@ from mi.platform.exceptions import PlatformException
 from mi.platform.exceptions import PlatformDriverException
 from mi.platform.exceptions import PlatformConnectionException
 from mi.platform.driver.rsn.oms_client_factory import CIOMSClientFactory
+from mi.platform.driver.rsn.oms_client_pool import fan_out
+from mi.platform.driver.rsn.attribute_poller import AttributePoller
 from mi.platform.responses import InvalidResponse
 
 from ion.agents.platform.util import ion_ts_2_ntp
@@ -81,6 +83,10 @@ class PlatformDriver(PlatformDriver):
         # CIOMSClient instance created by connect() and destroyed by disconnect():
         self._rsn_oms = None
 
+        # batched attribute retrieval for this platform and its subtree,
+        # keeps the last timestamp seen per attribute across connections:
+        self._attr_poller = AttributePoller()
+
         # TODO(OOIION-1495) review the following. Commented out for the moment.
         # What does "ports that have devices attached" mean?
         """
@@ -271,6 +277,7 @@ class PlatformDriver(PlatformDriver):
         log.debug("%r: creating CIOMSClient instance with oms_uri=%r",
                   self._platform_id, oms_uri)
         self._rsn_oms = CIOMSClientFactory.create_instance(oms_uri)
+        self._attr_poller.set_client(self._rsn_oms)
         log.debug("%r: CIOMSClient instance created: %s",
                   self._platform_id, self._rsn_oms)
 
@@ -313,12 +320,12 @@ class PlatformDriver(PlatformDriver):
 
         # power off all ports with connected devices
         if recursion:
-            for port in self._pnode.ports:
-                log.debug('disconnect power port: %s', port)
-                self.turn_off_port(port)
+            log.debug('disconnect power ports: %s', self._pnode.ports.keys())
+            self.turn_off_ports(self._pnode.ports)
 
         CIOMSClientFactory.destroy_instance(self._rsn_oms)
         self._rsn_oms = None
+        self._attr_poller.set_client(None)
         log.debug("%r: CIOMSClient instance destroyed", self._platform_id)
 
     def get_metadata(self):
@@ -378,6 +385,35 @@ class PlatformDriver(PlatformDriver):
         # reported timestamps are already in NTP. Just return the dict:
         return attr_values
 
+    def get_platforms_attribute_values(self, requests):
+        """
+        Gets attribute values for any number of platforms, typically this
+        platform and its subplatforms, with a single OMS call per platform.
+        Only samples newer than those returned by previous calls are
+        requested and returned.
+
+        @param requests  [(platform_id, attr_id, from_time), ...] with
+                         from_time in ION system time.
+
+        @retval {platform_id: {attr_id: [(value, timestamp), ...], ...}, ...}
+                with timestamps in NTP.
+        """
+        log.debug("%r: get_platforms_attribute_values: requests=%s",
+                  self._platform_id, requests)
+
+        if not isinstance(requests, (list, tuple, set)):
+            raise PlatformException('get_platforms_attribute_values: requests argument '
+                                    'must be a list [(platform_id, attrName, from_time), ...]. '
+                                    'Given: %s' % (requests,))
+
+        requests_ntp = [(platform_id, attr_id, ion_ts_2_ntp(from_time))
+                        for (platform_id, attr_id, from_time) in requests]
+
+        try:
+            return self._attr_poller.poll(requests_ntp)
+        except Exception as e:
+            raise PlatformConnectionException(msg="Cannot get_platform_attribute_values: %s" % str(e))
+
     def _verify_platform_id_in_response(self, response):
         """
         Verifies the presence of my platform_id in the response.
@@ -470,6 +506,59 @@ class PlatformDriver(PlatformDriver):
 
         return dic_plat  # note: return the dic for the platform
 
+    def turn_on_ports(self, port_ids, src=None):
+        """
+        Turns on several ports, issuing the requests concurrently when the
+        CIOMSClient supports it.
+        @param port_ids
+                    Port IDs
+        @param src
+                    Some provenance information: actor, mission, etc.
+
+        @retval {port_id: response} for my platform
+        @raise PlatformConnectionException if any of the requests failed;
+               all requests are issued regardless.
+        """
+        return self._set_ports_power('turn_on_platform_port', port_ids, src)
+
+    def turn_off_ports(self, port_ids, src=None):
+        """
+        Turns off several ports, issuing the requests concurrently when the
+        CIOMSClient supports it.
+        @param port_ids
+                    Port IDs
+        @param src
+                    Some provenance information: actor, mission, etc.
+
+        @retval {port_id: response} for my platform
+        @raise PlatformConnectionException if any of the requests failed;
+               all requests are issued regardless.
+        """
+        return self._set_ports_power('turn_off_platform_port', port_ids, src)
+
+    def _set_ports_power(self, operation, port_ids, src):
+        port_ids = list(port_ids)
+        log.debug("%r: %s: port_ids=%s src=%s",
+                  self._platform_id, operation, port_ids, src)
+
+        calls = [('port.%s' % operation, (self._platform_id, port_id, src))
+                 for port_id in port_ids]
+        responses = fan_out(self._rsn_oms, calls)
+
+        result = {}
+        errors = []
+        for port_id, response in zip(port_ids, responses):
+            if isinstance(response, Exception):
+                errors.append("%s: %s" % (port_id, response))
+                continue
+            dic_plat = self._verify_platform_id_in_response(response)
+            result[port_id] = self._verify_port_id_in_response(port_id, dic_plat)
+
+        if errors:
+            raise PlatformConnectionException(msg="Cannot %s: %s" % (operation, "; ".join(errors)))
+
+        return result
+
     def set_over_current(self, port_id, ma, us, src=None):
         """
         @param port_id
@@ -608,6 +697,10 @@ class PlatformDriver(PlatformDriver):
             result = self.get_attribute_values(attrs)
             return result
 
+        if 'platform_attrs' in kwargs:
+            result = self.get_platforms_attribute_values(kwargs['platform_attrs'])
+            return result
+
         if 'subplatform_ids' in kwargs:
             result = self.get_subplatform_ids()
             return result
@@ -14,7 +14,8 @@ __license__ = 'Apache 2.0'
 from pyon.public import log
 
 from ion.agents.platform.rsn.simulator.oms_simulator import CIOMSSimulator
-import xmlrpclib
+from mi.platform.driver.rsn.oms_client_pool import CIOMSClientPool
+from mi.platform.driver.rsn.oms_client_pool import DEFAULT_POOL_SIZE
 import os
 from gevent import Greenlet, sleep
 
@@ -31,6 +32,10 @@ class CIOMSClientFactory(object):
     _sim_process = None
     _rsn_oms = None
 
+    # {uri: [CIOMSClientPool, reference count]}: the pool for a URI is
+    # shared by all instances created for it in this process.
+    _pools = {}
+
     @classmethod
     def create_instance(cls, uri=None):
         """
@@ -44,7 +49,10 @@ class CIOMSClientFactory(object):
         then an CIOMSSimulator instance is directly created and returned.
         Otherwise, the given argument (or value of the OMS environment variable)
         is used as given to try the connection with the corresponding XML/RPC
-        server resolvable by that URI.
+        server resolvable by that URI. In this case the returned object is a
+        CIOMSClientPool of keep-alive connections, shared with any other
+        instance created for the same URI. The pool size is taken from the
+        OMS_POOL_SIZE environment variable, if defined.
         """
 
         if uri is None:
@@ -55,9 +63,14 @@ class CIOMSClientFactory(object):
             log.debug("Using embedded CIOMSSimulator instance")
             instance = CIOMSSimulator()
         else:
-            log.debug("Creating xmlrpclib.ServerProxy: uri=%s", uri)
-            instance = xmlrpclib.ServerProxy(uri, allow_none=True)
-            log.debug("Created xmlrpclib.ServerProxy: uri=%s", uri)
+            entry = cls._pools.get(uri)
+            if entry is None:
+                size = int(os.getenv('OMS_POOL_SIZE', DEFAULT_POOL_SIZE))
+                log.debug("Creating CIOMSClientPool: uri=%s size=%d", uri, size)
+                entry = cls._pools[uri] = [CIOMSClientPool(uri, size), 0]
+            entry[1] += 1
+            instance = entry[0]
+            log.debug("Using CIOMSClientPool: uri=%s references=%d", uri, entry[1])
 
         cls._inst_count += 1
         log.debug("create_instance: _inst_count = %d", cls._inst_count)
@@ -75,6 +88,15 @@ class CIOMSClientFactory(object):
             instance._deactivate_simulator()
             log.debug("Embedded CIOMSSimulator instance destroyed")
 
+        elif isinstance(instance, CIOMSClientPool):
+            entry = cls._pools.get(instance.uri)
+            if entry is not None and entry[0] is instance:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del cls._pools[instance.uri]
+                    instance.close()
+                    log.debug("CIOMSClientPool closed: uri=%s", instance.uri)
+
         # else: nothing needed to do.
             
         log.debug("destroy_instance: _inst_count = %d", cls._inst_count)
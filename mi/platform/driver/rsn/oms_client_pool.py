@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+
+"""
+@package mi.platform.driver.rsn.oms_client_pool
+@file    mi/platform/driver/rsn/oms_client_pool.py
+@author  agent
+@brief   Pooled, keep-alive CI-OMS client shared by the RSN platform drivers
+         in a process.
+
+A CIOMSClientPool looks like a CIOMSClient (operations are reached through
+the "handler" attributes, eg. pool.port.turn_on_platform_port(...)) but
+each call borrows one of a bounded set of xmlrpclib.ServerProxy instances.
+Every proxy keeps its own persistent HTTP/1.1 connection to the OMS, so
+the TCP connection is reused across calls, and independent calls can be
+issued concurrently with fan_out.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+
+import xmlrpclib
+import threading
+
+from mi.core.log import get_logger ; log = get_logger()
+
+
+# Default maximum number of proxies (and so connections) per pool.
+DEFAULT_POOL_SIZE = 8
+
+
+class CIOMSClientPool(object):
+    """
+    Bounded pool of keep-alive xmlrpclib.ServerProxy instances for a URI.
+    """
+
+    def __init__(self, uri, size=DEFAULT_POOL_SIZE):
+        """
+        @param uri   URI of the OMS XML/RPC server.
+        @param size  maximum number of concurrent connections.
+        """
+        self._uri = uri
+        self._size = max(1, size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._available = threading.BoundedSemaphore(self._size)
+        self._created = 0
+        self._closed = False
+
+    @property
+    def uri(self):
+        return self._uri
+
+    @property
+    def size(self):
+        return self._size
+
+    # emulate the CIOMSClient "handler" mechanism:
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return _PooledMethod(self, name)
+
+    def _acquire(self):
+        self._available.acquire()
+        with self._lock:
+            if self._closed:
+                self._available.release()
+                raise xmlrpclib.ProtocolError(self._uri, 0, "pool closed", {})
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        log.debug("CIOMSClientPool: creating proxy #%d for uri=%s", self._created, self._uri)
+        return xmlrpclib.ServerProxy(self._uri, allow_none=True)
+
+    def _release(self, proxy, discard=False):
+        with self._lock:
+            if discard or self._closed:
+                self._created -= 1
+                _close_proxy(proxy)
+            else:
+                self._idle.append(proxy)
+        self._available.release()
+
+    def call(self, method, *args):
+        """
+        Calls the given dotted OMS method, eg. "port.get_platform_ports", on
+        a pooled connection.
+        """
+        proxy = self._acquire()
+        try:
+            result = getattr(proxy, method)(*args)
+        except xmlrpclib.Fault:
+            # server side error: the connection is still good.
+            self._release(proxy)
+            raise
+        except:
+            # transport level error: drop the connection.
+            self._release(proxy, discard=True)
+            raise
+        self._release(proxy)
+        return result
+
+    def fan_out(self, calls):
+        """
+        Issues the given calls concurrently, using at most `size` connections.
+
+        @param calls  list of (method, args) pairs.
+        @retval list, in the order of calls, with the result of each call or
+                the exception it raised.
+        """
+        return fan_out(self, calls, self._size)
+
+    def stats(self):
+        with self._lock:
+            return {'uri': self._uri, 'size': self._size,
+                    'connections': self._created, 'idle': len(self._idle)}
+
+    def close(self):
+        """
+        Closes all idle connections; connections in use are closed as they
+        are returned.
+        """
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for proxy in idle:
+            _close_proxy(proxy)
+        log.debug("CIOMSClientPool: closed pool for uri=%s", self._uri)
+
+
+class _PooledMethod(object):
+    """
+    Dotted method name bound to a pool, resolved to a call on invocation.
+    """
+    def __init__(self, pool, name):
+        self._pool = pool
+        self._name = name
+
+    def __getattr__(self, name):
+        return _PooledMethod(self._pool, "%s.%s" % (self._name, name))
+
+    def __call__(self, *args):
+        return self._pool.call(self._name, *args)
+
+
+def _close_proxy(proxy):
+    try:
+        proxy('close')()
+    except Exception as e:
+        log.debug("CIOMSClientPool: error closing proxy: %s", e)
+
+
+def _resolve(client, method):
+    """
+    Resolves a dotted method name against a CIOMSClient-like object.
+    """
+    target = client
+    for name in method.split('.'):
+        target = getattr(target, name)
+    return target
+
+
+def fan_out(client, calls, size=DEFAULT_POOL_SIZE):
+    """
+    Issues the given calls against client, concurrently when client is a
+    CIOMSClientPool and serially otherwise (eg. the embedded simulator).
+
+    @param client  CIOMSClientPool or CIOMSClient instance.
+    @param calls   list of (method, args) pairs, method being a dotted name
+                   like "port.turn_off_platform_port".
+    @param size    maximum number of concurrent calls.
+
+    @retval list, in the order of calls, with the result of each call or the
+            exception it raised.
+    """
+    results = [None] * len(calls)
+
+    def run(index):
+        method, args = calls[index]
+        try:
+            results[index] = _resolve(client, method)(*args)
+        except Exception as e:
+            results[index] = e
+
+    if not isinstance(client, CIOMSClientPool) or len(calls) < 2 or size < 2:
+        for index in range(len(calls)):
+            run(index)
+        return results
+
+    pending = range(len(calls))
+    pending.reverse()
+    pending_lock = threading.Lock()
+
+    def worker():
+        while True:
+            with pending_lock:
+                if not pending:
+                    return
+                index = pending.pop()
+            run(index)
+
+    workers = [threading.Thread(target=worker) for _ in range(min(size, len(calls)))]
+    for thread in workers:
+        thread.daemon = True
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return results
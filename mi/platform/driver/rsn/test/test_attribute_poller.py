@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+"""
+@package mi.platform.driver.rsn.test.test_attribute_poller
+@file    mi/platform/driver/rsn/test/test_attribute_poller.py
+@author  agent
+@brief   Test cases for batched multi-platform attribute polling.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+from nose.plugins.attrib import attr
+
+from mi.core.unit_test import MiUnitTest
+
+from mi.platform.driver.rsn.attribute_poller import AttributePoller
+
+INVALID_PLATFORM_ID = 'ERROR_INVALID_PLATFORM_ID'
+INVALID_ATTRIBUTE_ID = 'ERROR_INVALID_ATTRIBUTE_ID'
+
+
+class OmsStub(object):
+    """
+    Serves samples at timestamps 1.0, 2.0, ... up to `now` for every
+    attribute, returning those at or after the requested from_time.
+    """
+    def __init__(self, platforms):
+        self.platforms = platforms
+        self.now = 3
+        self.requests = []
+
+    @property
+    def attr(self):
+        return self
+
+    def get_platform_attribute_values(self, platform_id, attrs):
+        self.requests.append((platform_id, attrs))
+        if platform_id not in self.platforms:
+            return {platform_id: INVALID_PLATFORM_ID}
+
+        values = {}
+        for attr_id, from_time in attrs:
+            if attr_id not in self.platforms[platform_id]:
+                values[attr_id] = INVALID_ATTRIBUTE_ID
+                continue
+            values[attr_id] = [('%s_%d' % (attr_id, t), float(t))
+                               for t in range(1, self.now + 1) if t >= from_time]
+        return {platform_id: values}
+
+
+@attr('UNIT', group='mi')
+class TestAttributePoller(MiUnitTest):
+
+    def setUp(self):
+        self.oms = OmsStub({'Node1A': ['input_voltage', 'input_bus_current'],
+                            'LJ01D': ['input_voltage']})
+        self.poller = AttributePoller(self.oms)
+
+    def test_grouping(self):
+        """
+        One OMS request per platform, with duplicate attributes merged.
+        """
+        grouped = self.poller.group_requests([('Node1A', 'input_voltage', 2.0),
+                                              ('LJ01D', 'input_voltage', 0.0),
+                                              ('Node1A', 'input_bus_current', 0.0),
+                                              ('Node1A', 'input_voltage', 1.0)])
+        self.assertEqual(grouped, {'Node1A': [('input_bus_current', 0.0), ('input_voltage', 1.0)],
+                                   'LJ01D': [('input_voltage', 0.0)]})
+
+    def test_poll(self):
+        """
+        Results keyed by platform, with only new samples on later polls.
+        """
+        requests = [('Node1A', 'input_voltage', 0.0),
+                    ('Node1A', 'input_bus_current', 0.0),
+                    ('LJ01D', 'input_voltage', 0.0)]
+
+        result = self.poller.poll(requests)
+        self.assertEqual(len(self.oms.requests), 2)
+        self.assertEqual(result['LJ01D']['input_voltage'],
+                         [('input_voltage_1', 1.0), ('input_voltage_2', 2.0), ('input_voltage_3', 3.0)])
+        self.assertEqual(len(result['Node1A']['input_bus_current']), 3)
+        self.assertEqual(self.poller.last_timestamp('Node1A', 'input_voltage'), 3.0)
+
+        # nothing new yet: from_time is moved up to the last timestamp seen
+        result = self.poller.poll(requests)
+        self.assertEqual(result['Node1A'], {'input_voltage': [], 'input_bus_current': []})
+        self.assertEqual(dict(self.oms.requests[-1][1])['input_voltage'], 3.0)
+
+        self.oms.now = 4
+        result = self.poller.poll(requests)
+        self.assertEqual(result['LJ01D'], {'input_voltage': [('input_voltage_4', 4.0)]})
+
+        self.poller.reset('LJ01D')
+        self.assertIsNone(self.poller.last_timestamp('LJ01D', 'input_voltage'))
+        self.assertEqual(self.poller.last_timestamp('Node1A', 'input_voltage'), 4.0)
+
+    def test_invalid(self):
+        """
+        Invalid platforms and attributes are reported in place.
+        """
+        result = self.poller.poll([('Bogus', 'input_voltage', 0.0),
+                                   ('LJ01D', 'bogus_attr', 0.0)])
+        self.assertEqual(result['Bogus'], INVALID_PLATFORM_ID)
+        self.assertEqual(result['LJ01D'], {'bogus_attr': INVALID_ATTRIBUTE_ID})
+
+    def test_error(self):
+        """
+        A failing OMS call is raised and records no timestamps.
+        """
+        def fail(platform_id, attrs):
+            raise IOError('connection lost')
+        self.oms.get_platform_attribute_values = fail
+
+        with self.assertRaises(IOError):
+            self.poller.poll([('LJ01D', 'input_voltage', 0.0)])
+        self.assertIsNone(self.poller.last_timestamp('LJ01D', 'input_voltage'))
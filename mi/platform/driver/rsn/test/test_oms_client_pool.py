@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+"""
+@package mi.platform.driver.rsn.test.test_oms_client_pool
+@file    mi/platform/driver/rsn/test/test_oms_client_pool.py
+@author  agent
+@brief   Test cases for the pooled CI-OMS client.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import time
+import threading
+import xmlrpclib
+from SocketServer import ThreadingMixIn
+from SimpleXMLRPCServer import SimpleXMLRPCServer
+from SimpleXMLRPCServer import SimpleXMLRPCRequestHandler
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+
+from mi.platform.driver.rsn.oms_client_pool import CIOMSClientPool
+from mi.platform.driver.rsn.oms_client_pool import fan_out
+
+# simulated OMS latency per call
+DELAY = .1
+
+
+class KeepAliveRequestHandler(SimpleXMLRPCRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        SimpleXMLRPCRequestHandler.setup(self)
+        self.server.connections += 1
+
+
+class ThreadedXMLRPCServer(ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+    connections = 0
+
+
+class OmsStub(object):
+    """
+    Minimal stand-in for the OMS port handler.
+    """
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def turn_off_platform_port(self, platform_id, port_id, src):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(DELAY)
+        with self.lock:
+            self.active -= 1
+        return {platform_id: {port_id: 'OFF'}}
+
+    def fail(self):
+        raise ValueError('failure requested')
+
+
+@attr('UNIT', group='mi')
+class TestCIOMSClientPool(MiUnitTest):
+
+    def setUp(self):
+        self.server = ThreadedXMLRPCServer(('localhost', 0), KeepAliveRequestHandler,
+                                           logRequests=False, allow_none=True)
+        self.stub = OmsStub()
+        self.server.register_function(lambda: 'pong', 'hello.ping')
+        self.server.register_function(self.stub.turn_off_platform_port, 'port.turn_off_platform_port')
+        self.server.register_function(self.stub.fail, 'port.fail')
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.uri = 'http://localhost:%d' % self.server.server_address[1]
+
+    def test_keep_alive(self):
+        """
+        Serial calls reuse a single connection.
+        """
+        pool = CIOMSClientPool(self.uri, 4)
+        for _ in range(10):
+            self.assertEqual(pool.hello.ping(), 'pong')
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(pool.stats()['connections'], 1)
+        pool.close()
+        self.assertEqual(pool.stats()['connections'], 0)
+
+    def test_fan_out(self):
+        """
+        Calls are issued concurrently, bounded by the pool size, and results
+        come back in order with exceptions in place.
+        """
+        pool = CIOMSClientPool(self.uri, 4)
+        calls = [('port.turn_off_platform_port', ('LJ01D', str(port), 'test'))
+                 for port in range(8)]
+        calls.append(('port.fail', ()))
+
+        start = time.time()
+        results = pool.fan_out(calls)
+        elapsed = time.time() - start
+        log.debug("fan_out of %d calls: %f secs", len(calls), elapsed)
+
+        for port, result in enumerate(results[:8]):
+            self.assertEqual(result, {'LJ01D': {str(port): 'OFF'}})
+        self.assertIsInstance(results[8], xmlrpclib.Fault)
+
+        self.assertEqual(self.stub.max_active, 4)
+        self.assertLess(elapsed, len(calls) * DELAY / 2)
+        self.assertLessEqual(self.server.connections, 4)
+        pool.close()
+
+    def test_transport_error(self):
+        """
+        A connection that fails at the transport level is dropped.
+        """
+        pool = CIOMSClientPool('http://localhost:1', 2)
+        with self.assertRaises(Exception):
+            pool.hello.ping()
+        self.assertEqual(pool.stats()['connections'], 0)
+
+        pool.close()
+        with self.assertRaises(xmlrpclib.ProtocolError):
+            pool.hello.ping()
+
+    def test_serial_fallback(self):
+        """
+        Clients that are not pools (eg. the embedded simulator) are called serially.
+        """
+        results = fan_out(self.stub, [('turn_off_platform_port', ('LJ01D', '1', 'test')),
+                                      ('fail', ())])
+        self.assertEqual(results[0], {'LJ01D': {'1': 'OFF'}})
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(self.stub.max_active, 1)
+
+
+@attr('INT', group='mi')
+class TestCIOMSClientPoolSimulator(MiUnitTest):
+    """
+    Exercises the pooled client against the OMS simulator launched as a
+    separate process.
+    """
+    def setUp(self):
+        from mi.platform.driver.rsn.oms_client_factory import CIOMSClientFactory
+        self.factory = CIOMSClientFactory
+        self.uri = CIOMSClientFactory.launch_simulator(inactivity_period=180)
+        self.addCleanup(CIOMSClientFactory.stop_launched_simulator)
+
+    def test_shared_pool(self):
+        first = self.factory.create_instance(self.uri)
+        second = self.factory.create_instance(self.uri)
+        self.assertIs(first, second)
+
+        self.assertEqual(first.hello.ping().upper(), 'PONG')
+
+        self.factory.destroy_instance(first)
+        self.assertEqual(second.hello.ping().upper(), 'PONG')
+        self.factory.destroy_instance(second)
+        self.assertNotIn(self.uri, self.factory._pools)
+
+    def test_fan_out(self):
+        client = self.factory.create_instance(self.uri)
+        self.addCleanup(self.factory.destroy_instance, client)
+
+        # responses for unknown IDs are just as comparable as valid ones
+        platform_ids = ['ShoreStation', 'Node1A', 'Node1B', 'LJ01D', 'MJ01C', 'LV01A']
+        calls = [('port.get_platform_ports', (platform_id,)) for platform_id in platform_ids]
+
+        start = time.time()
+        serial = [client.port.get_platform_ports(platform_id) for platform_id in platform_ids]
+        serial_time = time.time() - start
+
+        start = time.time()
+        concurrent = client.fan_out(calls)
+        concurrent_time = time.time() - start
+
+        log.debug("get_platform_ports for %d platforms: serial %f, fan out %f",
+                  len(platform_ids), serial_time, concurrent_time)
+        self.assertEqual(serial, concurrent)
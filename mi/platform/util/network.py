@@ -11,6 +11,9 @@ __author__ = 'Carlos Rueda'
 __license__ = 'Apache 2.0'
 
 
+import hashlib
+
+
 class BaseNode(object):
     """
     A convenient base class for the components of a platform network.
@@ -101,6 +104,9 @@ class PortNode(BaseNode):
         self._port_id = str(port_id)
         self._instrument_ids = []
 
+        # PlatformNode this port has been added to, if any:
+        self._platform = None
+
     def __repr__(self):
         return "PortNode{port_id=%r, instrument_ids=%r}" % (
             self.port_id, self.instrument_ids)
@@ -109,6 +115,10 @@ class PortNode(BaseNode):
     def port_id(self):
         return self._port_id
 
+    @property
+    def platform(self):
+        return self._platform
+
     @property
     def instrument_ids(self):
         """
@@ -121,12 +131,16 @@ class PortNode(BaseNode):
             raise Exception('duplicate instrument_id=%r for port_id=%r' % (
                             instrument_id, self.port_id))
         self._instrument_ids.append(instrument_id)
+        if self._platform:
+            self._platform.invalidate()
 
     def remove_instrument_id(self, instrument_id):
         if instrument_id not in self._instrument_ids:
             raise Exception('no such instrument_id=%r in port_id=%r' % (
                             instrument_id, self.port_id))
         self._instrument_ids.remove(instrument_id)
+        if self._platform:
+            self._platform.invalidate()
 
     def diff(self, other):
         """
@@ -215,6 +229,11 @@ class PlatformNode(BaseNode):
     The _CFG element included for convenience to capture the provided
     configuration dict in PlatformAgent. See
     create_network_definition_from_ci_config()
+
+    self._structural_hash caches the digest returned by structural_hash().
+    It is reset, for this node and all its ancestors, by the add_* methods
+    here and in PortNode; code modifying the nodes or attribute definitions
+    by other means should call invalidate().
     """
     #TODO: some separation of configuration vs. state would be convenient.
 
@@ -228,19 +247,56 @@ class PlatformNode(BaseNode):
         self._parent = None
         self._instruments = {}
         self._CFG = CFG
+        self._structural_hash = None
 
     def set_name(self, name):
         self._name = name
+        self.invalidate()
 
     def add_port(self, port):
         if port.port_id in self._ports:
             raise Exception('%s: duplicate port ID' % port.port_id)
         self._ports[port.port_id] = port
+        port._platform = self
+        self.invalidate()
 
     def add_attribute(self, attr):
         if attr.attr_id in self._attrs:
             raise Exception('%s: duplicate attribute ID' % attr.attr_id)
         self._attrs[attr.attr_id] = attr
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Discards the cached structural hash of this node and its ancestors.
+        """
+        # a cached node always has all its descendants cached, so the walk
+        # can stop at the first ancestor that is not cached.
+        node = self
+        while node is not None and node._structural_hash is not None:
+            node._structural_hash = None
+            node = node._parent
+
+    def structural_hash(self):
+        """
+        Digest of the elements compared by diff() for this subtree: platform
+        ID, name, attributes, ports with their instruments and, recursively,
+        subplatforms. Two subtrees with the same digest have no differences.
+        The parent is not included.
+
+        @retval hex string, cached until the subtree is modified.
+        """
+        if self._structural_hash is None:
+            h = hashlib.sha1()
+            h.update(repr((self._platform_id, self._name)))
+            for attr_id in sorted(self._attrs):
+                h.update(repr((attr_id, sorted(self._attrs[attr_id].defn.iteritems()))))
+            for port_id in sorted(self._ports):
+                h.update(repr((port_id, sorted(self._ports[port_id].instrument_ids))))
+            for platform_id in sorted(self._subplatforms):
+                h.update(self._subplatforms[platform_id].structural_hash())
+            self._structural_hash = h.hexdigest()
+        return self._structural_hash
 
     @property
     def platform_id(self):
@@ -278,6 +334,7 @@ class PlatformNode(BaseNode):
             raise Exception('%s: duplicate subplatform ID' % pn.platform_id)
         self._subplatforms[pn.platform_id] = pn
         pn._parent = self
+        self.invalidate()
 
     @property
     def instruments(self):
@@ -290,6 +347,7 @@ class PlatformNode(BaseNode):
         if instrument.instrument_id in self._instruments:
             raise Exception('%s: duplicate instrument ID' % instrument.instrument_id)
         self._instruments[instrument.instrument_id] = instrument
+        self.invalidate()
 
     def __str__(self):
         s = "<%s" % self.platform_id
@@ -334,12 +392,14 @@ class PlatformNode(BaseNode):
             return "platform parents are different: %r != %r" % (
                 self.parent.platform_id, other.parent.platform_id)
 
+        # identical subtrees need no further comparison:
+        if self is other or self.structural_hash() == other.structural_hash():
+            return None
+
         # compare attributes:
-        attr_ids = set(self.attrs.iterkeys())
-        other_attr_ids = set(other.attrs.iterkeys())
-        if attr_ids != other_attr_ids:
+        if self.attrs.viewkeys() != other.attrs.viewkeys():
             return "platform_id=%r: attribute IDs are different: %r != %r" % (
-                self.platform_id, attr_ids, other_attr_ids)
+                self.platform_id, set(self.attrs), set(other.attrs))
         for attr_id, attr in self.attrs.iteritems():
             other_attr = other.attrs[attr_id]
             diff = attr.diff(other_attr)
@@ -347,11 +407,9 @@ class PlatformNode(BaseNode):
                 return diff
 
         # compare ports:
-        port_ids = set(self.ports.iterkeys())
-        other_port_ids = set(other.ports.iterkeys())
-        if port_ids != other_port_ids:
+        if self.ports.viewkeys() != other.ports.viewkeys():
             return "platform_id=%r: port IDs are different: %r != %r" % (
-                self.platform_id, port_ids, other_port_ids)
+                self.platform_id, set(self.ports), set(other.ports))
         for port_id, port in self.ports.iteritems():
             other_port = other.ports[port_id]
             diff = port.diff(other_port)
@@ -359,12 +417,10 @@ class PlatformNode(BaseNode):
                 return diff
 
         # compare sub-platforms:
-        subplatform_ids = set(self.subplatforms.iterkeys())
-        other_subplatform_ids = set(other.subplatforms.iterkeys())
-        if subplatform_ids != other_subplatform_ids:
+        if self.subplatforms.viewkeys() != other.subplatforms.viewkeys():
             return "platform_id=%r: subplatform IDs are different: %r != %r" % (
                     self.platform_id,
-                    subplatform_ids, other_subplatform_ids)
+                    set(self.subplatforms), set(other.subplatforms))
 
         for platform_id, node in self.subplatforms.iteritems():
             other_node = other.subplatforms[platform_id]
@@ -382,6 +438,9 @@ class NetworkDefinition(BaseNode):
 
     See NetworkUtil for serialization/deserialization of objects of this type
     and other associated utilities.
+
+    Lookups by instrument ID and attribute ID use indexes built on first use
+    and rebuilt after the network is modified.
     """
 
     def __init__(self):
@@ -392,6 +451,10 @@ class NetworkDefinition(BaseNode):
         # the network.
         self._dummy_root = None
 
+        # {instrument_id: PortNode}, {instrument_id: PlatformNode} and
+        # {attr_id: [PlatformNode, ...]}; see _get_indexes
+        self._indexes = None
+
     @property
     def pnodes(self):
         """
@@ -421,6 +484,69 @@ class NetworkDefinition(BaseNode):
         """
         return self._dummy_root.get_map([])
 
+    def get_pnode(self, platform_id):
+        """
+        @return the PlatformNode with the given ID, or None.
+        """
+        return self._pnodes.get(platform_id)
+
+    def get_instrument_port(self, instrument_id):
+        """
+        @return the PortNode the given instrument is associated to, or None.
+        """
+        return self._get_indexes()[0].get(instrument_id)
+
+    def get_instrument_pnode(self, instrument_id):
+        """
+        @return the PlatformNode that has the given InstrumentNode configured
+                or, failing that, the platform of the port the instrument is
+                associated to. None if not found.
+        """
+        pnode = self._get_indexes()[1].get(instrument_id)
+        if pnode is None:
+            port = self.get_instrument_port(instrument_id)
+            if port is not None:
+                pnode = port.platform
+        return pnode
+
+    def get_attr_pnodes(self, attr_id):
+        """
+        @return list of the PlatformNodes having the given attribute.
+        """
+        return list(self._get_indexes()[2].get(attr_id, ()))
+
+    def _get_indexes(self):
+        """
+        Returns the indexes, rebuilding them in a single traversal if the
+        network has been modified since they were built. Modifications are
+        detected through the structural hash cache of the dummy root, which
+        is reset by any change in the tree.
+        """
+        root = self._dummy_root
+        if root is None:
+            return {}, {}, {}
+
+        if self._indexes is None or root._structural_hash is None:
+            instrument_ports = {}
+            instrument_pnodes = {}
+            attr_pnodes = {}
+            stack = [root]
+            while stack:
+                pnode = stack.pop()
+                for port in pnode.ports.itervalues():
+                    for instrument_id in port.instrument_ids:
+                        instrument_ports[instrument_id] = port
+                for instrument_id in pnode.instruments:
+                    instrument_pnodes[instrument_id] = pnode
+                for attr_id in pnode.attrs:
+                    attr_pnodes.setdefault(attr_id, []).append(pnode)
+                stack.extend(pnode.subplatforms.itervalues())
+
+            root.structural_hash()
+            self._indexes = instrument_ports, instrument_pnodes, attr_pnodes
+
+        return self._indexes
+
     def diff(self, other):
         """
         Returns None if the two objects represent the same network definition.
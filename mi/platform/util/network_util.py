@@ -133,8 +133,17 @@ class NetworkUtil(object):
         @param level Indentation level (0 by default)
         @return string with the serialization
         """
+        chunks = []
+        NetworkUtil._serialize_pnode(pnode, level, chunks)
+        return "".join(chunks)
 
-        result = ""
+    @staticmethod
+    def _serialize_pnode(pnode, level, chunks):
+        """
+        Appends the serialization of the given PlatformNode to chunks, so the
+        whole network is joined once instead of concatenating the string of
+        each subtree into its parent's.
+        """
         next_level = level
         if pnode.platform_id:
             pid = pnode.platform_id
@@ -169,14 +178,12 @@ class NetworkUtil(object):
                 lines.append('  subplatforms:')
 
             nl = "\n" + ("  " * level)
-            result += nl + nl.join(lines)
+            chunks.append(nl)
+            chunks.append(nl.join(lines))
             next_level = level + 1
 
-        if pnode.subplatforms:
-            for sub_platform in pnode.subplatforms.itervalues():
-                result += NetworkUtil.serialize_pnode(sub_platform, next_level)
-
-        return result
+        for sub_platform in pnode.subplatforms.itervalues():
+            NetworkUtil._serialize_pnode(sub_platform, next_level, chunks)
 
     @staticmethod
     def _dump_pnode(pnode, indent_level=0, only_topology=False,
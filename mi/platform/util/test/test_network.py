@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+
+"""
+@package mi.platform.util.test.test_network
+@file    mi/platform/util/test/test_network.py
+@author  agent
+@brief   Test cases for the NetworkDefinition indexes, structural hash
+         based diff and serialization, with a synthetic 1,000 node network.
+"""
+
+__author__ = 'agent'
+__license__ = 'Apache 2.0'
+
+import time
+
+from nose.plugins.attrib import attr
+
+from mi.core.log import get_logger ; log = get_logger()
+from mi.core.unit_test import MiUnitTest
+
+from mi.platform.util.network import NetworkDefinition
+from mi.platform.util.network import PlatformNode
+from mi.platform.util.network import AttrNode
+from mi.platform.util.network import PortNode
+from mi.platform.util.network import InstrumentNode
+from mi.platform.util.network_util import NetworkUtil
+
+NODE_COUNT = 1000
+FAN_OUT = 10
+
+
+def build_network(node_count=NODE_COUNT, fan_out=FAN_OUT):
+    """
+    Synthetic network: a tree of node_count platforms with fan_out
+    subplatforms each, two attributes and two ports with one instrument
+    per platform.
+    """
+    ndef = NetworkDefinition()
+    ndef._dummy_root = PlatformNode('')
+    ndef.pnodes[''] = ndef._dummy_root
+
+    nodes = []
+    for n in range(node_count):
+        platform_id = 'PLAT_%04d' % n
+        pnode = PlatformNode(platform_id)
+        for attr_name in ('input_voltage', 'input_bus_current'):
+            pnode.add_attribute(AttrNode(attr_name, {'monitor_cycle_seconds': 5,
+                                                     'units': 'V'}))
+        for p in range(2):
+            port = PortNode('%s_%d' % (platform_id, p))
+            port.add_instrument_id('INST_%04d_%d' % (n, p))
+            pnode.add_port(port)
+        pnode.add_instrument(InstrumentNode('CFG_INST_%04d' % n))
+
+        parent = nodes[(n - 1) // fan_out] if n else ndef._dummy_root
+        parent.add_subplatform(pnode)
+        ndef.pnodes[platform_id] = pnode
+        nodes.append(pnode)
+
+    return ndef
+
+
+def serialize_pnode_concat(pnode, level=0):
+    """
+    The string concatenating serialization NetworkUtil.serialize_pnode
+    replaced, kept as reference output and for the benchmark.
+    """
+    result = ""
+    next_level = level
+    if pnode.platform_id:
+        lines = []
+        if level == 0:
+            lines.append('network:')
+        lines.append('- platform_id: %s' % pnode.platform_id)
+        if len(pnode.attrs):
+            lines.append('  attrs:')
+            for attr_id, attr in pnode.attrs.iteritems():
+                lines.append('  - attr_id: %s' % attr_id)
+                for k, v in attr.defn.iteritems():
+                    if k != "attr_id":
+                        lines.append('    %s: %s' % (k, v))
+        if len(pnode.ports):
+            lines.append('  ports:')
+            for port_id, port in pnode.ports.iteritems():
+                lines.append('  - port_id: %s' % port_id)
+                if len(port.instrument_ids):
+                    lines.append('    instruments:')
+                    for instrument_id in port.instrument_ids:
+                        lines.append('    - instrument_id: %s' % instrument_id)
+        if pnode.subplatforms:
+            lines.append('  subplatforms:')
+        nl = "\n" + ("  " * level)
+        result += nl + nl.join(lines)
+        next_level = level + 1
+
+    for sub_platform in pnode.subplatforms.itervalues():
+        result += serialize_pnode_concat(sub_platform, next_level)
+
+    return result
+
+
+@attr('UNIT', group='mi')
+class TestNetworkDefinition(MiUnitTest):
+
+    def setUp(self):
+        self.ndef = build_network()
+
+    def test_indexes(self):
+        ndef = self.ndef
+        self.assertIs(ndef.get_pnode('PLAT_0123'), ndef.pnodes['PLAT_0123'])
+        self.assertIsNone(ndef.get_pnode('bogus'))
+
+        port = ndef.get_instrument_port('INST_0123_1')
+        self.assertEqual(port.port_id, 'PLAT_0123_1')
+        self.assertIs(port.platform, ndef.pnodes['PLAT_0123'])
+        self.assertIs(ndef.get_instrument_pnode('INST_0123_1'), ndef.pnodes['PLAT_0123'])
+        self.assertIs(ndef.get_instrument_pnode('CFG_INST_0123'), ndef.pnodes['PLAT_0123'])
+
+        self.assertEqual(len(ndef.get_attr_pnodes('input_voltage|0')), NODE_COUNT)
+        self.assertEqual(ndef.get_attr_pnodes('bogus'), [])
+
+        # indexes follow modifications
+        pnode = ndef.pnodes['PLAT_0999']
+        pnode.get_port('PLAT_0999_0').add_instrument_id('NEW_INST')
+        self.assertIs(ndef.get_instrument_port('NEW_INST').platform, pnode)
+        pnode.add_attribute(AttrNode('temperature', {'monitor_cycle_seconds': 5, 'units': 'C'}))
+        self.assertEqual(ndef.get_attr_pnodes('temperature|0'), [pnode])
+
+    def test_structural_hash(self):
+        other = build_network()
+        root = self.ndef.root
+        self.assertEqual(root.structural_hash(), other.root.structural_hash())
+
+        leaf = other.pnodes['PLAT_0999']
+        leaf.get_port('PLAT_0999_1').remove_instrument_id('INST_0999_1')
+        self.assertIsNone(other.root._structural_hash)
+        self.assertNotEqual(root.structural_hash(), other.root.structural_hash())
+
+        # only the changed branch is rehashed
+        self.assertEqual(self.ndef.pnodes['PLAT_0001'].structural_hash(),
+                         other.pnodes['PLAT_0001'].structural_hash())
+
+    def test_diff(self):
+        other = build_network()
+        self.assertIsNone(self.ndef.diff(other))
+
+        other.pnodes['PLAT_0999'].get_port('PLAT_0999_1').add_instrument_id('EXTRA')
+        diff = self.ndef.diff(other)
+        self.assertIn('PLAT_0999_1', diff)
+        self.assertIn('instrument_ids are different', diff)
+
+        other = build_network()
+        other.pnodes['PLAT_0500'].add_subplatform(PlatformNode('EXTRA'))
+        self.assertIn('subplatform IDs are different', self.ndef.diff(other))
+
+    def test_serialization(self):
+        ser = NetworkUtil.serialize_network_definition(self.ndef)
+        self.assertEqual(NetworkUtil.serialize_pnode(self.ndef.root),
+                         serialize_pnode_concat(self.ndef.root))
+
+        ndef2 = NetworkUtil.deserialize_network_definition(ser)
+        self.assertEqual(len(ndef2.pnodes), NODE_COUNT + 1)
+        self.assertIsNone(self.ndef.diff(ndef2))
+
+    def test_benchmark(self):
+        """
+        Timings for the synthetic network, logged at debug level.
+        """
+        other = build_network()
+
+        def timed(func, count=10):
+            start = time.time()
+            for _ in range(count):
+                func()
+            return (time.time() - start) / count
+
+        serialize = timed(lambda: NetworkUtil.serialize_pnode(self.ndef.root))
+        serialize_concat = timed(lambda: serialize_pnode_concat(self.ndef.root))
+
+        def uncached_diff():
+            for pnode in self.ndef.pnodes.itervalues():
+                pnode._structural_hash = None
+            for pnode in other.pnodes.itervalues():
+                pnode._structural_hash = None
+            return self.ndef.diff(other)
+
+        first_diff = timed(uncached_diff, 1)
+        cached_diff = timed(lambda: self.ndef.diff(other), 100)
+        lookup = timed(lambda: self.ndef.get_instrument_port('INST_0999_1'), 1000)
+
+        log.debug("%d node network: serialize %f (concatenating %f), "
+                  "diff %f, diff with cached hashes %f, instrument lookup %f",
+                  NODE_COUNT, serialize, serialize_concat, first_diff, cached_diff, lookup)
+
+        self.assertLess(cached_diff, first_diff)